@@ -0,0 +1,54 @@
+# Filename: backend/benchmarks/bench_c4_ai.py
+
+"""
+Connect Four AI: nodes per second, depth reached and time to move per
+difficulty, from a few opening and midgame positions.
+
+Run from backend/:
+    python -m benchmarks.bench_c4_ai
+"""
+
+# Step 1: Standard library imports
+import statistics
+
+# Step 2: Local imports
+from connect_four import ai, engine
+
+POSITIONS = {
+    "empty": [],
+    "opening": [3, 3, 2, 4],
+    "midgame": [3, 3, 2, 4, 4, 2, 5, 1, 1, 5, 0, 6],
+}
+
+
+def _position(cols):
+    position = engine.Position()
+    for col in cols:
+        position.play(col)
+    return position
+
+
+def main(runs=3):
+    print(f"{'difficulty':<8} {'position':<8} {'depth':>5} {'nodes':>9} {'ms/move':>9} {'nodes/s':>10}")
+    for difficulty, profile in ai.DIFFICULTIES.items():
+        for name, cols in POSITIONS.items():
+            samples = []
+            for _ in range(runs):
+                # Step 1: Cold table per run so numbers are comparable
+                result = ai.search(
+                    _position(cols),
+                    profile["max_depth"],
+                    profile["time_budget_ms"],
+                    table=ai.TranspositionTable(),
+                )
+                samples.append(result)
+
+            elapsed = statistics.median(r.elapsed_ms for r in samples)
+            nodes = statistics.median(r.nodes for r in samples)
+            depth = min(r.depth for r in samples)
+            nps = nodes / (elapsed / 1000) if elapsed else 0
+            print(f"{difficulty:<8} {name:<8} {depth:>5} {nodes:>9,.0f} {elapsed:>9.1f} {nps:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# Filename: backend/benchmarks/bench_c4_engine.py
+
+"""
+Connect Four move generation throughput (perft) on the bitboard engine.
+
+Run from backend/:
+    python -m benchmarks.bench_c4_engine
+"""
+
+# Step 1: Standard library imports
+import time
+
+# Step 2: Local imports
+from connect_four import engine
+
+
+def perft(position, depth):
+    # Step 1: Count leaf nodes, stopping at wins like a real search would
+    if depth == 0:
+        return 1
+    nodes = 0
+    for col in position.legal_columns():
+        if position.play(col):
+            nodes += 1
+        else:
+            nodes += perft(position, depth - 1)
+        position.undo(col)
+    return nodes
+
+
+def main(max_depth=7):
+    position = engine.Position()
+    for depth in range(1, max_depth + 1):
+        started = time.perf_counter()
+        nodes = perft(position, depth)
+        elapsed = time.perf_counter() - started
+        print(f"perft({depth}) = {nodes:>9,} nodes  {elapsed * 1e3:8.1f} ms  {nodes / elapsed:12,.0f} nodes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# Filename: backend/benchmarks/bench_checkers_ai.py
+
+"""
+Checkers: move generation (per-square tables vs. the old 64-square scan)
+and AI search speed / depth reached under the default time budget.
+
+Run from backend/:
+    python -m benchmarks.bench_checkers_ai
+"""
+
+# Step 1: Standard library imports
+import random
+import statistics
+import timeit
+
+# Step 2: Local imports
+from checkers import ai, engine
+from utils.game.transposition_table import TranspositionTable
+
+
+def _legacy_legal_moves(board, player, forced_piece_index=None):
+    """The pre-engine ``legal_moves_for`` (kept here for comparison only)."""
+    def owner(piece):
+        return 1 if piece in ("1", "3") else 2 if piece in ("2", "4") else None
+
+    def directions(piece):
+        if piece in ("3", "4"):
+            return [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+        return [(-1, -1), (-1, 1)] if piece == "1" else [(1, -1), (1, 1)] if piece == "2" else []
+
+    def inside(row, col):
+        return 0 <= row < 8 and 0 <= col < 8
+
+    captures, quiet = [], []
+    for index, piece in enumerate(board):
+        if owner(piece) != player or (forced_piece_index is not None and index != forced_piece_index):
+            continue
+        row, col = divmod(index, 8)
+        for dr, dc in directions(piece):
+            if inside(row + dr, col + dc) and inside(row + 2 * dr, col + 2 * dc):
+                mid, to = (row + dr) * 8 + col + dc, (row + 2 * dr) * 8 + col + 2 * dc
+                if owner(board[mid]) not in (None, player) and board[to] == "0":
+                    captures.append({"from": index, "to": to, "capture": mid})
+            if forced_piece_index is None and inside(row + dr, col + dc):
+                to = (row + dr) * 8 + col + dc
+                if board[to] == "0":
+                    quiet.append({"from": index, "to": to, "capture": None})
+    return captures if captures else quiet
+
+
+def _sample_positions(count=200, seed=7):
+    rng = random.Random(seed)
+    positions = []
+    p1, p2, kings = engine.from_board(engine.initial_board())
+    player = 1
+    while len(positions) < count:
+        own, opp = engine.split(p1, p2, player)
+        sequences = engine.move_sequences(own, opp, kings, player)
+        if not sequences or rng.random() < 0.02:
+            p1, p2, kings = engine.from_board(engine.initial_board())
+            player = 1
+            continue
+        positions.append((engine.to_board(p1, p2, kings), player))
+        _, own, opp, kings = rng.choice(sequences)
+        p1, p2 = engine.join(own, opp, player)
+        player = 3 - player
+    return positions
+
+
+def bench_move_generation(positions, repeat=5):
+    def legacy():
+        for board, player in positions:
+            _legacy_legal_moves(board, player)
+
+    def tables():
+        for board, player in positions:
+            p1, p2, kings = engine.from_board(board)
+            own, opp = engine.split(p1, p2, player)
+            engine.hop_moves(own, opp, kings, player)
+
+    def tables_no_parse():
+        for masks, player in parsed:
+            own, opp = engine.split(masks[0], masks[1], player)
+            engine.hop_moves(own, opp, masks[2], player)
+
+    parsed = [(engine.from_board(board), player) for board, player in positions]
+    for name, fn in (("legacy scan", legacy), ("tables+parse", tables), ("tables (masks)", tables_no_parse)):
+        best = min(timeit.repeat(fn, number=20, repeat=repeat))
+        per_call_us = best / (20 * len(positions)) * 1e6
+        print(f"{name:<16} {per_call_us:8.2f} us/position")
+
+
+def bench_search(positions, runs=3):
+    print(f"\n{'position':<10} {'depth':>5} {'nodes':>9} {'ms/move':>9} {'nodes/s':>10}")
+    for label, (board, player) in (("opening", positions[0]), ("midgame", positions[40])):
+        samples = [
+            ai.search(board, player, table=TranspositionTable())
+            for _ in range(runs)
+        ]
+        elapsed = statistics.median(r.elapsed_ms for r in samples)
+        nodes = statistics.median(r.nodes for r in samples)
+        depth = min(r.depth for r in samples)
+        nps = nodes / (elapsed / 1000) if elapsed else 0
+        print(f"{label:<10} {depth:>5} {nodes:>9,.0f} {elapsed:>9.1f} {nps:>10,.0f}")
+
+
+def main():
+    positions = _sample_positions()
+    bench_move_generation(positions)
+    bench_search(positions)
+
+
+if __name__ == "__main__":
+    main()
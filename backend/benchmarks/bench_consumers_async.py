@@ -0,0 +1,148 @@
+# Filename: backend/benchmarks/bench_consumers_async.py
+
+"""
+Concurrent active games per worker: sync ``JsonWebsocketConsumer`` dispatch
+(the previous gameplay consumers) vs. ``AsyncJsonWebsocketConsumer``.
+
+Both consumers do a gameplay frame the way the real ones do: the mover's
+frame is turned into one ``group_send`` and every socket in the game's group
+gets the update. The channel layer is in-memory but waits ``RTT`` seconds per
+call, like a Redis channel layer. Sync handlers run through
+``database_sync_to_async`` (one shared thread per process) and block it for
+every round trip; async handlers overlap them on the event loop.
+
+Each game has two sockets and makes one move every ``INTERVAL`` seconds. A
+move's latency is the time until the mover sees its own update. A worker
+"holds" a game count when p95 latency stays under ``BUDGET`` seconds.
+
+Run from backend/:
+    python -m benchmarks.bench_consumers_async
+"""
+
+# Step 1: Standard library imports
+import asyncio
+import os
+import statistics
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ttt_core.settings")
+django.setup()
+
+# Step 2: Third-party and local imports
+from asgiref.sync import async_to_sync  # noqa: E402
+from channels.generic.websocket import AsyncJsonWebsocketConsumer, JsonWebsocketConsumer  # noqa: E402
+from channels.layers import InMemoryChannelLayer, channel_layers  # noqa: E402
+from channels.testing import WebsocketCommunicator  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+RTT = 0.001          # one Redis round trip
+INTERVAL = 0.5       # seconds between moves in a game
+MOVES = 6            # moves per game
+BUDGET = 0.1         # p95 move latency a worker must hold
+
+
+class LatencyChannelLayer(InMemoryChannelLayer):
+    """In-memory channel layer that waits one round trip per group call."""
+
+    def __init__(self, **kwargs):
+        super().__init__(capacity=10_000, **kwargs)
+
+    async def group_add(self, group, channel):
+        await asyncio.sleep(RTT)
+        await super().group_add(group, channel)
+
+    async def group_discard(self, group, channel):
+        await asyncio.sleep(RTT)
+        await super().group_discard(group, channel)
+
+    async def group_send(self, group, message):
+        await asyncio.sleep(RTT)
+        await super().group_send(group, message)
+
+
+# Step 3: The same gameplay frame, sync and async
+class SyncGameConsumer(JsonWebsocketConsumer):
+    def connect(self):
+        self.group = f"bench_{self.scope['game_id']}"
+        async_to_sync(self.channel_layer.group_add)(self.group, self.channel_name)
+        self.accept()
+
+    def receive_json(self, content, **kwargs):
+        async_to_sync(self.channel_layer.group_send)(self.group, {"type": "game_update", **content})
+
+    def game_update(self, event):
+        self.send_json({"type": "game_update", "move": event["move"]})
+
+    def disconnect(self, close_code):
+        async_to_sync(self.channel_layer.group_discard)(self.group, self.channel_name)
+
+
+class AsyncGameConsumer(AsyncJsonWebsocketConsumer):
+    async def connect(self):
+        self.group = f"bench_{self.scope['game_id']}"
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+
+    async def receive_json(self, content, **kwargs):
+        await self.channel_layer.group_send(self.group, {"type": "game_update", **content})
+
+    async def game_update(self, event):
+        await self.send_json({"type": "game_update", "move": event["move"]})
+
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard(self.group, self.channel_name)
+
+
+# Step 4: Paced games
+async def _play(application, game_id, latencies):
+    sockets = []
+    for _ in range(2):
+        communicator = WebsocketCommunicator(application, f"/ws/bench/{game_id}/")
+        communicator.scope["game_id"] = game_id
+        await communicator.connect(timeout=30)
+        sockets.append(communicator)
+
+    # Spread game starts over one interval, like real tables.
+    await asyncio.sleep(INTERVAL * (game_id % 100) / 100)
+    for move in range(MOVES):
+        mover, other = sockets[move % 2], sockets[(move + 1) % 2]
+        started = time.perf_counter()
+        await mover.send_json_to({"move": move})
+        await mover.receive_json_from(timeout=60)
+        latencies.append(time.perf_counter() - started)
+        await other.receive_json_from(timeout=60)
+        await asyncio.sleep(INTERVAL)
+
+    for communicator in sockets:
+        await communicator.disconnect(timeout=30)
+
+
+async def _run(consumer, games):
+    channel_layers.backends.clear()
+    latencies = []
+    await asyncio.gather(*(_play(consumer.as_asgi(), index, latencies) for index in range(games)))
+    return statistics.quantiles(latencies, n=20)[-1], statistics.median(latencies)
+
+
+def main(game_counts=(25, 50, 100, 200, 400)):
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": f"{__name__}.LatencyChannelLayer"}}
+    print(f"layer RTT {RTT * 1000:.1f} ms, one move every {INTERVAL}s per game, budget p95 < {BUDGET * 1000:.0f} ms")
+    print(f"{'games':>6} {'sync p50/p95 (ms)':>20} {'async p50/p95 (ms)':>20}")
+
+    held = {"sync": 0, "async": 0}
+    for games in game_counts:
+        row = []
+        for name, consumer in (("sync", SyncGameConsumer), ("async", AsyncGameConsumer)):
+            p95, p50 = asyncio.run(_run(consumer, games))
+            if p95 < BUDGET:
+                held[name] = games
+            row.append(f"{p50 * 1000:>8.1f} / {p95 * 1000:>7.1f}")
+        print(f"{games:>6} {row[0]:>20} {row[1]:>20}")
+
+    print(f"games held per worker: sync {held['sync']}, async {held['async']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# Filename: backend/benchmarks/bench_lobby_round_trips.py
+
+"""
+Lobby operations: Redis round trips and throughput, command-by-command (the
+previous manager code) vs. the Lua scripts in ``utils.redis.lobby_scripts``.
+
+A round trip is one request written to the socket (a pipeline counts once).
+Needs a Redis server at ``REDIS_URL`` (default redis://localhost:6379) with
+Lua support.
+
+Run from backend/:
+    python -m benchmarks.bench_lobby_round_trips
+"""
+
+# Step 1: Standard library imports
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ttt_core.settings")
+django.setup()
+
+# Step 2: Third-party and local imports
+from redis import BlockingConnectionPool, Connection, Redis  # noqa: E402
+
+from utils.redis import redis_client  # noqa: E402
+from utils.redis.lobby_scripts import LobbyScripts  # noqa: E402
+from utils.redis.redis_game_lobby_manager import RedisGameLobbyManager  # noqa: E402
+
+TTL = RedisGameLobbyManager.LOBBY_TTL_SECONDS
+
+
+class CountingConnection(Connection):
+    round_trips = 0
+
+    def send_packed_command(self, command, check_health=True):
+        CountingConnection.round_trips += 1
+        return super().send_packed_command(command, check_health=check_health)
+
+
+def _client():
+    kwargs = redis_client._connection_kwargs()
+    kwargs.pop("connection_class", None)
+    return Redis(connection_pool=BlockingConnectionPool(connection_class=CountingConnection, **kwargs))
+
+
+def _keys(game_id):
+    return [f"bench:lobby:{game_id}:{name}" for name in ("players", "channels", "roles")]
+
+
+# Step 3: Previous command-by-command flows
+def _touch(client, keys):
+    for key in keys:
+        client.expire(key, TTL)
+
+
+def _join_commands(client, game_id, user, channel):
+    players, channels, roles = _keys(game_id)
+    client.hset(players, str(user.id), json.dumps({"id": user.id, "first_name": user.first_name}))
+    _touch(client, _keys(game_id))
+    client.sadd(channels, channel)
+    _touch(client, _keys(game_id))
+
+    # WATCH/MULTI role assignment, then set_player_role
+    pipe = client.pipeline()
+    pipe.watch(roles)
+    current = client.hgetall(roles)
+    role = current.get(str(user.id))
+    if role is None:
+        taken = set(current.values())
+        role = "X" if "X" not in taken else "O" if "O" not in taken else "Spectator"
+    pipe.multi()
+    if role in ("X", "O"):
+        pipe.hset(roles, str(user.id), role)
+    pipe.execute()
+    _touch(client, _keys(game_id))
+    if role in ("X", "O"):
+        client.hset(roles, str(user.id), role)
+    else:
+        client.hdel(roles, str(user.id))
+    _touch(client, _keys(game_id))
+    return role
+
+
+def _validate_commands(client, lobby_id, session_key, user_id):
+    stored = client.get(f"bench:session:{lobby_id}:key")
+    if stored != session_key:
+        return False
+    ok = client.sismember(f"bench:session:{lobby_id}:users", str(user_id))
+    client.sadd(f"bench:session:{lobby_id}:users", str(user_id))
+    client.expire(f"bench:session:{lobby_id}:users", TTL)
+    return ok
+
+
+def _leave_commands(client, game_id, user, channel):
+    players, channels, roles = _keys(game_id)
+    client.hdel(players, str(user.id))
+    client.hdel(roles, str(user.id))
+    client.srem(channels, channel)
+
+
+# Step 4: Scripted flows
+def _join_script(scripts, game_id, user, channel):
+    player = json.dumps({"id": user.id, "first_name": user.first_name})
+    return scripts.join_lobby(keys=_keys(game_id), args=[str(user.id), player, channel, TTL, "1"])
+
+
+def _validate_script(scripts, lobby_id, session_key, user_id):
+    keys = [f"bench:session:{lobby_id}:key", f"bench:session:{lobby_id}:users"]
+    return scripts.validate_session(keys=keys, args=[session_key, str(user_id), TTL, "0"])
+
+
+def _leave_script(scripts, game_id, user, channel):
+    return scripts.leave_lobby(keys=_keys(game_id), args=[str(user.id), channel])
+
+
+def _measure(name, operation, count):
+    CountingConnection.round_trips = 0
+    started = time.perf_counter()
+    for index in range(count):
+        operation(index)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<22} {CountingConnection.round_trips / count:>12.1f} {count / elapsed:>10,.0f}")
+
+
+def main(count=1000):
+    client = _client()
+    scripts = LobbyScripts(client)
+    scripts.load()
+    client.set("bench:session:s:key", "secret")
+    client.sadd("bench:session:s:users", "1")
+    users = [SimpleNamespace(id=index, first_name=f"U{index}") for index in range(count)]
+
+    print(f"{count} operations against {os.getenv('REDIS_URL', 'redis://localhost:6379')}")
+    print(f"{'operation':<22} {'round trips':>12} {'ops/s':>10}")
+    _measure("join (commands)", lambda i: _join_commands(client, i % 50, users[i], f"c{i}"), count)
+    _measure("join (script)", lambda i: _join_script(scripts, 50 + i % 50, users[i], f"c{i}"), count)
+    _measure("validate (commands)", lambda i: _validate_commands(client, "s", "secret", 1), count)
+    _measure("validate (script)", lambda i: _validate_script(scripts, "s", "secret", 1), count)
+    _measure("leave (commands)", lambda i: _leave_commands(client, i % 50, users[i], f"c{i}"), count)
+    _measure("leave (script)", lambda i: _leave_script(scripts, 50 + i % 50, users[i], f"c{i}"), count)
+
+    for key in client.scan_iter("bench:*"):
+        client.delete(key)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Filename: backend/benchmarks/bench_poker_ai.py
+
+"""
+Poker AI: decision latency per street against the time budget, cold (rollout)
+and warm (cached strength), for heads-up and full tables.
+
+Run from backend/:
+    python -m benchmarks.bench_poker_ai
+"""
+
+# Step 1: Standard library imports
+import random
+import statistics
+import time
+
+# Step 2: Local imports
+from poker import ai, evaluator
+
+STREETS = {"preflop": 0, "flop": 3, "turn": 4, "river": 5}
+
+
+def _spots(count, board_size, opponents, seed):
+    rng = random.Random(seed)
+    deck = list(evaluator.CARDS)
+    spots = []
+    for _ in range(count):
+        cards = rng.sample(deck, 2 + board_size)
+        spots.append(ai.Spot(
+            hole=cards[:2], board=cards[2:], opponents=opponents, pot=120, current_bet=40,
+            bet=0, chips=900, min_raise=20, big_blind=20,
+        ))
+    return spots
+
+
+def _latencies(spots, budget_ms):
+    rng = random.Random(0)
+    timings = []
+    for spot in spots:
+        started = time.perf_counter()
+        ai.decide(spot, time_budget_ms=budget_ms, rng=rng)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main(count=200, budget_ms=ai.DEFAULT_TIME_BUDGET_MS):
+    print(f"budget {budget_ms} ms")
+    print(f"{'street':<8} {'opps':>4} {'cold p50':>9} {'cold max':>9} {'warm p50':>9} {'decisions/s':>12}")
+    for street, board_size in STREETS.items():
+        for opponents in (1, 5):
+            spots = _spots(count, board_size, opponents, seed=board_size * 10 + opponents)
+            cold = _latencies(spots, budget_ms)
+            warm = _latencies(spots, budget_ms)
+            print(
+                f"{street:<8} {opponents:>4} {statistics.median(cold):>9.2f} {max(cold):>9.2f} "
+                f"{statistics.median(warm):>9.3f} {1000 / statistics.mean(warm):>12,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
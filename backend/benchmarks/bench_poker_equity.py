@@ -0,0 +1,65 @@
+# Filename: backend/benchmarks/bench_poker_equity.py
+
+"""
+Poker equity: rollouts per second and accuracy per street, batched NumPy
+scoring vs. a scalar loop over ``hand_score``.
+
+Run from backend/:
+    python -m benchmarks.bench_poker_equity
+"""
+
+# Step 1: Standard library imports
+import random
+import time
+
+# Step 2: Local imports
+from poker import equity, evaluator
+
+SPOTS = {
+    "preflop 1v1": (["Ah", "Kd"], [], 1),
+    "preflop 1v5": (["Ah", "Kd"], [], 5),
+    "flop 1v2": (["Ah", "Kd"], ["Kc", "7h", "2s"], 2),
+    "turn 1v1": (["Ah", "Kd"], ["Kc", "7h", "2s", "9d"], 1),
+    "river 1v3": (["Ah", "Kd"], ["Kc", "7h", "2s", "9d", "3c"], 3),
+}
+
+
+def scalar_equity(hole, board, opponents, trials, seed=0):
+    """Reference Monte Carlo with one ``hand_score`` call per hand."""
+    rng = random.Random(seed)
+    deck = [card for card in evaluator.CARDS if card not in hole and card not in board]
+    share = 0.0
+    for _ in range(trials):
+        drawn = rng.sample(deck, 5 - len(board) + 2 * opponents)
+        full_board = board + drawn[:5 - len(board)]
+        hero = evaluator.hand_score(hole + full_board)
+        rest = drawn[5 - len(board):]
+        villains = [evaluator.hand_score(rest[i:i + 2] + full_board) for i in range(0, len(rest), 2)]
+        best = max(villains)
+        if hero > best:
+            share += 1
+        elif hero == best:
+            share += 1 / (villains.count(best) + 1)
+    return share / trials
+
+
+def main(trials=20_000):
+    print(f"{'spot':<13} {'mode':<11} {'trials':>7} {'ms':>8} {'rollouts/s':>12} {'equity':>7} {'scalar r/s':>11}")
+    for name, (hole, board, opponents) in SPOTS.items():
+        result = equity.compute_equity(hole, board, opponents, deadline_ms=10_000, max_trials=trials, seed=1)
+        rate = result["trials"] / (result["elapsed_ms"] / 1000)
+
+        scalar_trials = 2000
+        started = time.perf_counter()
+        scalar_equity(hole, board, opponents, scalar_trials)
+        scalar_rate = scalar_trials / (time.perf_counter() - started)
+
+        mode = "exhaustive" if result["exhaustive"] else "monte-carlo"
+        print(
+            f"{name:<13} {mode:<11} {result['trials']:>7} {result['elapsed_ms']:>8.1f} "
+            f"{rate:>12,.0f} {result['equity']:>7.3f} {scalar_rate:>11,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
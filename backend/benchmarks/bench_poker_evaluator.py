@@ -0,0 +1,102 @@
+# Filename: backend/benchmarks/bench_poker_evaluator.py
+
+"""
+Poker hand evaluation: hands per second for the table-driven evaluator vs.
+the previous 21-combination implementation, on random 7-card hands.
+
+Run from backend/:
+    python -m benchmarks.bench_poker_evaluator
+"""
+
+# Step 1: Standard library imports
+import itertools
+import random
+import time
+from collections import Counter
+
+# Step 2: Local imports
+from poker import evaluator
+
+RANKS = evaluator.RANKS
+
+
+def _legacy_straight_high(values):
+    unique = sorted(set(values), reverse=True)
+    if 14 in unique:
+        unique.append(1)
+    for i in range(len(unique) - 4):
+        run = unique[i:i + 5]
+        if run[0] - run[4] == 4 and len(set(run)) == 5:
+            return 5 if run[0] == 5 else run[0]
+    return None
+
+
+def _legacy_evaluate_five(cards):
+    """The pre-table ``_evaluate_five`` (kept here for comparison only)."""
+    values = sorted((RANKS.index(card[0]) + 2 for card in cards), reverse=True)
+    suits = [card[1] for card in cards]
+    counts = Counter(values)
+    groups = sorted(counts.items(), key=lambda item: (item[1], item[0]), reverse=True)
+    flush = len(set(suits)) == 1
+    straight = _legacy_straight_high(values)
+
+    if straight and flush:
+        return (8, [straight], "Straight flush")
+    if groups[0][1] == 4:
+        quad = groups[0][0]
+        return (7, [quad, max(v for v in values if v != quad)], "Four of a kind")
+    if groups[0][1] == 3 and groups[1][1] == 2:
+        return (6, [groups[0][0], groups[1][0]], "Full house")
+    if flush:
+        return (5, values, "Flush")
+    if straight:
+        return (4, [straight], "Straight")
+    if groups[0][1] == 3:
+        trips = groups[0][0]
+        return (3, [trips] + sorted([v for v in values if v != trips], reverse=True), "Three of a kind")
+    if groups[0][1] == 2 and groups[1][1] == 2:
+        pairs = sorted([g[0] for g in groups if g[1] == 2], reverse=True)
+        return (2, pairs + [max(v for v in values if v not in pairs)], "Two pair")
+    if groups[0][1] == 2:
+        pair = groups[0][0]
+        return (1, [pair] + sorted([v for v in values if v != pair], reverse=True), "Pair")
+    return (0, values, "High card")
+
+
+def legacy_evaluate_hand(cards):
+    best = None
+    for combo in itertools.combinations(cards, 5):
+        score = _legacy_evaluate_five(combo)
+        if best is None or (score[0], score[1]) > (best[0], best[1]):
+            best = score
+    return {"rank": best[0], "kickers": best[1], "label": best[2]}
+
+
+def _hands_per_second(fn, hands):
+    started = time.perf_counter()
+    for cards in hands:
+        fn(cards)
+    return len(hands) / (time.perf_counter() - started)
+
+
+def main(count=20_000, seed=3):
+    rng = random.Random(seed)
+    deck = list(evaluator.CARDS)
+    hands = [rng.sample(deck, 7) for _ in range(count)]
+
+    # Step 1: Sanity check that both agree before timing
+    for cards in hands[:2000]:
+        assert legacy_evaluate_hand(cards) == evaluator.evaluate_hand(cards), cards
+
+    legacy = _hands_per_second(legacy_evaluate_hand, hands[:2000])
+    full = _hands_per_second(evaluator.evaluate_hand, hands)
+    score_only = _hands_per_second(evaluator.hand_score, hands)
+
+    print(f"{'implementation':<28} {'hands/s':>12} {'speedup':>8}")
+    print(f"{'legacy (21 combinations)':<28} {legacy:>12,.0f} {1:>7.1f}x")
+    print(f"{'evaluate_hand (dict)':<28} {full:>12,.0f} {full / legacy:>7.1f}x")
+    print(f"{'hand_score (int)':<28} {score_only:>12,.0f} {score_only / legacy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
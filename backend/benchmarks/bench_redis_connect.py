@@ -0,0 +1,79 @@
+# Filename: backend/benchmarks/bench_redis_connect.py
+
+"""
+Lobby manager construction under a reconnect storm: a new client plus PING
+per manager (the old ``get_redis_client``) vs. the shared pooled client.
+
+Each simulated WebSocket connect builds a lobby manager and does one write,
+from several threads at once. Reports connects per second and how many
+Redis connections were opened. Needs a Redis server at ``REDIS_URL``
+(default redis://localhost:6379); on rediss:// every opened connection is
+also a TLS handshake.
+
+Run from backend/:
+    python -m benchmarks.bench_redis_connect
+"""
+
+# Step 1: Standard library imports
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ttt_core.settings")
+django.setup()
+
+# Step 2: Third-party and local imports
+from redis import Redis  # noqa: E402
+
+from utils.redis import redis_client  # noqa: E402
+from utils.redis.redis_game_lobby_manager import RedisGameLobbyManager  # noqa: E402
+
+
+def _per_connect_client():
+    """What every manager did before: its own client and pool, then a PING."""
+    kwargs = redis_client._connection_kwargs()
+    kwargs.pop("health_check_interval", None)
+    client = Redis(**kwargs)
+    client.ping()
+    return client
+
+
+def _connect_before(index):
+    client = _per_connect_client()
+    client.sadd(f"bench:lobby:{index % 50}:channels", f"channel-{index}")
+    client.close()
+
+
+def _connect_after(index):
+    manager = RedisGameLobbyManager()
+    manager.redis.sadd(f"bench:lobby:{index % 50}:channels", f"channel-{index}")
+
+
+def _storm(connect, count, threads):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(connect, range(count)))
+    return count / (time.perf_counter() - started)
+
+
+def main(count=2000, threads=16):
+    redis_client.reset_redis_clients()
+    print(f"{count} connects on {threads} threads against {os.getenv('REDIS_URL', 'redis://localhost:6379')}")
+    print(f"{'client':<22} {'connects/s':>11} {'connections opened':>19}")
+
+    per_second = _storm(_connect_before, count, threads)
+    print(f"{'new client + PING':<22} {per_second:>11,.0f} {count:>19,}")
+
+    per_second = _storm(_connect_after, count, threads)
+    opened = redis_client.redis_pool_stats()["sync"]["created"]
+    print(f"{'shared pool':<22} {per_second:>11,.0f} {opened:>19,}")
+
+    client = redis_client.get_redis_client()
+    for key in client.scan_iter("bench:lobby:*"):
+        client.delete(key)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Filename: backend/benchmarks/bench_sudoku_generator.py
+
+"""
+Sudoku generation: puzzles per second per difficulty for the bitmask engine
+vs. the previous backtracking generator (``_is_valid`` scans, full
+two-solution count per removed cell).
+
+The legacy generator is time-boxed: hard and expert puzzles can take tens
+of seconds each with it, so its rate comes from however many it finishes
+in ``legacy_budget`` seconds (at least one).
+
+Run from backend/:
+    python -m benchmarks.bench_sudoku_generator
+"""
+
+# Step 1: Standard library imports
+import random
+import time
+
+# Step 2: Local imports
+from sudoku import engine
+from sudoku.puzzle_generator import CLUE_COUNTS, generate_puzzle
+
+
+def _legacy_is_valid(board, row, col, num):
+    if num in board[row]:
+        return False
+    if num in (board[r][col] for r in range(9)):
+        return False
+    box_r, box_c = (row // 3) * 3, (col // 3) * 3
+    for r in range(box_r, box_r + 3):
+        for c in range(box_c, box_c + 3):
+            if board[r][c] == num:
+                return False
+    return True
+
+
+def _legacy_fill(board, rng):
+    for row in range(9):
+        for col in range(9):
+            if board[row][col] == 0:
+                nums = list(range(1, 10))
+                rng.shuffle(nums)
+                for num in nums:
+                    if _legacy_is_valid(board, row, col, num):
+                        board[row][col] = num
+                        if _legacy_fill(board, rng):
+                            return True
+                        board[row][col] = 0
+                return False
+    return True
+
+
+def _legacy_count_solutions(board, limit=2):
+    count = [0]
+
+    def solve(b):
+        if count[0] >= limit:
+            return
+        for row in range(9):
+            for col in range(9):
+                if b[row][col] == 0:
+                    for num in range(1, 10):
+                        if _legacy_is_valid(b, row, col, num):
+                            b[row][col] = num
+                            solve(b)
+                            b[row][col] = 0
+                    return
+        count[0] += 1
+
+    solve([row[:] for row in board])
+    return count[0]
+
+
+def legacy_generate_puzzle(difficulty, rng):
+    """The pre-engine ``generate_puzzle`` (kept here for comparison only)."""
+    solution = [[0] * 9 for _ in range(9)]
+    _legacy_fill(solution, rng)
+
+    puzzle = [row[:] for row in solution]
+    cells_to_remove = 81 - CLUE_COUNTS[difficulty]
+    positions = list(range(81))
+    rng.shuffle(positions)
+
+    removed = 0
+    for pos in positions:
+        if removed >= cells_to_remove:
+            break
+        row, col = divmod(pos, 9)
+        backup = puzzle[row][col]
+        puzzle[row][col] = 0
+        if _legacy_count_solutions(puzzle) == 1:
+            removed += 1
+        else:
+            puzzle[row][col] = backup
+
+    puzzle_str = "".join(str(puzzle[r][c]) for r in range(9) for c in range(9))
+    solution_str = "".join(str(solution[r][c]) for r in range(9) for c in range(9))
+    return puzzle_str, solution_str
+
+
+def _rate(generate, difficulty, rng, budget):
+    """(puzzles/s, average clues) generating for about ``budget`` seconds."""
+    started = time.perf_counter()
+    count = clues = 0
+    while not count or time.perf_counter() - started < budget:
+        puzzle, solution = generate(difficulty, rng)
+        assert engine.has_unique_solution(engine.from_string(puzzle)), puzzle
+        count += 1
+        clues += 81 - puzzle.count("0")
+    elapsed = time.perf_counter() - started
+    return count / elapsed, clues / count
+
+
+def main(budget=3.0, legacy_budget=10.0, seed=7):
+    rng = random.Random(seed)
+
+    print(f"{'difficulty':<10} {'legacy/s':>10} {'clues':>6} {'engine/s':>10} {'clues':>6} {'speedup':>9}")
+    for difficulty in CLUE_COUNTS:
+        legacy, legacy_clues = _rate(legacy_generate_puzzle, difficulty, rng, legacy_budget)
+        fast, fast_clues = _rate(generate_puzzle, difficulty, rng, budget)
+        print(
+            f"{difficulty:<10} {legacy:>10.2f} {legacy_clues:>6.1f} "
+            f"{fast:>10.1f} {fast_clues:>6.1f} {fast / legacy:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Filename: backend/benchmarks/bench_ttt_ai.py
+
+"""
+Tic-Tac-Toe AI move latency: precomputed table lookup vs recursive minimax.
+
+Run from backend/:
+    python -m benchmarks.bench_ttt_ai
+"""
+
+# Step 1: Standard library imports
+import random
+import time
+from types import SimpleNamespace
+
+# Step 2: Local imports
+from game.ai_logic import ai_logic, ai_logic_hard_mode
+from game.engine import WINNING_COMBINATIONS
+
+
+def _legacy_minimax(board, depth, is_maximizing, player_marker, ai_marker):
+    # Step 1: Verbatim shape of the old per-turn search (for comparison only)
+    for a, b, c in WINNING_COMBINATIONS:
+        if board[a] != "_" and board[a] == board[b] == board[c]:
+            return 10 - depth if board[a] == ai_marker else depth - 10
+    if "_" not in board:
+        return 0
+
+    scores = []
+    for i in range(9):
+        if board[i] == "_":
+            board[i] = ai_marker if is_maximizing else player_marker
+            scores.append(_legacy_minimax(board, depth + 1, not is_maximizing, player_marker, ai_marker))
+            board[i] = "_"
+    return max(scores) if is_maximizing else min(scores)
+
+
+def _legacy_best_move(board_state, player_marker, ai_marker):
+    board = list(board_state)
+    best_score, best_move = float("-inf"), None
+    for i in range(9):
+        if board[i] == "_":
+            board[i] = ai_marker
+            score = _legacy_minimax(board, 0, False, player_marker, ai_marker)
+            board[i] = "_"
+            if score > best_score:
+                best_score, best_move = score, i
+    return best_move
+
+
+def _time_per_call(fn, boards, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for board in boards:
+            fn(board)
+    elapsed = time.perf_counter() - started
+    return elapsed / (repeat * len(boards))
+
+
+def main():
+    # Step 1: Sample opening-ish positions (the expensive ones for minimax)
+    random.seed(7)
+    boards = ["_________", "X________", "____X____", "X___O____", "X_O_X____"]
+    games = [SimpleNamespace(board_state=b) for b in boards]
+
+    # Step 2: Measure
+    legacy = _time_per_call(lambda b: _legacy_best_move(b, "X", "O"), boards, 1)
+    hard = _time_per_call(lambda g: ai_logic_hard_mode.get_best_move(g, "X", "O"), games, 20000)
+    medium = _time_per_call(lambda g: ai_logic.get_best_move(g, "X", "O"), games, 20000)
+
+    # Step 3: Report
+    print(f"legacy recursive minimax : {legacy * 1e3:10.2f} ms/move")
+    print(f"table lookup (hard)      : {hard * 1e6:10.2f} us/move")
+    print(f"table lookup (medium)    : {medium * 1e6:10.2f} us/move")
+
+
+if __name__ == "__main__":
+    main()
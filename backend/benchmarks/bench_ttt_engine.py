@@ -0,0 +1,62 @@
+# Filename: backend/benchmarks/bench_ttt_engine.py
+
+"""
+Per-move cost of Tic-Tac-Toe rule checks: bitboard engine vs string scan.
+
+Run from backend/:
+    python -m benchmarks.bench_ttt_engine
+"""
+
+# Step 1: Standard library imports
+import time
+
+# Step 2: Local imports
+from game import engine
+
+MOVES = [(4, "X"), (0, "O"), (8, "X"), (2, "O"), (1, "X"), (7, "O"), (6, "X"), (3, "O"), (5, "X")]
+
+
+def _string_move(board_state, position, player):
+    # Step 1: Shape of the old TicTacToeGame.make_move + check_winner path
+    if board_state[position] != "_":
+        raise ValueError("occupied")
+    board = list(board_state)
+    board[position] = player
+    board_state = "".join(board)
+    for a, b, c in engine.WINNING_COMBINATIONS:
+        if board_state[a] == board_state[b] == board_state[c] != "_":
+            return board_state, board_state[a]
+    return board_state, "D" if "_" not in board_state else None
+
+
+def _bitboard_move(x_mask, o_mask, position, player):
+    if engine.validate_move(x_mask, o_mask, position, player, player):
+        raise ValueError("illegal")
+    x_mask, o_mask = engine.apply_move(x_mask, o_mask, position, player)
+    return x_mask, o_mask, engine.winner(x_mask, o_mask)
+
+
+def main(repeat=50000):
+    # Step 1: String implementation
+    started = time.perf_counter()
+    for _ in range(repeat):
+        board_state = "_________"
+        for position, player in MOVES:
+            board_state, _ = _string_move(board_state, position, player)
+    string_us = (time.perf_counter() - started) / (repeat * len(MOVES)) * 1e6
+
+    # Step 2: Bitboard implementation
+    started = time.perf_counter()
+    for _ in range(repeat):
+        x_mask = o_mask = 0
+        for position, player in MOVES:
+            x_mask, o_mask, _ = _bitboard_move(x_mask, o_mask, position, player)
+    bitboard_us = (time.perf_counter() - started) / (repeat * len(MOVES)) * 1e6
+
+    # Step 3: Report
+    print(f"string scan : {string_us:6.2f} us/move (validate + apply + win check)")
+    print(f"bitboard    : {bitboard_us:6.2f} us/move (validate + apply + win check)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# Filename: backend/benchmarks/bench_wire_codec.py
+
+"""
+WebSocket frame encoding: stdlib ``json`` (the previous consumers) vs. the
+``utils.websockets.codec`` text (orjson) and binary (msgpack) frames.
+
+Payloads are typical client frames: a Tic-Tac-Toe ``game_update`` and a
+six-seat poker ``game_update`` (the merged ``poker_update`` a seated player
+receives). For each one the benchmark reports encode time per frame and
+frame bytes, then the cost of a fan-out to ``SUBSCRIBERS`` sockets when each
+socket encodes its own frame vs. one ``frame_event`` encoded before
+``group_send``.
+
+Run from backend/:
+    python -m benchmarks.bench_wire_codec
+"""
+
+# Step 1: Standard library imports
+import json
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ttt_core.settings")
+django.setup()
+
+# Step 2: Local imports
+from utils.websockets import codec  # noqa: E402
+
+ROUNDS = 20_000
+SUBSCRIBERS = 50
+
+
+def _game_update():
+    return {
+        "type": "game_update",
+        "game_id": "1842",
+        "board_state": "XO_X_O__X",
+        "current_turn": "O",
+        "winner": None,
+        "is_completed": False,
+        "winning_combination": None,
+        "seq": 17,
+        "player_role": "O",
+        "player_x": {"id": 31, "first_name": "Xena"},
+        "player_o": {"id": 57, "first_name": "Otto"},
+    }
+
+
+def _poker_update():
+    seats = [
+        {
+            "seat": n,
+            "user_id": 100 + n,
+            "name": f"Player {n}",
+            "chips": 9_400 + 25 * n,
+            "bet": 200 if n in (2, 3) else 0,
+            "folded": n == 5,
+            "all_in": False,
+            "is_ai": n > 4,
+            "cards": ["Ah", "Kd"] if n == 1 else ["??", "??"],
+            "current_best_hand": "Pair of Kings" if n == 1 else None,
+            "last_action": "call",
+        }
+        for n in range(1, 7)
+    ]
+    return {
+        "type": "game_update",
+        "game": {
+            "id": 512,
+            "player_one_id": 101,
+            "player_two_id": 102,
+            "player_one_name": "Player 1",
+            "player_two_name": "Player 2",
+            "is_ai_game": False,
+            "community_cards": ["Kh", "7c", "2d"],
+            "table_seats": seats,
+            "players": seats,
+            "starting_chips": 10_000,
+            "small_blind": 50,
+            "big_blind": 100,
+            "turn_timer_seconds": 30,
+            "max_players": 6,
+            "pot": 1_250,
+            "current_bet": 200,
+            "current_turn": 4,
+            "current_turn_started_at": "2026-10-17T12:00:03.512000+00:00",
+            "turn_deadline_at": "2026-10-17T12:00:33.512000+00:00",
+            "server_now": "2026-10-17T12:00:04.101000+00:00",
+            "dealer": 6,
+            "hand_number": 23,
+            "phase": "flop",
+            "last_action": {"seat": 3, "action": "call", "amount": 200},
+            "winner": None,
+            "winning_label": None,
+            "shown_cards": [],
+            "last_hand_result": None,
+            "is_completed": False,
+            "my_seat": 1,
+            "my_current_best_hand": "Pair of Kings",
+            "my_equity": 0.6412,
+            "legal_actions": ["fold", "call", "raise"],
+            "call_amount": 200,
+            "min_raise_to": 400,
+            "max_raise_to": 9_425,
+            "min_raise": 100,
+            "can_update_settings": False,
+        },
+    }
+
+
+ENCODERS = (
+    ("json (before)", json.dumps),
+    ("orjson text", codec.dumps),
+    ("msgpack binary", codec.pack),
+)
+
+
+def _per_frame_us(encode, payload):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        encode(payload)
+    return (time.perf_counter() - started) / ROUNDS * 1e6
+
+
+def _fan_out_us(encode_once, payload):
+    """Encode time for one group message delivered to ``SUBSCRIBERS`` sockets."""
+    rounds = ROUNDS // SUBSCRIBERS
+    started = time.perf_counter()
+    for _ in range(rounds):
+        if encode_once:
+            codec.frame_event(payload)
+        else:
+            for _ in range(SUBSCRIBERS):
+                json.dumps(payload)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def main():
+    for name, payload in (("game_update", _game_update()), ("poker_update", _poker_update())):
+        print(f"\n{name}")
+        print(f"  {'codec':<16}{'encode us':>11}{'bytes':>8}")
+        for label, encode in ENCODERS:
+            frame = encode(payload)
+            size = len(frame.encode("utf-8") if isinstance(frame, str) else frame)
+            print(f"  {label:<16}{_per_frame_us(encode, payload):>11.2f}{size:>8}")
+
+        per_socket = _fan_out_us(False, payload)
+        once = _fan_out_us(True, payload)
+        print(
+            f"  fan-out to {SUBSCRIBERS}: json per socket {per_socket:.1f} us, "
+            f"frame_event once {once:.1f} us ({per_socket / once:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
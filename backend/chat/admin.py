@@ -1,5 +1,5 @@
 from django.contrib import admin
-from chat.models import ChatRoom, ChatRoomMember, ChatRoomMessage, Conversation, DirectMessage
+from chat.models import ChatRoom, ChatRoomMember, ChatRoomMessage, Conversation, DirectMessage, UnreadCounter
 
 
 admin.site.register(Conversation)
@@ -7,3 +7,4 @@ admin.site.register(DirectMessage)
 admin.site.register(ChatRoom)
 admin.site.register(ChatRoomMember)
 admin.site.register(ChatRoomMessage)
+admin.site.register(UnreadCounter)
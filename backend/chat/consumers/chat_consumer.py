@@ -7,6 +7,7 @@ from channels.generic.websocket import JsonWebsocketConsumer
 
 from utils.shared.shared_utils_game_chat import SharedUtils
 from utils.chat.chat_utils import ChatUtils  # keep your existing path
+from utils.websockets.codec import dumps, frame_event, loads
 
 logger = logging.getLogger("chat.consumer")
 
@@ -125,37 +126,41 @@ class ChatConsumer(JsonWebsocketConsumer):
                 self.send_json({"type": "error", "message": "Chat group not initialized."})
                 return
 
-            # Step 3: Broadcast (explicit id for FE dedupe)
+            # Step 3: Broadcast (explicit id for FE dedupe), encoded once for the whole lobby
             message_id = str(uuid.uuid4())
 
             async_to_sync(self.channel_layer.group_send)(
                 self.chat_group_name,
-                {
-                    "type": "chat_message",
-                    "message": {
-                        "id": message_id,
-                        "sender": sender_name,
-                        "content": text,
-                    },
-                },
+                frame_event(
+                    {
+                        "type": "chat_message",
+                        "message": {
+                            "id": message_id,
+                            "sender": sender_name,
+                            "content": text,
+                        },
+                    }
+                ),
             )
 
         except Exception as exc:
             logger.exception("handle_chat_message failed: %s", exc)
             self.send_json({"type": "error", "message": "Failed to send message."})
 
-    def chat_message(self, event: dict) -> None:
+    def wire_frame(self, event: dict) -> None:
         """
-        Receives broadcast events from the group and forwards them to the client.
-        Expected event:
-          { "type": "chat_message", "message": { "id": "<uuid>", "sender": "...", "content": "..." } }
+        Forwards a pre-encoded group frame (``utils.websockets.codec.frame_event``)
+        to the client as is.
         """
-        message = event.get("message")
-        if not isinstance(message, dict) or "content" not in message:
-            self.send_json({"type": "error", "message": "Invalid message structure."})
-            return
+        self.send(text_data=event["text"])
+
+    @classmethod
+    def decode_json(cls, text_data):
+        return loads(text_data)
 
-        self.send_json({"type": "chat_message", "message": message})
+    @classmethod
+    def encode_json(cls, content):
+        return dumps(content)
 
     def disconnect(self, code: int) -> None:
         # Step 1: Only group cleanup (no Redis roster here anymore)
@@ -5,17 +5,17 @@ import logging
 
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
-from django.contrib.auth import get_user_model
 from django.db.models import Q
 
 from friends.models import Friendship
-from chat.models import Conversation, DirectMessage
+from chat.models import Conversation
+from chat.services import message_pipeline
+from utils.websockets.codec import WireCodecMixin, frame_event, loads
 
 logger = logging.getLogger("chat.direct_message_consumer")
-User = get_user_model()
 
 
-class DirectMessageConsumer(AsyncWebsocketConsumer):
+class DirectMessageConsumer(WireCodecMixin, AsyncWebsocketConsumer):
     """
     Handles private 1-on-1 WebSocket messaging between two accepted friends.
 
@@ -84,25 +84,28 @@ class DirectMessageConsumer(AsyncWebsocketConsumer):
             self.friend_id = int(self.scope["url_route"]["kwargs"]["friend_id"])
         except (KeyError, TypeError, ValueError):
             await self.accept()
-            await self.send(text_data=json.dumps({"type": "error", "message": "Missing/invalid friend_id"}))
+            await self.send_json({"type": "error", "message": "Missing/invalid friend_id"})
             await self.close(code=4402)
             return
 
         # Step 2: Reject anonymous (make it observable to FE/devtools)
         if not self.user or self.user.is_anonymous:
             await self.accept()
-            await self.send(text_data=json.dumps({"type": "error", "message": "Unauthorized"}))
+            await self.send_json({"type": "error", "message": "Unauthorized"})
             await self.close(code=4401)
             return
 
         # Step 3: Verify friendship
         if not await self.are_friends(self.user.id, self.friend_id):
             await self.accept()
-            await self.send(text_data=json.dumps({"type": "error", "message": "Not friends"}))
+            await self.send_json({"type": "error", "message": "Not friends"})
             await self.close(code=4403)
             return
 
-        # Step 4: Group join
+        # Step 4: Resolve the conversation once; messages reuse it
+        self.conversation_id = await self.get_or_create_conversation_id()
+
+        # Step 5: Group join
         self.room_group_name = self.get_room_group_name(self.user.id, self.friend_id)
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
 
@@ -116,7 +119,7 @@ class DirectMessageConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data=None, bytes_data=None):
         # Step 1: Parse JSON safely
         try:
-            data = json.loads(text_data or "{}")
+            data = loads(text_data or "{}")
         except json.JSONDecodeError:
             logger.warning("[DM] Invalid JSON received; ignoring.")
             return
@@ -145,31 +148,31 @@ class DirectMessageConsumer(AsyncWebsocketConsumer):
         if not message or not isinstance(message, str):
             return
 
-        # Step 1: Ensure conversation exists + revive if soft-deleted
-        conversation = await self.get_or_create_conversation()
-
-        # Step 2: Persist message
-        dm = await self.save_message(message, conversation)
+        # Step 1: Id + timestamp now, row written behind (no SQL on the send path)
+        dm = await self.save_message(message)
 
-        # Step 3: Broadcast to DM group (real-time thread)
+        # Step 2: Broadcast to DM group (real-time thread)
         sender_id = int(self.user.id)
         receiver_id = int(self.friend_id)
         conversation_key = self.get_conversation_key(sender_id, receiver_id)
 
+        # Same frame for both sockets: encode it once
         await self.channel_layer.group_send(
             self.room_group_name,
-            {
-                "type": "chat_message",
-                "sender_id": sender_id,
-                "receiver_id": receiver_id,
-                "message": message,
-                "message_id": dm.id,
-                "conversation_id": conversation.id,        # ✅ DB id
-                "conversation_key": conversation_key,       # ✅ deterministic key if you need it
-            },
+            frame_event(
+                {
+                    "type": "message",
+                    "sender_id": sender_id,
+                    "receiver_id": receiver_id,
+                    "message": message,
+                    "message_id": dm["id"],
+                    "conversation_id": self.conversation_id,   # ✅ DB id
+                    "conversation_key": conversation_key,       # ✅ deterministic key if you need it
+                }
+            ),
         )
 
-        # Step 4: Notify receiver personal group (badge signal; keep payload minimal)
+        # Step 3: Notify receiver personal group (badge signal; keep payload minimal)
         await self.channel_layer.group_send(
             f"user_{receiver_id}",
             {
@@ -178,10 +181,10 @@ class DirectMessageConsumer(AsyncWebsocketConsumer):
                     "type": "dm",
                     "sender_id": sender_id,
                     "receiver_id": receiver_id,
-                    "message_id": dm.id,
-                    "conversation_id": conversation.id,      # ✅ DB id
+                    "message_id": dm["id"],
+                    "conversation_id": self.conversation_id,   # ✅ DB id
                     "conversation_key": conversation_key,
-                    "timestamp": str(dm.timestamp),
+                    "timestamp": str(dm["timestamp"]),
                 },
             },
         )
@@ -198,13 +201,15 @@ class DirectMessageConsumer(AsyncWebsocketConsumer):
         # Step 1: Send to DM room
         await self.channel_layer.group_send(
             self.room_group_name,
-            {
-                "type": "game_invite",
-                "sender_id": sender_id,
-                "receiver_id": receiver_id,
-                "game_id": game_id,
-                "lobby_id": lobby_id,
-            },
+            frame_event(
+                {
+                    "type": "game_invite",
+                    "sender_id": sender_id,
+                    "receiver_id": receiver_id,
+                    "game_id": game_id,
+                    "lobby_id": lobby_id,
+                }
+            ),
         )
 
         # Step 2: Also notify receiver (sidebar/panel)
@@ -222,35 +227,6 @@ class DirectMessageConsumer(AsyncWebsocketConsumer):
             },
         )
 
-    # -----------------------------
-    # Group event handlers
-    # -----------------------------
-
-    async def chat_message(self, event):
-        # Step 1: Normalize & forward
-        payload = {
-            "type": "message",
-            "sender_id": event["sender_id"],
-            "receiver_id": event["receiver_id"],
-            "message": event["message"],
-            "message_id": event["message_id"],
-            "conversation_id": event.get("conversation_id"),
-            "conversation_key": event.get("conversation_key") or self.get_conversation_key(
-                event["sender_id"], event["receiver_id"]
-            ),
-        }
-        await self.send(text_data=json.dumps(payload))
-
-    async def game_invite(self, event):
-        payload = {
-            "type": "game_invite",
-            "sender_id": event["sender_id"],
-            "receiver_id": event["receiver_id"],
-            "game_id": event["game_id"],
-            "lobby_id": event.get("lobby_id", str(event["game_id"])),
-        }
-        await self.send(text_data=json.dumps(payload))
-
     # -----------------------------
     # Helpers
     # -----------------------------
@@ -273,27 +249,21 @@ class DirectMessageConsumer(AsyncWebsocketConsumer):
         )
         return qs.exists()
 
-    @database_sync_to_async
-    def save_message(self, content: str, conversation: Conversation) -> DirectMessage:
-        return DirectMessage.objects.create(
-            sender=self.user,
+    async def save_message(self, content: str) -> dict:
+        """Queue the message for write-behind; returns its ``id`` and ``timestamp``."""
+        return await message_pipeline.asubmit_direct(
+            sender_id=self.user.id,
             receiver_id=self.friend_id,
+            conversation_id=self.conversation_id,
             content=content,
-            conversation=conversation,
         )
 
     @database_sync_to_async
-    def get_or_create_conversation(self) -> Conversation:
+    def get_or_create_conversation_id(self) -> int:
         """
-        Ensures a unique 1-on-1 conversation between two users.
-        Also revives conversation if either participant soft-deleted it.
+        Ensures a unique 1-on-1 conversation between two users (one query once it exists).
+        Soft-deleted conversations are not revived: the deleting user's cutoff hides only older history.
         """
-        friend = User.objects.get(id=self.friend_id)
-        user1, user2 = sorted([self.user, friend], key=lambda u: u.id)
-        conversation, _ = Conversation.objects.get_or_create(user1=user1, user2=user2)
-
-        # # ✅ If you added soft-delete fields/methods, revive on new activity
-        # if hasattr(conversation, "revive_for_participants"):
-        #     conversation.revive_for_participants()
-
-        return conversation
+        user1_id, user2_id = sorted([int(self.user.id), int(self.friend_id)])
+        conversation, _ = Conversation.objects.get_or_create(user1_id=user1_id, user2_id=user2_id)
+        return conversation.id
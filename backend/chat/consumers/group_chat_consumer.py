@@ -1,16 +1,38 @@
 import json
 import logging
 
+from asgiref.sync import async_to_sync
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from channels.layers import get_channel_layer
+from django.db import transaction
 
-from chat.models import ChatRoom, ChatRoomMember, ChatRoomMessage
+from chat.models import ChatRoomMember
+from chat.services import message_pipeline, unread_counters
+from utils.notifications.notify import anotify_users
+from utils.websockets.codec import WireCodecMixin, frame_event, loads
 
 
 logger = logging.getLogger("chat.group_chat_consumer")
 
 
-class GroupChatConsumer(AsyncWebsocketConsumer):
+def room_group_name(room_id) -> str:
+    return f"chat_group_{room_id}"
+
+
+def notify_members_changed(room_id) -> None:
+    """
+    Tell the room's open sockets to reload their member ids, once the
+    current transaction commits (call it wherever a room's active members
+    change: join, leave, removal, archive).
+    """
+    def send():
+        async_to_sync(get_channel_layer().group_send)(room_group_name(room_id), {"type": "members_changed"})
+
+    transaction.on_commit(send)
+
+
+class GroupChatConsumer(WireCodecMixin, AsyncWebsocketConsumer):
     """
     Persistent group chat socket.
 
@@ -20,6 +42,10 @@ class GroupChatConsumer(AsyncWebsocketConsumer):
     Client -> Server:
       { "type": "message", "message": "hello" }
 
+    The room's active member ids are loaded at connect and reloaded on a
+    ``members_changed`` event (``notify_members_changed``), so sending a
+    message runs no SQL.
+
     Server -> Client:
       {
         "type": "group_message",
@@ -36,29 +62,33 @@ class GroupChatConsumer(AsyncWebsocketConsumer):
         self.user = self.scope.get("user")
         self.room_id = None
         self.room_group_name = None
+        self.member_ids = set()
 
         try:
             self.room_id = int(self.scope["url_route"]["kwargs"]["room_id"])
         except (KeyError, TypeError, ValueError):
             await self.accept()
-            await self.send(text_data=json.dumps({"type": "error", "message": "Missing/invalid room_id"}))
+            await self.send_json({"type": "error", "message": "Missing/invalid room_id"})
             await self.close(code=4402)
             return
 
         if not self.user or getattr(self.user, "is_anonymous", True):
             await self.accept()
-            await self.send(text_data=json.dumps({"type": "error", "message": "Unauthorized"}))
+            await self.send_json({"type": "error", "message": "Unauthorized"})
             await self.close(code=4401)
             return
 
-        if not await self.is_active_member():
+        self.member_ids = await self.active_member_ids()
+        if self.user.id not in self.member_ids:
             await self.accept()
-            await self.send(text_data=json.dumps({"type": "error", "message": "Not a group member"}))
+            await self.send_json({"type": "error", "message": "Not a group member"})
             await self.close(code=4403)
             return
 
-        self.room_group_name = f"chat_group_{self.room_id}"
+        self.room_group_name = room_group_name(self.room_id)
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
+        # A change committed between the load above and joining the group sent no event here
+        self.member_ids = await self.active_member_ids()
         await self.accept()
         await self.mark_read()
 
@@ -74,7 +104,7 @@ class GroupChatConsumer(AsyncWebsocketConsumer):
 
     async def receive(self, text_data=None, bytes_data=None):
         try:
-            data = json.loads(text_data or "{}")
+            data = loads(text_data or "{}")
         except json.JSONDecodeError:
             return
 
@@ -85,62 +115,63 @@ class GroupChatConsumer(AsyncWebsocketConsumer):
         if not message:
             return
 
-        if not await self.is_active_member():
-            await self.send(text_data=json.dumps({"type": "error", "message": "Not a group member"}))
+        # Membership and recipients come from the cached member ids: no SQL here
+        if self.user.id not in self.member_ids:
+            await self.send_json({"type": "error", "message": "Not a group member"})
             await self.close(code=4403)
             return
 
-        saved = await self.save_message(message)
+        # Row, unread counts and the room's updated_at are written behind
+        saved = await self.save_message(message, [user_id for user_id in self.member_ids if user_id != self.user.id])
 
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                "type": "group_message",
-                **saved,
-            },
-        )
+        # Every member gets the same frame: encode it once, not once per socket
+        await self.channel_layer.group_send(self.room_group_name, frame_event(self.group_message_payload(saved)))
         await self.notify_members(saved)
-        await self.touch_room()
-
-    async def group_message(self, event):
-        await self.send(
-            text_data=json.dumps(
-                {
-                    "type": "group_message",
-                    "room_id": event["room_id"],
-                    "message_id": event["message_id"],
-                    "sender_id": event["sender_id"],
-                    "sender_name": event["sender_name"],
-                    "message": event["message"],
-                    "content": event["message"],
-                    "timestamp": event["timestamp"],
-                }
-            )
-        )
 
-    @database_sync_to_async
-    def is_active_member(self):
-        return ChatRoomMember.objects.filter(
-            room_id=self.room_id,
-            room__archived_at__isnull=True,
-            user=self.user,
-            left_at__isnull=True,
-        ).exists()
+    async def members_changed(self, event):
+        self.member_ids = await self.active_member_ids()
+        if self.user.id not in self.member_ids:
+            await self.send_json({"type": "error", "message": "Not a group member"})
+            await self.close(code=4403)
+
+    @staticmethod
+    def group_message_payload(saved):
+        return {
+            "type": "group_message",
+            "room_id": saved["room_id"],
+            "message_id": saved["message_id"],
+            "sender_id": saved["sender_id"],
+            "sender_name": saved["sender_name"],
+            "message": saved["message"],
+            "content": saved["message"],
+            "timestamp": saved["timestamp"],
+        }
 
     @database_sync_to_async
-    def save_message(self, content):
-        message = ChatRoomMessage.objects.create(
+    def active_member_ids(self):
+        return set(
+            ChatRoomMember.objects.filter(
+                room_id=self.room_id,
+                room__archived_at__isnull=True,
+                left_at__isnull=True,
+            ).values_list("user_id", flat=True)
+        )
+
+    async def save_message(self, content, recipient_ids):
+        queued = await message_pipeline.asubmit_group(
             room_id=self.room_id,
-            sender=self.user,
+            sender_id=self.user.id,
             content=content,
+            recipient_ids=recipient_ids,
         )
         return {
             "room_id": self.room_id,
-            "message_id": message.id,
+            "message_id": queued["id"],
             "sender_id": self.user.id,
             "sender_name": self.user.first_name,
-            "message": message.content,
-            "timestamp": message.timestamp.isoformat(),
+            "message": content,
+            "timestamp": queued["timestamp"].isoformat(),
+            "recipient_ids": recipient_ids,
         }
 
     @database_sync_to_async
@@ -153,37 +184,18 @@ class GroupChatConsumer(AsyncWebsocketConsumer):
         ).first()
         if membership:
             membership.mark_read()
-
-    @database_sync_to_async
-    def touch_room(self):
-        room = ChatRoom.objects.filter(id=self.room_id).first()
-        if room:
-            room.save(update_fields=["updated_at"])
-
-    @database_sync_to_async
-    def active_member_ids(self):
-        return list(
-            ChatRoomMember.objects.filter(
-                room_id=self.room_id,
-                left_at__isnull=True,
-            )
-            .exclude(user=self.user)
-            .values_list("user_id", flat=True)
-        )
+            unread_counters.reset(unread_counters.KIND_GROUP, self.room_id, [self.user.id])
 
     async def notify_members(self, saved):
-        for user_id in await self.active_member_ids():
-            await self.channel_layer.group_send(
-                f"user_{user_id}",
-                {
-                    "type": "notify",
-                    "payload": {
-                        "type": "group_chat",
-                        "room_id": saved["room_id"],
-                        "sender_id": saved["sender_id"],
-                        "sender_name": saved["sender_name"],
-                        "message_id": saved["message_id"],
-                        "timestamp": saved["timestamp"],
-                    },
-                },
-            )
+        # One batched fan-out for the whole room, not a group_send per member
+        await anotify_users(
+            user_ids=saved["recipient_ids"],
+            payload={
+                "type": "group_chat",
+                "room_id": saved["room_id"],
+                "sender_id": saved["sender_id"],
+                "sender_name": saved["sender_name"],
+                "message_id": saved["message_id"],
+                "timestamp": saved["timestamp"],
+            },
+        )
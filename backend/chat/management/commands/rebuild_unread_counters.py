@@ -0,0 +1,60 @@
+# Filename: chat/management/commands/rebuild_unread_counters.py
+
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from chat.services import unread_counters
+
+
+class Command(BaseCommand):
+    """
+    Recompute the materialized unread counters from DM and group message history.
+
+    Usage:
+        python manage.py rebuild_unread_counters
+        python manage.py rebuild_unread_counters --user 12 --user 57
+        python manage.py rebuild_unread_counters --batch-size 5000
+
+    Notes:
+    - Two aggregate queries (DMs, group memberships), one bulk insert, then the
+      cached Redis hashes are dropped and refill on the next badge read.
+    - Run it after deploying the counters, or whenever counts look off
+      (e.g. messages written outside the socket consumers).
+    """
+
+    help = "Recompute unread DM and group counters from the message tables."
+
+    def add_arguments(self, parser) -> None:
+        # Step 1: Optional user scope
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only rebuild this user's counters (repeatable).",
+        )
+
+        # Step 2: Insert batch size
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows per bulk insert and keys per Redis delete.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        # Step 1: Read args
+        user_ids = options.get("user_ids")
+        batch_size: int = max(1, int(options.get("batch_size") or 1000))
+
+        # Step 2: Rebuild
+        written = unread_counters.rebuild(user_ids=user_ids, batch_size=batch_size)
+
+        # Step 3: Final output
+        scope = f"{len(user_ids)} user(s)" if user_ids else "all users"
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Rebuilt unread counters for {scope}: {written} non-zero counter(s).")
+        )
@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-17 08:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0007_chatroom_archived_at_chatroom_archived_by'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('dm', 'Direct message'), ('group', 'Group')], max_length=10)),
+                ('target_id', models.BigIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unread_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'target_id'], name='chat_unread_kind_f34c08_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'kind', 'target_id'), name='unique_unread_counter')],
+            },
+        ),
+    ]
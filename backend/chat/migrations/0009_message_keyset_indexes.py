@@ -0,0 +1,27 @@
+# Generated by Django 5.1 on 2026-10-17 08:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0008_unreadcounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatroommessage',
+            index=models.Index(fields=['room', 'timestamp', 'id'], name='chat_roommsg_room_ts_id'),
+        ),
+        migrations.AddIndex(
+            model_name='directmessage',
+            index=models.Index(fields=['conversation', 'timestamp', 'id'], name='chat_dm_convo_ts_id'),
+        ),
+        migrations.RemoveIndex(
+            model_name='chatroommessage',
+            name='chat_chatro_room_id_f4ecd5_idx',
+        ),
+    ]
@@ -36,8 +36,10 @@ class DirectMessage(models.Model):
         help_text="Message content (text only)"
     )
 
+    # Not auto_now_add: write-behind rows keep the time they were sent
     timestamp = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         help_text="Timestamp of when the message was created"
     )
 
@@ -59,6 +61,10 @@ class DirectMessage(models.Model):
         ordering = ["timestamp"]
         verbose_name = "Direct Message"
         verbose_name_plural = "Direct Messages"
+        indexes = [
+            # Keyset history pages: one range scan per page (chat/pagination.py)
+            models.Index(fields=["conversation", "timestamp", "id"], name="chat_dm_convo_ts_id"),
+        ]
 
     @property
     def conversation_id(self):
@@ -278,14 +284,54 @@ class ChatRoomMessage(models.Model):
         on_delete=models.CASCADE,
     )
     content = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ["timestamp"]
         indexes = [
-            models.Index(fields=["room", "timestamp"]),
+            # Keyset history pages; also serves the old (room, timestamp) lookups
+            models.Index(fields=["room", "timestamp", "id"], name="chat_roommsg_room_ts_id"),
             models.Index(fields=["sender", "timestamp"]),
         ]
 
     def __str__(self):
         return f"{self.sender.email} → room {self.room_id}: {self.content[:20]}"
+
+
+class UnreadCounter(models.Model):
+    """
+    Durable copy of one unread badge count (the Redis hash is the fast path).
+
+    One row per (user, kind, target). ``target_id`` is the other participant's
+    user id for DMs (one conversation per pair) and the room id for groups.
+    """
+
+    KIND_DM = "dm"
+    KIND_GROUP = "group"
+    KIND_CHOICES = (
+        (KIND_DM, "Direct message"),
+        (KIND_GROUP, "Group"),
+    )
+
+    user = models.ForeignKey(
+        User,
+        related_name="unread_counters",
+        on_delete=models.CASCADE,
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    target_id = models.BigIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    # Last read / clear-history: messages sent up to here never count
+    read_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "kind", "target_id"], name="unique_unread_counter"),
+        ]
+        indexes = [
+            models.Index(fields=["kind", "target_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.kind}:{self.target_id} = {self.count}"
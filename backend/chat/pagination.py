@@ -0,0 +1,111 @@
+# Filename: chat/pagination.py
+
+"""
+Keyset (cursor) pagination for chat history.
+
+Why:
+- The DM and group history endpoints returned the whole thread on every
+  open. OFFSET paging would still scan every skipped row, and it shifts when
+  new messages arrive.
+
+How:
+- Pages are cut on ``(timestamp, id)``, which the composite indexes
+  ``(conversation, timestamp, id)`` / ``(room, timestamp, id)`` serve in
+  order. Every page is one index range scan of ``limit + 1`` rows, however
+  long the history is.
+- No cursor: the newest ``limit`` messages. ``?before=<cursor>``: older
+  messages (scroll back). ``?after=<cursor>``: newer messages (catch up).
+- Results are always oldest -> newest. ``older`` / ``newer`` are the cursors
+  to pass back, or null when there is nothing more in that direction.
+- Cursors are opaque, URL-safe strings of the boundary row's position.
+"""
+
+# Step 1: Imports
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_cursor(timestamp, pk) -> str:
+    position = f"{(timestamp - EPOCH) // MICROSECOND}.{pk}"
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Cursor -> ``(timestamp, id)``; raises ``ValidationError`` on anything else."""
+    try:
+        position = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        micros, pk = position.split(".")
+        return EPOCH + int(micros) * MICROSECOND, int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError, OverflowError):
+        raise ValidationError({"cursor": "Invalid cursor."})
+
+
+class KeysetPagination(BasePagination):
+    """
+    ``(timestamp, id)`` keyset pages over a message queryset.
+
+    The queryset may be a ``.values()`` queryset; rows only need ``timestamp``
+    and ``id``.
+    """
+
+    default_limit = 50
+    max_limit = 200
+
+    def get_limit(self, request) -> int:
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except (TypeError, ValueError):
+            raise ValidationError({"limit": "Must be an integer."})
+        return max(1, min(limit, self.max_limit))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Step 1: Direction and boundary
+        before = request.query_params.get("before")
+        after = request.query_params.get("after")
+        if before and after:
+            raise ValidationError({"cursor": "Pass either before or after, not both."})
+        limit = self.get_limit(request)
+
+        # Step 2: One range scan of limit + 1 rows (the extra row says "more")
+        if after:
+            timestamp, pk = decode_cursor(after)
+            rows = list(
+                queryset.filter(Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=pk))
+                .order_by("timestamp", "id")[:limit + 1]
+            )
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            self.has_older, self.has_newer = True, has_more
+        else:
+            if before:
+                timestamp, pk = decode_cursor(before)
+                queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk))
+            rows = list(queryset.order_by("-timestamp", "-id")[:limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit][::-1]
+            self.has_older, self.has_newer = has_more, bool(before)
+
+        # Step 3: Remember the page edges for the response cursors
+        self.rows = rows
+        return rows
+
+    def _cursor(self, row):
+        if isinstance(row, dict):
+            return encode_cursor(row["timestamp"], row["id"])
+        return encode_cursor(row.timestamp, row.id)
+
+    def get_paginated_response(self, data):
+        older = newer = None
+        if self.rows:
+            older = self._cursor(self.rows[0]) if self.has_older else None
+            newer = self._cursor(self.rows[-1]) if self.has_newer else None
+        return Response({"results": data, "older": older, "newer": newer})
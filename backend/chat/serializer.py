@@ -20,6 +20,25 @@ class DirectMessageSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "sender", "timestamp", "conversation_id", "is_read"]
 
 
+class DirectMessageCompactSerializer(serializers.Serializer):
+    """
+    History row for the paginated thread endpoint.
+
+    Reads ``DIRECT_MESSAGE_COMPACT_FIELDS`` rows from ``.values()``: no model
+    instances, and no per-message sender/receiver loads (the model's
+    ``conversation_id`` property would fetch both users for every message).
+    """
+    id = serializers.IntegerField(read_only=True)
+    sender_id = serializers.IntegerField(read_only=True)
+    receiver_id = serializers.IntegerField(read_only=True)
+    content = serializers.CharField(read_only=True)
+    timestamp = serializers.DateTimeField(read_only=True)
+    is_read = serializers.BooleanField(read_only=True)
+
+
+DIRECT_MESSAGE_COMPACT_FIELDS = ("id", "sender_id", "receiver_id", "content", "timestamp", "is_read")
+
+
 class ChatRoomMemberSerializer(serializers.ModelSerializer):
     user_id = serializers.IntegerField(source="user.id", read_only=True)
     first_name = serializers.CharField(source="user.first_name", read_only=True)
@@ -110,6 +129,19 @@ class ChatRoomMessageSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
 
+
+class ChatRoomMessageCompactSerializer(serializers.Serializer):
+    """History row for the paginated group endpoint (``.values()`` rows, sender name joined)."""
+    id = serializers.IntegerField(read_only=True)
+    sender_id = serializers.IntegerField(read_only=True)
+    sender_name = serializers.CharField(source="sender__first_name", read_only=True)
+    content = serializers.CharField(read_only=True)
+    timestamp = serializers.DateTimeField(read_only=True)
+
+
+CHAT_ROOM_MESSAGE_COMPACT_FIELDS = ("id", "sender_id", "sender__first_name", "content", "timestamp")
+
+
 class ConversationMessageListView(generics.ListAPIView):
     """
     Returns all messages in a given conversation, sorted by timestamp.
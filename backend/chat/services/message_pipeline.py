@@ -0,0 +1,571 @@
+# Filename: chat/services/message_pipeline.py
+
+"""
+Write-behind persistence for DM and group chat messages.
+
+Why:
+- Every DM ran ``User.objects.get`` plus ``Conversation.objects.get_or_create``
+  and an INSERT before it was broadcast, and every group message added an
+  INSERT and a ``ChatRoom.updated_at`` UPDATE. That is three or four SQL
+  round trips per message on the send path.
+
+How:
+- The consumers resolve the conversation (or check the room) once and
+  ``asubmit_direct`` / ``asubmit_group`` assign the message its id and
+  timestamp in process (``next_message_id``), record it in the Redis stream
+  ``chat:pending`` (one XADD), and return. The consumer broadcasts right
+  away; the send path runs no SQL.
+- One writer per event loop collects submitted messages and flushes them
+  every ``CHAT_FLUSH_INTERVAL_MS`` milliseconds, or as soon as
+  ``CHAT_FLUSH_BATCH`` are waiting: one ``bulk_create`` per model, the
+  batch's unread-counter increments, and one ``updated_at`` touch for all
+  the rooms it wrote to. Flushed entries are then XDELed.
+- Unread counts skip messages sent before the recipient's last read (the
+  counter's ``read_at``), and group recipients who left before the flush.
+  A DM read before its row was written is stored as read.
+- Crash safety: a worker that dies before its flush, or a flush that keeps
+  failing (the database is down), leaves its entries in the stream. A
+  ``chat.drain`` timer (started by ``ttt_core.asgi``, run by one worker at
+  a time) drains it every ``CHAT_DRAIN_INTERVAL_SECONDS``, taking only
+  entries older than a live writer keeps them (``CHAT_FLUSH_INTERVAL_MS``
+  x ``MAX_FLUSH_ATTEMPTS``). A flush locks the conversations and rooms it
+  writes to before checking which ids are already stored, so a drain that
+  does race a live writer waits for it and then inserts (and counts
+  unread for) only the rows still missing.
+- Bad messages do not sink their batch: a batch rejected by the database
+  itself (an integrity or data error, e.g. a deleted conversation, or an
+  id stored for a different message: ``MessageIdCollision``) is bisected
+  until each failing message is alone, and those are moved, with the
+  error, to the dead-letter stream ``chat:dead`` and logged. The rest of
+  the batch is written.
+- A REST history read can trail the socket by up to one flush interval.
+
+Message ids:
+    Snowflake-style and time-ordered, kept below 2**53 so browsers read
+    them exactly: 40 bits of milliseconds since ``ID_EPOCH`` (about 34
+    years), 6 bits of worker id, 7 bits of per-millisecond sequence. The
+    message timestamp is the id's millisecond, so ``(timestamp, id)`` order
+    is id order.
+
+    A worker id is leased, never just taken: ``SET chat:worker:{n} NX EX``
+    on the first free slot (or on ``CHAT_WORKER_ID`` only, if set). A
+    heartbeat thread renews the lease while the process lives; ids are only
+    issued while the lease is known to be held, and a lost or lapsed lease
+    is replaced before the next id. With every slot held, leasing raises.
+
+Redis Key Structure:
+    - chat:pending     (Stream)  "m" -> JSON of one submitted message
+    - chat:dead        (Stream)  "m" -> JSON of a rejected message, "error" -> why
+    - chat:worker:{n}  (String)  lease on worker id n -> holder token, short TTL
+"""
+
+# Step 1: Imports
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+import weakref
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DataError, IntegrityError, transaction
+
+from chat.models import ChatRoom, ChatRoomMember, ChatRoomMessage, Conversation, DirectMessage
+from chat.services import unread_counters
+from utils.redis.redis_client import get_async_redis_client, get_redis_client
+from utils.redis.script_registry import ScriptRegistry
+from utils.scheduler.timer_scheduler import get_timer_scheduler
+from utils.websockets.codec import dumps, loads
+
+logger = logging.getLogger("chat.message_pipeline")
+
+PENDING_STREAM = "chat:pending"
+DEAD_LETTER_STREAM = "chat:dead"
+DEAD_LETTER_MAXLEN = 10_000
+WORKER_LEASE_PREFIX = "chat:worker:"
+DRAIN_TIMER = "chat.drain"
+
+KIND_DM = "dm"
+KIND_GROUP = "group"
+
+ID_EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+WORKER_BITS = 6
+SEQUENCE_BITS = 7
+MAX_WORKER = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+WORKER_LEASE_TTL_SECONDS = 30
+WORKER_LEASE_MARGIN_SECONDS = 10   # stop issuing ids this long before the lease could lapse
+WORKER_HEARTBEAT_SECONDS = 5
+
+DRAIN_BATCH = 500
+MAX_FLUSH_ATTEMPTS = 3
+
+# The database rejected these messages; retrying the same rows cannot help.
+# Anything else (connection lost, timeouts) is retried, then left to the drain.
+REJECTED_ERRORS = (IntegrityError, DataError)
+
+# KEYS = candidate lease keys, ARGV = [holder token, ttl]. Takes the first
+# free key (or one this holder already has) and returns its index, or -1.
+LEASE_LUA = """
+for i, key in ipairs(KEYS) do
+    if redis.call('SET', key, ARGV[1], 'NX', 'EX', ARGV[2]) then
+        return i - 1
+    end
+    if redis.call('GET', key) == ARGV[1] then
+        redis.call('EXPIRE', key, ARGV[2])
+        return i - 1
+    end
+end
+return -1
+"""
+
+# KEYS[1] = lease key, ARGV = [holder token, ttl]. 1 if renewed, 0 if lost.
+RENEW_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_script = ScriptRegistry({"lease": LEASE_LUA, "renew": RENEW_LUA})
+
+
+class MessageIdCollision(IntegrityError):
+    """A message id is already stored for a different message."""
+
+
+# Step 2: Message ids
+class _IdState:
+    worker_id = None
+    lease_redis = None
+    lease_until = 0.0   # time.monotonic() up to which the lease is known to be held
+    token = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    heartbeat = None
+    last_ms = -1
+    sequence = 0
+    lock = threading.Lock()
+    lease_lock = threading.Lock()
+
+
+def _epoch_ms() -> int:
+    return int((time.time() - ID_EPOCH.timestamp()) * 1000)
+
+
+def _lease_key(worker_id) -> str:
+    return f"{WORKER_LEASE_PREFIX}{worker_id}"
+
+
+def _lease_worker_id() -> None:
+    with _IdState.lease_lock:
+        if time.monotonic() < _IdState.lease_until:
+            return
+        configured = settings.CHAT_WORKER_ID
+        if configured is not None and not 0 <= configured <= MAX_WORKER:
+            raise ImproperlyConfigured(f"CHAT_WORKER_ID must be between 0 and {MAX_WORKER}")
+        candidates = [configured] if configured is not None else list(range(MAX_WORKER + 1))
+
+        redis = get_redis_client()
+        leased_at = time.monotonic()
+        index = _script(redis, "lease")(
+            keys=[_lease_key(worker_id) for worker_id in candidates],
+            args=[_IdState.token, WORKER_LEASE_TTL_SECONDS],
+        )
+        if index < 0:
+            raise RuntimeError(f"[CHAT] every message worker id in {candidates[0]}..{candidates[-1]} is leased")
+        with _IdState.lock:
+            _IdState.worker_id = candidates[index]
+            _IdState.lease_redis = redis
+            _IdState.lease_until = leased_at + WORKER_LEASE_TTL_SECONDS - WORKER_LEASE_MARGIN_SECONDS
+        logger.info("[CHAT] leased message worker id %s", _IdState.worker_id)
+
+        if _IdState.heartbeat is None:
+            _IdState.heartbeat = threading.Thread(target=_heartbeat, name="chat-worker-lease", daemon=True)
+            _IdState.heartbeat.start()
+
+
+def _renew_lease() -> None:
+    with _IdState.lock:
+        worker_id, redis = _IdState.worker_id, _IdState.lease_redis
+    if worker_id is None:
+        return
+    renewed_at = time.monotonic()
+    if _script(redis, "renew")(keys=[_lease_key(worker_id)], args=[_IdState.token, WORKER_LEASE_TTL_SECONDS]):
+        with _IdState.lock:
+            if _IdState.worker_id == worker_id:
+                _IdState.lease_until = renewed_at + WORKER_LEASE_TTL_SECONDS - WORKER_LEASE_MARGIN_SECONDS
+        return
+    logger.error("[CHAT] lost the lease on message worker id %s; the next message takes a new one", worker_id)
+    with _IdState.lock:
+        if _IdState.worker_id == worker_id:
+            _IdState.lease_until = 0.0
+
+
+def _heartbeat() -> None:
+    while True:
+        time.sleep(WORKER_HEARTBEAT_SECONDS)
+        try:
+            _renew_lease()
+        except Exception:
+            logger.exception("[CHAT] renewing the message worker id lease failed")
+
+
+async def aworker_id() -> int:
+    """This process's worker id field, leasing one from Redis when it holds none."""
+    if time.monotonic() >= _IdState.lease_until:
+        await sync_to_async(_lease_worker_id, thread_sensitive=False)()
+    return _IdState.worker_id
+
+
+def next_message_id() -> int:
+    """Next time-ordered id (``await aworker_id()`` just before)."""
+    with _IdState.lock:
+        if time.monotonic() >= _IdState.lease_until:
+            raise RuntimeError("[CHAT] no live message worker id lease; await aworker_id() first")
+        now = max(_epoch_ms(), _IdState.last_ms)   # never run backwards with the clock
+        if now == _IdState.last_ms:
+            _IdState.sequence = (_IdState.sequence + 1) & MAX_SEQUENCE
+            if _IdState.sequence == 0:   # this millisecond is used up
+                while now <= _IdState.last_ms:
+                    now = _epoch_ms()
+        else:
+            _IdState.sequence = 0
+        _IdState.last_ms = now
+        return (now << (WORKER_BITS + SEQUENCE_BITS)) | (_IdState.worker_id << SEQUENCE_BITS) | _IdState.sequence
+
+
+def message_timestamp(message_id) -> datetime:
+    """The send time encoded in a message id (millisecond precision)."""
+    return ID_EPOCH + timedelta(milliseconds=message_id >> (WORKER_BITS + SEQUENCE_BITS))
+
+
+# Step 3: Persistence (DB thread)
+DM_IDENTITY = ("sender_id", "conversation_id", "content")
+POST_IDENTITY = ("sender_id", "room_id", "content")
+
+
+def _new_only(model, items, identity) -> list:
+    """
+    The items not stored yet. A stored id is only skipped if it holds this
+    very message (an earlier flush or drain wrote it); any other match is
+    an id collision and raises.
+    """
+    if not items:
+        return []
+    stored = {
+        row["id"]: row
+        for row in model.objects.filter(id__in=[item["id"] for item in items]).values("id", *identity)
+    }
+    collisions = [
+        item["id"] for item in items
+        if item["id"] in stored and any(stored[item["id"]][field] != item[field] for field in identity)
+    ]
+    if collisions:
+        raise MessageIdCollision(f"{model.__name__} id(s) {collisions} already stored for other messages")
+    return [item for item in items if item["id"] not in stored]
+
+
+def persist_messages(items) -> int:
+    """
+    Write one batch of submitted messages and everything that follows from them.
+
+    Idempotent per message id. Returns the number of rows inserted.
+
+    Raises:
+        MessageIdCollision: An id is already stored for a different message.
+    """
+    dms = [item for item in items if item["kind"] == KIND_DM]
+    posts = [item for item in items if item["kind"] == KIND_GROUP]
+    with transaction.atomic():
+        # Step 1: Lock what this batch writes to (always conversations, then
+        # rooms, by id): a concurrent flush of the same messages waits here
+        # and then finds them stored, so nothing is inserted or counted twice
+        if dms:
+            list(Conversation.objects.select_for_update().filter(
+                id__in={item["conversation_id"] for item in dms},
+            ).order_by("id").values_list("id", flat=True))
+        if posts:
+            list(ChatRoom.objects.select_for_update().filter(
+                id__in={item["room_id"] for item in posts},
+            ).order_by("id").values_list("id", flat=True))
+
+        # Skip what an earlier flush or drain already stored
+        dms = _new_only(DirectMessage, dms, DM_IDENTITY)
+        posts = _new_only(ChatRoomMessage, posts, POST_IDENTITY)
+
+        # Step 2: Read marks set while these waited: older messages are already read
+        dm_marks = unread_counters.read_marks(
+            unread_counters.KIND_DM, [item["sender_id"] for item in dms], [item["receiver_id"] for item in dms],
+        )
+        for item in dms:
+            read_at = dm_marks.get((item["sender_id"], item["receiver_id"]))
+            item["is_read"] = read_at is not None and message_timestamp(item["id"]) <= read_at
+
+        # Step 3: One INSERT per model (a duplicate id left here still raises)
+        DirectMessage.objects.bulk_create(
+            [
+                DirectMessage(
+                    id=item["id"],
+                    sender_id=item["sender_id"],
+                    receiver_id=item["receiver_id"],
+                    conversation_id=item["conversation_id"],
+                    content=item["content"],
+                    timestamp=message_timestamp(item["id"]),
+                    is_read=item["is_read"],
+                )
+                for item in dms
+            ],
+        )
+        ChatRoomMessage.objects.bulk_create(
+            [
+                ChatRoomMessage(
+                    id=item["id"],
+                    room_id=item["room_id"],
+                    sender_id=item["sender_id"],
+                    content=item["content"],
+                    timestamp=message_timestamp(item["id"]),
+                )
+                for item in posts
+            ],
+        )
+
+        # Step 4: Unread counters, one increment per (target, recipient)
+        unread = Counter((item["sender_id"], item["receiver_id"]) for item in dms if not item["is_read"])
+        for (sender_id, receiver_id), count in unread.items():
+            unread_counters.increment(unread_counters.KIND_DM, sender_id, [receiver_id], by=count)
+
+        room_ids = {item["room_id"] for item in posts}
+        recipient_ids = {user_id for item in posts for user_id in item["recipient_ids"]}
+        members = set(
+            ChatRoomMember.objects.filter(
+                room_id__in=room_ids, user_id__in=recipient_ids, left_at__isnull=True, room__archived_at__isnull=True,
+            ).values_list("room_id", "user_id")
+        ) if posts else set()
+        group_marks = unread_counters.read_marks(unread_counters.KIND_GROUP, room_ids, recipient_ids) if posts else {}
+        unread = Counter(
+            (item["room_id"], user_id)
+            for item in posts
+            for user_id in item["recipient_ids"]
+            if (item["room_id"], user_id) in members
+            and not (
+                (item["room_id"], user_id) in group_marks
+                and message_timestamp(item["id"]) <= group_marks[(item["room_id"], user_id)]
+            )
+        )
+        by_count = defaultdict(list)   # same room, same count -> one increment for all those users
+        for (room_id, user_id), count in unread.items():
+            by_count[(room_id, count)].append(user_id)
+        for (room_id, count), user_ids in by_count.items():
+            unread_counters.increment(unread_counters.KIND_GROUP, room_id, user_ids, by=count)
+
+        # Step 5: One coalesced updated_at touch for every room written to
+        if posts:
+            ChatRoom.objects.filter(id__in={item["room_id"] for item in posts}).update(
+                updated_at=message_timestamp(max(item["id"] for item in posts)),
+            )
+    return len(dms) + len(posts)
+
+
+def persist_isolating(items) -> tuple:
+    """
+    ``persist_messages``, bisecting a batch the database rejects until each
+    rejected message is alone, so the others are still written.
+
+    Returns:
+        tuple: (rows inserted, ``[(item, error)]`` rejected on their own).
+
+    Raises:
+        Exception: Any error that is not a rejection of the rows themselves.
+    """
+    try:
+        return persist_messages(items), []
+    except REJECTED_ERRORS as exc:
+        if len(items) == 1:
+            return 0, [(items[0], exc)]
+    middle = len(items) // 2
+    written_head, rejected_head = persist_isolating(items[:middle])
+    written_tail, rejected_tail = persist_isolating(items[middle:])
+    return written_head + written_tail, rejected_head + rejected_tail
+
+
+def _dead_letter_fields(rejected) -> list:
+    for item, error in rejected:
+        logger.error("[CHAT] dead-lettered message id=%s kind=%s: %s", item.get("id"), item.get("kind"), error)
+    return [{"m": dumps(item), "error": f"{type(error).__name__}: {error}"} for item, error in rejected]
+
+
+# Step 4: Writer (one per event loop)
+class _Writer:
+    def __init__(self):
+        self.pending = []   # [(stream entry id, item, attempts)]
+        self.flush_now = asyncio.Event()
+        self.task = None
+
+    async def submit(self, item) -> None:
+        entry_id = await get_async_redis_client().xadd(PENDING_STREAM, {"m": dumps(item)})
+        self.pending.append((entry_id, item, 0))
+        if len(self.pending) >= settings.CHAT_FLUSH_BATCH:
+            self.flush_now.set()
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        interval = settings.CHAT_FLUSH_INTERVAL_MS / 1000
+        while self.pending:
+            try:
+                await asyncio.wait_for(self.flush_now.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Persist everything waiting now. Rejected messages are dead-lettered;
+        other failures are retried, then left to the drain.
+        """
+        self.flush_now.clear()
+        batch, self.pending = self.pending, []
+        if not batch:
+            return 0
+        try:
+            written, rejected = await database_sync_to_async(persist_isolating)([item for _, item, _ in batch])
+        except Exception:
+            logger.exception("[CHAT] flush of %s message(s) failed", len(batch))
+            retry = [(entry_id, item, attempts + 1) for entry_id, item, attempts in batch]
+            kept = [entry for entry in retry if entry[2] < MAX_FLUSH_ATTEMPTS]
+            if len(kept) < len(retry):
+                logger.error("[CHAT] leaving %s message(s) for the drain", len(retry) - len(kept))
+            self.pending = kept + self.pending
+            return 0
+        async with get_async_redis_client().pipeline(transaction=True) as pipe:
+            for fields in _dead_letter_fields(rejected):
+                pipe.xadd(DEAD_LETTER_STREAM, fields, maxlen=DEAD_LETTER_MAXLEN, approximate=True)
+            pipe.xdel(PENDING_STREAM, *[entry_id for entry_id, _, _ in batch])
+            await pipe.execute()
+        return written
+
+
+_writers = weakref.WeakKeyDictionary()   # event loop -> _Writer
+
+
+def _writer() -> _Writer:
+    loop = asyncio.get_running_loop()
+    writer = _writers.get(loop)
+    if writer is None:
+        writer = _writers[loop] = _Writer()
+    return writer
+
+
+async def aflush() -> int:
+    """Flush this event loop's waiting messages now (tests, shutdown)."""
+    return await _writer().flush()
+
+
+# Step 5: Submitting (consumers)
+async def asubmit_direct(*, sender_id, receiver_id, conversation_id, content) -> dict:
+    """
+    Queue a DM for write-behind.
+
+    Returns:
+        dict: ``{"id", "timestamp"}`` to broadcast now.
+    """
+    await aworker_id()
+    item = {
+        "kind": KIND_DM,
+        "id": next_message_id(),
+        "sender_id": int(sender_id),
+        "receiver_id": int(receiver_id),
+        "conversation_id": int(conversation_id),
+        "content": content,
+    }
+    await _writer().submit(item)
+    return {"id": item["id"], "timestamp": message_timestamp(item["id"])}
+
+
+async def asubmit_group(*, room_id, sender_id, content, recipient_ids) -> dict:
+    """
+    Queue a group message for write-behind; ``recipient_ids`` get an unread count.
+
+    Returns:
+        dict: ``{"id", "timestamp"}`` to broadcast now.
+    """
+    await aworker_id()
+    item = {
+        "kind": KIND_GROUP,
+        "id": next_message_id(),
+        "room_id": int(room_id),
+        "sender_id": int(sender_id),
+        "content": content,
+        "recipient_ids": [int(user_id) for user_id in recipient_ids],
+    }
+    await _writer().submit(item)
+    return {"id": item["id"], "timestamp": message_timestamp(item["id"])}
+
+
+# Step 6: Drain
+def _stale_after_seconds() -> float:
+    """How long a live writer may still hold an entry (all its flush attempts)."""
+    return settings.CHAT_FLUSH_INTERVAL_MS * MAX_FLUSH_ATTEMPTS / 1000
+
+
+def drain_pending() -> int:
+    """
+    Persist the messages no live writer will flush any more (its worker
+    died, or its flush attempts ran out).
+
+    Only entries older than ``_stale_after_seconds`` are taken (the stream
+    entry id is its Redis-clock millisecond); newer ones may still be
+    flushed by the writer that added them. Rejected messages are
+    dead-lettered like in a flush; any other error stops the drain until
+    its next run, leaving the rest in the stream.
+    """
+    redis = get_redis_client()
+    seconds, microseconds = redis.time()
+    end = str(seconds * 1000 + microseconds // 1000 - int(_stale_after_seconds() * 1000))
+    drained = 0
+    start = "-"
+    while True:
+        entries = redis.xrange(PENDING_STREAM, start, end, count=DRAIN_BATCH)
+        if not entries:
+            return drained
+        written, rejected = persist_isolating([loads(fields["m"]) for _, fields in entries])
+        drained += written
+        pipe = redis.pipeline(transaction=True)
+        for fields in _dead_letter_fields(rejected):
+            pipe.xadd(DEAD_LETTER_STREAM, fields, maxlen=DEAD_LETTER_MAXLEN, approximate=True)
+        pipe.xdel(PENDING_STREAM, *[entry_id for entry_id, _ in entries])
+        pipe.execute()
+        start = "(" + entries[-1][0]
+
+
+def _fire_drain(key, token):
+    try:
+        written = drain_pending()
+    except Exception:
+        logger.exception("[CHAT] drain of %s failed; retrying at its next run", PENDING_STREAM)
+    else:
+        if written:
+            logger.info("[CHAT] drained %s unflushed message(s) from %s", written, PENDING_STREAM)
+    return time.time() + settings.CHAT_DRAIN_INTERVAL_SECONDS   # run again (same token)
+
+
+def schedule_drain() -> None:
+    """
+    Start the periodic drain on the timer scheduler's thread pool.
+
+    The first run waits until whatever was left before this worker started
+    counts as stale. Every worker calls this at startup; all of them share
+    one timer (a new token replaces the old one), so one drain runs at a time.
+    """
+    get_timer_scheduler().schedule(
+        DRAIN_TIMER, "pending", uuid.uuid4().hex, time.time() + _stale_after_seconds(),
+    )
+
+
+get_timer_scheduler().register(DRAIN_TIMER, _fire_drain)
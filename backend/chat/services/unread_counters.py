@@ -0,0 +1,328 @@
+# Filename: chat/services/unread_counters.py
+
+"""
+Materialized unread counters for DM and group chat badges.
+
+Why:
+- ``get_unread_summary`` re-aggregated every unread ``DirectMessage`` of the
+  user (with the deletion-cutoff OR conditions) and ran one ``COUNT`` per
+  group room, on every badge refresh.
+
+How:
+- Counts are kept, not computed. ``UnreadCounter`` rows are the durable copy
+  and ``unread:{user_id}`` is a Redis hash of the same numbers
+  (``dm:{friend_id}`` / ``group:{room_id}`` -> count).
+- Writes go to the rows inside the caller's transaction (insert-if-missing,
+  then ``count = count + 1``: two statements, whatever the room size). The
+  Redis hashes follow from ``transaction.on_commit``, in one Lua call that
+  touches only hashes already loaded.
+- The badge read is one ``HGETALL``. A missing hash is filled from the rows
+  (one query), with the ``-`` marker so a user with no counters stays cached.
+  Writes that find the hash missing bump ``unread_fill:{user_id}``; a fill
+  that started before such a write sees the bump and does not cache what it
+  read, so a late fill can never pin a stale count for the TTL.
+- Read, clear-history, leave and archive reset or drop the counter. A reset
+  also stores ``read_at``, so messages still waiting to be written behind
+  (``chat.services.message_pipeline``) that were sent before it never count.
+- Redis errors are logged and the rows are read instead.
+  ``manage.py rebuild_unread_counters`` recomputes the counts from messages,
+  keeping each counter's ``read_at``.
+
+Redis Key Structure:
+    - unread:{user_id}       (Hash)    "dm:{friend_id}" / "group:{room_id}" -> count, "-" -> marker
+    - unread_fill:{user_id}  (String)  bumped by writes that found the hash missing
+"""
+
+# Step 1: Imports
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from chat.models import ChatRoomMember, DirectMessage, UnreadCounter
+from utils.redis.redis_client import get_redis_client
+from utils.redis.script_registry import ScriptRegistry
+
+logger = logging.getLogger("chat.unread_counters")
+
+KIND_DM = UnreadCounter.KIND_DM
+KIND_GROUP = UnreadCounter.KIND_GROUP
+MARKER = "-"   # keeps a user without counters cached
+
+
+def unread_key(user_id) -> str:
+    return f"unread:{user_id}"
+
+
+def fill_key(user_id) -> str:
+    return f"unread_fill:{user_id}"
+
+
+def _field(kind, target_id) -> str:
+    return f"{kind}:{target_id}"
+
+
+# Step 2: Lua scripts
+# Hashes that are not loaded are left alone (their next read fills them), but
+# their fill key is bumped so a fill already in flight does not cache.
+_BUMP_FILL = """
+        redis.call('INCR', KEYS[i + 1])
+        redis.call('EXPIRE', KEYS[i + 1], ttl)
+"""
+
+# KEYS: user hash, fill key, ...   ARGV: field, increment, ttl
+INCREMENT = """
+local ttl = ARGV[3]
+for i = 1, #KEYS, 2 do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('HINCRBY', KEYS[i], ARGV[1], ARGV[2])
+        redis.call('EXPIRE', KEYS[i], ttl)
+    else""" + _BUMP_FILL + """    end
+end
+return 0
+"""
+
+# KEYS: user hash, fill key, ...   ARGV: field, ttl
+RESET = """
+local ttl = ARGV[2]
+for i = 1, #KEYS, 2 do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('HDEL', KEYS[i], ARGV[1])
+    else""" + _BUMP_FILL + """    end
+end
+return 0
+"""
+
+# KEYS: user hash, fill key   ARGV: fill value read before loading ('' = none), ttl, field, count, ...
+# Caches the loaded counters only if no write found the hash missing meanwhile.
+FILL = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then return 0 end
+if redis.call('EXISTS', KEYS[1]) == 1 then return 0 end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+_script = ScriptRegistry({"increment": INCREMENT, "reset": RESET, "fill": FILL})
+
+
+def _run_on_commit(name, user_ids, *args) -> None:
+    keys = [key for user_id in user_ids for key in (unread_key(user_id), fill_key(user_id))]
+
+    def apply():
+        try:
+            redis = get_redis_client()
+            _script(redis, name)(keys=keys, args=list(args))
+        except Exception as exc:
+            # The next fill from the rows is correct; drop what may be stale.
+            logger.warning("[UNREAD] %s failed for users=%s err=%s", name, user_ids, exc)
+            _forget(keys[::2])
+
+    transaction.on_commit(apply)
+
+
+def _forget(keys) -> None:
+    try:
+        get_redis_client().delete(*keys)
+    except Exception as exc:
+        logger.warning("[UNREAD] could not drop %s err=%s", keys, exc)
+
+
+# Step 3: Writes
+def increment(kind, target_id, user_ids, by=1) -> None:
+    """Add ``by`` unread messages for every listed user (call where the messages are saved)."""
+    user_ids = list(user_ids)
+    if not user_ids or by <= 0:
+        return
+    with transaction.atomic():
+        UnreadCounter.objects.bulk_create(
+            [UnreadCounter(user_id=user_id, kind=kind, target_id=target_id) for user_id in user_ids],
+            ignore_conflicts=True,
+        )
+        UnreadCounter.objects.filter(kind=kind, target_id=target_id, user_id__in=user_ids).update(
+            count=F("count") + by,
+        )
+        _run_on_commit("increment", user_ids, _field(kind, target_id), by, settings.UNREAD_COUNTERS_TTL)
+
+
+def reset(kind, target_id, user_ids) -> None:
+    """Zero the counter for the listed users and move their read mark to now (read, clear-history)."""
+    user_ids = list(user_ids)
+    with transaction.atomic():
+        UnreadCounter.objects.bulk_create(
+            [UnreadCounter(user_id=user_id, kind=kind, target_id=target_id) for user_id in user_ids],
+            ignore_conflicts=True,
+        )
+        UnreadCounter.objects.filter(kind=kind, target_id=target_id, user_id__in=user_ids).update(
+            count=0, read_at=timezone.now(),
+        )
+        _run_on_commit("reset", user_ids, _field(kind, target_id), settings.UNREAD_COUNTERS_TTL)
+
+
+def drop(kind, target_id, user_ids=None) -> None:
+    """Delete the counter (left the room, room archived); ``None`` means every user."""
+    rows = UnreadCounter.objects.filter(kind=kind, target_id=target_id)
+    if user_ids is not None:
+        rows = rows.filter(user_id__in=list(user_ids))
+    user_ids = list(rows.values_list("user_id", flat=True))
+    if not user_ids:
+        return
+    rows.delete()
+    _run_on_commit("reset", user_ids, _field(kind, target_id), settings.UNREAD_COUNTERS_TTL)
+
+
+def read_marks(kind, target_ids, user_ids) -> dict:
+    """``{(target_id, user_id): read_at}`` for the counters that have been read (one query)."""
+    return {
+        (target_id, user_id): read_at
+        for target_id, user_id, read_at in UnreadCounter.objects.filter(
+            kind=kind, target_id__in=set(target_ids), user_id__in=set(user_ids), read_at__isnull=False,
+        ).values_list("target_id", "user_id", "read_at")
+    }
+
+
+# Step 4: Reads
+def _load(user_id) -> dict:
+    return {
+        _field(kind, target_id): count
+        for kind, target_id, count in UnreadCounter.objects.filter(user_id=user_id, count__gt=0).values_list(
+            "kind", "target_id", "count",
+        )
+    }
+
+
+def _cached(user_id) -> dict:
+    redis = get_redis_client()
+    key = unread_key(user_id)
+    fields = redis.hgetall(key)
+    if fields:
+        return fields
+
+    # Step 1: Note the fill key, then read the rows
+    seen = redis.get(fill_key(user_id)) or ""
+    fields = _load(user_id)
+
+    # Step 2: Cache them unless a write raced the read
+    args = [seen, settings.UNREAD_COUNTERS_TTL, MARKER, 0]
+    for field, count in fields.items():
+        args.extend((field, count))
+    _script(redis, "fill")(keys=[key, fill_key(user_id)], args=args)
+    return fields
+
+
+def unread_counts(user_id) -> dict:
+    """
+    Non-zero counters of one user, by kind.
+
+    Returns:
+        dict: ``{"dm": {friend_id: count}, "group": {room_id: count}}`` with
+        string ids, as the badge payload uses them.
+    """
+    try:
+        fields = _cached(user_id)
+    except Exception as exc:
+        logger.warning("[UNREAD] Redis unavailable for user=%s, reading rows err=%s", user_id, exc)
+        fields = _load(user_id)
+
+    counts = {KIND_DM: {}, KIND_GROUP: {}}
+    for field, count in fields.items():
+        if field == MARKER or int(count) <= 0:
+            continue
+        kind, target_id = field.split(":", 1)
+        counts[kind][target_id] = int(count)
+    return counts
+
+
+# Step 5: Rebuild
+def _dm_rows(user_ids):
+    """Unread DMs per (receiver, sender), after the receiver's clear-history cutoff."""
+    messages = DirectMessage.objects.filter(is_read=False, conversation__isnull=False)
+    if user_ids is not None:
+        messages = messages.filter(receiver_id__in=user_ids)
+    visible = (
+        Q(conversation__user1=F("receiver"))
+        & (Q(conversation__user1_deleted_at__isnull=True) | Q(timestamp__gt=F("conversation__user1_deleted_at")))
+    ) | (
+        Q(conversation__user2=F("receiver"))
+        & (Q(conversation__user2_deleted_at__isnull=True) | Q(timestamp__gt=F("conversation__user2_deleted_at")))
+    )
+    for row in messages.filter(visible).values("receiver_id", "sender_id").annotate(count=Count("id")):
+        yield row["receiver_id"], KIND_DM, row["sender_id"], row["count"]
+
+
+def _group_rows(user_ids):
+    """Unread room messages per active membership, after last read and clear-history."""
+    memberships = ChatRoomMember.objects.filter(left_at__isnull=True, room__archived_at__isnull=True)
+    if user_ids is not None:
+        memberships = memberships.filter(user_id__in=user_ids)
+    unread = (
+        (Q(last_read_at__isnull=True) | Q(room__messages__timestamp__gt=F("last_read_at")))
+        & (Q(deleted_at__isnull=True) | Q(room__messages__timestamp__gt=F("deleted_at")))
+        & ~Q(room__messages__sender_id=F("user_id"))
+    )
+    rows = memberships.annotate(unread=Count("room__messages", filter=unread)).values_list(
+        "user_id", "room_id", "unread",
+    )
+    for user_id, room_id, count in rows:
+        yield user_id, KIND_GROUP, room_id, count
+
+
+def rebuild(user_ids=None, batch_size=1000) -> int:
+    """
+    Recompute counters from the messages (two aggregate queries), update the
+    rows in place and drop the Redis hashes, which refill on their next read.
+
+    Rows keep their ``read_at``: it is what stops messages still waiting to
+    be written behind from counting. A row is deleted only when its count is
+    zero and it has never been read.
+
+    Args:
+        user_ids: Only these users; ``None`` rebuilds everyone.
+
+    Returns:
+        int: Number of non-zero counters written.
+    """
+    user_ids = None if user_ids is None else [int(user_id) for user_id in user_ids]
+    counts = {
+        (user_id, kind, target_id): count
+        for rows in (_dm_rows(user_ids), _group_rows(user_ids))
+        for user_id, kind, target_id, count in rows if count
+    }
+    written = len(counts)
+
+    with transaction.atomic():
+        existing = UnreadCounter.objects.select_for_update()
+        if user_ids is not None:
+            existing = existing.filter(user_id__in=user_ids)
+        changed, never_read = [], []
+        for row in existing.only("id", "user_id", "kind", "target_id", "count", "read_at"):
+            count = counts.pop((row.user_id, row.kind, row.target_id), 0)
+            if not count and row.read_at is None:
+                never_read.append(row.id)
+            elif row.count != count:
+                row.count = count
+                changed.append(row)
+        for start in range(0, len(never_read), batch_size):
+            UnreadCounter.objects.filter(id__in=never_read[start:start + batch_size]).delete()
+        UnreadCounter.objects.bulk_update(changed, ["count"], batch_size=batch_size)
+        UnreadCounter.objects.bulk_create(
+            [
+                UnreadCounter(user_id=user_id, kind=kind, target_id=target_id, count=count)
+                for (user_id, kind, target_id), count in counts.items()
+            ],
+            batch_size=batch_size,
+        )
+
+    try:
+        if user_ids is None:
+            keys = list(get_redis_client().scan_iter(match=unread_key("*"), count=batch_size))
+        else:
+            keys = [unread_key(user_id) for user_id in user_ids]
+    except Exception as exc:
+        logger.warning("[UNREAD] could not list cached counters err=%s", exc)
+        keys = []
+    for start in range(0, len(keys), batch_size):
+        _forget(keys[start:start + batch_size])
+    return written
@@ -1,10 +1,28 @@
+from io import StringIO
+import time
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from unittest.mock import patch
 from rest_framework.test import APITestCase
 
-from chat.models import ChatRoom, ChatRoomMember, ChatRoomMessage
+from chat.consumers.group_chat_consumer import GroupChatConsumer, notify_members_changed
+from chat.models import ChatRoom, ChatRoomMember, ChatRoomMessage, Conversation, DirectMessage, UnreadCounter
+from chat.routing import websocket_urlpatterns
+from chat.services import message_pipeline, unread_counters
 from friends.models import Friendship
+from utils.websockets.codec import loads
 
 
 User = get_user_model()
@@ -12,6 +30,10 @@ User = get_user_model()
 
 class GroupChatRestTests(APITestCase):
     def setUp(self):
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        redis_patch = patch.object(unread_counters, "get_redis_client", return_value=self.redis)
+        redis_patch.start()
+        self.addCleanup(redis_patch.stop)
         self.owner = User.objects.create_user(
             email="owner@example.com",
             password="pass",
@@ -39,7 +61,7 @@ class GroupChatRestTests(APITestCase):
     def test_create_group_with_accepted_friend(self):
         self.client.force_authenticate(user=self.owner)
 
-        with patch("chat.views.group_views.notify_user") as notify_user:
+        with patch("chat.views.group_views.notify_users") as notify_users:
             response = self.client.post(
                 "/api/chat/groups/",
                 {"name": "Recruiter Demo", "member_ids": [self.friend.id]},
@@ -49,10 +71,10 @@ class GroupChatRestTests(APITestCase):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.data["name"], "Recruiter Demo")
         self.assertEqual(response.data["member_count"], 2)
-        notify_user.assert_called_once()
-        self.assertEqual(notify_user.call_args.kwargs["user_id"], self.friend.id)
-        self.assertEqual(notify_user.call_args.kwargs["payload"]["type"], "group_created")
-        self.assertEqual(notify_user.call_args.kwargs["payload"]["room_id"], response.data["id"])
+        notify_users.assert_called_once()
+        self.assertEqual(notify_users.call_args.kwargs["user_ids"], [self.friend.id])
+        self.assertEqual(notify_users.call_args.kwargs["payload"]["type"], "group_created")
+        self.assertEqual(notify_users.call_args.kwargs["payload"]["room_id"], response.data["id"])
         self.assertTrue(
             ChatRoomMember.objects.filter(
                 room_id=response.data["id"],
@@ -107,6 +129,7 @@ class GroupChatRestTests(APITestCase):
             role=ChatRoomMember.ROLE_MEMBER,
         )
         ChatRoomMessage.objects.create(room=room, sender=self.owner, content="hello")
+        unread_counters.rebuild()
 
         self.client.force_authenticate(user=self.friend)
         response = self.client.get("/api/chat/unread-summary/")
@@ -129,15 +152,15 @@ class GroupChatRestTests(APITestCase):
         )
 
         self.client.force_authenticate(user=self.owner)
-        with patch("chat.views.group_views.notify_user") as notify_user:
+        with patch("chat.views.group_views.notify_users") as notify_users:
             response = self.client.delete(f"/api/chat/groups/{room.id}/delete/")
 
         self.assertEqual(response.status_code, 204)
         room.refresh_from_db()
         self.assertIsNotNone(room.archived_at)
-        notify_user.assert_called_once()
-        self.assertEqual(notify_user.call_args.kwargs["user_id"], self.friend.id)
-        self.assertEqual(notify_user.call_args.kwargs["payload"]["type"], "group_deleted")
+        notify_users.assert_called_once()
+        self.assertEqual(list(notify_users.call_args.kwargs["user_ids"]), [self.friend.id])
+        self.assertEqual(notify_users.call_args.kwargs["payload"]["type"], "group_deleted")
 
         self.client.force_authenticate(user=self.friend)
         list_response = self.client.get("/api/chat/groups/")
@@ -163,3 +186,494 @@ class GroupChatRestTests(APITestCase):
         self.assertEqual(response.status_code, 403)
         room.refresh_from_db()
         self.assertIsNone(room.archived_at)
+
+
+class UnreadCounterTests(APITestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        self.redis = fakeredis.FakeRedis(server=self.server, decode_responses=True)
+        redis_patch = patch.object(unread_counters, "get_redis_client", return_value=self.redis)
+        redis_patch.start()
+        self.addCleanup(redis_patch.stop)
+
+        self.ada, self.bob, self.cy = (
+            User.objects.create_user(email=f"{name}@unread.test", password="pass", first_name=name)
+            for name in ("ada", "bob", "cy")
+        )
+        self.convo = Conversation.objects.create(user1=self.ada, user2=self.bob)
+        self.room = ChatRoom.objects.create(name="Room", created_by=self.ada)
+        for user in (self.ada, self.bob, self.cy):
+            ChatRoomMember.objects.create(room=self.room, user=user)
+
+    def _dm(self, sender, receiver):
+        """Save a DM the way DirectMessageConsumer.save_message does."""
+        DirectMessage.objects.create(sender=sender, receiver=receiver, content="hi", conversation=self.convo)
+        with self.captureOnCommitCallbacks(execute=True):
+            unread_counters.increment(unread_counters.KIND_DM, sender.id, [receiver.id])
+
+    def _group_message(self, sender):
+        """Save a room message the way GroupChatConsumer.save_message does."""
+        ChatRoomMessage.objects.create(room=self.room, sender=sender, content="hi")
+        others = [user.id for user in (self.ada, self.bob, self.cy) if user != sender]
+        with self.captureOnCommitCallbacks(execute=True):
+            unread_counters.increment(unread_counters.KIND_GROUP, self.room.id, others)
+
+    def _summary(self, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.get("/api/chat/unread-summary/")
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_warm_badge_read_is_one_hgetall_and_no_sql(self):
+        self._dm(self.ada, self.bob)
+        self._group_message(self.ada)
+        self.assertEqual(self._summary(self.bob)["dm_unread_total"], 1)   # fills the hash
+
+        self._dm(self.ada, self.bob)
+        self.client.force_authenticate(user=self.bob)
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get("/api/chat/unread-summary/").data
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(data["by_friend"], {str(self.ada.id): 2})
+        self.assertEqual(data["groups"], {str(self.room.id): 1})
+
+    def test_mark_read_and_clear_history_reset_counters(self):
+        self._dm(self.ada, self.bob)
+        self._group_message(self.ada)
+        self._summary(self.bob)
+
+        self.client.force_authenticate(user=self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/api/chat/conversations/{self.convo.id}/mark-read/")
+            self.client.delete(f"/api/chat/groups/{self.room.id}/clear/")
+
+        data = self._summary(self.bob)
+        self.assertEqual((data["dm_unread_total"], data["group_unread_total"]), (0, 0))
+        self.assertFalse(UnreadCounter.objects.filter(user=self.bob, count__gt=0).exists())
+
+    def test_leaving_or_archiving_drops_group_counters(self):
+        self._group_message(self.ada)
+        self._summary(self.cy)
+
+        self.client.force_authenticate(user=self.cy)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/chat/groups/{self.room.id}/")
+        self.assertEqual(self._summary(self.cy)["groups"], {})
+
+        self.room.archive_for_everyone(self.ada)
+        with self.captureOnCommitCallbacks(execute=True):
+            unread_counters.drop(unread_counters.KIND_GROUP, self.room.id)
+        self.assertEqual(self._summary(self.bob)["groups"], {})
+
+    def test_summary_reads_rows_when_redis_is_down(self):
+        self._dm(self.ada, self.bob)
+        self.server.connected = False
+        self.assertEqual(self._summary(self.bob)["by_friend"], {str(self.ada.id): 1})
+
+    def test_rebuild_matches_message_history(self):
+        self._dm(self.ada, self.bob)
+        self._dm(self.bob, self.ada)
+        self._group_message(self.ada)
+        self._group_message(self.bob)
+        self.convo.mark_deleted_for(self.ada)          # cleared: the DM from bob no longer counts
+        self._dm(self.ada, self.bob)
+        ChatRoomMember.objects.filter(user=self.cy).update(last_read_at=timezone.now())
+        self._summary(self.bob)                        # a cached hash the rebuild must drop
+
+        expected = {
+            (row.user_id, row.kind, row.target_id, row.count)
+            for row in UnreadCounter.objects.filter(count__gt=0)
+        }
+        expected -= {(self.ada.id, "dm", self.bob.id, 1), (self.cy.id, "group", self.room.id, 2)}
+        UnreadCounter.objects.all().delete()
+
+        self.assertEqual(unread_counters.rebuild(), len(expected))
+        self.assertEqual(
+            {(row.user_id, row.kind, row.target_id, row.count) for row in UnreadCounter.objects.all()},
+            expected,
+        )
+        self.assertEqual(self.redis.keys("unread:*"), [])
+        self.assertEqual(self._summary(self.bob)["dm_unread_total"], 2)
+
+    def test_rebuild_keeps_read_marks(self):
+        self._dm(self.ada, self.bob)
+        self.client.force_authenticate(user=self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/api/chat/conversations/{self.convo.id}/mark-read/")
+        read_at = UnreadCounter.objects.get(user=self.bob, kind="dm").read_at
+        self._dm(self.ada, self.bob)
+
+        self.assertEqual(unread_counters.rebuild(), 1)
+        row = UnreadCounter.objects.get(user=self.bob, kind="dm")
+        self.assertEqual((row.count, row.read_at), (1, read_at))
+
+    def test_fill_racing_a_write_is_not_cached(self):
+        self._dm(self.ada, self.bob)
+        load = unread_counters._load
+
+        def load_then_write(user_id):
+            fields = load(user_id)      # read before the next message commits
+            self._dm(self.ada, self.bob)
+            return fields
+
+        with patch.object(unread_counters, "_load", side_effect=load_then_write):
+            self.assertEqual(unread_counters.unread_counts(self.bob.id)["dm"], {str(self.ada.id): 1})
+        self.assertFalse(self.redis.exists(unread_counters.unread_key(self.bob.id)))
+        self.assertEqual(unread_counters.unread_counts(self.bob.id)["dm"], {str(self.ada.id): 2})
+
+    def test_rebuild_command_scopes_to_users(self):
+        self._dm(self.ada, self.bob)
+        self._dm(self.bob, self.ada)
+        UnreadCounter.objects.all().delete()
+
+        call_command("rebuild_unread_counters", "--user", str(self.bob.id), stdout=StringIO())
+        self.assertEqual(list(UnreadCounter.objects.values_list("user_id", "count")), [(self.bob.id, 1)])
+
+
+class KeysetHistoryTests(APITestCase):
+    def setUp(self):
+        self.ada, self.bob = (
+            User.objects.create_user(email=f"{name}@history.test", password="pass", first_name=name)
+            for name in ("ada", "bob")
+        )
+        self.convo = Conversation.objects.create(user1=self.ada, user2=self.bob)
+        self.room = ChatRoom.objects.create(name="History", created_by=self.ada)
+        ChatRoomMember.objects.create(room=self.room, user=self.ada, role=ChatRoomMember.ROLE_OWNER)
+        self.client.force_authenticate(user=self.ada)
+
+    def _history(self, count, same_timestamp_every=3):
+        start = timezone.now() - timezone.timedelta(hours=1)
+        DirectMessage.objects.bulk_create(
+            DirectMessage(sender=self.bob, receiver=self.ada, content=f"m{n}", conversation=self.convo)
+            for n in range(count)
+        )
+        # Several messages share a timestamp: pages must still split on id
+        for message in DirectMessage.objects.order_by("id"):
+            moment = start + timezone.timedelta(seconds=(message.id // same_timestamp_every))
+            DirectMessage.objects.filter(id=message.id).update(timestamp=moment)
+
+    def _page(self, **params):
+        response = self.client.get(f"/api/chat/conversations/{self.convo.id}/messages/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_scrolling_back_visits_every_message_once(self):
+        self._history(120)
+        page = self._page(limit=50)
+        self.assertIsNone(page["newer"])
+        seen = [row["content"] for row in page["results"]]
+        self.assertEqual(seen[-1], "m119")
+
+        while page["older"]:
+            page = self._page(limit=50, before=page["older"])
+            self.assertIsNotNone(page["newer"])
+            seen = [row["content"] for row in page["results"]] + seen
+
+        self.assertEqual(seen, [f"m{n}" for n in range(120)])
+        self.assertEqual(set(page["results"][0]), {"id", "sender_id", "receiver_id", "content", "timestamp", "is_read"})
+
+    def test_after_cursor_catches_up_on_newer_messages(self):
+        self._history(10)
+        latest = self._page(limit=5)
+        older = self._page(limit=5, before=latest["older"])
+        newer = self._page(limit=3, after=older["newer"])
+        self.assertEqual([row["content"] for row in newer["results"]], ["m5", "m6", "m7"])
+        self.assertIsNotNone(newer["older"])
+        self.assertIsNotNone(newer["newer"])
+
+    def test_page_cost_does_not_grow_with_history(self):
+        self._history(10)
+        with CaptureQueriesContext(connection) as short:
+            self._page(limit=5)
+        self._history(300)
+        with CaptureQueriesContext(connection) as long:
+            self._page(limit=5)
+        self.assertEqual(len(short), len(long))
+        self.assertIn("LIMIT 6", long[-1]["sql"])
+
+    def test_cleared_history_is_not_paged_back_into(self):
+        self._history(5)
+        self.convo.mark_deleted_for(self.ada)
+        self.assertEqual(self._page()["results"], [])
+
+    def test_bad_cursor_is_rejected(self):
+        self.assertEqual(
+            self.client.get(f"/api/chat/conversations/{self.convo.id}/messages/", {"before": "nope"}).status_code,
+            400,
+        )
+
+    def test_group_history_pages_with_sender_names(self):
+        for n in range(4):
+            ChatRoomMessage.objects.create(room=self.room, sender=self.ada, content=f"g{n}")
+
+        first = self.client.get(f"/api/chat/groups/{self.room.id}/messages/", {"limit": 3}).data
+        self.assertEqual([row["content"] for row in first["results"]], ["g1", "g2", "g3"])
+        self.assertEqual(first["results"][0]["sender_name"], "ada")
+
+        rest = self.client.get(f"/api/chat/groups/{self.room.id}/messages/", {"before": first["older"]}).data
+        self.assertEqual([row["content"] for row in rest["results"]], ["g0"])
+        self.assertIsNone(rest["older"])
+
+
+class MessagePipelineTests(TestCase):
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        self.redis = fakeredis.FakeRedis(server=server, decode_responses=True)
+        for patcher in (
+            patch.object(message_pipeline, "get_redis_client", return_value=self.redis),
+            patch.object(
+                message_pipeline, "get_async_redis_client",
+                side_effect=lambda: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True),
+            ),
+            patch.object(unread_counters, "get_redis_client", return_value=self.redis),
+            # every test leases its worker id afresh, from its own Redis
+            patch.multiple(message_pipeline._IdState, worker_id=None, lease_redis=None, lease_until=0.0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.ada, self.bob, self.cy = (
+            User.objects.create_user(email=f"{name}@pipeline.test", password="pass", first_name=name)
+            for name in ("ada", "bob", "cy")
+        )
+        self.convo = Conversation.objects.create(user1=self.ada, user2=self.bob)
+        self.room = ChatRoom.objects.create(name="Room", created_by=self.ada)
+        for user in (self.ada, self.bob, self.cy):
+            ChatRoomMember.objects.create(room=self.room, user=user)
+
+    def _dm(self, content="hi"):
+        return message_pipeline.asubmit_direct(
+            sender_id=self.ada.id, receiver_id=self.bob.id, conversation_id=self.convo.id, content=content,
+        )
+
+    def _post(self, content="hi"):
+        return message_pipeline.asubmit_group(
+            room_id=self.room.id, sender_id=self.ada.id, content=content, recipient_ids=[self.bob.id, self.cy.id],
+        )
+
+    def test_message_ids_are_ordered_and_browser_safe(self):
+        async_to_sync(message_pipeline.aworker_id)()
+        ids = [message_pipeline.next_message_id() for _ in range(1000)]
+        self.assertEqual(ids, sorted(set(ids)))
+        self.assertLess(ids[-1], 2 ** 53)
+        sent = message_pipeline.message_timestamp(ids[-1])
+        self.assertLess(abs((timezone.now() - sent).total_seconds()), 5)
+
+    def test_worker_ids_are_leased_and_running_out_fails_loudly(self):
+        self.redis.set(message_pipeline._lease_key(0), "another-process")
+        self.assertEqual(async_to_sync(message_pipeline.aworker_id)(), 1)
+        self.assertEqual(self.redis.get(message_pipeline._lease_key(1)), message_pipeline._IdState.token)
+        self.assertGreater(self.redis.ttl(message_pipeline._lease_key(1)), 0)
+
+        message_pipeline._IdState.lease_until = 0.0   # lapsed here, but the slot is still ours
+        self.assertEqual(async_to_sync(message_pipeline.aworker_id)(), 1)
+
+        for worker_id in range(message_pipeline.MAX_WORKER + 1):
+            self.redis.set(message_pipeline._lease_key(worker_id), "another-process")
+        message_pipeline._renew_lease()   # the heartbeat notices the lease is gone
+        with self.assertRaises(RuntimeError):
+            message_pipeline.next_message_id()
+        with self.assertRaises(RuntimeError):
+            async_to_sync(message_pipeline.aworker_id)()
+
+    def test_a_stored_id_holding_another_message_is_not_skipped(self):
+        async_to_sync(message_pipeline.aworker_id)()
+        item = {"kind": "dm", "id": message_pipeline.next_message_id(), "sender_id": self.ada.id,
+                "receiver_id": self.bob.id, "conversation_id": self.convo.id, "content": "first"}
+        self.assertEqual(message_pipeline.persist_messages([item]), 1)
+
+        with self.assertRaises(message_pipeline.MessageIdCollision):
+            message_pipeline.persist_messages([{**item, "content": "second"}])
+        self.assertEqual(DirectMessage.objects.get().content, "first")
+
+    def test_send_path_writes_nothing_until_one_flush_writes_the_batch(self):
+        async def send_then_flush():
+            sent = [await self._dm(f"m{n}") for n in range(3)] + [await self._post(f"g{n}") for n in range(3)]
+            written_before_flush = await database_sync_to_async(DirectMessage.objects.count)()
+            await message_pipeline.aflush()
+            return sent, written_before_flush
+
+        sent, written_before_flush = async_to_sync(send_then_flush)()
+
+        self.assertEqual(written_before_flush, 0)
+        self.assertEqual(
+            list(DirectMessage.objects.order_by("id").values_list("id", "content")),
+            [(item["id"], f"m{n}") for n, item in enumerate(sent[:3])],
+        )
+        post = ChatRoomMessage.objects.get(id=sent[3]["id"])
+        self.assertEqual(post.timestamp, sent[3]["timestamp"])
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.updated_at, sent[-1]["timestamp"])
+        self.assertEqual(unread_counters.unread_counts(self.bob.id)["dm"], {str(self.ada.id): 3})
+        self.assertEqual(unread_counters.unread_counts(self.cy.id)["group"], {str(self.room.id): 3})
+        self.assertEqual(self.redis.xlen(message_pipeline.PENDING_STREAM), 0)
+
+    def test_flush_cost_does_not_grow_with_the_batch(self):
+        async_to_sync(message_pipeline.aworker_id)()
+
+        def batch(size):
+            return [
+                {"kind": "dm", "id": message_pipeline.next_message_id(), "sender_id": self.ada.id,
+                 "receiver_id": self.bob.id, "conversation_id": self.convo.id, "content": "hi"}
+                for _ in range(size)
+            ] + [
+                {"kind": "group", "id": message_pipeline.next_message_id(), "room_id": self.room.id,
+                 "sender_id": self.ada.id, "content": "hi", "recipient_ids": [self.bob.id, self.cy.id]}
+                for _ in range(size)
+            ]
+
+        with CaptureQueriesContext(connection) as small, self.captureOnCommitCallbacks(execute=True):
+            message_pipeline.persist_messages(batch(3))
+        with CaptureQueriesContext(connection) as large, self.captureOnCommitCallbacks(execute=True):
+            message_pipeline.persist_messages(batch(30))
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(UnreadCounter.objects.get(user=self.cy, kind="group").count, 33)
+
+    def test_read_before_the_flush_is_not_undone_by_it(self):
+        async def send_read_flush():
+            await self._dm()
+            await self._post()
+            await database_sync_to_async(unread_counters.reset)(unread_counters.KIND_DM, self.ada.id, [self.bob.id])
+            await database_sync_to_async(unread_counters.reset)(
+                unread_counters.KIND_GROUP, self.room.id, [self.bob.id],
+            )
+            await database_sync_to_async(ChatRoomMember.objects.filter(user=self.cy).update)(
+                left_at=timezone.now(),
+            )
+            await message_pipeline.aflush()
+
+        async_to_sync(send_read_flush)()
+
+        self.assertTrue(DirectMessage.objects.get().is_read)
+        self.assertEqual(unread_counters.unread_counts(self.bob.id), {"dm": {}, "group": {}})
+        self.assertEqual(unread_counters.unread_counts(self.cy.id)["group"], {})
+
+    def test_a_rejected_message_is_dead_lettered_and_the_rest_of_its_batch_written(self):
+        async def send_collide_flush():
+            sent = [await self._dm(f"m{n}") for n in range(3)] + [await self._post()]
+            # another message already holds the second id
+            taken = {**self._pending()[1], "content": "other"}
+            await database_sync_to_async(message_pipeline.persist_messages)([taken])
+            await message_pipeline.aflush()
+            return sent
+
+        sent = async_to_sync(send_collide_flush)()
+
+        self.assertEqual(
+            list(DirectMessage.objects.order_by("id").values_list("id", "content")),
+            [(sent[0]["id"], "m0"), (sent[1]["id"], "other"), (sent[2]["id"], "m2")],
+        )
+        self.assertEqual(ChatRoomMessage.objects.get().id, sent[3]["id"])
+        [(_, dead)] = self.redis.xrange(message_pipeline.DEAD_LETTER_STREAM)
+        self.assertEqual(loads(dead["m"])["content"], "m1")
+        self.assertIn("MessageIdCollision", dead["error"])
+        self.assertEqual(self.redis.xlen(message_pipeline.PENDING_STREAM), 0)
+
+    def _pending(self):
+        return [loads(fields["m"]) for _, fields in self.redis.xrange(message_pipeline.PENDING_STREAM)]
+
+    def _send_and_crash(self):
+        async def send_and_crash():
+            sent = [await self._dm(), await self._post()]
+            message_pipeline._writer().pending.clear()   # the process died before its flush
+            return sent
+
+        return async_to_sync(send_and_crash)()
+
+    @override_settings(CHAT_FLUSH_INTERVAL_MS=0)
+    def test_drain_writes_what_a_crashed_worker_left(self):
+        sent = self._send_and_crash()
+        left = self._pending()
+        self.assertFalse(DirectMessage.objects.exists())
+
+        self.assertEqual(message_pipeline.drain_pending(), 2)
+        self.assertEqual(message_pipeline.drain_pending(), 0)
+        self.assertEqual(DirectMessage.objects.get().id, sent[0]["id"])
+        self.assertEqual(ChatRoomMessage.objects.get().id, sent[1]["id"])
+
+        # a live flush of the same entries, racing the drain, writes and counts nothing more
+        self.assertEqual(message_pipeline.persist_messages(left), 0)
+        self.assertEqual(UnreadCounter.objects.get(user=self.bob, kind="dm").count, 1)
+        self.assertEqual(UnreadCounter.objects.get(user=self.bob, kind="group").count, 1)
+
+    @override_settings(CHAT_FLUSH_INTERVAL_MS=0, CHAT_DRAIN_INTERVAL_SECONDS=60)
+    def test_drain_dead_letters_rejected_messages_and_runs_again(self):
+        sent = self._send_and_crash()
+        message_pipeline.persist_messages([{**self._pending()[0], "content": "other"}])
+
+        before = time.time()
+        self.assertGreaterEqual(message_pipeline._fire_drain("pending", "token"), before + 60)
+        self.assertEqual(ChatRoomMessage.objects.get().id, sent[1]["id"])
+        self.assertEqual(self.redis.xlen(message_pipeline.DEAD_LETTER_STREAM), 1)
+        self.assertEqual(self.redis.xlen(message_pipeline.PENDING_STREAM), 0)
+
+        # a failing run is logged and the drain still comes back
+        with patch.object(message_pipeline, "drain_pending", side_effect=ConnectionError):
+            self.assertGreaterEqual(message_pipeline._fire_drain("pending", "token"), before + 60)
+
+    def test_drain_leaves_entries_a_live_writer_may_still_flush(self):
+        self._send_and_crash()
+
+        self.assertEqual(message_pipeline.drain_pending(), 0)
+        self.assertEqual(self.redis.xlen(message_pipeline.PENDING_STREAM), 2)
+        self.assertFalse(DirectMessage.objects.exists())
+
+
+@pytest.fixture
+def group_room(transactional_db):
+    ada, bob, cy = (
+        User.objects.create_user(email=f"{name}@socket.test", password="pass", first_name=name)
+        for name in ("ada", "bob", "cy")
+    )
+    room = ChatRoom.objects.create(name="Room", created_by=ada)
+    for user in (ada, bob, cy):
+        ChatRoomMember.objects.create(room=room, user=user)
+    return room, ada, bob, cy
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+async def test_group_send_path_uses_cached_members_until_they_change(group_room):
+    room, ada, bob, cy = group_room
+    loads_of_members = []
+    submitted = []
+    load_members = vars(GroupChatConsumer)["active_member_ids"]
+
+    async def counting_load(consumer):
+        loads_of_members.append(consumer.room_id)
+        return await load_members(consumer)
+
+    async def submit(*, room_id, sender_id, content, recipient_ids):
+        submitted.append(sorted(recipient_ids))
+        return {"id": len(submitted), "timestamp": timezone.now()}
+
+    with patch.object(GroupChatConsumer, "active_member_ids", counting_load), \
+            patch.object(message_pipeline, "asubmit_group", submit), \
+            patch.object(unread_counters, "get_redis_client", return_value=fakeredis.FakeRedis(decode_responses=True)):
+        socket = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f"/ws/chat/group/{room.id}/")
+        socket.scope["user"] = ada
+        assert (await socket.connect())[0]
+        loaded_at_connect = len(loads_of_members)
+
+        for text in ("one", "two"):
+            await socket.send_json_to({"type": "message", "message": text})
+            assert (await socket.receive_json_from())["message"] == text
+        assert len(loads_of_members) == loaded_at_connect
+        assert submitted == [sorted([bob.id, cy.id])] * 2
+
+        def remove_cy():
+            ChatRoomMember.objects.filter(room=room, user=cy).update(left_at=timezone.now())
+            notify_members_changed(room.id)
+
+        await database_sync_to_async(remove_cy)()
+        await socket.send_json_to({"type": "message", "message": "three"})
+        assert (await socket.receive_json_from())["message"] == "three"
+        assert submitted[-1] == [bob.id]
+
+        def remove_ada():
+            ChatRoomMember.objects.filter(room=room, user=ada).update(left_at=timezone.now())
+            notify_members_changed(room.id)
+
+        await database_sync_to_async(remove_ada)()
+        assert (await socket.receive_json_from())["type"] == "error"
+        assert (await socket.receive_output())["type"] == "websocket.close"
@@ -10,13 +10,15 @@ Production behaviors implemented here:
 - "Delete conversation" is a per-user soft delete (does not destroy history for the other user).
 - If a user has deleted the conversation, fetching messages returns ONLY messages AFTER their deleted cutoff
   (i.e., "clear history for me" behavior).
+- Message history is keyset-paginated on (timestamp, id) (chat/pagination.py): newest page first, then
+  ?before=<cursor> to scroll back.
 - Mark-read updates only the requesting user's unread messages.
-- Unread-summary respects per-user deletion cutoffs (deleted history does not count toward unread).
+- Unread-summary reads the materialized counters (chat/services/unread_counters.py); mark-read and
+  delete reset them, so deleted history does not count toward unread.
 """
 
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
-from django.db.models import Count, Q, F
 
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
@@ -24,8 +26,9 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 
 from chat.models import Conversation, DirectMessage
-from chat.serializer import DirectMessageSerializer
-from chat.views.group_views import get_group_unread_summary_for_user
+from chat.pagination import KeysetPagination
+from chat.serializer import DIRECT_MESSAGE_COMPACT_FIELDS, DirectMessageCompactSerializer
+from chat.services import unread_counters
 
 
 User = get_user_model()
@@ -33,16 +36,18 @@ User = get_user_model()
 
 class ConversationMessageListView(generics.ListAPIView):
     """
-    List all messages in a conversation for an authenticated participant.
+    List a page of messages in a conversation for an authenticated participant.
 
     Key behaviors:
     - Only participants can access the conversation.
     - If the requesting user has soft-deleted this conversation, only returns messages AFTER their deleted cutoff
       (so the UI shows an empty thread after deletion, until new messages arrive).
-    - Otherwise, returns all messages sorted by timestamp ascending.
+    - Pages: the newest ?limit= (default 50) messages, ?before=<cursor> for older, ?after=<cursor> for newer.
+      Response: { "results": [...oldest -> newest], "older": cursor|null, "newer": cursor|null }.
     """
 
-    serializer_class = DirectMessageSerializer
+    serializer_class = DirectMessageCompactSerializer
+    pagination_class = KeysetPagination
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -60,7 +65,8 @@ class ConversationMessageListView(generics.ListAPIView):
         if not convo.includes(user):
             raise PermissionDenied("You are not a participant in this conversation.")
 
-        qs = convo.messages.all().order_by("timestamp")
+        # Ordering and page boundaries come from KeysetPagination
+        qs = convo.messages.values(*DIRECT_MESSAGE_COMPACT_FIELDS)
 
         # Step 1: "Clear history for me" via per-user deleted_at cutoff timestamps
         # If user1_deleted_at exists for this requester, hide anything at/before that timestamp.
@@ -117,6 +123,8 @@ def mark_conversation_read(request, conversation_id):
         DirectMessage.objects.filter(conversation=convo, receiver=request.user, is_read=False)
         .update(is_read=True)
     )
+    friend_id = convo.user2_id if request.user.id == convo.user1_id else convo.user1_id
+    unread_counters.reset(unread_counters.KIND_DM, friend_id, [request.user.id])
 
     return Response({"updated": updated}, status=status.HTTP_200_OK)
 
@@ -145,7 +153,11 @@ def delete_conversation(request, conversation_id):
     # Step 1: Record deletion cutoff for this user
     convo.mark_deleted_for(request.user)
 
-    # Step 2: 204 is the most REST-standard response for successful delete.
+    # Step 2: Nothing before the cutoff counts as unread any more
+    friend_id = convo.user2_id if request.user.id == convo.user1_id else convo.user1_id
+    unread_counters.reset(unread_counters.KIND_DM, friend_id, [request.user.id])
+
+    # Step 3: 204 is the most REST-standard response for successful delete.
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -153,46 +165,22 @@ def delete_conversation(request, conversation_id):
 @permission_classes([permissions.IsAuthenticated])
 def get_unread_summary(request):
     """
-    Returns unread DM counts for the authenticated user grouped by sender.
+    Returns unread DM counts for the authenticated user grouped by sender, and group counts by room.
     Used to rehydrate unread badges after refresh.
 
     IMPORTANT:
-    - Respects per-user deletion cutoffs so a "cleared" conversation does not contribute unread
-      for messages at/before the cutoff.
+    - One HGETALL on the user's counter hash (filled from UnreadCounter rows on a miss); nothing is
+      aggregated here. A "cleared" conversation was reset when it was cleared.
     """
-    user = request.user
-
-    base = DirectMessage.objects.filter(receiver=user, is_read=False)
-
-    # Step 1: Apply deletion cutoff semantics (clear history for me)
-    # If I'm convo.user1: allow unread if user1_deleted_at is null OR msg.timestamp > user1_deleted_at
-    cond_user1 = (
-        Q(conversation__user1=user)
-        & (Q(conversation__user1_deleted_at__isnull=True) | Q(timestamp__gt=F("conversation__user1_deleted_at")))
-    )
-
-    # If I'm convo.user2: allow unread if user2_deleted_at is null OR msg.timestamp > user2_deleted_at
-    cond_user2 = (
-        Q(conversation__user2=user)
-        & (Q(conversation__user2_deleted_at__isnull=True) | Q(timestamp__gt=F("conversation__user2_deleted_at")))
-    )
-
-    qs = (
-        base.filter(cond_user1 | cond_user2)
-        .values("sender_id")
-        .annotate(count=Count("id"))
-    )
-
-    by_friend = {str(row["sender_id"]): row["count"] for row in qs}
-    total = sum(by_friend.values())
-    group_unread = get_group_unread_summary_for_user(user)
-    group_total = sum(group_unread.values())
+    counts = unread_counters.unread_counts(request.user.id)
+    by_friend = counts[unread_counters.KIND_DM]
+    group_unread = counts[unread_counters.KIND_GROUP]
 
     return Response(
         {
-            "dm_unread_total": total,
+            "dm_unread_total": sum(by_friend.values()),
             "by_friend": by_friend,
-            "group_unread_total": group_total,
+            "group_unread_total": sum(group_unread.values()),
             "groups": group_unread,
         },
         status=status.HTTP_200_OK,
@@ -10,14 +10,18 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 
+from chat.consumers.group_chat_consumer import notify_members_changed
 from chat.models import ChatRoom, ChatRoomMember, ChatRoomMessage
+from chat.pagination import KeysetPagination
 from chat.serializer import (
+    CHAT_ROOM_MESSAGE_COMPACT_FIELDS,
     ChatRoomCreateSerializer,
-    ChatRoomMessageSerializer,
+    ChatRoomMessageCompactSerializer,
     ChatRoomSerializer,
 )
+from chat.services import unread_counters
 from friends.models import Friendship
-from utils.notifications.notify import notify_user
+from utils.notifications.notify import notify_users
 
 
 User = get_user_model()
@@ -81,16 +85,15 @@ def _notify_group_membership(*, user_ids, room, event_type, actor):
         "actor_id": actor.id,
         "actor_name": actor.first_name,
     }
-    for user_id in user_ids:
-        try:
-            notify_user(user_id=user_id, payload=payload)
-        except Exception:
-            logger.exception(
-                "Failed to notify user=%s about room=%s event=%s",
-                user_id,
-                room.id,
-                event_type,
-            )
+    try:
+        notify_users(user_ids=user_ids, payload=payload)
+    except Exception:
+        logger.exception(
+            "Failed to notify users=%s about room=%s event=%s",
+            user_ids,
+            room.id,
+            event_type,
+        )
 
 
 def _active_room_member_ids(room):
@@ -174,6 +177,8 @@ def group_detail(request, room_id):
         return Response(ChatRoomSerializer(room).data)
 
     membership.leave()
+    unread_counters.drop(unread_counters.KIND_GROUP, room.id, [request.user.id])
+    notify_members_changed(room.id)
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -187,6 +192,8 @@ def delete_group_for_everyone(request, room_id):
 
     member_ids = _active_room_member_ids(room)
     room.archive_for_everyone(request.user)
+    unread_counters.drop(unread_counters.KIND_GROUP, room.id)
+    notify_members_changed(room.id)
     _notify_group_membership(
         user_ids=[user_id for user_id in member_ids if user_id != request.user.id],
         room=room,
@@ -199,11 +206,15 @@ def delete_group_for_everyone(request, room_id):
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def group_messages(request, room_id):
+    # Membership already excludes archived rooms; the page is one (room, timestamp, id) range scan
     membership = _require_active_member(room_id, request.user)
-    qs = ChatRoomMessage.objects.filter(room_id=room_id, room__archived_at__isnull=True).select_related("sender")
+    qs = ChatRoomMessage.objects.filter(room_id=room_id)
     if membership.deleted_at:
         qs = qs.filter(timestamp__gt=membership.deleted_at)
-    return Response(ChatRoomMessageSerializer(qs.order_by("timestamp"), many=True).data)
+
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(qs.values(*CHAT_ROOM_MESSAGE_COMPACT_FIELDS), request)
+    return paginator.get_paginated_response(ChatRoomMessageCompactSerializer(page, many=True).data)
 
 
 @api_view(["POST"])
@@ -211,6 +222,7 @@ def group_messages(request, room_id):
 def mark_group_read(request, room_id):
     membership = _require_active_member(room_id, request.user)
     membership.mark_read()
+    unread_counters.reset(unread_counters.KIND_GROUP, membership.room_id, [request.user.id])
     return Response({"updated": 1}, status=status.HTTP_200_OK)
 
 
@@ -219,6 +231,7 @@ def mark_group_read(request, room_id):
 def clear_group_history(request, room_id):
     membership = _require_active_member(room_id, request.user)
     membership.mark_deleted()
+    unread_counters.reset(unread_counters.KIND_GROUP, membership.room_id, [request.user.id])
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -240,22 +253,27 @@ def add_group_members(request, room_id):
     users = _validate_friend_member_ids(request.user, member_ids)
 
     notified_user_ids = []
+    # Unread counts start at joining: earlier history is not unread
+    joined_at = timezone.now()
 
     with transaction.atomic():
         for user in users:
             membership, created = ChatRoomMember.objects.get_or_create(
                 room=room,
                 user=user,
-                defaults={"role": ChatRoomMember.ROLE_MEMBER},
+                defaults={"role": ChatRoomMember.ROLE_MEMBER, "last_read_at": joined_at},
             )
             if created:
                 notified_user_ids.append(user.id)
             elif membership.left_at is not None:
                 membership.left_at = None
                 membership.deleted_at = None
-                membership.save(update_fields=["left_at", "deleted_at"])
+                membership.last_read_at = joined_at
+                membership.save(update_fields=["left_at", "deleted_at", "last_read_at"])
                 notified_user_ids.append(user.id)
         room.save(update_fields=["updated_at"])
+        if notified_user_ids:
+            notify_members_changed(room.id)
 
     room = ChatRoom.objects.prefetch_related("memberships__user").get(id=room.id)
     if notified_user_ids:
@@ -289,28 +307,8 @@ def remove_group_member(request, room_id, user_id):
         raise ValidationError("The owner cannot be removed by another member.")
 
     target.leave()
+    unread_counters.drop(unread_counters.KIND_GROUP, room.id, [target.user_id])
     room.save(update_fields=["updated_at"])
+    notify_members_changed(room.id)
     return Response(status=status.HTTP_204_NO_CONTENT)
 
-
-def get_group_unread_summary_for_user(user):
-    memberships = ChatRoomMember.objects.filter(
-        user=user,
-        room__archived_at__isnull=True,
-        left_at__isnull=True,
-    ).values("room_id", "last_read_at", "deleted_at")
-
-    unread = {}
-    for membership in memberships:
-        cutoff = membership["last_read_at"]
-        deleted_at = membership["deleted_at"]
-        qs = ChatRoomMessage.objects.filter(room_id=membership["room_id"]).exclude(sender=user)
-        if cutoff:
-            qs = qs.filter(timestamp__gt=cutoff)
-        if deleted_at:
-            qs = qs.filter(timestamp__gt=deleted_at)
-        count = qs.count()
-        if count:
-            unread[str(membership["room_id"])] = count
-
-    return unread
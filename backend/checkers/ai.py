@@ -0,0 +1,269 @@
+"""
+Checkers AI: negamax with alpha-beta pruning over whole turns.
+
+- A move is a complete turn: multi-jumps are expanded to the end by
+  ``engine.move_sequences``, so the search never stops halfway through one.
+- Evaluation is material (kings worth more than men), mobility (empty
+  squares reachable by a quiet step) and a small bonus for advancing men.
+- Positions with a capture pending are searched past the depth limit; every
+  capture removes a piece, so this always terminates.
+- A bounded transposition table (``utils.game.transposition_table``) shared
+  by every search in the process, keyed by the raw masks and side to move.
+- Iterative deepening under a per-move millisecond budget: the move from the
+  deepest *completed* iteration is played.
+
+Like ``connect_four.ai`` this module has no Django imports.
+"""
+
+import time
+from dataclasses import dataclass
+
+from checkers import engine
+from utils.game.transposition_table import EXACT, LOWER, UPPER, TranspositionTable
+
+WIN_SCORE = 100_000
+MAN_VALUE = 100
+KING_VALUE = 160
+MOBILITY_WEIGHT = 3
+ADVANCE_WEIGHT = 2
+
+DEFAULT_MAX_DEPTH = 12
+DEFAULT_TIME_BUDGET_MS = 300
+
+# Table for the in-process fallback: a depth-1 search stores a few entries.
+FALLBACK_TABLE_ENTRIES = 4096
+
+_DEADLINE_CHECK_INTERVAL = 512
+
+# Step 1: Shift masks for quiet-step mobility (no wrap across the a/h files)
+_BOARD_MASK = (1 << engine.SQUARES) - 1
+_NOT_A_FILE = sum(1 << sq for sq in range(engine.SQUARES) if sq % engine.SIZE != 0)
+_NOT_H_FILE = sum(1 << sq for sq in range(engine.SQUARES) if sq % engine.SIZE != engine.SIZE - 1)
+
+# ROW_MASKS[r] covers board row r; used to score how far men have advanced.
+_ROW_MASKS = tuple(0xFF << (row * engine.SIZE) for row in range(engine.SIZE))
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the move budget is exhausted."""
+
+
+@dataclass
+class SearchResult:
+    hops: tuple
+    score: int
+    depth: int
+    nodes: int
+    elapsed_ms: float
+
+
+_SHARED_TABLE = TranspositionTable()
+
+
+def _up_steps(pieces):
+    return ((pieces & _NOT_A_FILE) >> 9) | ((pieces & _NOT_H_FILE) >> 7)
+
+
+def _down_steps(pieces):
+    return (((pieces & _NOT_A_FILE) << 7) | ((pieces & _NOT_H_FILE) << 9)) & _BOARD_MASK
+
+
+def _mobility(pieces, kings, player, empty):
+    men = pieces & ~kings
+    own_kings = pieces & kings
+    forward = _up_steps(men) if player == 1 else _down_steps(men)
+    return ((forward | _up_steps(own_kings) | _down_steps(own_kings)) & empty).bit_count()
+
+
+def _advancement(men, player):
+    # Rows travelled from the player's own back row.
+    total = 0
+    for row, mask in enumerate(_ROW_MASKS):
+        count = (men & mask).bit_count()
+        if count:
+            total += count * ((engine.SIZE - 1 - row) if player == 1 else row)
+    return total
+
+
+def evaluate(own, opp, kings, player):
+    """Static score for ``player`` (the side to move, owning ``own``)."""
+    other = 3 - player
+    own_kings = (own & kings).bit_count()
+    opp_kings = (opp & kings).bit_count()
+    material = (
+        ((own.bit_count() - own_kings) - (opp.bit_count() - opp_kings)) * MAN_VALUE
+        + (own_kings - opp_kings) * KING_VALUE
+    )
+    empty = _BOARD_MASK & ~(own | opp)
+    mobility = _mobility(own, kings, player, empty) - _mobility(opp, kings, other, empty)
+    advance = _advancement(own & ~kings, player) - _advancement(opp & ~kings, other)
+    return material + mobility * MOBILITY_WEIGHT + advance * ADVANCE_WEIGHT
+
+
+class _Searcher:
+    def __init__(self, table, deadline):
+        self.table = table
+        self.deadline = deadline
+        self.nodes = 0
+        self.can_timeout = False
+
+    def negamax(self, own, opp, kings, player, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.can_timeout and not self.nodes % _DEADLINE_CHECK_INTERVAL:
+            if time.perf_counter() >= self.deadline:
+                raise SearchTimeout()
+
+        # Step 1: Horizon; keep searching while a capture is pending
+        if depth <= 0 and not engine.has_capture(own, opp, kings, player):
+            if not _mobility(own, kings, player, _BOARD_MASK & ~(own | opp)):
+                return -WIN_SCORE + ply  # blocked: no capture and no step
+            return evaluate(own, opp, kings, player)
+
+        # Step 2: Transposition table probe
+        key = (own, opp, kings, player)
+        alpha_orig = alpha
+        entry = self.table.get(key)
+        tt_hops = None
+        if entry is not None:
+            tt_depth, flag, score, tt_hops = entry
+            if tt_depth >= depth:
+                if flag == EXACT:
+                    return score
+                if flag == LOWER and score > alpha:
+                    alpha = score
+                elif flag == UPPER and score < beta:
+                    beta = score
+                if alpha >= beta:
+                    return score
+
+        sequences = engine.move_sequences(own, opp, kings, player)
+        if not sequences:
+            return -WIN_SCORE + ply
+        _order(sequences, tt_hops)
+
+        # Step 3: Search children
+        best_score = -WIN_SCORE - 1
+        best_hops = sequences[0][0]
+        other = 3 - player
+        for hops, new_own, new_opp, new_kings in sequences:
+            score = -self.negamax(new_opp, new_own, new_kings, other, depth - 1, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score, best_hops = score, hops
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        # Step 4: Store with bound type
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(key, max(depth, 0), flag, best_score, best_hops)
+        return best_score
+
+
+def _order(sequences, tt_hops):
+    # Previous best first, then longer multi-jumps (more material won).
+    sequences.sort(key=lambda seq: (seq[0] != tt_hops, -len(seq[0])))
+
+
+def search(board, to_move, forced=None, max_depth=DEFAULT_MAX_DEPTH,
+           time_budget_ms=DEFAULT_TIME_BUDGET_MS, table=None):
+    """
+    Iterative-deepening search for ``to_move`` on a persisted 64-char board.
+
+    Args:
+        board (str): Persisted board string.
+        to_move (int): Player (1 or 2) to move.
+        forced (int): Square that must keep capturing (mid multi-jump).
+        max_depth (int): Deepest iteration to attempt (in whole turns).
+        time_budget_ms (float): Wall-clock budget for the whole move.
+        table (TranspositionTable): Defaults to the process-wide table.
+
+    Returns:
+        SearchResult: ``hops`` is the full turn as ``(from, to, captured)``
+        steps, taken from the deepest completed iteration, or None when
+        ``to_move`` has no legal move.
+    """
+    started = time.perf_counter()
+    table = _SHARED_TABLE if table is None else table
+    searcher = _Searcher(table, started + time_budget_ms / 1000.0)
+
+    p1, p2, kings = engine.from_board(board)
+    own, opp = engine.split(p1, p2, to_move)
+    other = 3 - to_move
+
+    root = engine.move_sequences(own, opp, kings, to_move, forced)
+    if not root:
+        return SearchResult(None, -WIN_SCORE, 0, 0, (time.perf_counter() - started) * 1000)
+
+    best_hops, best_score, completed_depth = root[0][0], 0, 0
+    if len(root) == 1:
+        # Only one legal turn (common with forced captures): no search needed.
+        return SearchResult(best_hops, 0, 0, 0, (time.perf_counter() - started) * 1000)
+
+    for depth in range(1, max(1, max_depth) + 1):
+        # Depth 1 always completes so there is a searched move to fall back on.
+        searcher.can_timeout = completed_depth > 0
+        _order(root, best_hops)
+        alpha = -WIN_SCORE - 1
+        iteration_hops = root[0][0]
+        try:
+            for hops, new_own, new_opp, new_kings in root:
+                score = -searcher.negamax(
+                    new_opp, new_own, new_kings, other, depth - 1, -WIN_SCORE - 1, -alpha, 1
+                )
+                if score > alpha:
+                    alpha, iteration_hops = score, hops
+        except SearchTimeout:
+            break
+
+        best_hops, best_score, completed_depth = iteration_hops, alpha, depth
+        if abs(alpha) >= WIN_SCORE - engine.SQUARES:
+            break  # forced result found; deeper search cannot change it
+
+    return SearchResult(
+        hops=best_hops,
+        score=best_score,
+        depth=completed_depth,
+        nodes=searcher.nodes,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+
+
+def choose_move(board, to_move, forced=None, max_depth=DEFAULT_MAX_DEPTH, time_budget_ms=DEFAULT_TIME_BUDGET_MS):
+    """
+    Pick the whole turn for ``to_move`` on a persisted board.
+
+    Runs in a worker process, so it only takes and returns plain values.
+
+    Returns:
+        dict: ``{"hops", "score", "depth", "nodes", "elapsed_ms"}``; ``hops``
+        is a list of ``[from, to, captured]``, or None when ``to_move`` has
+        no legal move.
+    """
+    return _as_dict(search(board, to_move, forced=forced, max_depth=max_depth, time_budget_ms=time_budget_ms))
+
+
+def fallback_move(board, to_move, forced=None):
+    """
+    A cheap turn computed in the calling process (a depth-1 search), for
+    when the worker pool cannot answer. Same result shape as ``choose_move``.
+    """
+    return _as_dict(search(
+        board, to_move, forced=forced, max_depth=1, time_budget_ms=0,
+        table=TranspositionTable(FALLBACK_TABLE_ENTRIES),
+    ))
+
+
+def _as_dict(result):
+    return {
+        "hops": None if result.hops is None else [list(hop) for hop in result.hops],
+        "score": result.score,
+        "depth": result.depth,
+        "nodes": result.nodes,
+        "elapsed_ms": result.elapsed_ms,
+    }
@@ -1,105 +1,153 @@
 import logging
 
 from asgiref.sync import async_to_sync
-from channels.generic.websocket import JsonWebsocketConsumer
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.core.exceptions import ValidationError
 from django.db import transaction
 
+from utils.game.event_log import (
+    aappend_event,
+    alatest_seq,
+    append_event,
+    areplay_since,
+    parse_since,
+    since_from_scope,
+)
 from utils.shared.shared_utils_game_chat import SharedUtils
+from utils.websockets.codec import MSGPACK_SUBPROTOCOL, WireCodecMixin
 
 from .models import CheckersGame
 from .serializers import CheckersGameSerializer
+from .services.ai_player import schedule_ai_move
 
 logger = logging.getLogger(__name__)
 CHECKERS_GROUP = "checkers_{game_id}"
+GAME_TYPE = "checkers"
 
 
-class CheckersConsumer(JsonWebsocketConsumer):
+def broadcast_game_update(channel_layer, game):
+    """Log the current board and send it to every socket in the game's group (sync callers)."""
+    event = append_event(GAME_TYPE, game.pk, {"type": "checkers_update", "game": CheckersGameSerializer(game).data})
+    async_to_sync(channel_layer.group_send)(CHECKERS_GROUP.format(game_id=game.pk), event)
+
+
+class CheckersConsumer(WireCodecMixin, AsyncJsonWebsocketConsumer):
+    # Binary msgpack frames for clients that offer the subprotocol.
+    wire_subprotocols = (MSGPACK_SUBPROTOCOL,)
+
     def _group(self):
         return CHECKERS_GROUP.format(game_id=self.game_id)
 
-    def _accept_and_close(self, code):
-        self.accept()
-        self.close(code=code)
+    async def _accept_and_close(self, code):
+        await self.accept()
+        await self.close(code=code)
+
+    async def _get_game(self):
+        # Both players are joined in, so piece_for_user and the serializer
+        # never hit the database from the event loop.
+        return await CheckersGame.objects.select_related("player_one", "player_two").aget(pk=self.game_id)
 
-    def connect(self):
+    async def connect(self):
         raw_id = self.scope.get("url_route", {}).get("kwargs", {}).get("game_id")
         if not raw_id:
-            self._accept_and_close(4002)
+            await self._accept_and_close(4002)
             return
 
         self.game_id = str(raw_id)
         self.user = SharedUtils.authenticate_user(self.scope)
         if not self.user:
-            self._accept_and_close(4001)
+            await self._accept_and_close(4001)
             return
 
         try:
-            game = CheckersGame.objects.get(pk=self.game_id)
+            game = await self._get_game()
         except CheckersGame.DoesNotExist:
-            self._accept_and_close(4004)
+            await self._accept_and_close(4004)
             return
 
         if game.piece_for_user(self.user) is None:
-            self._accept_and_close(4003)
+            await self._accept_and_close(4003)
             return
 
-        async_to_sync(self.channel_layer.group_add)(self._group(), self.channel_name)
-        self.accept()
-        self._send_state(game)
+        await self.channel_layer.group_add(self._group(), self.channel_name)
+        await self.accept()
+        # A reconnecting client gets only the events it missed when the log still has them.
+        replayed = await areplay_since(self, GAME_TYPE, self.game_id, since_from_scope(self.scope))
+        if not replayed:
+            await self._send_state(game)
+        self._resume_ai_turn(game)
 
-    def receive_json(self, content, **kwargs):
+    async def receive_json(self, content, **kwargs):
         msg_type = content.get("type", "")
         if msg_type == "move":
-            self._handle_move(content)
+            await self._handle_move(content)
         elif msg_type == "sync":
-            self._handle_sync()
+            await self._handle_sync(content)
         else:
-            self.send_json({"type": "error", "message": "Unknown message type."})
+            await self.send_json({"type": "error", "message": "Unknown message type."})
 
-    def _handle_sync(self):
+    def _resume_ai_turn(self, game):
+        """Schedule the AI's turn if the game is waiting on it (e.g. a search was lost)."""
+        channel_layer = self.channel_layer
+        schedule_ai_move(game, on_applied=lambda g: broadcast_game_update(channel_layer, g))
+
+    async def _handle_sync(self, content):
+        replayed = await areplay_since(self, GAME_TYPE, self.game_id, parse_since(content.get("since")))
         try:
-            self._send_state(CheckersGame.objects.get(pk=self.game_id))
+            game = await self._get_game()
         except CheckersGame.DoesNotExist:
-            self.send_json({"type": "error", "message": "Game not found."})
+            if not replayed:
+                await self.send_json({"type": "error", "message": "Game not found."})
+            return
+        if not replayed:
+            await self._send_state(game)
+        self._resume_ai_turn(game)
 
-    def _send_state(self, game):
-        self.send_json({
+    async def _send_state(self, game):
+        await self.send_json({
             "type": "game_state",
             "game": CheckersGameSerializer(game).data,
             "my_piece": game.piece_for_user(self.user),
+            "seq": await alatest_seq(GAME_TYPE, self.game_id),
         })
 
-    def _handle_move(self, content):
+    @database_sync_to_async
+    def _apply_move(self, from_index, to_index):
+        """Apply the move under the row lock; returns the game and its serialized form."""
+        with transaction.atomic():
+            game = CheckersGame.objects.select_for_update().get(pk=self.game_id)
+            game.apply_move(from_index, to_index, self.user)
+        return game, CheckersGameSerializer(game).data
+
+    async def _handle_move(self, content):
         try:
-            with transaction.atomic():
-                game = CheckersGame.objects.select_for_update().get(pk=self.game_id)
-                game.apply_move(content.get("from"), content.get("to"), self.user)
+            game, game_data = await self._apply_move(content.get("from"), content.get("to"))
         except CheckersGame.DoesNotExist:
-            self.send_json({"type": "error", "message": "Game not found."})
+            await self.send_json({"type": "error", "message": "Game not found."})
             return
         except ValidationError as exc:
-            self.send_json({"type": "error", "message": str(exc)})
+            await self.send_json({"type": "error", "message": str(exc)})
             return
 
-        async_to_sync(self.channel_layer.group_send)(
-            self._group(),
-            {
-                "type": "checkers_update",
-                "game": CheckersGameSerializer(game).data,
-            },
-        )
+        event = await aappend_event(GAME_TYPE, self.game_id, {"type": "checkers_update", "game": game_data})
+        await self.channel_layer.group_send(self._group(), event)
+
+        # AI reply runs in the worker pool; this consumer returns to the event
+        # loop immediately and the update is broadcast when the search finishes.
+        self._resume_ai_turn(game)
 
-    def checkers_update(self, event):
+    async def checkers_update(self, event):
         game = event["game"]
-        self.send_json({
+        await self.send_json({
             "type": "game_update",
             "game": game,
             "my_piece": 1 if game.get("player_one_id") == getattr(self.user, "id", None) else 2,
+            "seq": event.get("seq"),
         })
 
-    def disconnect(self, close_code):
+    async def disconnect(self, close_code):
         try:
-            async_to_sync(self.channel_layer.group_discard)(self._group(), self.channel_name)
+            await self.channel_layer.group_discard(self._group(), self.channel_name)
         except Exception:
             pass
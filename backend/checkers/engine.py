@@ -0,0 +1,262 @@
+"""
+Bitboard engine for checkers.
+
+A position is three 64-bit integers: player one's pieces, player two's pieces
+and a ``kings`` mask shared by both sides. Bit ``i`` is index ``i`` of the
+persisted 64-character ``board`` string (row 0 at the top; player one starts
+on rows 5-7 and moves up).
+
+All geometry is precomputed once per square and per piece kind:
+
+    STEPS[kind][square] -> (target, ...)
+    JUMPS[kind][square] -> ((captured, target), ...)
+
+so move generation only walks the side's own pieces (at most 12) and never
+re-derives directions or board bounds.
+
+Rules are the ones the game has always used: captures are mandatory, a
+capturing piece keeps jumping while it can (``forced`` square), men promote
+on the far row and may keep capturing as kings, and a side with no pieces or
+no legal move loses. Convert at the edges with ``from_board`` / ``to_board``.
+"""
+
+EMPTY = "0"
+P1_MAN = "1"
+P2_MAN = "2"
+P1_KING = "3"
+P2_KING = "4"
+
+SIZE = 8
+SQUARES = SIZE * SIZE
+
+# Piece kinds used to index the tables.
+P1_MAN_KIND, P2_MAN_KIND, KING_KIND = 0, 1, 2
+_KIND_DIRECTIONS = (
+    ((-1, -1), (-1, 1)),
+    ((1, -1), (1, 1)),
+    ((-1, -1), (-1, 1), (1, -1), (1, 1)),
+)
+
+BIT = tuple(1 << square for square in range(SQUARES))
+DARK_SQUARES = tuple(sq for sq in range(SQUARES) if (sq // SIZE + sq % SIZE) % 2)
+# PROMOTION_MASKS[player]: the row a man of that player promotes on.
+PROMOTION_MASKS = (0, 0xFF, 0xFF << (SQUARES - SIZE))
+
+
+def _build_tables():
+    steps = []
+    jumps = []
+    for directions in _KIND_DIRECTIONS:
+        kind_steps = []
+        kind_jumps = []
+        for square in range(SQUARES):
+            row, col = divmod(square, SIZE)
+            targets = []
+            captures = []
+            for dr, dc in directions:
+                if 0 <= row + dr < SIZE and 0 <= col + dc < SIZE:
+                    targets.append((row + dr) * SIZE + col + dc)
+                if 0 <= row + 2 * dr < SIZE and 0 <= col + 2 * dc < SIZE:
+                    captures.append(((row + dr) * SIZE + col + dc, (row + 2 * dr) * SIZE + col + 2 * dc))
+            kind_steps.append(tuple(targets))
+            kind_jumps.append(tuple(captures))
+        steps.append(tuple(kind_steps))
+        jumps.append(tuple(kind_jumps))
+    return tuple(steps), tuple(jumps)
+
+
+STEPS, JUMPS = _build_tables()
+
+_CELL_BITS = {
+    EMPTY: (0, 0, 0),
+    P1_MAN: (1, 0, 0),
+    P2_MAN: (0, 1, 0),
+    P1_KING: (1, 0, 1),
+    P2_KING: (0, 1, 1),
+}
+
+
+def initial_board():
+    cells = [EMPTY] * SQUARES
+    for square in DARK_SQUARES:
+        row = square // SIZE
+        if row <= 2:
+            cells[square] = P2_MAN
+        elif row >= 5:
+            cells[square] = P1_MAN
+    return "".join(cells)
+
+
+def from_board(board):
+    """
+    Parse the persisted 64-character board into ``(p1, p2, kings)`` masks.
+
+    Raises:
+        ValueError: If the string has the wrong length or an unknown cell.
+    """
+    if len(board) != SQUARES:
+        raise ValueError(f"Board must be {SQUARES} characters long.")
+
+    p1 = p2 = kings = 0
+    for square, cell in enumerate(board):
+        if cell == EMPTY:
+            continue
+        try:
+            is_p1, is_p2, is_king = _CELL_BITS[cell]
+        except KeyError:
+            raise ValueError(f"Invalid board cell {cell!r} at index {square}.")
+        bit = BIT[square]
+        if is_p1:
+            p1 |= bit
+        if is_p2:
+            p2 |= bit
+        if is_king:
+            kings |= bit
+    return p1, p2, kings
+
+
+def to_board(p1, p2, kings):
+    """Render ``(p1, p2, kings)`` back into the persisted string."""
+    cells = []
+    for bit in BIT:
+        if p1 & bit:
+            cells.append(P1_KING if kings & bit else P1_MAN)
+        elif p2 & bit:
+            cells.append(P2_KING if kings & bit else P2_MAN)
+        else:
+            cells.append(EMPTY)
+    return "".join(cells)
+
+
+def split(p1, p2, player):
+    """Return ``(own, opp)`` masks for ``player``."""
+    return (p1, p2) if player == 1 else (p2, p1)
+
+
+def join(own, opp, player):
+    """Inverse of ``split``: back to ``(p1, p2)``."""
+    return (own, opp) if player == 1 else (opp, own)
+
+
+def _squares(mask):
+    # Ascending square order, matching a left-to-right scan of the board.
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _kind(square, kings, player):
+    if kings & BIT[square]:
+        return KING_KIND
+    return P1_MAN_KIND if player == 1 else P2_MAN_KIND
+
+
+def captures_from(square, own, opp, kings, player):
+    """Single capturing hops ``(from, to, captured)`` for the piece on ``square``."""
+    empty = ~(own | opp)
+    return [
+        (square, target, over)
+        for over, target in JUMPS[_kind(square, kings, player)][square]
+        if opp & BIT[over] and empty & BIT[target]
+    ]
+
+
+def has_capture(own, opp, kings, player):
+    """True if any of ``player``'s pieces can capture (early exit)."""
+    occupied = own | opp
+    for square in _squares(own):
+        for over, target in JUMPS[_kind(square, kings, player)][square]:
+            if opp & BIT[over] and not occupied & BIT[target]:
+                return True
+    return False
+
+
+def hop_moves(own, opp, kings, player, forced=None):
+    """
+    Legal single hops for ``player`` as ``(from, to, captured)`` tuples.
+
+    ``captured`` is None for a quiet move. Captures are mandatory: if any
+    exist, only captures are returned. With ``forced`` set (mid multi-jump),
+    only that piece's captures are legal.
+    """
+    if forced is not None:
+        if not own & BIT[forced]:
+            return []
+        return captures_from(forced, own, opp, kings, player)
+
+    occupied = own | opp
+    captures = []
+    quiet = []
+    for square in _squares(own):
+        kind = _kind(square, kings, player)
+        for over, target in JUMPS[kind][square]:
+            if opp & BIT[over] and not occupied & BIT[target]:
+                captures.append((square, target, over))
+        if not captures:
+            for target in STEPS[kind][square]:
+                if not occupied & BIT[target]:
+                    quiet.append((square, target, None))
+    return captures if captures else quiet
+
+
+def apply_hop(own, opp, kings, player, frm, to, captured=None):
+    """
+    Apply one hop (assumed legal) and return ``(own, opp, kings)``.
+
+    A man landing on its promotion row becomes a king.
+    """
+    from_bit = BIT[frm]
+    to_bit = BIT[to]
+    own ^= from_bit | to_bit
+    if kings & from_bit:
+        kings ^= from_bit | to_bit
+    elif to_bit & PROMOTION_MASKS[player]:
+        kings |= to_bit
+    if captured is not None:
+        captured_bit = BIT[captured]
+        opp ^= captured_bit
+        kings &= ~captured_bit
+    return own, opp, kings
+
+
+def _extend_jumps(square, own, opp, kings, player, path, out):
+    hops = captures_from(square, own, opp, kings, player)
+    if not hops:
+        out.append((tuple(path), own, opp, kings))
+        return
+    for hop in hops:
+        path.append(hop)
+        _extend_jumps(hop[1], *apply_hop(own, opp, kings, player, *hop), player, path, out)
+        path.pop()
+
+
+def move_sequences(own, opp, kings, player, forced=None):
+    """
+    Every complete turn for ``player``, multi-jumps expanded to the end.
+
+    Returns:
+        list: ``(hops, own, opp, kings)`` where ``hops`` is the tuple of
+        ``(from, to, captured)`` steps and the masks are the resulting
+        position. Empty if the side to move has no legal move.
+    """
+    first_hops = hop_moves(own, opp, kings, player, forced)
+    if not first_hops or first_hops[0][2] is None:
+        return [((hop,), *apply_hop(own, opp, kings, player, *hop)) for hop in first_hops]
+
+    sequences = []
+    for hop in first_hops:
+        _extend_jumps(hop[1], *apply_hop(own, opp, kings, player, *hop), player, [hop], sequences)
+    return sequences
+
+
+def winner(p1, p2, kings, to_move, forced=None):
+    """Return 1 or 2 once the game is decided, else None."""
+    if not p1:
+        return 2
+    if not p2:
+        return 1
+    own, opp = split(p1, p2, to_move)
+    if not hop_moves(own, opp, kings, to_move, forced):
+        return 2 if to_move == 1 else 1
+    return None
@@ -0,0 +1,129 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from checkers.ai import choose_move, fallback_move
+from checkers.models import CheckersGame
+from utils.game.ai_pool import get_dispatch_pool, get_search_pool
+
+logger = logging.getLogger(__name__)
+
+# Extra time allowed on top of the search budget for process hand-off.
+RESULT_GRACE_SECONDS = 5.0
+
+# Games with an AI turn scheduled in this process (one search per game at a time).
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+
+def search_move(board, forced):
+    """
+    Run the AI search for player two in the worker pool and wait for it.
+
+    Returns:
+        dict: ``checkers.ai.choose_move`` result.
+    """
+    budget_ms = settings.CHECKERS_AI_TIME_BUDGET_MS
+    future = get_search_pool().submit(
+        choose_move, board, 2, forced, settings.CHECKERS_AI_MAX_DEPTH, budget_ms,
+    )
+    return future.result(timeout=budget_ms / 1000.0 + RESULT_GRACE_SECONDS)
+
+
+def apply_ai_move(game_id, searched_board, searched_forced, hops):
+    """
+    Apply the AI's turn if the game has not moved on since the search.
+
+    Returns:
+        CheckersGame | None: The updated game, or None if the result was stale.
+    """
+    with transaction.atomic():
+        game = CheckersGame.objects.select_for_update().select_related("player_one", "player_two").get(pk=game_id)
+        if (
+            not game.is_ai_turn
+            or game.board != searched_board
+            or game.forced_piece_index != searched_forced
+        ):
+            logger.info("[CHECKERS][AI] stale search result dropped game_id=%s", game_id)
+            return None
+        game.apply_ai_move(hops)
+    return game
+
+
+def _search_and_apply(game_id, board, forced):
+    # A failed or timed-out pool search must not leave the game on the AI's
+    # turn: play a cheap in-process move instead.
+    try:
+        result = search_move(board, forced)
+    except Exception:
+        logger.exception("[CHECKERS][AI] pool search failed game_id=%s; playing the fallback move", game_id)
+        result = fallback_move(board, 2, forced)
+    logger.info(
+        "[CHECKERS][AI] game_id=%s hops=%s depth=%s nodes=%s ms=%.1f",
+        game_id, result["hops"], result["depth"], result["nodes"], result["elapsed_ms"],
+    )
+    return apply_ai_move(game_id, board, forced, result["hops"])
+
+
+def play_ai_move(game):
+    """
+    Blocking AI turn for request/response paths (REST).
+
+    Call it after the human move has committed: the search runs in the
+    worker pool with no row lock held, and only the calling thread waits.
+    """
+    if not game.is_ai_turn:
+        return game
+    applied = _search_and_apply(game.pk, game.board, game.forced_piece_index)
+    if applied is None:
+        game.refresh_from_db()
+        return game
+    return applied
+
+
+def _run_ai_turn(game_id, board, forced, on_applied):
+    try:
+        game = _search_and_apply(game_id, board, forced)
+        if game is not None and on_applied is not None:
+            on_applied(game)
+    except Exception:
+        logger.exception("[CHECKERS][AI] AI turn failed game_id=%s", game_id)
+    finally:
+        with _in_flight_lock:
+            _in_flight.discard(game_id)
+        close_old_connections()
+
+
+def schedule_ai_move(game, on_applied=None):
+    """
+    Fire-and-forget AI turn for WebSocket consumers.
+
+    Returns immediately; a dispatch thread waits for the worker-pool search,
+    applies the turn under a row lock and then calls ``on_applied(game)``
+    (e.g. to broadcast the update).
+
+    Also the retry path: loading a game that is still on the AI's turn
+    (REST detail, socket connect or sync) schedules it again, so a turn
+    lost with a worker is picked up. A game already scheduled in this
+    process is not scheduled twice.
+
+    Returns:
+        concurrent.futures.Future | None: None if it is not the AI's turn,
+        or its turn is already scheduled here.
+    """
+    if not game.is_ai_turn:
+        return None
+    with _in_flight_lock:
+        if game.pk in _in_flight:
+            return None
+        _in_flight.add(game.pk)
+    try:
+        return get_dispatch_pool().submit(
+            _run_ai_turn, game.pk, game.board, game.forced_piece_index, on_applied,
+        )
+    except Exception:
+        with _in_flight_lock:
+            _in_flight.discard(game.pk)
+        raise
@@ -0,0 +1,153 @@
+# Filename: checkers/tests/test_ai.py
+
+# Step 1: Imports
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from checkers import ai, engine
+from checkers.models import CheckersGame, legal_moves_for
+from checkers.services import ai_player
+from utils.game.transposition_table import TranspositionTable
+
+User = get_user_model()
+
+
+def _board(pieces):
+    cells = [engine.EMPTY] * engine.SQUARES
+    for (row, col), piece in pieces.items():
+        cells[row * 8 + col] = piece
+    return "".join(cells)
+
+
+# Step 2: Search behaviour
+def test_search_prefers_the_longer_multi_jump():
+    board = _board({(0, 3): "2", (1, 2): "1", (1, 4): "1", (3, 6): "1", (7, 0): "1"})
+    result = ai.search(board, 2, max_depth=4, time_budget_ms=500, table=TranspositionTable())
+    assert [hop[1] for hop in result.hops] == [2 * 8 + 5, 4 * 8 + 7]
+
+
+def test_search_avoids_hanging_a_piece():
+    # Stepping to (4, 3) would be captured by the man on (5, 4).
+    board = _board({(3, 2): "2", (5, 4): "1", (7, 0): "1", (0, 7): "2"})
+    result = ai.search(board, 2, max_depth=4, time_budget_ms=500, table=TranspositionTable())
+    assert result.hops != ((3 * 8 + 2, 4 * 8 + 3, None),)
+
+
+def test_search_respects_time_budget():
+    started = time.perf_counter()
+    result = ai.search(engine.initial_board(), 1, max_depth=40, time_budget_ms=100, table=TranspositionTable())
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    assert result.depth >= 1
+    assert elapsed_ms < 400
+
+
+def test_search_reports_no_moves_without_raising():
+    result = ai.search(_board({(5, 0): "1"}), 2)
+    assert result.hops is None
+    assert ai.choose_move(_board({(5, 0): "1"}), 2)["hops"] is None
+
+
+def test_board_errors_are_not_mistaken_for_no_moves():
+    with pytest.raises(ValueError):
+        ai.choose_move("not a board", 2)
+
+
+# Step 3: Model integration
+@pytest.mark.django_db
+def test_apply_ai_move_plays_the_whole_turn():
+    human = User.objects.create_user(email="human@test.com", password="pass1234")
+    bot = User.objects.create_user(email="bot@test.com", password="pass1234")
+    board = _board({(2, 1): "2", (3, 2): "1", (5, 4): "1", (7, 6): "1"})
+    game = CheckersGame.objects.create(
+        player_one=human, player_two=bot, is_ai_game=True, board=board, current_turn=2
+    )
+
+    game.apply_ai_move(ai.choose_move(board, 2, max_depth=4, time_budget_ms=200)["hops"])
+    game.refresh_from_db()
+    assert game.board[5 * 8 + 4] == engine.EMPTY
+    assert game.board[3 * 8 + 2] == engine.EMPTY
+    assert game.board[6 * 8 + 5] == engine.P2_MAN
+    assert game.current_turn == 1
+    assert game.forced_piece_index is None
+
+
+# Step 4: Worker-pool service
+@pytest.mark.django_db
+def test_service_drops_a_stale_search_result():
+    human = User.objects.create_user(email="human2@test.com", password="pass1234")
+    bot = User.objects.create_user(email="bot2@test.com", password="pass1234")
+    board = _board({(2, 1): "2", (3, 2): "1", (5, 4): "1", (7, 6): "1"})
+    game = CheckersGame.objects.create(
+        player_one=human, player_two=bot, is_ai_game=True, board=board, current_turn=2
+    )
+    hops = ai.choose_move(board, 2, max_depth=4, time_budget_ms=200)["hops"]
+
+    stale = list(board)
+    stale[7 * 8 + 6] = engine.EMPTY
+    assert ai_player.apply_ai_move(game.pk, stale, None, hops) is None
+    game.refresh_from_db()
+    assert game.board == board and game.current_turn == 2
+
+    applied = ai_player.apply_ai_move(game.pk, board, None, hops)
+    assert applied.current_turn == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rest_move_returns_the_ai_reply():
+    human = User.objects.create_user(email="human3@test.com", password="pass1234")
+    client = APIClient()
+    client.force_authenticate(human)
+    game_id = client.post("/api/checkers/", {"is_ai_game": True}, format="json").data["id"]
+    move = legal_moves_for(CheckersGame.objects.get(pk=game_id).board, 1)[0]
+
+    response = client.post(
+        f"/api/checkers/{game_id}/move/", {"from": move["from"], "to": move["to"]}, format="json"
+    )
+
+    assert response.status_code == 200
+    game = CheckersGame.objects.get(pk=game_id)
+    assert game.current_turn == 1
+    assert response.data["board"] == game.board
+
+
+@pytest.mark.django_db
+def test_pool_failure_falls_back_to_an_in_process_move(monkeypatch):
+    human = User.objects.create_user(email="human4@test.com", password="pass1234")
+    bot = User.objects.create_user(email="bot4@test.com", password="pass1234")
+    game = CheckersGame.objects.create(player_one=human, player_two=bot, is_ai_game=True, current_turn=2)
+
+    def timed_out(board, forced):
+        raise TimeoutError
+    monkeypatch.setattr(ai_player, "search_move", timed_out)
+
+    game = ai_player.play_ai_move(game)
+    assert game.current_turn == 1 and not game.is_completed
+
+
+class _RecordingPool:
+    """Dispatch pool stand-in that records which games were scheduled."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, game_id, *args):
+        self.submitted.append(game_id)
+
+
+@pytest.mark.django_db
+def test_loading_a_game_stuck_on_the_ai_turn_schedules_it_again(monkeypatch):
+    human = User.objects.create_user(email="human5@test.com", password="pass1234")
+    bot = User.objects.create_user(email="bot5@test.com", password="pass1234")
+    game = CheckersGame.objects.create(player_one=human, player_two=bot, is_ai_game=True, current_turn=2)
+    pool = _RecordingPool()
+    monkeypatch.setattr(ai_player, "get_dispatch_pool", lambda: pool)
+    client = APIClient()
+    client.force_authenticate(human)
+
+    assert client.get(f"/api/checkers/{game.pk}/").status_code == 200
+    assert client.get(f"/api/checkers/{game.pk}/").status_code == 200
+    assert pool.submitted == [game.pk]   # scheduled once while in flight
+    ai_player._in_flight.discard(game.pk)
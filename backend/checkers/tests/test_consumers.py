@@ -0,0 +1,142 @@
+from unittest.mock import patch
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+
+from checkers.models import CheckersGame, legal_moves_for
+from checkers.routing import websocket_urlpatterns
+from game.models import GameEvent
+from utils.game import event_log
+from utils.websockets.codec import MSGPACK_SUBPROTOCOL, pack, unpack
+
+
+User = get_user_model()
+IN_MEMORY_LAYER = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+@pytest.fixture(autouse=True)
+def event_log_redis():
+    """The event log on an in-process Redis shared by its sync and async clients."""
+    server = fakeredis.FakeServer()
+    with patch.object(event_log, "get_redis_client", return_value=fakeredis.FakeRedis(server=server, decode_responses=True)), \
+            patch.object(
+                event_log, "get_async_redis_client",
+                side_effect=lambda: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True),
+            ):
+        yield server
+
+
+@pytest.fixture
+def table(transactional_db):
+    p1 = User.objects.create_user(email="ws-p1@example.com", password="pass", first_name="P1")
+    p2 = User.objects.create_user(email="ws-p2@example.com", password="pass", first_name="P2")
+    outsider = User.objects.create_user(email="ws-p3@example.com", password="pass", first_name="P3")
+    game = CheckersGame.objects.create(player_one=p1, player_two=p2)
+    return game, p1, p2, outsider
+
+
+def _communicator(game, user, query="", subprotocols=None):
+    communicator = WebsocketCommunicator(
+        URLRouter(websocket_urlpatterns), f"/ws/checkers/{game.id}/{query}", subprotocols=subprotocols,
+    )
+    communicator.scope["user"] = user
+    return communicator
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+async def test_move_is_broadcast_to_both_players(table):
+    game, p1, p2, _ = table
+    first, second = _communicator(game, p1), _communicator(game, p2)
+    assert (await first.connect())[0] and (await second.connect())[0]
+
+    state = await first.receive_json_from()
+    assert state["type"] == "game_state" and state["my_piece"] == 1 and state["seq"] == 0
+    assert (await second.receive_json_from())["my_piece"] == 2
+
+    move = legal_moves_for(game.board, 1)[0]
+    await first.send_json_to({"type": "move", "from": move["from"], "to": move["to"]})
+
+    for communicator, piece in ((first, 1), (second, 2)):
+        update = await communicator.receive_json_from()
+        assert update["type"] == "game_update" and update["my_piece"] == piece
+        assert update["game"]["current_turn"] == 2 and update["seq"] == 1
+
+    await second.send_json_to({"type": "move", "from": move["from"], "to": move["to"]})
+    assert (await second.receive_json_from())["type"] == "error"
+
+    await first.disconnect()
+    await second.disconnect()
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+async def test_msgpack_subprotocol_is_negotiated_per_socket(table):
+    game, p1, p2, _ = table
+    binary = _communicator(game, p1, subprotocols=[MSGPACK_SUBPROTOCOL])
+    text = _communicator(game, p2)
+    connected, subprotocol = await binary.connect()
+    assert connected and subprotocol == MSGPACK_SUBPROTOCOL
+    assert (await text.connect()) == (True, None)
+
+    state = await binary.receive_output()
+    assert "text" not in state and unpack(state["bytes"])["my_piece"] == 1
+    await text.receive_json_from()
+
+    move = legal_moves_for(game.board, 1)[0]
+    await binary.send_to(bytes_data=pack({"type": "move", "from": move["from"], "to": move["to"]}))
+
+    assert unpack((await binary.receive_output())["bytes"])["seq"] == 1
+    update = await text.receive_json_from()
+    assert update["type"] == "game_update" and update["my_piece"] == 2
+
+    await binary.disconnect()
+    await text.disconnect()
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+async def test_non_participant_is_closed_with_4003(table):
+    game, _, _, outsider = table
+    communicator = _communicator(game, outsider)
+
+    connected, _ = await communicator.connect()
+    assert connected is True
+    assert (await communicator.receive_output())["code"] == 4003
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+async def test_reconnect_with_since_replays_only_missed_moves(table):
+    game, p1, p2, _ = table
+    first = _communicator(game, p1)
+    assert (await first.connect())[0]
+    await first.receive_json_from()
+
+    move = legal_moves_for(game.board, 1)[0]
+    await first.send_json_to({"type": "move", "from": move["from"], "to": move["to"]})
+    update = await first.receive_json_from()
+    assert update["seq"] == 1
+
+    # Up to date: nothing to replay, and no snapshot either.
+    resumed = _communicator(game, p2, "?since=1")
+    assert (await resumed.connect())[0]
+    assert await resumed.receive_nothing()
+
+    # One move behind: just that move, as it was broadcast.
+    behind = _communicator(game, p2, "?since=0")
+    assert (await behind.connect())[0]
+    replayed = await behind.receive_json_from()
+    assert replayed["type"] == "game_update" and replayed["seq"] == 1 and replayed["my_piece"] == 2
+    assert replayed["game"] == update["game"]
+    assert await behind.receive_nothing()
+
+    # Ahead of the log (e.g. a stale client): full snapshot.
+    stale = _communicator(game, p2, "?since=7")
+    assert (await stale.connect())[0]
+    assert (await stale.receive_json_from())["type"] == "game_state"
+
+    assert await GameEvent.objects.filter(game_type="checkers", game_id=game.id).acount() == 1
+    for communicator in (first, resumed, behind, stale):
+        await communicator.disconnect()
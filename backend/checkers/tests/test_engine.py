@@ -0,0 +1,94 @@
+# Filename: checkers/tests/test_engine.py
+
+# Step 1: Imports
+import pytest
+
+from checkers import engine
+
+
+def _board(pieces):
+    cells = [engine.EMPTY] * engine.SQUARES
+    for (row, col), piece in pieces.items():
+        cells[row * 8 + col] = piece
+    return "".join(cells)
+
+
+def _sq(row, col):
+    return row * 8 + col
+
+
+def _moves(board, player, forced=None):
+    p1, p2, kings = engine.from_board(board)
+    own, opp = engine.split(p1, p2, player)
+    return own, opp, kings, engine.hop_moves(own, opp, kings, player, forced)
+
+
+# Step 2: Tables and parsing
+def test_tables_stay_on_the_board():
+    assert engine.STEPS[engine.P1_MAN_KIND][_sq(5, 0)] == (_sq(4, 1),)
+    assert engine.STEPS[engine.P2_MAN_KIND][_sq(2, 7)] == (_sq(3, 6),)
+    assert len(engine.STEPS[engine.KING_KIND][_sq(4, 3)]) == 4
+    assert engine.JUMPS[engine.P1_MAN_KIND][_sq(1, 2)] == ()
+    assert engine.JUMPS[engine.KING_KIND][_sq(0, 1)] == ((_sq(1, 2), _sq(2, 3)),)
+
+
+def test_board_round_trip():
+    board = _board({(5, 0): "1", (4, 1): "4", (0, 7): "3", (2, 3): "2"})
+    assert engine.to_board(*engine.from_board(board)) == board
+    assert engine.to_board(*engine.from_board(engine.initial_board())) == engine.initial_board()
+
+
+def test_from_board_rejects_bad_input():
+    with pytest.raises(ValueError):
+        engine.from_board("0" * 10)
+    with pytest.raises(ValueError):
+        engine.from_board("9" + "0" * 63)
+
+
+# Step 3: Move generation
+def test_initial_position_has_seven_quiet_moves():
+    _, _, _, hops = _moves(engine.initial_board(), 1)
+    assert len(hops) == 7
+    assert all(captured is None for _, _, captured in hops)
+
+
+def test_captures_are_mandatory():
+    board = _board({(5, 0): "1", (4, 1): "2", (5, 4): "1"})
+    _, _, _, hops = _moves(board, 1)
+    assert hops == [(_sq(5, 0), _sq(3, 2), _sq(4, 1))]
+
+
+def test_forced_piece_only_continues_capturing():
+    board = _board({(5, 0): "1", (4, 1): "2", (5, 4): "1"})
+    _, _, _, hops = _moves(board, 1, forced=_sq(5, 4))
+    assert hops == []
+
+
+def test_move_sequences_expand_multi_jumps():
+    board = _board({(7, 0): "1", (6, 1): "2", (4, 3): "2", (2, 5): "2", (0, 7): "2"})
+    p1, p2, kings = engine.from_board(board)
+    sequences = engine.move_sequences(p1, p2, kings, 1)
+    assert len(sequences) == 1
+    hops, own, opp, new_kings = sequences[0]
+    assert [hop[1] for hop in hops] == [_sq(5, 2), _sq(3, 4), _sq(1, 6)]
+    assert own == engine.BIT[_sq(1, 6)]
+    assert opp == engine.BIT[_sq(0, 7)]
+    assert new_kings == 0
+
+
+def test_promotion_mid_jump_continues_as_king():
+    # The man promotes on row 0 and, as a king, captures back down.
+    board = _board({(2, 1): "1", (1, 2): "2", (1, 4): "2"})
+    p1, p2, kings = engine.from_board(board)
+    sequences = engine.move_sequences(p1, p2, kings, 1)
+    hops, own, opp, new_kings = sequences[0]
+    assert [hop[1] for hop in hops] == [_sq(0, 3), _sq(2, 5)]
+    assert opp == 0
+    assert new_kings == own == engine.BIT[_sq(2, 5)]
+
+
+def test_winner_when_blocked_or_out_of_pieces():
+    assert engine.winner(*engine.from_board(_board({(5, 0): "1"})), 1) == 1
+    blocked = _board({(7, 0): "1", (6, 1): "2", (5, 2): "2"})
+    assert engine.winner(*engine.from_board(blocked), 1) == 2
+    assert engine.winner(*engine.from_board(engine.initial_board()), 1) is None
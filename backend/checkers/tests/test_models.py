@@ -3,7 +3,7 @@ from django.core.exceptions import ValidationError
 from django.test import TestCase
 from rest_framework.test import APITestCase
 
-from .models import CheckersGame, legal_moves_for
+from checkers.models import CheckersGame, legal_moves_for
 
 
 User = get_user_model()
@@ -1,5 +1,6 @@
 import logging
 
+from channels.layers import get_channel_layer
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import transaction
@@ -11,8 +12,10 @@ from rest_framework.response import Response
 from utils.redis.redis_game_lobby_manager import RedisGameLobbyManager
 from utils.websockets.ws_groups import scoped_lobby_id
 
+from .consumers import broadcast_game_update
 from .models import CheckersGame
 from .serializers import CheckersGameSerializer
+from .services.ai_player import play_ai_move, schedule_ai_move
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -35,11 +38,6 @@ def _serialize(game, request_user):
     return data
 
 
-def _resolve_ai_turn(game):
-    while game.is_ai_game and game.current_turn == 2 and not game.is_completed:
-        game.apply_ai_move()
-
-
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def create_game(request):
@@ -49,7 +47,7 @@ def create_game(request):
         player_two=_ai_user() if is_ai else None,
         is_ai_game=is_ai,
     )
-    _resolve_ai_turn(game)
+    game = play_ai_move(game)
     data = _serialize(game, request.user)
 
     if not is_ai:
@@ -71,6 +69,10 @@ def game_detail(request, game_id):
         game = CheckersGame.objects.get(pk=game_id)
     except CheckersGame.DoesNotExist:
         return Response({"error": "Game not found."}, status=404)
+    # Still waiting on the AI (its search was lost): run the turn again; the
+    # board reaches the client over the game socket or the next poll.
+    channel_layer = get_channel_layer()
+    schedule_ai_move(game, on_applied=lambda g: broadcast_game_update(channel_layer, g))
     return Response(_serialize(game, request.user))
 
 
@@ -103,10 +105,13 @@ def make_move(request, game_id):
         with transaction.atomic():
             game = CheckersGame.objects.select_for_update().get(pk=game_id)
             game.apply_move(request.data.get("from"), request.data.get("to"), request.user)
-            _resolve_ai_turn(game)
     except CheckersGame.DoesNotExist:
         return Response({"error": "Game not found."}, status=404)
     except ValidationError as exc:
         return Response({"error": str(exc)}, status=400)
 
+    # AI reply: searched in the worker pool after the row lock is released.
+    # The AI page reads it from this response, so the request waits for it.
+    game = play_ai_move(game)
+
     return Response(_serialize(game, request.user))
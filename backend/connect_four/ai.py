@@ -0,0 +1,290 @@
+"""
+Connect Four AI: negamax with alpha-beta pruning.
+
+- Center-first move ordering (``engine.MOVE_ORDER``), with the transposition
+  table's best move tried first.
+- A Zobrist-keyed transposition table with a bounded size and FIFO eviction,
+  shared by every search in the process (positions recur across moves).
+- Iterative deepening under a per-move millisecond budget: the move from the
+  deepest *completed* iteration is played.
+
+This module deliberately has no Django imports so it can run inside a
+worker process (see ``connect_four.services.ai_player``).
+"""
+
+import random
+import time
+from dataclasses import dataclass
+
+from connect_four.engine import (
+    BOARD_MASK,
+    COLS,
+    COLUMN_BITS,
+    COLUMN_MASKS,
+    MOVE_ORDER,
+    ROWS,
+    TOP_CELL_MASKS,
+    from_board,
+    has_four,
+)
+from utils.game.transposition_table import EXACT, LOWER, UPPER, TranspositionTable  # noqa: F401
+
+WIN_SCORE = 1_000_000
+CELLS = ROWS * COLS
+
+# Difficulty profiles: search depth cap, time budget and how often a random
+# legal move replaces the searched one.
+DIFFICULTIES = {
+    "easy": {"max_depth": 2, "time_budget_ms": 50, "randomness": 0.3},
+    "medium": {"max_depth": 6, "time_budget_ms": 250, "randomness": 0.0},
+    "hard": {"max_depth": CELLS, "time_budget_ms": 1000, "randomness": 0.0},
+}
+DEFAULT_DIFFICULTY = "medium"
+
+# Table for the in-process fallback: a depth-1 search stores a few entries.
+FALLBACK_TABLE_ENTRIES = 4096
+
+_BOTTOM_BITS = tuple(1 << (col * COLUMN_BITS) for col in range(COLS))
+_CENTER_MASK = COLUMN_MASKS[COLS // 2]
+_DEADLINE_CHECK_INTERVAL = 1024
+
+# Step 1: Zobrist keys (fixed seed so every worker process agrees)
+_rng = random.Random(0xC4C4)
+ZOBRIST = tuple(
+    tuple(_rng.getrandbits(64) for _ in range(COLS * COLUMN_BITS)) for _ in range(2)
+)
+ZOBRIST_SIDE = _rng.getrandbits(64)
+del _rng
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the move budget is exhausted."""
+
+
+@dataclass
+class SearchResult:
+    col: int
+    score: int
+    depth: int
+    nodes: int
+    elapsed_ms: float
+
+
+_SHARED_TABLE = TranspositionTable()
+
+
+def zobrist_key(position):
+    """Full Zobrist key for an ``engine.Position`` (incremental in search)."""
+    key = ZOBRIST_SIDE if position.to_move == 2 else 0
+    for index, bitboard in enumerate(position.bitboards):
+        while bitboard:
+            low = bitboard & -bitboard
+            key ^= ZOBRIST[index][low.bit_length() - 1]
+            bitboard ^= low
+    return key
+
+
+def _winning_cells(pieces, mask):
+    """Empty cells that would complete four for ``pieces``."""
+    # vertical
+    r = (pieces << 1) & (pieces << 2) & (pieces << 3)
+    # horizontal and both diagonals
+    for shift in (COLUMN_BITS, COLUMN_BITS - 1, COLUMN_BITS + 1):
+        pair = (pieces << shift) & (pieces << (2 * shift))
+        r |= pair & (pieces << (3 * shift))
+        r |= pair & (pieces >> shift)
+        pair = (pieces >> shift) & (pieces >> (2 * shift))
+        r |= pair & (pieces << shift)
+        r |= pair & (pieces >> (3 * shift))
+    return r & (BOARD_MASK ^ mask)
+
+
+def evaluate(current, mask):
+    """
+    Static score for the side to move (``current`` are its pieces).
+
+    Open three-in-a-row threats dominate; center-column pieces break ties.
+    """
+    opponent = current ^ mask
+    threats = _winning_cells(current, mask).bit_count() - _winning_cells(opponent, mask).bit_count()
+    center = (current & _CENTER_MASK).bit_count() - (opponent & _CENTER_MASK).bit_count()
+    return threats * 16 + center * 3
+
+
+class _Searcher:
+    def __init__(self, table, deadline):
+        self.table = table
+        self.deadline = deadline
+        self.nodes = 0
+        self.can_timeout = False
+
+    def negamax(self, current, mask, key, side, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.can_timeout and not self.nodes % _DEADLINE_CHECK_INTERVAL:
+            if time.perf_counter() >= self.deadline:
+                raise SearchTimeout()
+
+        # Step 1: Immediate wins and move generation in one pass
+        playable = []
+        for col in MOVE_ORDER:
+            if mask & TOP_CELL_MASKS[col]:
+                continue
+            bit = (mask + _BOTTOM_BITS[col]) & COLUMN_MASKS[col]
+            if has_four(current | bit):
+                return WIN_SCORE - ply
+            playable.append((col, bit))
+
+        if not playable:
+            return 0  # full board: draw
+        if depth <= 0:
+            return evaluate(current, mask)
+
+        # Step 2: Transposition table probe
+        alpha_orig = alpha
+        entry = self.table.get(key)
+        tt_col = None
+        if entry is not None:
+            tt_depth, flag, score, tt_col = entry
+            if tt_depth >= depth:
+                if flag == EXACT:
+                    return score
+                if flag == LOWER and score > alpha:
+                    alpha = score
+                elif flag == UPPER and score < beta:
+                    beta = score
+                if alpha >= beta:
+                    return score
+            if tt_col is not None:
+                playable.sort(key=lambda move: move[0] != tt_col)
+
+        # Step 3: Search children
+        best_score = -WIN_SCORE - 1
+        best_col = playable[0][0]
+        opponent = current ^ mask
+        zobrist = ZOBRIST[side]
+        for col, bit in playable:
+            child_key = key ^ zobrist[bit.bit_length() - 1] ^ ZOBRIST_SIDE
+            score = -self.negamax(
+                opponent, mask | bit, child_key, 1 - side, depth - 1, -beta, -alpha, ply + 1
+            )
+            if score > best_score:
+                best_score, best_col = score, col
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        # Step 4: Store with bound type
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(key, depth, flag, best_score, best_col)
+        return best_score
+
+
+def search(position, max_depth=CELLS, time_budget_ms=1000, table=None):
+    """
+    Iterative-deepening search from ``position`` for its side to move.
+
+    Args:
+        position (engine.Position): Position to search (not modified).
+        max_depth (int): Deepest iteration to attempt.
+        time_budget_ms (float): Wall-clock budget for the whole move.
+        table (TranspositionTable): Defaults to the process-wide table.
+
+    Returns:
+        SearchResult: Move from the deepest completed iteration.
+
+    Raises:
+        ValueError: If the position has no legal move.
+    """
+    started = time.perf_counter()
+    table = _SHARED_TABLE if table is None else table
+    searcher = _Searcher(table, started + time_budget_ms / 1000.0)
+
+    mask = position.occupied
+    side = position.to_move - 1
+    current = position.bitboards[side]
+    key = zobrist_key(position)
+    remaining = CELLS - position.moves
+
+    legal = [col for col in MOVE_ORDER if not mask & TOP_CELL_MASKS[col]]
+    if not legal:
+        raise ValueError("No legal moves: the board is full.")
+
+    best_col, best_score, completed_depth = legal[0], 0, 0
+    for depth in range(1, max(1, min(max_depth, remaining)) + 1):
+        # Depth 1 always completes so there is a searched move to fall back on.
+        searcher.can_timeout = completed_depth > 0
+        try:
+            score = searcher.negamax(current, mask, key, side, depth, -WIN_SCORE - 1, WIN_SCORE + 1, 0)
+        except SearchTimeout:
+            break
+
+        entry = table.get(key)
+        if entry is not None and entry[3] is not None:
+            best_col = entry[3]
+        else:
+            # Root returned early (immediate win): find the winning column.
+            best_col = next(
+                (col for col in legal if has_four(current | ((mask + _BOTTOM_BITS[col]) & COLUMN_MASKS[col]))),
+                best_col,
+            )
+        best_score, completed_depth = score, depth
+        if abs(score) >= WIN_SCORE - CELLS:
+            break  # forced result found; deeper search cannot change it
+
+    return SearchResult(
+        col=best_col,
+        score=best_score,
+        depth=completed_depth,
+        nodes=searcher.nodes,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+
+
+def choose_move(board, to_move, difficulty=DEFAULT_DIFFICULTY):
+    """
+    Pick a column for ``to_move`` on a persisted 42-character board.
+
+    Runs in a worker process, so it only takes and returns plain values.
+
+    Returns:
+        dict: ``{"col", "score", "depth", "nodes", "elapsed_ms", "difficulty"}``.
+    """
+    profile = DIFFICULTIES.get(difficulty) or DIFFICULTIES[DEFAULT_DIFFICULTY]
+    position = from_board(board, to_move=to_move)
+    result = search(position, profile["max_depth"], profile["time_budget_ms"])
+
+    col = result.col
+    if profile["randomness"] and random.random() < profile["randomness"]:
+        col = random.choice(position.legal_columns())
+
+    return {
+        "col": col,
+        "score": result.score,
+        "depth": result.depth,
+        "nodes": result.nodes,
+        "elapsed_ms": result.elapsed_ms,
+        "difficulty": difficulty if difficulty in DIFFICULTIES else DEFAULT_DIFFICULTY,
+    }
+
+
+def fallback_move(board, to_move):
+    """
+    A cheap column computed in the calling process (a depth-1 search), for
+    when the worker pool cannot answer. Same result shape as ``choose_move``.
+    """
+    position = from_board(board, to_move=to_move)
+    result = search(position, max_depth=1, time_budget_ms=0, table=TranspositionTable(FALLBACK_TABLE_ENTRIES))
+    return {
+        "col": result.col,
+        "score": result.score,
+        "depth": result.depth,
+        "nodes": result.nodes,
+        "elapsed_ms": result.elapsed_ms,
+        "difficulty": None,
+    }
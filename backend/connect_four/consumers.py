@@ -2,44 +2,87 @@ import logging
 import random
 import time
 from asgiref.sync import async_to_sync
-from channels.generic.websocket import JsonWebsocketConsumer
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.core.exceptions import ValidationError
+from django.db import transaction
 
+from utils.game.event_log import aappend_event, alatest_seq, append_event, areplay_since, parse_since, since_from_scope
 from utils.shared.shared_utils_game_chat import SharedUtils
 from utils.redis.redis_game_lobby_manager import RedisGameLobbyManager
+from utils.websockets.codec import MSGPACK_SUBPROTOCOL, WireCodecMixin
 from .models import ConnectFourGame
 from .serializers import ConnectFourGameSerializer
+from .services.ai_player import schedule_ai_move
 
 logger = logging.getLogger(__name__)
 
 C4_GROUP = "c4_{game_id}"
+GAME_TYPE = "connect_four"
 
 
-class ConnectFourConsumer(JsonWebsocketConsumer):
+def _game_update_event(game):
+    return {
+        "type": "c4_game_update",
+        "board": game.board,
+        "current_turn": game.current_turn,
+        "winner": game.winner,
+        "is_completed": game.is_completed,
+        "player_one_id": game.player_one_id,
+        "player_two_id": game.player_two_id if game.player_two_id else None,
+    }
+
+
+def broadcast_game_update(channel_layer, game):
+    """Log the current board and send it to every socket in the game's group (sync callers)."""
+    event = append_event(GAME_TYPE, game.pk, _game_update_event(game))
+    async_to_sync(channel_layer.group_send)(C4_GROUP.format(game_id=game.pk), event)
+
+
+class ConnectFourConsumer(WireCodecMixin, AsyncJsonWebsocketConsumer):
+    # Binary msgpack frames for clients that offer the subprotocol.
+    wire_subprotocols = (MSGPACK_SUBPROTOCOL,)
 
     def _group(self):
         return C4_GROUP.format(game_id=self.game_id)
 
-    def _accept_and_close(self, code):
-        self.accept()
-        self.close(code=code)
+    async def _broadcast_logged(self, event):
+        """Append a group event to the game's log, then send it to the game group."""
+        await self.channel_layer.group_send(self._group(), await aappend_event(GAME_TYPE, self.game_id, event))
+
+    async def _send_state(self, game):
+        await self.send_json({
+            "type": "game_state",
+            "game": ConnectFourGameSerializer(game).data,
+            "my_piece": 1 if game.player_one == self.user else 2,
+            "seq": await alatest_seq(GAME_TYPE, self.game_id),
+        })
+
+    async def _accept_and_close(self, code):
+        await self.accept()
+        await self.close(code=code)
+
+    async def _get_game(self):
+        # Players are joined in, so the participant check and the serializer
+        # never hit the database from the event loop.
+        return await ConnectFourGame.objects.select_related("player_one", "player_two").aget(pk=self.game_id)
 
-    def connect(self):
+    async def connect(self):
         raw_id = self.scope.get("url_route", {}).get("kwargs", {}).get("game_id")
         if not raw_id:
-            self._accept_and_close(4002)
+            await self._accept_and_close(4002)
             return
 
         self.game_id = str(raw_id)
         self.user = SharedUtils.authenticate_user(self.scope)
         if not self.user:
-            self._accept_and_close(4001)
+            await self._accept_and_close(4001)
             return
 
         try:
-            game = ConnectFourGame.objects.get(pk=self.game_id)
+            game = await self._get_game()
         except ConnectFourGame.DoesNotExist:
-            self._accept_and_close(4004)
+            await self._accept_and_close(4004)
             return
 
         is_participant = (
@@ -47,11 +90,11 @@ class ConnectFourConsumer(JsonWebsocketConsumer):
             or (game.player_two and game.player_two == self.user)
         )
         if not is_participant:
-            self._accept_and_close(4003)
+            await self._accept_and_close(4003)
             return
 
-        async_to_sync(self.channel_layer.group_add)(self._group(), self.channel_name)
-        self.accept()
+        await self.channel_layer.group_add(self._group(), self.channel_name)
+        await self.accept()
         logger.info(
             "[C4] connected game_id=%s user_id=%s group=%s",
             self.game_id,
@@ -59,59 +102,65 @@ class ConnectFourConsumer(JsonWebsocketConsumer):
             self._group(),
         )
 
-        self.send_json({
-            "type": "game_state",
-            "game": ConnectFourGameSerializer(game).data,
-            "my_piece": 1 if game.player_one == self.user else 2,
-        })
+        # A reconnecting client gets only the events it missed when the log still has them.
+        replayed = await areplay_since(self, GAME_TYPE, self.game_id, since_from_scope(self.scope))
+        if not replayed:
+            await self._send_state(game)
+        self._resume_ai_turn(game)
 
-    def receive_json(self, content, **kwargs):
+    async def receive_json(self, content, **kwargs):
         msg_type = content.get("type", "")
 
         if msg_type == "move":
-            self._handle_move(content)
+            await self._handle_move(content)
         elif msg_type == "sync":
-            self._handle_sync()
+            await self._handle_sync(content)
         elif msg_type == "rematch_request":
-            self._handle_rematch_request()
+            await self._handle_rematch_request()
         elif msg_type == "rematch_accept":
-            self._handle_rematch_accept()
+            await self._handle_rematch_accept()
         elif msg_type == "rematch_decline":
-            self._handle_rematch_decline()
+            await self._handle_rematch_decline()
         else:
-            self.send_json({"type": "error", "message": "Unknown message type."})
+            await self.send_json({"type": "error", "message": "Unknown message type."})
+
+    def _resume_ai_turn(self, game):
+        """Schedule the AI's turn if the game is waiting on it (e.g. a search was lost)."""
+        channel_layer = self.channel_layer
+        schedule_ai_move(game, on_applied=lambda g: broadcast_game_update(channel_layer, g))
 
-    def _handle_sync(self):
+    async def _handle_sync(self, content):
+        replayed = await areplay_since(self, GAME_TYPE, self.game_id, parse_since(content.get("since")))
         try:
-            game = ConnectFourGame.objects.get(pk=self.game_id)
-            self.send_json({
-                "type": "game_state",
-                "game": ConnectFourGameSerializer(game).data,
-                "my_piece": 1 if game.player_one == self.user else 2,
-            })
+            game = await self._get_game()
         except ConnectFourGame.DoesNotExist:
-            self.send_json({"type": "error", "message": "Game not found."})
+            if not replayed:
+                await self.send_json({"type": "error", "message": "Game not found."})
+            return
+        if not replayed:
+            await self._send_state(game)
+        self._resume_ai_turn(game)
 
-    def _get_game_and_pieces(self):
-        game = ConnectFourGame.objects.get(pk=self.game_id)
+    async def _get_game_and_pieces(self):
+        game = await ConnectFourGame.objects.aget(pk=self.game_id)
         if game.player_one_id == self.user.id:
             return game, 1, game.player_two_id
         if game.player_two_id == self.user.id:
             return game, 2, game.player_one_id
         return game, None, None
 
-    def _handle_rematch_request(self):
+    async def _handle_rematch_request(self):
         try:
-            game, requester_piece, receiver_id = self._get_game_and_pieces()
+            game, requester_piece, receiver_id = await self._get_game_and_pieces()
         except ConnectFourGame.DoesNotExist:
-            self.send_json({"type": "error", "message": "Game not found."})
+            await self.send_json({"type": "error", "message": "Game not found."})
             return
 
         if not game.is_completed:
-            self.send_json({"type": "error", "message": "Finish the game before requesting a rematch."})
+            await self.send_json({"type": "error", "message": "Finish the game before requesting a rematch."})
             return
         if requester_piece not in (1, 2) or not receiver_id:
-            self.send_json({"type": "error", "message": "Both players must be present to rematch."})
+            await self.send_json({"type": "error", "message": "Both players must be present to rematch."})
             return
 
         manager = RedisGameLobbyManager()
@@ -123,46 +172,48 @@ class ConnectFourConsumer(JsonWebsocketConsumer):
             "message": f"{self.user.first_name or 'Player'} wants a rematch!",
             "createdAtMs": int(time.time() * 1000),
         }
-        manager.store_rematch_offer(str(self.game_id), offer)
+        # Store the offer unless one is pending (one atomic round trip); a
+        # second request, from either player, re-sends the pending offer
+        existing_offer = await manager.aoffer_rematch(str(self.game_id), offer)
+        if existing_offer is not None:
+            offer = {**offer, **existing_offer}
 
-        async_to_sync(self.channel_layer.group_send)(
-            self._group(),
+        await self._broadcast_logged(
             {
                 "type": "c4_rematch_offer",
                 **offer,
             },
         )
 
-    def _handle_rematch_accept(self):
+    async def _handle_rematch_accept(self):
         manager = RedisGameLobbyManager()
-        offer = manager.get_rematch_offer(str(self.game_id))
+        offer = await manager.aget_rematch_offer(str(self.game_id))
         if not offer:
-            self.send_json({"type": "error", "message": "No pending rematch offer found."})
+            await self.send_json({"type": "error", "message": "No pending rematch offer found."})
             return
         if str(offer.get("receiverUserId")) != str(self.user.id):
-            self.send_json({"type": "error", "message": "Only the other player can accept this rematch."})
+            await self.send_json({"type": "error", "message": "Only the other player can accept this rematch."})
             return
 
         try:
-            game = ConnectFourGame.objects.get(pk=self.game_id)
+            game = await ConnectFourGame.objects.aget(pk=self.game_id)
         except ConnectFourGame.DoesNotExist:
-            self.send_json({"type": "error", "message": "Game not found."})
+            await self.send_json({"type": "error", "message": "Game not found."})
             return
 
         if not game.player_one_id or not game.player_two_id:
-            self.send_json({"type": "error", "message": "Both players must be present to rematch."})
+            await self.send_json({"type": "error", "message": "Both players must be present to rematch."})
             return
 
-        manager.pop_rematch_offer(str(self.game_id))
-        new_game = ConnectFourGame.objects.create(
-            player_one=game.player_one,
-            player_two=game.player_two,
+        await manager.apop_rematch_offer(str(self.game_id))
+        new_game = await ConnectFourGame.objects.acreate(
+            player_one_id=game.player_one_id,
+            player_two_id=game.player_two_id,
             is_ai_game=False,
             current_turn=random.choice([1, 2]),
         )
 
-        async_to_sync(self.channel_layer.group_send)(
-            self._group(),
+        await self._broadcast_logged(
             {
                 "type": "c4_rematch_start",
                 "new_game_id": str(new_game.id),
@@ -170,38 +221,41 @@ class ConnectFourConsumer(JsonWebsocketConsumer):
             },
         )
 
-    def _handle_rematch_decline(self):
+    async def _handle_rematch_decline(self):
         manager = RedisGameLobbyManager()
-        offer = manager.get_rematch_offer(str(self.game_id))
+        offer = await manager.aget_rematch_offer(str(self.game_id))
         if offer:
-            manager.clear_rematch_offer(str(self.game_id))
+            await manager.aclear_rematch_offer(str(self.game_id))
 
-        async_to_sync(self.channel_layer.group_send)(
-            self._group(),
+        await self._broadcast_logged(
             {
                 "type": "c4_rematch_declined",
                 "message": f"{self.user.first_name or 'Player'} declined the rematch.",
             },
         )
 
-    def _handle_move(self, content):
+    @database_sync_to_async
+    def _drop_piece(self, col):
+        with transaction.atomic():
+            game = ConnectFourGame.objects.select_for_update().get(pk=self.game_id)
+            game.drop_piece(col, self.user)
+        return game
+
+    async def _handle_move(self, content):
         col = content.get("col")
         if col is None:
-            self.send_json({"type": "error", "message": "col is required."})
+            await self.send_json({"type": "error", "message": "col is required."})
             return
 
         try:
-            game = ConnectFourGame.objects.select_for_update().get(pk=self.game_id)
-            game.drop_piece(int(col), self.user)
+            game = await self._drop_piece(int(col))
         except ConnectFourGame.DoesNotExist:
-            self.send_json({"type": "error", "message": "Game not found."})
+            await self.send_json({"type": "error", "message": "Game not found."})
             return
         except (ValidationError, ValueError) as e:
-            self.send_json({"type": "error", "message": str(e)})
+            await self.send_json({"type": "error", "message": str(e)})
             return
 
-        p1_id = game.player_one_id
-        p2_id = game.player_two_id if game.player_two_id else None
         logger.info(
             "[C4] move accepted game_id=%s user_id=%s col=%s next_turn=%s group=%s",
             self.game_id,
@@ -211,20 +265,13 @@ class ConnectFourConsumer(JsonWebsocketConsumer):
             self._group(),
         )
 
-        async_to_sync(self.channel_layer.group_send)(
-            self._group(),
-            {
-                "type": "c4_game_update",
-                "board": game.board,
-                "current_turn": game.current_turn,
-                "winner": game.winner,
-                "is_completed": game.is_completed,
-                "player_one_id": p1_id,
-                "player_two_id": p2_id,
-            },
-        )
+        await self._broadcast_logged(_game_update_event(game))
+
+        # AI reply runs in the worker pool; this consumer returns to the event
+        # loop immediately and the update is broadcast when the search finishes.
+        self._resume_ai_turn(game)
 
-    def c4_game_update(self, event):
+    async def c4_game_update(self, event):
         user_id = getattr(self.user, "id", None)
         p1_id = event.get("player_one_id")
         my_piece = 1 if user_id == p1_id else 2
@@ -235,20 +282,21 @@ class ConnectFourConsumer(JsonWebsocketConsumer):
             event["current_turn"],
         )
 
-        self.send_json({
+        await self.send_json({
             "type": "game_update",
             "board": event["board"],
             "current_turn": event["current_turn"],
             "winner": event["winner"],
             "is_completed": event["is_completed"],
             "my_piece": my_piece,
+            "seq": event.get("seq"),
         })
 
-    def c4_rematch_offer(self, event):
+    async def c4_rematch_offer(self, event):
         user_id = getattr(self.user, "id", None)
         receiver_id = event.get("receiverUserId")
         requester_id = event.get("requesterUserId")
-        self.send_json({
+        await self.send_json({
             "type": "rematch_offer",
             "game_id": event.get("game_id"),
             "message": event.get("message"),
@@ -258,23 +306,26 @@ class ConnectFourConsumer(JsonWebsocketConsumer):
             "uiMode": "receiver" if str(user_id) == str(receiver_id) else "requester",
             "createdAtMs": event.get("createdAtMs"),
             "rematchPending": True,
+            "seq": event.get("seq"),
         })
 
-    def c4_rematch_start(self, event):
-        self.send_json({
+    async def c4_rematch_start(self, event):
+        await self.send_json({
             "type": "rematch_start",
             "new_game_id": event.get("new_game_id"),
             "message": event.get("message"),
+            "seq": event.get("seq"),
         })
 
-    def c4_rematch_declined(self, event):
-        self.send_json({
+    async def c4_rematch_declined(self, event):
+        await self.send_json({
             "type": "rematch_declined",
             "message": event.get("message"),
             "rematchPending": False,
+            "seq": event.get("seq"),
         })
 
-    def disconnect(self, close_code):
+    async def disconnect(self, close_code):
         logger.info(
             "[C4] disconnected game_id=%s user_id=%s code=%s",
             getattr(self, "game_id", None),
@@ -282,6 +333,6 @@ class ConnectFourConsumer(JsonWebsocketConsumer):
             close_code,
         )
         try:
-            async_to_sync(self.channel_layer.group_discard)(self._group(), self.channel_name)
+            await self.channel_layer.group_discard(self._group(), self.channel_name)
         except Exception:
             pass
@@ -0,0 +1,212 @@
+"""
+Bitboard engine for Connect Four.
+
+Layout (per player, 49 bits): each column owns 7 bits, bottom row first, with
+the 7th bit of every column left empty as a sentinel so shifts never carry a
+line from one column into the next:
+
+     6 13 20 27 34 41 48   <- sentinel row (always 0)
+     5 12 19 26 33 40 47   <- top row (board row 0)
+     4 11 18 25 32 39 46
+     3 10 17 24 31 38 45
+     2  9 16 23 30 37 44
+     1  8 15 22 29 36 43
+     0  7 14 21 28 35 42   <- bottom row (board row 5)
+
+Four-in-a-row is four shift-and-AND operations (vertical, horizontal and the
+two diagonals), so checking the mover after each drop is O(1). Per-column
+height counters give O(1) move generation.
+
+The persisted format stays the 42-character ``board`` string (row 0 is the
+top row, ``"0"`` empty, ``"1"``/``"2"`` pieces); convert at the edges with
+``from_board`` / ``to_board``.
+"""
+
+ROWS = 6
+COLS = 7
+COLUMN_BITS = ROWS + 1
+EMPTY_BOARD = "0" * (ROWS * COLS)
+
+# Center-first ordering: central columns take part in more lines, so trying
+# them first gives alpha-beta search much earlier cutoffs.
+MOVE_ORDER = (3, 2, 4, 1, 5, 0, 6)
+
+BOTTOM_MASK = sum(1 << (col * COLUMN_BITS) for col in range(COLS))
+BOARD_MASK = BOTTOM_MASK * ((1 << ROWS) - 1)
+COLUMN_MASKS = tuple(((1 << ROWS) - 1) << (col * COLUMN_BITS) for col in range(COLS))
+TOP_CELL_MASKS = tuple(1 << (ROWS - 1 + col * COLUMN_BITS) for col in range(COLS))
+_LINE_SHIFTS = (1, COLUMN_BITS, COLUMN_BITS - 1, COLUMN_BITS + 1)  # |  -  /  \
+
+
+def has_four(bitboard):
+    """True if ``bitboard`` contains four aligned pieces."""
+    # Unrolled over _LINE_SHIFTS: this runs once per node in AI search.
+    pairs = bitboard & (bitboard >> 1)
+    if pairs & (pairs >> 2):
+        return True
+    pairs = bitboard & (bitboard >> 7)
+    if pairs & (pairs >> 14):
+        return True
+    pairs = bitboard & (bitboard >> 6)
+    if pairs & (pairs >> 12):
+        return True
+    pairs = bitboard & (bitboard >> 8)
+    return bool(pairs & (pairs >> 16))
+
+
+def cell_bit(row, col):
+    """Bit for board-string coordinates (row 0 = top)."""
+    return 1 << (col * COLUMN_BITS + (ROWS - 1 - row))
+
+
+def board_index(row, col):
+    """Index into the persisted 42-character board string."""
+    return row * COLS + col
+
+
+def winning_cells(bitboard):
+    """
+    Return the ``[row, col]`` pairs of every four-in-a-row in ``bitboard``.
+
+    Only used for presentation (highlighting), so it favours clarity.
+    """
+    cells = set()
+    for shift in _LINE_SHIFTS:
+        pairs = bitboard & (bitboard >> shift)
+        starts = pairs & (pairs >> (2 * shift))
+        while starts:
+            low = starts & -starts
+            base = low.bit_length() - 1
+            for step in range(4):
+                bit = base + step * shift
+                col, height = divmod(bit, COLUMN_BITS)
+                cells.add((ROWS - 1 - height, col))
+            starts ^= low
+    return [list(cell) for cell in sorted(cells)]
+
+
+class Position:
+    """
+    Mutable Connect Four position.
+
+    Attributes:
+        bitboards (list[int]): Pieces of player 1 and player 2 (index piece - 1).
+        heights (list[int]): Next free bit index for each column.
+        to_move (int): Piece (1 or 2) whose turn it is.
+        moves (int): Number of pieces on the board.
+    """
+
+    __slots__ = ("bitboards", "heights", "to_move", "moves")
+
+    def __init__(self, to_move=1):
+        self.bitboards = [0, 0]
+        self.heights = [col * COLUMN_BITS for col in range(COLS)]
+        self.to_move = to_move
+        self.moves = 0
+
+    def copy(self):
+        clone = Position.__new__(Position)
+        clone.bitboards = list(self.bitboards)
+        clone.heights = list(self.heights)
+        clone.to_move = self.to_move
+        clone.moves = self.moves
+        return clone
+
+    @property
+    def occupied(self):
+        return self.bitboards[0] | self.bitboards[1]
+
+    def can_play(self, col):
+        return 0 <= col < COLS and not (self.occupied & TOP_CELL_MASKS[col])
+
+    def legal_columns(self):
+        """Playable columns in center-first order."""
+        occupied = self.occupied
+        return [col for col in MOVE_ORDER if not occupied & TOP_CELL_MASKS[col]]
+
+    def next_row(self, col):
+        """Board-string row the next piece in ``col`` would land on."""
+        return ROWS - 1 - (self.heights[col] - col * COLUMN_BITS)
+
+    def is_winning_move(self, col):
+        """True if the side to move wins by playing ``col`` (board unchanged)."""
+        return has_four(self.bitboards[self.to_move - 1] | (1 << self.heights[col]))
+
+    def play(self, col):
+        """
+        Drop the side-to-move's piece into ``col`` (assumed playable).
+
+        Returns:
+            bool: True if the move completed four in a row.
+        """
+        index = self.to_move - 1
+        bitboard = self.bitboards[index] | (1 << self.heights[col])
+        self.bitboards[index] = bitboard
+        self.heights[col] += 1
+        self.moves += 1
+        self.to_move = 3 - self.to_move
+        return has_four(bitboard)
+
+    def undo(self, col):
+        """Take back the last piece dropped into ``col``."""
+        self.to_move = 3 - self.to_move
+        self.moves -= 1
+        self.heights[col] -= 1
+        self.bitboards[self.to_move - 1] ^= 1 << self.heights[col]
+
+    def is_full(self):
+        return self.moves == ROWS * COLS
+
+    def winner(self):
+        """Return 1 or 2 for a four-in-a-row, 0 for a full board, else None."""
+        for piece in (1, 2):
+            if has_four(self.bitboards[piece - 1]):
+                return piece
+        return 0 if self.is_full() else None
+
+
+def from_board(board, to_move=1):
+    """
+    Build a ``Position`` from the persisted 42-character board string.
+
+    Raises:
+        ValueError: If the string has the wrong length, an unknown cell, or
+            a floating piece above an empty cell.
+    """
+    if len(board) != ROWS * COLS:
+        raise ValueError(f"Board must be {ROWS * COLS} characters long.")
+
+    position = Position(to_move=to_move)
+    for col in range(COLS):
+        for row in range(ROWS - 1, -1, -1):
+            cell = board[board_index(row, col)]
+            if cell == "0":
+                break
+            if cell not in ("1", "2"):
+                raise ValueError(f"Invalid board cell {cell!r}.")
+            position.bitboards[int(cell) - 1] |= 1 << position.heights[col]
+            position.heights[col] += 1
+            position.moves += 1
+        else:
+            continue
+        # Everything above the first empty cell in a column must be empty.
+        if any(board[board_index(r, col)] != "0" for r in range(row)):
+            raise ValueError(f"Floating piece in column {col}.")
+    return position
+
+
+def to_board(position):
+    """Render a ``Position`` back into the persisted 42-character string."""
+    one, two = position.bitboards
+    cells = []
+    for row in range(ROWS):
+        for col in range(COLS):
+            bit = cell_bit(row, col)
+            cells.append("1" if one & bit else "2" if two & bit else "0")
+    return "".join(cells)
+
+
+def set_cell(board, row, col, piece):
+    """Return ``board`` with a single cell replaced (no list rebuild)."""
+    index = board_index(row, col)
+    return board[:index] + str(piece) + board[index + 1:]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('connect_four', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='connectfourgame',
+            name='ai_difficulty',
+            field=models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], default='medium', max_length=10),
+        ),
+    ]
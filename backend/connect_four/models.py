@@ -2,50 +2,18 @@ from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
 
-ROWS = 6
-COLS = 7
-EMPTY_BOARD = "0" * (ROWS * COLS)
-
-
-def _drop(board, col, piece):
-    """Return new board string after dropping piece into col, or None if full."""
-    cells = list(board)
-    for row in range(ROWS - 1, -1, -1):
-        idx = row * COLS + col
-        if cells[idx] == "0":
-            cells[idx] = str(piece)
-            return "".join(cells)
-    return None
-
-
-def _check_winner(board):
-    """Return 1, 2, or None."""
-    b = board
-    for piece in ("1", "2"):
-        # horizontal
-        for r in range(ROWS):
-            for c in range(COLS - 3):
-                if all(b[r * COLS + c + i] == piece for i in range(4)):
-                    return int(piece)
-        # vertical
-        for c in range(COLS):
-            for r in range(ROWS - 3):
-                if all(b[(r + i) * COLS + c] == piece for i in range(4)):
-                    return int(piece)
-        # diagonal \
-        for r in range(ROWS - 3):
-            for c in range(COLS - 3):
-                if all(b[(r + i) * COLS + c + i] == piece for i in range(4)):
-                    return int(piece)
-        # diagonal /
-        for r in range(3, ROWS):
-            for c in range(COLS - 3):
-                if all(b[(r - i) * COLS + c + i] == piece for i in range(4)):
-                    return int(piece)
-    return None
-
-
-class ConnectFourGame(models.Model):
+from connect_four import engine
+from connect_four.engine import COLS, EMPTY_BOARD, ROWS  # noqa: F401 (re-exported)
+from stats.hooks import CompletionHookMixin
+
+# In AI games the human is always player_one; the AI plays piece 2.
+AI_PIECE = 2
+AI_DIFFICULTY_CHOICES = [("easy", "Easy"), ("medium", "Medium"), ("hard", "Hard")]
+
+
+class ConnectFourGame(CompletionHookMixin, models.Model):
+    stats_game_type = "connect_four"
+
     # player_one always plays piece=1, player_two plays piece=2
     player_one = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -60,6 +28,7 @@ class ConnectFourGame(models.Model):
         blank=True,
     )
     is_ai_game = models.BooleanField(default=False)
+    ai_difficulty = models.CharField(max_length=10, choices=AI_DIFFICULTY_CHOICES, default="medium")
     board = models.CharField(max_length=42, default=EMPTY_BOARD)
     current_turn = models.IntegerField(default=1)  # 1 or 2
     # winner: 1=player_one, 2=player_two, 0=draw, null=ongoing
@@ -85,16 +54,36 @@ class ConnectFourGame(models.Model):
         if piece != self.current_turn:
             raise ValidationError("It is not your turn.")
 
-        new_board = _drop(self.board, col, piece)
-        if new_board is None:
+        self._apply_drop(col, piece)
+
+    def drop_ai_piece(self, col):
+        if not self.is_ai_game:
+            raise ValidationError("This is not an AI game.")
+        if self.is_completed:
+            raise ValidationError("Game is already over.")
+        if self.current_turn != AI_PIECE:
+            raise ValidationError("It is not the AI's turn.")
+        if not (0 <= col < COLS):
+            raise ValidationError("Invalid column.")
+
+        self._apply_drop(col, AI_PIECE)
+
+    @property
+    def is_ai_turn(self):
+        return self.is_ai_game and not self.is_completed and self.current_turn == AI_PIECE
+
+    def _apply_drop(self, col, piece):
+        position = engine.from_board(self.board, to_move=piece)
+        if not position.can_play(col):
             raise ValidationError("That column is full.")
 
-        self.board = new_board
-        winner = _check_winner(self.board)
-        if winner:
-            self.winner = winner
+        row = position.next_row(col)
+        won = position.play(col)
+        self.board = engine.set_cell(self.board, row, col, piece)
+        if won:
+            self.winner = piece
             self.is_completed = True
-        elif "0" not in self.board:
+        elif position.is_full():
             self.winner = 0
             self.is_completed = True
         else:
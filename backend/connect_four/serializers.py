@@ -13,6 +13,7 @@ class ConnectFourGameSerializer(serializers.ModelSerializer):
             "player_one_name",
             "player_two_name",
             "is_ai_game",
+            "ai_difficulty",
             "board",
             "current_turn",
             "winner",
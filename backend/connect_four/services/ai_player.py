@@ -0,0 +1,127 @@
+import logging
+import threading
+
+from django.db import close_old_connections, transaction
+
+from connect_four.ai import DIFFICULTIES, DEFAULT_DIFFICULTY, choose_move, fallback_move
+from connect_four.models import ConnectFourGame
+from utils.game.ai_pool import get_dispatch_pool, get_search_pool
+
+logger = logging.getLogger(__name__)
+
+# Extra time allowed on top of the search budget for process hand-off.
+RESULT_GRACE_SECONDS = 5.0
+
+# Games with an AI turn scheduled in this process (one search per game at a time).
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+
+def _result_timeout(difficulty):
+    profile = DIFFICULTIES.get(difficulty) or DIFFICULTIES[DEFAULT_DIFFICULTY]
+    return profile["time_budget_ms"] / 1000.0 + RESULT_GRACE_SECONDS
+
+
+def search_move(board, to_move, difficulty):
+    """
+    Run the AI search in the worker pool and wait for it.
+
+    Returns:
+        dict: ``connect_four.ai.choose_move`` result.
+    """
+    future = get_search_pool().submit(choose_move, board, to_move, difficulty)
+    return future.result(timeout=_result_timeout(difficulty))
+
+
+def apply_ai_move(game_id, searched_board, col):
+    """
+    Apply the AI's column if the game has not moved on since the search.
+
+    Returns:
+        ConnectFourGame | None: The updated game, or None if the result was stale.
+    """
+    with transaction.atomic():
+        game = ConnectFourGame.objects.select_for_update().get(pk=game_id)
+        if not game.is_ai_turn or game.board != searched_board:
+            logger.info("[C4][AI] stale search result dropped game_id=%s", game_id)
+            return None
+        game.drop_ai_piece(col)
+    return game
+
+
+def _search_and_apply(game_id, board, to_move, difficulty):
+    # A failed or timed-out pool search must not leave the game on the AI's
+    # turn: play a cheap in-process move instead.
+    try:
+        result = search_move(board, to_move, difficulty)
+    except Exception:
+        logger.exception("[C4][AI] pool search failed game_id=%s; playing the fallback move", game_id)
+        result = fallback_move(board, to_move)
+    logger.info(
+        "[C4][AI] game_id=%s col=%s depth=%s nodes=%s ms=%.1f",
+        game_id, result["col"], result["depth"], result["nodes"], result["elapsed_ms"],
+    )
+    return apply_ai_move(game_id, board, result["col"])
+
+
+def play_ai_move(game):
+    """
+    Blocking AI turn for request/response paths (REST, game creation).
+
+    The search still runs in the worker pool; only the calling thread waits.
+    The move is applied like a scheduled one, under the row lock and the
+    stale check.
+    """
+    if not game.is_ai_turn:
+        return game
+    applied = _search_and_apply(game.pk, game.board, game.current_turn, game.ai_difficulty)
+    if applied is None:
+        game.refresh_from_db()
+        return game
+    return applied
+
+
+def _run_ai_turn(game_id, board, to_move, difficulty, on_applied):
+    try:
+        game = _search_and_apply(game_id, board, to_move, difficulty)
+        if game is not None and on_applied is not None:
+            on_applied(game)
+    except Exception:
+        logger.exception("[C4][AI] AI turn failed game_id=%s", game_id)
+    finally:
+        with _in_flight_lock:
+            _in_flight.discard(game_id)
+        close_old_connections()
+
+
+def schedule_ai_move(game, on_applied=None):
+    """
+    Fire-and-forget AI turn for WebSocket consumers.
+
+    Returns immediately; a dispatch thread waits for the worker-pool search,
+    applies the move under a row lock and then calls ``on_applied(game)``
+    (e.g. to broadcast the update).
+
+    Also the retry path: loading a game that is still on the AI's turn
+    (REST detail, socket connect or sync) schedules it again, so a turn
+    lost with a worker is picked up. A game already scheduled in this
+    process is not scheduled twice.
+
+    Returns:
+        concurrent.futures.Future | None: None if it is not the AI's turn,
+        or its turn is already scheduled here.
+    """
+    if not game.is_ai_turn:
+        return None
+    with _in_flight_lock:
+        if game.pk in _in_flight:
+            return None
+        _in_flight.add(game.pk)
+    try:
+        return get_dispatch_pool().submit(
+            _run_ai_turn, game.pk, game.board, game.current_turn, game.ai_difficulty, on_applied,
+        )
+    except Exception:
+        with _in_flight_lock:
+            _in_flight.discard(game.pk)
+        raise
@@ -5,7 +5,9 @@ from django.contrib.auth import get_user_model
 from django.db import transaction
 from rest_framework.exceptions import ValidationError
 
+from connect_four.ai import DEFAULT_DIFFICULTY, DIFFICULTIES
 from connect_four.models import ConnectFourGame, EMPTY_BOARD
+from connect_four.services.ai_player import play_ai_move
 
 User = get_user_model()
 
@@ -21,6 +23,7 @@ def create_connect_four_game(
     creator_user,
     is_ai_game: bool,
     opponent_user: Optional[User] = None,
+    ai_difficulty: str = DEFAULT_DIFFICULTY,
 ) -> CreateGameResult:
     """
     Create a Connect Four game in a server-authoritative way, mirroring
@@ -28,25 +31,32 @@ def create_connect_four_game(
 
     Args:
         creator_user: Authenticated user creating the game (seat "X" / player_one).
-        is_ai_game: Whether the opponent is AI (handled by the existing
-            connect_four AI creation path; kept here only for signature parity).
+        is_ai_game: Whether the opponent is the server-side AI (piece 2).
         opponent_user: Required for invite-created multiplayer games. The
             receiver becomes player_two (seat "O").
+        ai_difficulty: AI search profile ("easy", "medium" or "hard").
 
     Returns:
         CreateGameResult: dict containing the created game and creator's seat label.
     """
     if not creator_user or not getattr(creator_user, "id", None):
         raise ValidationError({"detail": "Authenticated user is missing."})
+    if ai_difficulty not in DIFFICULTIES:
+        raise ValidationError({"detail": f"Unknown AI difficulty: {ai_difficulty}."})
 
     game = ConnectFourGame.objects.create(
         player_one=creator_user,
         player_two=opponent_user,
         is_ai_game=is_ai_game,
+        ai_difficulty=ai_difficulty,
         board=EMPTY_BOARD,
         current_turn=random.choice([1, 2]),
         winner=None,
         is_completed=False,
     )
 
+    # AI opens if it won the coin toss
+    if game.is_ai_turn:
+        play_ai_move(game)
+
     return {"game": game, "player_role": "X"}
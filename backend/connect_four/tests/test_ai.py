@@ -0,0 +1,141 @@
+# Filename: connect_four/tests/test_ai.py
+
+# Step 1: Imports
+import time
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from connect_four import ai, engine, views
+from connect_four.models import AI_PIECE, ConnectFourGame
+from connect_four.services import ai_player
+
+User = get_user_model()
+
+
+def _position(cols, to_move=1):
+    position = engine.Position(to_move=to_move)
+    for col in cols:
+        position.play(col)
+    return position
+
+
+# Step 2: Search behaviour
+def test_search_takes_immediate_win():
+    position = _position([0, 6, 1, 6, 2, 6])
+    result = ai.search(position, max_depth=6, time_budget_ms=200, table=ai.TranspositionTable())
+    assert result.col == 3
+    assert result.score > 0
+
+
+def test_search_blocks_immediate_loss():
+    position = _position([0, 6, 1, 6, 2])
+    result = ai.search(position, max_depth=6, time_budget_ms=200, table=ai.TranspositionTable())
+    assert result.col == 3
+
+
+def test_search_respects_time_budget():
+    started = time.perf_counter()
+    result = ai.search(engine.Position(), max_depth=42, time_budget_ms=100, table=ai.TranspositionTable())
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    assert result.depth >= 1
+    assert elapsed_ms < 400
+    assert result.col in range(7)
+
+
+def test_transposition_table_is_bounded():
+    table = ai.TranspositionTable(max_entries=50)
+    ai.search(engine.Position(), max_depth=5, time_budget_ms=1000, table=table)
+    assert len(table) == 50
+
+
+def test_zobrist_key_matches_incremental_updates():
+    position = _position([3, 3, 2, 4])
+    key = ai.zobrist_key(engine.Position())
+    replay = engine.Position()
+    for col in [3, 3, 2, 4]:
+        bit_index = replay.heights[col]
+        key ^= ai.ZOBRIST[replay.to_move - 1][bit_index] ^ ai.ZOBRIST_SIDE
+        replay.play(col)
+    assert key == ai.zobrist_key(position)
+
+
+def test_choose_move_returns_plain_values():
+    result = ai.choose_move(engine.EMPTY_BOARD, 1, "easy")
+    assert set(result) == {"col", "score", "depth", "nodes", "elapsed_ms", "difficulty"}
+    assert 0 <= result["col"] < 7
+
+
+# Step 3: Worker pool + DB application
+@pytest.fixture
+def ai_game(db):
+    human = User.objects.create_user(email="human@test.com", password="pass1234")
+    return ConnectFourGame.objects.create(player_one=human, is_ai_game=True, ai_difficulty="easy")
+
+
+@pytest.mark.django_db
+def test_play_ai_move_uses_worker_pool(ai_game):
+    ai_game.drop_piece(3, ai_game.player_one)
+    assert ai_game.is_ai_turn
+
+    ai_player.play_ai_move(ai_game)
+    ai_game.refresh_from_db()
+    assert ai_game.board.count(str(AI_PIECE)) == 1
+    assert ai_game.current_turn == 1
+
+
+@pytest.mark.django_db
+def test_apply_ai_move_drops_stale_result(ai_game):
+    ai_game.drop_piece(3, ai_game.player_one)
+    stale_board = engine.EMPTY_BOARD
+    assert ai_player.apply_ai_move(ai_game.pk, stale_board, 0) is None
+
+    applied = ai_player.apply_ai_move(ai_game.pk, ai_game.board, 0)
+    assert applied is not None
+    assert applied.current_turn == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rest_move_schedules_ai_reply_after_commit(ai_game):
+    client = APIClient()
+    client.force_authenticate(ai_game.player_one)
+    with patch.object(views, "schedule_ai_move") as schedule:
+        response = client.post(f"/api/connect-four/{ai_game.pk}/move/", {"col": 3}, format="json")
+
+    assert response.status_code == 200
+    assert response.data["current_turn"] == AI_PIECE
+    schedule.assert_called_once()
+    assert schedule.call_args.args[0].board.count("1") == 1
+
+
+@pytest.mark.django_db
+def test_failed_pool_search_falls_back_to_an_in_process_move(ai_game):
+    ai_game.drop_piece(3, ai_game.player_one)
+    with patch.object(ai_player, "search_move", side_effect=TimeoutError):
+        game = ai_player.play_ai_move(ai_game)
+
+    assert game.board.count(str(AI_PIECE)) == 1
+    assert game.current_turn == 1
+
+
+@pytest.mark.django_db
+def test_loading_a_game_stuck_on_the_ai_turn_schedules_it_again(ai_game):
+    ai_game.drop_piece(3, ai_game.player_one)
+    client = APIClient()
+    client.force_authenticate(ai_game.player_one)
+    with patch.object(views, "schedule_ai_move") as schedule:
+        assert client.get(f"/api/connect-four/{ai_game.pk}/").status_code == 200
+
+    schedule.assert_called_once()
+    assert schedule.call_args.args[0].pk == ai_game.pk
+
+
+def test_a_game_already_scheduled_is_not_scheduled_twice(ai_game):
+    ai_game.drop_piece(3, ai_game.player_one)
+    with patch.object(ai_player, "get_dispatch_pool") as pool:
+        ai_player.schedule_ai_move(ai_game)
+        assert ai_player.schedule_ai_move(ai_game) is None
+    pool.return_value.submit.assert_called_once()
+    ai_player._in_flight.discard(ai_game.pk)
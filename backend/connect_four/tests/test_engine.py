@@ -0,0 +1,105 @@
+# Filename: connect_four/tests/test_engine.py
+
+# Step 1: Imports
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+
+from connect_four import engine
+from connect_four.models import ConnectFourGame
+
+User = get_user_model()
+
+
+def _play_all(position, cols):
+    won = False
+    for col in cols:
+        won = position.play(col)
+    return won
+
+
+# Step 2: Pure engine tests
+@pytest.mark.parametrize(
+    "cols",
+    [
+        [0, 0, 1, 1, 2, 2, 3],              # horizontal, bottom row
+        [4, 5, 4, 5, 4, 5, 4],              # vertical
+        [0, 1, 1, 2, 2, 3, 2, 3, 3, 6, 3],  # diagonal /
+        [6, 5, 5, 4, 4, 3, 4, 3, 3, 0, 3],  # diagonal \
+    ],
+)
+def test_play_detects_four_in_a_row(cols):
+    position = engine.Position(to_move=1)
+    assert _play_all(position, cols[:-1]) is False
+    assert position.play(cols[-1]) is True
+    assert position.winner() == 1
+
+
+def test_no_wrap_between_columns():
+    # Three in column 0 top + one at the bottom of column 1 must not "wrap".
+    position = engine.Position(to_move=1)
+    for col in [0, 1, 0, 1, 0, 1, 2, 0, 2, 0, 2]:
+        position.play(col)
+    assert position.winner() is None
+
+
+def test_board_round_trip_and_heights():
+    position = engine.Position(to_move=2)
+    _play_all(position, [3, 3, 4])
+    board = engine.to_board(position)
+    assert board[5 * 7 + 3] == "2"
+    assert board[4 * 7 + 3] == "1"
+    assert board[5 * 7 + 4] == "2"
+
+    parsed = engine.from_board(board, to_move=position.to_move)
+    assert parsed.bitboards == position.bitboards
+    assert parsed.heights == position.heights
+    assert parsed.next_row(3) == 3
+
+
+def test_from_board_rejects_floating_piece():
+    board = list(engine.EMPTY_BOARD)
+    board[0] = "1"  # top-left with nothing beneath
+    with pytest.raises(ValueError):
+        engine.from_board("".join(board))
+
+
+def test_undo_restores_position():
+    position = engine.Position()
+    _play_all(position, [3, 2, 3])
+    snapshot = (list(position.bitboards), list(position.heights), position.to_move, position.moves)
+    position.play(4)
+    position.undo(4)
+    assert (position.bitboards, position.heights, position.to_move, position.moves) == snapshot
+
+
+def test_legal_columns_center_first_and_full_column():
+    position = engine.Position()
+    _play_all(position, [3] * 6)
+    assert position.can_play(3) is False
+    assert position.legal_columns() == [2, 4, 1, 5, 0, 6]
+
+
+def test_winning_cells_for_highlight():
+    position = engine.Position(to_move=1)
+    _play_all(position, [0, 0, 1, 1, 2, 2, 3])
+    assert engine.winning_cells(position.bitboards[0]) == [[5, 0], [5, 1], [5, 2], [5, 3]]
+
+
+# Step 3: Model integration
+@pytest.mark.django_db
+def test_drop_piece_persists_board_and_winner():
+    one = User.objects.create_user(email="one@test.com", password="pass1234")
+    two = User.objects.create_user(email="two@test.com", password="pass1234")
+    game = ConnectFourGame.objects.create(player_one=one, player_two=two, current_turn=1)
+
+    for col, user in [(0, one), (0, two), (1, one), (1, two), (2, one), (2, two)]:
+        game.drop_piece(col, user)
+    with pytest.raises(ValidationError):
+        game.drop_piece(3, two)  # not their turn
+
+    game.drop_piece(3, one)
+    game.refresh_from_db()
+    assert game.board[35:] == "1111000"
+    assert game.winner == 1
+    assert game.is_completed is True
@@ -3,10 +3,15 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from channels.layers import get_channel_layer
 from django.core.exceptions import ValidationError
+from django.db import transaction
 
+from .ai import DEFAULT_DIFFICULTY, DIFFICULTIES
 from .models import ConnectFourGame
 from .serializers import ConnectFourGameSerializer
+from .consumers import broadcast_game_update
+from .services.ai_player import schedule_ai_move
 from utils.redis.redis_game_lobby_manager import RedisGameLobbyManager
 from utils.websockets.ws_groups import scoped_lobby_id
 
@@ -28,9 +33,13 @@ def _serialize(game, request_user):
 @permission_classes([IsAuthenticated])
 def create_game(request):
     is_ai = bool(request.data.get("is_ai_game", False))
+    difficulty = request.data.get("ai_difficulty") or DEFAULT_DIFFICULTY
+    if difficulty not in DIFFICULTIES:
+        return Response({"error": "Unknown AI difficulty."}, status=400)
     game = ConnectFourGame.objects.create(
         player_one=request.user,
         is_ai_game=is_ai,
+        ai_difficulty=difficulty,
     )
     data = _serialize(game, request.user)
 
@@ -58,6 +67,10 @@ def game_detail(request, game_id):
         game = ConnectFourGame.objects.get(pk=game_id)
     except ConnectFourGame.DoesNotExist:
         return Response({"error": "Game not found."}, status=404)
+    # Still waiting on the AI (its search was lost): run the turn again; the
+    # board reaches the client over the game socket or the next poll.
+    channel_layer = get_channel_layer()
+    schedule_ai_move(game, on_applied=lambda g: broadcast_game_update(channel_layer, g))
     return Response(_serialize(game, request.user))
 
 
@@ -86,19 +99,28 @@ def join_game(request, game_id):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def make_move(request, game_id):
-    try:
-        game = ConnectFourGame.objects.select_for_update().get(pk=game_id)
-    except ConnectFourGame.DoesNotExist:
-        return Response({"error": "Game not found."}, status=404)
-
     col = request.data.get("col")
     if col is None:
         return Response({"error": "col is required."}, status=400)
 
-    try:
-        col = int(col)
-        game.drop_piece(col, request.user)
-    except (ValidationError, ValueError) as e:
-        return Response({"error": str(e)}, status=400)
+    with transaction.atomic():
+        try:
+            game = ConnectFourGame.objects.select_for_update().get(pk=game_id)
+        except ConnectFourGame.DoesNotExist:
+            return Response({"error": "Game not found."}, status=404)
+
+        try:
+            col = int(col)
+            game.drop_piece(col, request.user)
+        except (ValidationError, ValueError) as e:
+            return Response({"error": str(e)}, status=400)
+
+        # AI reply: searched in the worker pool once the move is committed,
+        # then broadcast to the game group (clients also poll game_detail).
+        if game.is_ai_turn:
+            channel_layer = get_channel_layer()
+            transaction.on_commit(
+                lambda: schedule_ai_move(game, on_applied=lambda g: broadcast_game_update(channel_layer, g))
+            )
 
     return Response(_serialize(game, request.user))
@@ -2,48 +2,32 @@
 
 
 # Step 1: Standard library imports
-import json
+import asyncio
 import logging
 
 # Step 2: Third-party imports
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
 
-# Step 3: Django imports
-from django.contrib.auth import get_user_model
-from django.db.models import Q
+# Step 3: Local imports
+from utils.presence import presence_service
+from utils.presence.presence_service import presence_group
+from utils.websockets.codec import WireCodecMixin
 
-# Step 4: Local imports
-from friends.models import Friendship
-
-User = get_user_model()
 logger = logging.getLogger("friends")
 
 
-
-# Step 1: Use a presence-specific group namespace to avoid collisions with NotificationConsumer
-def _presence_group_name(user_id: int) -> str:
-    """
-    Build the group name used exclusively for presence updates.
-
-    Args:
-        user_id (int): The target user's ID.
-
-    Returns:
-        str: The presence group name.
-    """
-    return f"presence_user_{user_id}"
-
-
-class FriendStatusConsumer(AsyncWebsocketConsumer):
+class FriendStatusConsumer(WireCodecMixin, AsyncWebsocketConsumer):
     """
     WebSocket consumer for tracking and broadcasting user online/offline status.
 
     Responsibilities:
-    - Marks a user as "online" on WebSocket connect
-    - Marks them "offline" on disconnect
-    - Broadcasts status updates to all accepted friends (presence-only groups)
-    - Allows friends to listen for real-time status updates via group subscription
+    - Registers the socket with the presence service on connect (and every
+      heartbeat), and unregisters it on disconnect
+    - Lets friends listen for real-time status updates via their presence group
+
+    Presence lives in Redis (``utils.presence.presence_service``): a user is
+    online while any tab is connected, goes offline only after a grace
+    period, and friends are told once per transition. Connecting runs no SQL.
 
     Important:
     - Presence groups MUST NOT share the same namespace as Notifications/DM groups.
@@ -58,11 +42,12 @@ class FriendStatusConsumer(AsyncWebsocketConsumer):
         1) Reject unauthenticated users.
         2) Accept the socket.
         3) Add user to their presence group.
-        4) Mark user online.
-        5) Broadcast online status to accepted friends.
+        4) Register the socket; friends hear about it only if the user was offline.
+        5) Start the heartbeat.
         """
         # Step 1: Store the authenticated user
         self.user = self.scope["user"]
+        self.heartbeat = None
         logger.debug("[connect] Attempting presence WS connection for user=%s", self.user)
 
         # Step 2: Reject anonymous users
@@ -75,23 +60,22 @@ class FriendStatusConsumer(AsyncWebsocketConsumer):
         await self.accept()
         logger.info("[connect] Presence connection accepted for user_id=%s", self.user.id)
 
-
         # Step 4: Join presence-only group (prevents collisions with NotificationConsumer user_<id>)
-        group_name = _presence_group_name(self.user.id)
+        group_name = presence_group(self.user.id)
         await self.channel_layer.group_add(group_name, self.channel_name)
         logger.debug("[connect] user_id=%s joined presence group=%s", self.user.id, group_name)
 
-        # Step 5: Mark online and notify friends
-        await self.set_user_status("online")
-        await self.broadcast_status_to_friends("online")
+        # Step 5: Register the socket and keep it alive
+        await presence_service.aconnect(self.user.id, self.channel_name)
+        self.heartbeat = asyncio.ensure_future(self.heartbeat_loop())
 
     async def disconnect(self, close_code):
         """
         Called when the WebSocket disconnects.
 
         Steps:
-        1) Mark user offline.
-        2) Broadcast offline status to accepted friends.
+        1) Stop the heartbeat.
+        2) Unregister the socket (the last one starts the offline grace period).
         3) Remove user from their presence group.
         """
         if self.user.is_anonymous:
@@ -99,108 +83,29 @@ class FriendStatusConsumer(AsyncWebsocketConsumer):
 
         logger.info("[disconnect] Presence disconnect for user_id=%s close_code=%s", self.user.id, close_code)
 
-        # Step 1: Mark offline
-        await self.set_user_status("offline")
-
-        # Step 2: Notify friends
-        await self.broadcast_status_to_friends("offline")
+        # Step 1: Stop the heartbeat
+        if getattr(self, "heartbeat", None):
+            self.heartbeat.cancel()
 
+        # Step 2: Unregister the socket
+        await presence_service.adisconnect(self.user.id, self.channel_name)
 
         # Step 3: Leave presence-only group
-        group_name = _presence_group_name(self.user.id)
+        group_name = presence_group(self.user.id)
         await self.channel_layer.group_discard(group_name, self.channel_name)
         logger.debug("[disconnect] user_id=%s removed from presence group=%s", self.user.id, group_name)
 
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         """
         Presence is one-way (server -> client). We ignore inbound messages.
         """
         logger.debug("[receive] Unexpected presence message received: %s", text_data)
 
-    @database_sync_to_async
-    def set_user_status(self, status: str) -> None:
-        """
-        Updates the user's `status` field in the database.
-
-        Args:
-            status (str): "online" or "offline"
-        """
-        logger.debug("[set_user_status] Setting user_id=%s status=%s", self.user.id, status)
-        self.user.status = status
-        self.user.save(update_fields=["status"])
-
-    @database_sync_to_async
-    def get_accepted_friend_ids(self):
-        """
-        Returns a list of user IDs for accepted friends.
-
-        Returns:
-            list[int]: Accepted friend user IDs.
-        """
-        friendships = Friendship.objects.filter(is_accepted=True).filter(
-            Q(from_user=self.user) | Q(to_user=self.user)
-        )
-
-        friend_ids = []
-        for friendship in friendships:
-            if friendship.from_user == self.user:
-                friend_ids.append(friendship.to_user.id)
-            else:
-                friend_ids.append(friendship.from_user.id)
-
-        logger.debug(
-            "[get_accepted_friend_ids] user_id=%s accepted_friends=%s",
-            self.user.id,
-            len(friend_ids),
-        )
-        return friend_ids
-
-    async def broadcast_status_to_friends(self, status: str) -> None:
-        """
-        Sends a `status_update` event to all accepted friends' presence groups.
-
-        Args:
-            status (str): "online" or "offline"
-        """
-        friend_ids = await self.get_accepted_friend_ids()
-
-        for friend_id in friend_ids:
-  
-            # Step 1: Broadcast ONLY to presence group (prevents NotificationConsumer crash)
-            target_group = _presence_group_name(friend_id)
-
-            logger.debug(
-                "[broadcast_status_to_friends] user_id=%s -> friend_id=%s status=%s group=%s",
-                self.user.id,
-                friend_id,
-                status,
-                target_group,
-            )
-
-            await self.channel_layer.group_send(
-                target_group,
-                {
-                    "type": "status_update",
-                    "user_id": self.user.id,
-                    "status": status,
-                },
-            )
-
-    async def status_update(self, event):
-        """
-        Called when another user's status update is sent to this client.
-
-        Args:
-            event (dict): Must include 'user_id' and 'status'.
-        """
-        logger.debug("[status_update] Forwarding status update to client: %s", event)
-
-        await self.send(
-            text_data=json.dumps(
-                {
-                    "type": "status_update",
-                    "user_id": event.get("user_id"),
-                    "status": event.get("status"),
-                }
-            )
-        )
+    async def heartbeat_loop(self):
+        """Refresh this socket's presence entry until it disconnects."""
+        while True:
+            await asyncio.sleep(presence_service.heartbeat_interval())
+            try:
+                await presence_service.aconnect(self.user.id, self.channel_name)
+            except Exception as exc:
+                logger.warning("[heartbeat] user_id=%s presence refresh failed: %s", self.user.id, exc)
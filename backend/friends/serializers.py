@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.db import models
 from django.contrib.auth import get_user_model
+from utils.presence.presence_service import is_online
 from .models import Friendship
 
 User = get_user_model()
@@ -62,8 +63,17 @@ class FriendshipSerializer(serializers.ModelSerializer):
         return other.first_name if other else "Unknown"
 
     def get_friend_status(self, obj):
+        """
+        Live presence from Redis. List views pass the online friend ids in
+        ``context["online_ids"]`` (one lookup for the whole list).
+        """
         other = self._get_other_user(obj)
-        return other.status if other else "offline"
+        if not other:
+            return "offline"
+        online_ids = self.context.get("online_ids")
+        if online_ids is not None:
+            return "online" if other.id in online_ids else "offline"
+        return "online" if is_online(other.id) else "offline"
 
     # ===== Creation logic =====
 
@@ -0,0 +1,17 @@
+# Filename: friends/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utils.presence.presence_service import invalidate_friend_ids
+from .models import Friendship
+
+
+@receiver(post_save, sender=Friendship)
+@receiver(post_delete, sender=Friendship)
+def invalidate_presence_friends(sender, instance, **kwargs):
+    """
+    Drop both users' cached friend ids so presence fan-out follows accepted
+    and removed friendships.
+    """
+    invalidate_friend_ids(instance.from_user_id, instance.to_user_id)
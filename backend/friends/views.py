@@ -5,6 +5,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db import models
 
+from utils.presence.presence_service import online_user_ids
 from .models import Friendship
 from .serializers import FriendshipSerializer
 
@@ -38,7 +39,13 @@ class FriendshipViewset(viewsets.ModelViewSet):
             models.Q(from_user=user) | models.Q(to_user=user),
             is_accepted=True
         ).distinct()
-        serializer = self.get_serializer(friendships, many=True, context={"request": request})
+        friend_ids = [
+            friendship.to_user_id if friendship.from_user_id == user.id else friendship.from_user_id
+            for friendship in friendships
+        ]
+        serializer = self.get_serializer(
+            friendships, many=True, context={"request": request, "online_ids": online_user_ids(friend_ids)},
+        )
         return Response(serializer.data)
 
     @action(detail=False, methods=["get"])
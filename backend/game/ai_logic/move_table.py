@@ -0,0 +1,225 @@
+# Filename: backend/game/ai_logic/move_table.py
+
+"""
+Precomputed Tic-Tac-Toe move tables.
+
+Every reachable board (either marker may open, because game creation
+randomizes the starting turn) is solved exactly once when this module is
+imported. AI turns then become a single dict lookup instead of a fresh
+recursive minimax per move.
+
+Two tables are built:
+    - HARD:   exact, full-depth minimax scores (perfect play).
+    - MEDIUM: the depth-limited (max_depth=3) scores used by the medium AI.
+
+Each table maps ``(board_state, ai_marker)`` to a tuple of ``(index, score)``
+pairs already sorted best-first. Scores are identical to the ones the old
+recursive ``minimax`` functions produced, so move choice is unchanged.
+"""
+
+import logging
+import time
+
+from game.engine import (
+    CELL_MASKS,
+    MARKERS,
+    from_board_state,
+    legal_moves,
+    to_board_state,
+    winner,
+)
+
+logger = logging.getLogger(__name__)
+
+WIN_SCORE = 10
+MEDIUM_MAX_DEPTH = 3
+
+
+def _shrink(score):
+    """Pull a score one step toward zero (a result one ply further away)."""
+    if score > 0:
+        return score - 1
+    if score < 0:
+        return score + 1
+    return 0
+
+
+def _play(own, index):
+    return own | CELL_MASKS[index]
+
+
+def _solve_exact(own, opp, memo):
+    """
+    Exact negamax value for the side to move, whose cells are ``own``.
+
+    Uses the same scale as the original minimax: a win ``k`` plies after the
+    root move scores ``10 - k``, a loss ``k - 10`` and a draw ``0``.
+    """
+    key = (own, opp)
+    cached = memo.get(key)
+    if cached is not None:
+        return cached
+
+    best = max(_exact_move_score(own, opp, i, memo) for i in legal_moves(own, opp))
+    memo[key] = best
+    return best
+
+
+def _exact_move_score(own, opp, index, memo):
+    """Exact score of the side to move playing ``index`` (root-move semantics)."""
+    own = _play(own, index)
+    outcome = winner(own, opp)
+    if outcome == "X":  # ``own`` sits in the X slot of winner()
+        return WIN_SCORE
+    if outcome == "D":
+        return 0
+    return _shrink(-_solve_exact(opp, own, memo))
+
+
+def _limited_value(ai, human, depth, is_maximizing, memo):
+    """
+    Depth-limited minimax value, identical to the old ``minimax(max_depth=3)``.
+
+    Memoized on (board, depth, side) so the whole medium table costs a few
+    thousand node visits instead of a full search per position.
+    """
+    key = (ai, human, depth, is_maximizing)
+    cached = memo.get(key)
+    if cached is not None:
+        return cached
+
+    outcome = winner(ai, human)
+    if outcome == "X":  # ``ai`` sits in the X slot of winner()
+        value = WIN_SCORE - depth
+    elif outcome == "O":
+        value = depth - WIN_SCORE
+    elif outcome == "D" or depth >= MEDIUM_MAX_DEPTH:
+        value = 0
+    elif is_maximizing:
+        value = max(
+            _limited_value(_play(ai, i), human, depth + 1, False, memo)
+            for i in legal_moves(ai, human)
+        )
+    else:
+        value = min(
+            _limited_value(ai, _play(human, i), depth + 1, True, memo)
+            for i in legal_moves(ai, human)
+        )
+
+    memo[key] = value
+    return value
+
+
+def _reachable_positions():
+    """
+    Enumerate every non-terminal position reachable from an empty board with
+    either marker opening, as ``(mover_mask, waiting_mask)`` pairs.
+
+    Because either marker may open, the set is the same whichever marker is
+    moving, so only the masks matter here.
+    """
+    seen = set()
+    stack = [(0, 0)]
+    while stack:
+        own, opp = stack.pop()
+        if (own, opp) in seen or winner(own, opp) is not None:
+            continue
+        seen.add((own, opp))
+        for i in legal_moves(own, opp):
+            stack.append((opp, _play(own, i)))
+    return seen
+
+
+def _ranked(scored_moves):
+    # Stable sort keeps the lowest index first among equal scores, matching
+    # the tie-breaking of the original loops.
+    return tuple(sorted(scored_moves, key=lambda pair: pair[1], reverse=True))
+
+
+def _masks_for(board_state, ai_marker):
+    x_mask, o_mask = from_board_state(board_state)
+    return (x_mask, o_mask) if ai_marker == "X" else (o_mask, x_mask)
+
+
+def rank_moves_exact(board_state, ai_marker, memo=None):
+    """Return ``((index, score), ...)`` best-first using full-depth minimax."""
+    return _rank_exact(*_masks_for(board_state, ai_marker), {} if memo is None else memo)
+
+
+def rank_moves_limited(board_state, ai_marker, memo=None):
+    """Return ``((index, score), ...)`` best-first using depth-limited minimax."""
+    return _rank_limited(*_masks_for(board_state, ai_marker), {} if memo is None else memo)
+
+
+def _rank_exact(ai, human, memo):
+    return _ranked((i, _exact_move_score(ai, human, i, memo)) for i in legal_moves(ai, human))
+
+
+def _rank_limited(ai, human, memo):
+    return _ranked(
+        (i, _limited_value(_play(ai, i), human, 0, False, memo)) for i in legal_moves(ai, human)
+    )
+
+
+def build_move_tables():
+    """
+    Solve every reachable position once.
+
+    The search runs on (mover, waiting) masks, so one solve serves both
+    markers: the 'X'-to-move and 'O'-to-move entries are just the two ways of
+    writing the same masks back out as a ``board_state`` string.
+
+    Returns:
+        tuple: (hard_table, medium_table), both keyed by (board_state, ai_marker).
+    """
+    started = time.perf_counter()
+    exact_memo = {}
+    limited_memo = {}
+    hard_table = {}
+    medium_table = {}
+
+    for ai, human in _reachable_positions():
+        hard_ranked = _rank_exact(ai, human, exact_memo)
+        medium_ranked = _rank_limited(ai, human, limited_memo)
+
+        for ai_marker in MARKERS:
+            board_state = to_board_state(ai, human) if ai_marker == "X" else to_board_state(human, ai)
+            hard_table[(board_state, ai_marker)] = hard_ranked
+            medium_table[(board_state, ai_marker)] = medium_ranked
+
+    logger.debug(
+        "Built Tic-Tac-Toe move tables: %s positions in %.1f ms",
+        len(hard_table),
+        (time.perf_counter() - started) * 1000,
+    )
+    return hard_table, medium_table
+
+
+HARD_TABLE, MEDIUM_TABLE = build_move_tables()
+
+
+def lookup_ranked_moves(board_state, ai_marker, hard=True):
+    """
+    Ranked moves for ``ai_marker`` on ``board_state``.
+
+    Falls back to solving on demand for boards outside the reachable set
+    (e.g. hand-edited rows), so callers never get a KeyError.
+
+    Args:
+        board_state (str): 9-character board string.
+        ai_marker (str): Marker the AI is about to place.
+        hard (bool): True for perfect play, False for the medium table.
+
+    Returns:
+        tuple: ``((index, score), ...)`` best-first; empty if no move exists.
+    """
+    table = HARD_TABLE if hard else MEDIUM_TABLE
+    ranked = table.get((board_state, ai_marker))
+    if ranked is not None:
+        return ranked
+
+    if winner(*from_board_state(board_state)) is not None:
+        return ()
+    if hard:
+        return rank_moves_exact(board_state, ai_marker)
+    return rank_moves_limited(board_state, ai_marker)
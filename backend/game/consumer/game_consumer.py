@@ -4,19 +4,23 @@ import logging
 import time
 import random
 from urllib.parse import parse_qs
-from django.apps import apps
 
-from asgiref.sync import async_to_sync
-from channels.generic.websocket import JsonWebsocketConsumer
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.core.exceptions import ValidationError
 from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework.exceptions import PermissionDenied as DRFPermissionDenied
 from rest_framework.exceptions import ValidationError as DRFValidationError
 
+from game import engine
 from invites.guards import validate_invite_for_lobby_join
+from game.services.game_update_bus import apublish, delta_event
+from utils.game.event_log import aappend_event, alatest_seq, areplay_since, parse_since, since_from_scope
 from utils.game.game_utils import GameUtils
+from utils.game.hot_game_state import GameState, aapply_move, aget_game_state, persist_game_state
 from utils.redis.redis_game_lobby_manager import RedisGameLobbyManager
 from utils.shared.shared_utils_game_chat import SharedUtils
+from utils.websockets.codec import MSGPACK_SUBPROTOCOL, WireCodecMixin
 from utils.websockets.ws_groups import game_group, scoped_lobby_id
 
 # GameConsumer is permanently and exclusively Tic-Tac-Toe (route ws/game/<id>/,
@@ -62,12 +66,29 @@ def _extract_drf_validation_message(exc: DRFValidationError) -> str:
 
     return str(exc)
 
-class GameConsumer(JsonWebsocketConsumer):
+class GameConsumer(WireCodecMixin, AsyncJsonWebsocketConsumer):
     """
     WebSocket consumer for managing game-specific functionality.
+
+    Runs on the event loop: games are read with the async ORM (players
+    joined in), writes run in ``database_sync_to_async`` sections and Redis
+    goes through the lobby manager's async twins.
+
+    Gameplay (connect snapshot, sync, moves) works on the game's hot state in
+    Redis (``utils.game.hot_game_state``); the row is written behind.
+
+    Group events go through ``utils.game.event_log`` first and carry a
+    ``seq``; clients resume with ``?since=<seq>`` (or ``sync_state`` +
+    ``since``) and get only what they missed.
+
+    Frames are encoded by ``utils.websockets.codec``: orjson text, or msgpack
+    for clients that offer the ``msgpack`` subprotocol.
     """
 
-    def _accept_and_close(self, code: int) -> None:
+    # Binary msgpack frames for clients that offer the subprotocol.
+    wire_subprotocols = (MSGPACK_SUBPROTOCOL,)
+
+    async def _accept_and_close(self, code: int) -> None:
         """
         Accept then close so the client (and Channels tests) receive close codes.
 
@@ -75,10 +96,10 @@ class GameConsumer(JsonWebsocketConsumer):
             code: WebSocket close code.
         """
         # Step 1: Accept handshake so close frame is actually emitted
-        self.accept()
-        self.close(code=code)
+        await self.accept()
+        await self.close(code=code)
         
-    def connect(self) -> None:
+    async def connect(self) -> None:
         """
         Game WebSocket connect for a specific game.
 
@@ -91,7 +112,7 @@ class GameConsumer(JsonWebsocketConsumer):
         # Step 1: Extract game_id and derive GAME group name (not lobby group)
         raw_game_id = self.scope.get("url_route", {}).get("kwargs", {}).get("game_id")
         if not raw_game_id:
-            self._accept_and_close(code=4002)
+            await self._accept_and_close(code=4002)
             return
 
         self.game_id = str(raw_game_id)
@@ -102,7 +123,7 @@ class GameConsumer(JsonWebsocketConsumer):
         # Step 2: Authenticate user
         self.user = SharedUtils.authenticate_user(self.scope)
         if not self.user:
-            self._accept_and_close(code=4001)
+            await self._accept_and_close(code=4001)
             return
 
         # Step 3: Parse query string (Game WS requires sessionKey + lobbyId)
@@ -126,7 +147,7 @@ class GameConsumer(JsonWebsocketConsumer):
                 "[GAME_CONNECT] invite provided on game ws (reject). game_id=%s lobby_id=%s user_id=%s",
                 self.game_id, lobby_id, getattr(self.user, "id", None),
             )
-            self._accept_and_close(code=4003)  # protocol violation
+            await self._accept_and_close(code=4003)  # protocol violation
             return
 
         if not lobby_id or not session_key:
@@ -134,7 +155,7 @@ class GameConsumer(JsonWebsocketConsumer):
                 "[GAME_CONNECT] missing lobby/sessionKey. game_id=%s lobby_id=%s user_id=%s",
                 self.game_id, lobby_id, getattr(self.user, "id", None),
             )
-            self._accept_and_close(code=4404)
+            await self._accept_and_close(code=4404)
             return
 
         self.lobby_id = str(lobby_id)
@@ -146,7 +167,7 @@ class GameConsumer(JsonWebsocketConsumer):
                 "[GAME_CONNECT] lobby/game mismatch (reject). game_id=%s lobby_id=%s user_id=%s",
                 self.game_id, self.lobby_id, self.user.id,
             )
-            self._accept_and_close(code=4409)
+            await self._accept_and_close(code=4409)
             return
 
         # Step 4: Initialize Redis manager
@@ -155,7 +176,7 @@ class GameConsumer(JsonWebsocketConsumer):
         # Step 5: Validate sessionKey + allow-list membership
         self.redis_scope_id = scoped_lobby_id(GAME_TYPE, self.lobby_id)
         try:
-            is_valid = self.game_lobby_manager.validate_session_key(
+            is_valid = await self.game_lobby_manager.avalidate_session_key(
                 lobby_id=self.redis_scope_id,
                 session_key=str(session_key),
                 user_id=self.user.id,
@@ -165,7 +186,7 @@ class GameConsumer(JsonWebsocketConsumer):
                 "[GAME_CONNECT] session validation error. lobby_id=%s user_id=%s err=%s",
                 self.lobby_id, self.user.id, exc,
             )
-            self._accept_and_close(code=4500)
+            await self._accept_and_close(code=4500)
             return
 
         if not is_valid:
@@ -173,44 +194,31 @@ class GameConsumer(JsonWebsocketConsumer):
                 "[GAME_CONNECT] invalid/expired session. lobby_id=%s user_id=%s",
                 self.lobby_id, self.user.id,
             )
-            self._accept_and_close(code=4408)
+            await self._accept_and_close(code=4408)
             return
 
-        # Optional: refresh allow-list TTL (best effort)
-        try:
-            self.game_lobby_manager.add_user_to_session(self.redis_scope_id, self.user.id)
-        except Exception:
-            pass
-
         # Step 6: Join GAME group + accept
-        async_to_sync(self.channel_layer.group_add)(self.game_group_name, self.channel_name)
-        self.accept()
+        await self.channel_layer.group_add(self.game_group_name, self.channel_name)
+        await self.accept()
 
-        # Step 7: Load game + determine role (needed for move validation)
+        # Step 7: Load hot game state + determine role (needed for move validation)
         try:
-            self.game = GameUtils.get_game_instance(game_id=self.game_id)
+            self.game = await aget_game_state(self.game_id)
         except Exception as exc:
             logger.error("[GAME_CONNECT] failed to load game. game_id=%s err=%s", self.game_id, exc)
-            self.send_json({"type": "error", "message": "Failed to load game."})
-            self.close(code=4500)
+            await self.send_json({"type": "error", "message": "Failed to load game."})
+            await self.close(code=4500)
             return
 
         # (Optional) compute role for local validation (no Redis roster broadcasting here)
-        self.role = "Spectator"
-        try:
-            GameModel = apps.get_model("game", "Game")
-            game = GameModel.objects.only("player_x_id", "player_o_id").get(id=self.game_id)
-            if game.player_x_id == self.user.id:
-                self.role = "X"
-            elif game.player_o_id == self.user.id:
-                self.role = "O"
-        except Exception:
-            pass
-
-        # Step 8: Send authoritative snapshot immediately
-        self.send_game_state_snapshot(reason="connect")
-
-    def receive_json(self, content: dict, **kwargs) -> None:
+        self.role = self.game.marker_for(self.user.id) or "Spectator"
+
+        # Step 8: Replay what a reconnecting client missed, else send the snapshot
+        if await areplay_since(self, GAME_TYPE, self.game_id, since_from_scope(self.scope)):
+            return
+        await self.send_game_state_snapshot(reason="connect")
+
+    async def receive_json(self, content: dict, **kwargs) -> None:
         """
         Handle incoming gameplay-related messages from the WebSocket client.
         """
@@ -219,7 +227,7 @@ class GameConsumer(JsonWebsocketConsumer):
         # Step 2: Validate structure + enforce allowed message types (gameplay only)
         if not SharedUtils.validate_message(content, allowed_types=GAME_ALLOWED_TYPES):
             # IMPORTANT: Do NOT close for bad client payload; just respond
-            self.send_json({"type": "error", "message": "Invalid message payload/type (gameplay socket)."})
+            await self.send_json({"type": "error", "message": "Invalid message payload/type (gameplay socket)."})
             return
 
         # Step 3: Normalize message type
@@ -237,70 +245,81 @@ class GameConsumer(JsonWebsocketConsumer):
 
         if requires_game and not getattr(self, "game", None):
             try:
-                self.game = GameUtils.get_game_instance(game_id=self.game_id)
+                self.game = await aget_game_state(self.game_id)
             except Exception as exc:
                 logger.error("Failed to fetch game instance in receive_json: %s", exc)
-                self.send_json({"type": "error", "message": "Unable to fetch game instance."})
+                await self.send_json({"type": "error", "message": "Unable to fetch game instance."})
                 return
 
         # Step 5: Route gameplay-only messages
         try:
             if message_type == "sync_state":
-                self.handle_sync_state()
+                await self.handle_sync_state(content)
                 return
 
             if message_type == "move":
-                self.handle_move(content)
+                await self.handle_move(content)
                 return
 
             if message_type == "rematch_request":
-                self.handle_rematch_request()
+                await self.handle_rematch_request()
                 return
 
             if message_type == "rematch_accept":
-                self.handle_rematch_accept()
+                await self.handle_rematch_accept()
                 return
 
             if message_type == "rematch_decline":
-                self.handle_rematch_decline()
+                await self.handle_rematch_decline()
                 return
 
             if message_type == "rematch_timeout":
-                self.handle_rematch_timeout()
+                await self.handle_rematch_timeout()
                 return
 
             # Should be unreachable due to allowed_types enforcement
-            self.send_json({"type": "error", "message": "Unsupported gameplay message type."})
+            await self.send_json({"type": "error", "message": "Unsupported gameplay message type."})
             return
 
         except Exception as exc:
             logger.error("Unexpected error in GameConsumer: %s", exc)
-            self.send_json({"type": "error", "message": "Server error handling game message."})
+            await self.send_json({"type": "error", "message": "Server error handling game message."})
             return
 
-    def send_game_state_snapshot(self, reason: str = "unknown") -> None:
+    async def send_game_state_snapshot(self, reason: str = "unknown") -> None:
         """
         Sends authoritative game state snapshot to THIS client.
         """
         # You can either implement GameUtils.serialize_game_state(...) or inline fields.
         snapshot = GameUtils.serialize_game_state(self.game)
 
-        self.send_json(
+        await self.send_json(
             {
                 "type": "game_state",
                 "reason": reason,          # "connect" | "sync_state"
                 "gameId": str(self.game_id),
+                "seq": await alatest_seq(GAME_TYPE, self.game_id),
                 **snapshot,
             }
         )
 
-    def game_start_acknowledgment(self, event: dict) -> None:
+    async def handle_sync_state(self, content: dict | None = None) -> None:
+        """
+        Re-send what the client missed (``since``), or the authoritative snapshot.
+        """
+        since = parse_since((content or {}).get("since"))
+        if await areplay_since(self, GAME_TYPE, self.game_id, since):
+            return
+        self.game = await aget_game_state(self.game_id)
+        await self.send_game_state_snapshot(reason="sync_state")
+
+    async def game_start_acknowledgment(self, event: dict) -> None:
         """
         Handle the game_start_acknowledgment group event.
         """
         logger.info("Broadcasting game start acknowledgment: %s", event)
 
-        self.send_json(
+        await self.send_json(
             {
                 "type": "game_start_acknowledgment",
                 "message": event["message"],
@@ -309,7 +328,7 @@ class GameConsumer(JsonWebsocketConsumer):
             }
         )
 
-    def handle_move(self, content: dict) -> None:
+    async def handle_move(self, content: dict) -> None:
         """
         Handle a move made by a player and broadcast the updated game state.
         """
@@ -319,72 +338,74 @@ class GameConsumer(JsonWebsocketConsumer):
 
         # Step 2: Validate position
         if position is None:
-            self.send_json({"type": "error", "message": "Invalid move: Position is missing."})
+            await self.send_json({"type": "error", "message": "Invalid move: Position is missing."})
             return
 
         if not isinstance(position, int) or not (0 <= position < 9):
-            self.send_json({"type": "error", "message": "Invalid move: Position must be an integer between 0 and 8."})
+            await self.send_json({"type": "error", "message": "Invalid move: Position must be an integer between 0 and 8."})
             return
 
-        # Step 3: Fetch game instance
+        # Step 3: Determine marker (X/O) from the hot state (no SQL)
         try:
-            game = GameUtils.get_game_instance(game_id=self.game_id)
+            state = await aget_game_state(self.game_id)
         except ValueError as exc:
-            self.send_json({"type": "error", "message": str(exc)})
+            await self.send_json({"type": "error", "message": str(exc)})
             return
 
-        # Step 4: Determine marker (X/O)
-        if user == game.player_x:
-            player_marker = "X"
-        elif user == game.player_o:
-            player_marker = "O"
-        else:
-            self.send_json({"type": "error", "message": "You are not a participant in this game."})
+        player_marker = state.marker_for(getattr(user, "id", None))
+        if player_marker is None:
+            await self.send_json({"type": "error", "message": "You are not a participant in this game."})
             return
 
         logger.info("Player %s (%s) made a move at position %s", user.first_name, player_marker, position)
 
-        # Step 5: Apply move
+        # Step 4: Apply move in Redis (the AI's reply, if any, lands in the same write)
         try:
-            game.make_move(position=position, player=player_marker)
-            game.refresh_from_db()
+            state = await aapply_move(self.game_id, position, player_marker)
         except (DjangoValidationError, DRFValidationError) as exc:
-            self.send_json({"type": "error", "message": str(exc) or "Invalid move."})
+            await self.send_json({"type": "error", "message": str(exc) or "Invalid move."})
             return
         except Exception as exc:
             logger.error("Unexpected error applying move: %s", exc)
-            self.send_json({"type": "error", "message": "Server error applying move."})
+            await self.send_json({"type": "error", "message": "Server error applying move."})
             return
+        self.game = state
 
-        # Step 6: Normalize winner to JSON-safe primitive
-        winner_value = getattr(game, "winner", None)
-        if hasattr(winner_value, "id"):
-            winner_value = winner_value.id
+        # Step 5: A finished game is written through before anyone can ask for a rematch
+        if state.is_completed:
+            try:
+                await database_sync_to_async(persist_game_state)(self.game_id, evict=True)
+            except Exception as exc:
+                logger.error("[TTT_STATE] could not persist finished game_id=%s err=%s", self.game_id, exc)
 
-        # Step 7: Broadcast game update to GAME group (not lobby)
-        async_to_sync(self.channel_layer.group_send)(
-            self.game_group_name,
-            {
-                "type": "game_update",
-                "game_id": str(game.id),
-                "board_state": game.board_state,
-                "current_turn": game.current_turn,
-                "winner": winner_value,
-                "is_completed": getattr(game, "is_completed", False),
-                "winning_combination": getattr(game, "winning_combination", []),
-            },
+        # Step 6: One delta event to the GAME group (not lobby), logged first.
+        # Live games are mirrored by the write-behind; a finished one is not hot any more.
+        await apublish(
+            delta_event(
+                self.game_id,
+                state.last_moves,
+                state.current_turn,
+                state.winner,
+                state.is_completed,
+                version=state.version,
+            ),
+            mirror=state.is_completed,
         )
 
         logger.info(
             "[BROADCAST] game_update -> group=%s game_id=%s board=%s turn=%s winner=%s",
             self.game_group_name,
-            game.id,
-            game.board_state,
-            game.current_turn,
-            game.winner,
+            self.game_id,
+            state.board_state,
+            state.current_turn,
+            state.winner,
         )
 
-    def update_player_list(self, event: dict) -> None:
+    async def _broadcast_logged(self, event: dict) -> None:
+        """Append a group event to the game's log, then send it to the game group."""
+        await self.channel_layer.group_send(self.game_group_name, await aappend_event(GAME_TYPE, self.game_id, event))
+
+    async def update_player_list(self, event: dict) -> None:
         """
         Handle the update_player_list event for the game lobby.
 
@@ -398,72 +419,49 @@ class GameConsumer(JsonWebsocketConsumer):
 
         logger.debug("GameConsumer processing update_player_list event: %s", validated_players)
 
-        self.send_json({"type": "update_player_list", "players": validated_players})
+        await self.send_json({"type": "update_player_list", "players": validated_players})
         logger.info("GameConsumer sent updated player list: %s", validated_players)
 
-    def game_update(self, event: dict) -> None:
+    async def game_update(self, event: dict) -> None:
         """
         Send the updated game state to this client.
 
-        Key rule:
-        - Always deliver the core update from the event payload.
-        - Enrichment (player info / AI labels) is best-effort only.
+        Group events are deltas from ``game.services.game_update_bus``. This
+        socket's copy of the hot state is brought up to date (or re-read from
+        Redis after a gap or a direct row write), and the client gets the
+        full board as before. No database access.
         """
-        logger.info("Received game update event: %s", event)
-
-        # Step 1: Validate required keys (core contract)
-        required_keys = ["board_state", "current_turn", "winner"]
-        if not all(key in event for key in required_keys):
-            logger.error("Missing keys in event: %s", event)
-            self.send_json({"type": "error", "message": "Invalid game update payload."})
-            return
-
-        # Step 2: Start with core payload (never depends on DB)
-        payload = {
-            "type": "game_update",
-            "game_id": str(event.get("game_id", getattr(self, "game_id", ""))),
-            "board_state": event["board_state"],
-            "current_turn": event["current_turn"],
-            "winner": event["winner"],
-            "is_completed": event.get("is_completed", False),
-            "winning_combination": event.get("winning_combination", []),
-            # Enrichment defaults
-            "player_role": None,
-            "player_x": None,
-            "player_o": None,
-        }
-
-        # Step 3: Best-effort enrichment (safe fallback if GameUtils fails)
-        try:
-            game = GameUtils.get_game_instance(self.game_id)
-
-            ai_user = None
-            if getattr(game, "is_ai_game", False):
-                ai_user = self.get_ai_user()
-
-            payload["is_completed"] = getattr(game, "is_completed", payload["is_completed"])
-            payload["player_role"] = GameUtils.determine_player_role(user=self.user, game=game)
-
-            if getattr(game, "player_x", None):
-                payload["player_x"] = {"id": game.player_x.id, "first_name": game.player_x.first_name}
+        # Step 1: Apply the delta, or reload
+        state = getattr(self, "game", None)
+        if not isinstance(state, GameState) or not state.apply_delta(event):
+            try:
+                state = await aget_game_state(self.game_id)
+            except Exception as exc:
+                logger.error("game_update could not load game state: %s", exc)
+                await self.send_json({"type": "error", "message": "Invalid game update payload."})
+                return
+        self.game = state
 
-            payload["player_o"] = {
-                "id": game.player_o.id if game.player_o else None,
-                "first_name": (
-                    "AI"
-                    if getattr(game, "is_ai_game", False) and ai_user and game.player_o == ai_user
-                    else (game.player_o.first_name if game.player_o else "Waiting...")
-                ),
+        # Step 2: Full client payload from the state
+        x_mask, o_mask = engine.from_board_state(state.board_state)
+        players = state.players()
+        await self.send_json(
+            {
+                "type": "game_update",
+                "game_id": str(self.game_id),
+                "board_state": state.board_state,
+                "current_turn": state.current_turn,
+                "winner": state.winner,
+                "is_completed": state.is_completed,
+                "winning_combination": engine.winning_line(x_mask, o_mask),
+                "seq": event.get("seq"),
+                "player_role": state.marker_for(getattr(self.user, "id", None)) or "Spectator",
+                "player_x": players["player_x"],
+                "player_o": players["player_o"] or {"id": None, "first_name": "Waiting..."},
             }
-        except Exception as exc:
-            # Important: do NOT block the update if enrichment fails
-            logger.warning("game_update enrichment skipped: %s", exc)
-
-        # Step 4: Send the update
-        self.send_json(payload)
-        logger.info("Game update sent successfully.")
+        )
 
-    def handle_rematch_request(self) -> None:
+    async def handle_rematch_request(self) -> None:
         """
         Handle when a player initiates a rematch request.
 
@@ -490,15 +488,15 @@ class GameConsumer(JsonWebsocketConsumer):
         game_group_name = getattr(self, "game_group_name", None)
         if not game_group_name:
             logger.error("[REMATCH][REQUEST] Missing game_group_name on GameConsumer. game_id=%s", self.game_id)
-            self.send_json({"type": "error", "message": "Unable to process rematch request (socket not ready)."})
+            await self.send_json({"type": "error", "message": "Unable to process rematch request (socket not ready)."})
             return
 
         # Step 1: Load the game from DB (authoritative mapping)
         try:
-            game = GameUtils.get_game_instance(game_id=self.game_id)
+            game = await GameUtils.aget_game_instance(game_id=self.game_id)
         except Exception as exc:
             logger.error("[REMATCH][REQUEST] Failed to fetch game: %s", exc)
-            self.send_json({"type": "error", "message": "Unable to process rematch request."})
+            await self.send_json({"type": "error", "message": "Unable to process rematch request."})
             return
 
         logger.info(
@@ -517,7 +515,7 @@ class GameConsumer(JsonWebsocketConsumer):
                 self.game_id,
                 self.user.id,
             )
-            self.send_json({"type": "error", "message": "Rematch is only available after the game ends."})
+            await self.send_json({"type": "error", "message": "Rematch is only available after the game ends."})
             return
 
         # Step 3: Ensure both players exist
@@ -527,7 +525,7 @@ class GameConsumer(JsonWebsocketConsumer):
                 self.game_id,
                 self.user.id,
             )
-            self.send_json({"type": "error", "message": "Both players must be present to rematch."})
+            await self.send_json({"type": "error", "message": "Both players must be present to rematch."})
             return
 
         # Step 4: Determine requester role via DB mapping (stable)
@@ -535,7 +533,7 @@ class GameConsumer(JsonWebsocketConsumer):
             requester_role = GameUtils.determine_player_role(user=self.user, game=game)
         except Exception as exc:
             logger.error("[REMATCH][REQUEST] Failed to determine role: %s", exc)
-            self.send_json({"type": "error", "message": "Unable to determine player role."})
+            await self.send_json({"type": "error", "message": "Unable to determine player role."})
             return
 
         logger.info(
@@ -550,7 +548,7 @@ class GameConsumer(JsonWebsocketConsumer):
                 self.user.id,
                 requester_role,
             )
-            self.send_json(
+            await self.send_json(
                 {"type": "error", "message": "Only players assigned as X or O may request a rematch."}
             )
             return
@@ -558,26 +556,39 @@ class GameConsumer(JsonWebsocketConsumer):
         # Step 5: Determine receiver user (the other player)
         receiver_user = game.player_o if requester_role == "X" else game.player_x
 
-        # Step 6: Dedupe — if an offer is already pending, resync broadcast
+        # Step 6: Build offer payload (authoritative)
+        offer = {
+            "rematchRequestedBy": requester_role,
+            "requesterUserId": int(self.user.id),
+            "receiverUserId": int(receiver_user.id),
+            "createdAtMs": int(time.time() * 1000),
+            "message": f"{self.user.first_name} wants a rematch!",
+            "isRematchOfferVisible": True,
+            "rematchPending": True,
+        }
+
+        # Step 7: Store offer with TTL unless one is pending (one atomic round trip)
         try:
-            existing_offer = self.game_lobby_manager.get_rematch_offer(str(self.game_id))
+            existing_offer = await self.game_lobby_manager.aoffer_rematch(str(self.game_id), offer)
         except Exception as exc:
-            logger.error("[REMATCH][REQUEST] Failed reading existing offer from Redis: %s", exc)
-            existing_offer = None
+            logger.error("[REMATCH][REQUEST] Failed storing offer in Redis: %s", exc)
+            await self.send_json({"type": "error", "message": "Unable to store rematch offer."})
+            return
 
         logger.info(
             "[REMATCH][REQUEST][REDIS] existing_offer_present=%s",
-            bool(existing_offer),
+            existing_offer is not None,
         )
 
-        if existing_offer:
+        # Step 8: Dedupe — if an offer was already pending, resync broadcast
+        if existing_offer is not None:
             logger.info(
                 "[REMATCH][REQUEST] Duplicate request -> resync broadcast. game_id=%s user_id=%s",
                 self.game_id,
                 self.user.id,
             )
 
-            # Step 6.1: Normalize fields and enforce visibility/pending flags
+            # Step 8.1: Normalize fields and enforce visibility/pending flags
             resync = {
                 "type": "rematch_offer_broadcast",
                 "game_id": str(self.game_id),
@@ -589,7 +600,7 @@ class GameConsumer(JsonWebsocketConsumer):
 
             try:
                 # ✅ Broadcast on GAME group (not lobby group)
-                async_to_sync(self.channel_layer.group_send)(game_group_name, resync)
+                await self._broadcast_logged(resync)
                 logger.info(
                     "[REMATCH][REQUEST] Resync broadcast sent. game_id=%s group=%s",
                     self.game_id,
@@ -603,36 +614,17 @@ class GameConsumer(JsonWebsocketConsumer):
                 )
             return
 
-        # Step 7: Build offer payload (authoritative)
-        offer = {
-            "rematchRequestedBy": requester_role,
-            "requesterUserId": int(self.user.id),
-            "receiverUserId": int(receiver_user.id),
-            "createdAtMs": int(time.time() * 1000),
-            "message": f"{self.user.first_name} wants a rematch!",
-            "isRematchOfferVisible": True,
-            "rematchPending": True,
-        }
-
-        # Step 8: Store offer in Redis with TTL
-        try:
-            self.game_lobby_manager.store_rematch_offer(str(self.game_id), offer)
-            logger.info(
-                "[REMATCH][REQUEST] Stored offer. game_id=%s requested_by=%s requester_user_id=%s receiver_user_id=%s",
-                self.game_id,
-                requester_role,
-                self.user.id,
-                receiver_user.id,
-            )
-        except Exception as exc:
-            logger.error("[REMATCH][REQUEST] Failed storing offer in Redis: %s", exc)
-            self.send_json({"type": "error", "message": "Unable to store rematch offer."})
-            return
+        logger.info(
+            "[REMATCH][REQUEST] Stored offer. game_id=%s requested_by=%s requester_user_id=%s receiver_user_id=%s",
+            self.game_id,
+            requester_role,
+            self.user.id,
+            receiver_user.id,
+        )
 
         # Step 9: Broadcast offer to GAME group
         try:
-            async_to_sync(self.channel_layer.group_send)(
-                game_group_name,
+            await self._broadcast_logged(
                 {
                     "type": "rematch_offer_broadcast",
                     "game_id": str(self.game_id),
@@ -651,9 +643,9 @@ class GameConsumer(JsonWebsocketConsumer):
                 exc,
             )
             # Socket-safe: do not crash connection
-            self.send_json({"type": "error", "message": "Failed to broadcast rematch offer."})
+            await self.send_json({"type": "error", "message": "Failed to broadcast rematch offer."})
 
-    def rematch_offer_broadcast(self, event: dict) -> None:
+    async def rematch_offer_broadcast(self, event: dict) -> None:
         """
         Send a rematch_offer payload to this client.
 
@@ -690,7 +682,7 @@ class GameConsumer(JsonWebsocketConsumer):
             # Step 2: Optional role compute (safe)
             player_role = None
             try:
-                game = GameUtils.get_game_instance(game_id=self.game_id)
+                game = await GameUtils.aget_game_instance(game_id=self.game_id)
                 player_role = GameUtils.determine_player_role(user=self.user, game=game)
             except Exception:
                 player_role = None
@@ -709,10 +701,11 @@ class GameConsumer(JsonWebsocketConsumer):
                 "createdAtMs": event.get("createdAtMs"),
                 "isRematchOfferVisible": event.get("isRematchOfferVisible", True),
                 "rematchPending": event.get("rematchPending", True),
+                "seq": event.get("seq"),
             }
 
             # Step 4: Send to this client
-            self.send_json(payload)
+            await self.send_json(payload)
 
             logger.info(
                 "[REMATCH][OFFER_SENT] to_user_id=%s ui_mode=%s requester_user_id=%s receiver_user_id=%s requested_by=%s game_id=%s",
@@ -726,9 +719,9 @@ class GameConsumer(JsonWebsocketConsumer):
 
         except Exception as exc:
             logger.error("[REMATCH][OFFER_SENT][ERROR] %s", exc)
-            SharedUtils.send_error(self, "Failed to deliver rematch offer.")
+            await SharedUtils.async_send_error(self, "Failed to deliver rematch offer.")
 
-    def handle_rematch_accept(self) -> None:
+    async def handle_rematch_accept(self) -> None:
         """
         Handle when the receiver accepts a rematch.
 
@@ -748,18 +741,18 @@ class GameConsumer(JsonWebsocketConsumer):
         # Step 0: Ensure correct broadcast group exists
         game_group_name = getattr(self, "game_group_name", None)
         if not game_group_name:
-            SharedUtils.send_error(self, "Game socket not ready for rematch.")
+            await SharedUtils.async_send_error(self, "Game socket not ready for rematch.")
             return
 
         # Step 1: Preview offer WITHOUT deleting (prevents wrong-user click deleting state)
         try:
-            offer_preview = self.game_lobby_manager.get_rematch_offer(str(self.game_id))
+            offer_preview = await self.game_lobby_manager.aget_rematch_offer(str(self.game_id))
         except Exception as exc:
             logger.error("[REMATCH][ACCEPT] Failed reading offer preview from Redis: %s", exc)
             offer_preview = None
 
         if not offer_preview:
-            SharedUtils.send_error(self, "No pending rematch offer found.")
+            await SharedUtils.async_send_error(self, "No pending rematch offer found.")
             return
 
         # Step 1.1: Validate receiver (int-safe)
@@ -775,35 +768,35 @@ class GameConsumer(JsonWebsocketConsumer):
             my_user_id = None
 
         if receiver_user_id is not None and my_user_id != receiver_user_id:
-            SharedUtils.send_error(self, "Only the other player may accept this rematch.")
+            await SharedUtils.async_send_error(self, "Only the other player may accept this rematch.")
             return
 
         # Step 2: Atomically pop the offer (prevents double-accept)
         try:
-            offer = self.game_lobby_manager.pop_rematch_offer(str(self.game_id))
+            offer = await self.game_lobby_manager.apop_rematch_offer(str(self.game_id))
         except Exception as exc:
             logger.error("[REMATCH][ACCEPT] Failed popping offer from Redis: %s", exc)
             offer = None
 
         if not offer:
-            SharedUtils.send_error(self, "Rematch offer already consumed.")
+            await SharedUtils.async_send_error(self, "Rematch offer already consumed.")
             return
 
         # Step 3: Load old game (authoritative players)
         try:
-            old_game = GameUtils.get_game_instance(game_id=self.game_id)
+            old_game = await GameUtils.aget_game_instance(game_id=self.game_id)
         except ValidationError as exc:
-            SharedUtils.send_error(self, str(exc))
+            await SharedUtils.async_send_error(self, str(exc))
             return
         except Exception as exc:
             logger.error("[REMATCH][ACCEPT] Failed fetching old game: %s", exc)
-            SharedUtils.send_error(self, "Unable to load game for rematch.")
+            await SharedUtils.async_send_error(self, "Unable to load game for rematch.")
             return
 
         old_x = getattr(old_game, "player_x", None)
         old_o = getattr(old_game, "player_o", None)
         if not old_x or not old_o:
-            SharedUtils.send_error(self, "Cannot rematch because one of the players is missing.")
+            await SharedUtils.async_send_error(self, "Cannot rematch because one of the players is missing.")
             return
 
         # Step 4: Create new game (your existing utility)
@@ -814,18 +807,18 @@ class GameConsumer(JsonWebsocketConsumer):
 
         try:
             starting_turn, player_x_dict, player_o_dict = GameUtils.randomize_turn(players=players)
-            new_game = GameUtils.create_game(
+            new_game = await database_sync_to_async(GameUtils.create_game)(
                 player_o_id=player_o_dict["id"],
                 player_x_id=player_x_dict["id"],
                 starting_turn=starting_turn,
             )
             new_game_id = str(new_game.id)
         except ValueError as exc:
-            SharedUtils.send_error(self, str(exc))
+            await SharedUtils.async_send_error(self, str(exc))
             return
         except Exception as exc:
             logger.error("[REMATCH][ACCEPT] Failed creating new game: %s", exc)
-            SharedUtils.send_error(self, "Failed to create rematch game.")
+            await SharedUtils.async_send_error(self, "Failed to create rematch game.")
             return
 
         # Step 5: Mint NEW session for NEW lobby/game id and add both users
@@ -833,14 +826,14 @@ class GameConsumer(JsonWebsocketConsumer):
         session_key = None
         try:
             new_redis_scope_id = scoped_lobby_id(GAME_TYPE, new_game_id)
-            session_key = self.game_lobby_manager.ensure_session_key(new_redis_scope_id)
+            session_key = await self.game_lobby_manager.aensure_session_key(new_redis_scope_id)
             # add both users to allow-list for the new session (best effort)
             try:
-                self.game_lobby_manager.add_user_to_session(new_redis_scope_id, int(old_x.id))
+                await self.game_lobby_manager.aadd_user_to_session(new_redis_scope_id, int(old_x.id))
             except Exception:
                 pass
             try:
-                self.game_lobby_manager.add_user_to_session(new_redis_scope_id, int(old_o.id))
+                await self.game_lobby_manager.aadd_user_to_session(new_redis_scope_id, int(old_o.id))
             except Exception:
                 pass
         except Exception as exc:
@@ -850,8 +843,7 @@ class GameConsumer(JsonWebsocketConsumer):
         # Step 6: Broadcast rematch start on CURRENT game group so both clients navigate together
         # IMPORTANT: include lobby_id=new_game_id (not old).
         try:
-            async_to_sync(self.channel_layer.group_send)(
-                game_group_name,
+            await self._broadcast_logged(
                 {
                     "type": "rematch_start",  # requires handler rematch_start(self, event)
                     "old_game_id": str(self.game_id),
@@ -871,10 +863,10 @@ class GameConsumer(JsonWebsocketConsumer):
             )
         except Exception as exc:
             logger.error("[REMATCH][ACCEPT] Broadcast failed. old_game_id=%s err=%s", self.game_id, exc)
-            SharedUtils.send_error(self, "Failed to start rematch.")
+            await SharedUtils.async_send_error(self, "Failed to start rematch.")
             return
         
-    def handle_rematch_decline(self) -> None:
+    async def handle_rematch_decline(self) -> None:
         """
         Handle when the receiving player declines a rematch offer.
 
@@ -893,13 +885,13 @@ class GameConsumer(JsonWebsocketConsumer):
         # Step 1: Load current offer
         offer = None
         try:
-            offer = self.game_lobby_manager.get_rematch_offer(str(self.game_id))
+            offer = await self.game_lobby_manager.aget_rematch_offer(str(self.game_id))
         except Exception as exc:
             logger.warning("[REMATCH][DECLINE] could not read offer: %s", exc)
 
         if not offer:
             # No active offer; do not crash, just inform user.
-            self.send_json(
+            await self.send_json(
                 {"type": "error", "message": "No active rematch offer to decline."}
             )
             return
@@ -913,20 +905,19 @@ class GameConsumer(JsonWebsocketConsumer):
                 receiver_user_id,
                 self.game_id,
             )
-            self.send_json(
+            await self.send_json(
                 {"type": "error", "message": "Only the receiving player can decline."}
             )
             return
 
         # Step 3: Clear offer in Redis (authoritative)
         try:
-            self.game_lobby_manager.clear_rematch_offer(str(self.game_id))
+            await self.game_lobby_manager.aclear_rematch_offer(str(self.game_id))
         except Exception as exc:
             logger.warning("[REMATCH][DECLINE] could not clear offer: %s", exc)
 
-        # Step 4: Broadcast to entire lobby so both clients close UI
-        async_to_sync(self.channel_layer.group_send)(
-            self.lobby_group_name,
+        # Step 4: Broadcast to the game group so both clients close UI
+        await self._broadcast_logged(
             {
                 "type": "rematch_declined_broadcast",
                 "game_id": str(self.game_id),
@@ -940,12 +931,12 @@ class GameConsumer(JsonWebsocketConsumer):
             },
         )
 
-    def rematch_declined_broadcast(self, event: dict) -> None:
+    async def rematch_declined_broadcast(self, event: dict) -> None:
         """
         Send a rematch_declined message to this client.
         """
         try:
-            self.send_json(
+            await self.send_json(
                 {
                     "type": "rematch_declined",
                     "game_id": event.get("game_id", str(self.game_id)),
@@ -956,6 +947,7 @@ class GameConsumer(JsonWebsocketConsumer):
                     "requesterUserId": event.get("requesterUserId"),
                     "receiverUserId": event.get("receiverUserId"),
                     "createdAtMs": event.get("createdAtMs"),
+                    "seq": event.get("seq"),
                 }
             )
 
@@ -966,9 +958,9 @@ class GameConsumer(JsonWebsocketConsumer):
             )
         except Exception as exc:
             logger.error("[REMATCH][DECLINED_SENT][ERROR] %s", exc)
-            SharedUtils.send_error(self, "Failed to deliver rematch declined event.")
+            await SharedUtils.async_send_error(self, "Failed to deliver rematch declined event.")
 
-    def handle_rematch_timeout(self) -> None:
+    async def handle_rematch_timeout(self) -> None:
         """
         Handle when a client countdown expires and it wants the server to close the loop.
 
@@ -984,7 +976,7 @@ class GameConsumer(JsonWebsocketConsumer):
 
         # Step 1: Check if an offer is still pending
         try:
-            offer = self.game_lobby_manager.get_rematch_offer(self.game_id)
+            offer = await self.game_lobby_manager.aget_rematch_offer(self.game_id)
         except Exception as exc:
             logger.warning("[REMATCH][TIMEOUT] get_rematch_offer failed: %s", exc)
             offer = None
@@ -995,13 +987,12 @@ class GameConsumer(JsonWebsocketConsumer):
 
         # Step 2: Clear offer (idempotent)
         try:
-            self.game_lobby_manager.clear_rematch_offer(self.game_id)
+            await self.game_lobby_manager.aclear_rematch_offer(self.game_id)
         except Exception as exc:
             logger.warning("[REMATCH][TIMEOUT] clear_rematch_offer failed: %s", exc)
 
         # Step 3: Broadcast expiry to both clients
-        async_to_sync(self.channel_layer.group_send)(
-            self.lobby_group_name,
+        await self._broadcast_logged(
             {
                 "type": "rematch_expired_broadcast",
                 "game_id": str(self.game_id),
@@ -1012,12 +1003,12 @@ class GameConsumer(JsonWebsocketConsumer):
             },
         )
 
-    def rematch_expired_broadcast(self, event: dict) -> None:
+    async def rematch_expired_broadcast(self, event: dict) -> None:
         """
         Send a rematch_expired message to this client so UI can reset cleanly.
         """
         try:
-            self.send_json(
+            await self.send_json(
                 {
                     "type": "rematch_expired",
                     "game_id": event.get("game_id", str(self.game_id)),
@@ -1027,6 +1018,7 @@ class GameConsumer(JsonWebsocketConsumer):
                     "requesterUserId": event.get("requesterUserId"),
                     "receiverUserId": event.get("receiverUserId"),
                     "createdAtMs": event.get("createdAtMs"),
+                    "seq": event.get("seq"),
                 }
             )
 
@@ -1037,9 +1029,9 @@ class GameConsumer(JsonWebsocketConsumer):
             )
         except Exception as exc:
             logger.error("[REMATCH][EXPIRED_SENT][ERROR] %s", exc)
-            SharedUtils.send_error(self, "Failed to deliver rematch expired event.")
+            await SharedUtils.async_send_error(self, "Failed to deliver rematch expired event.")
 
-    def rematch_start(self, event: dict) -> None:
+    async def rematch_start(self, event: dict) -> None:
         """
         Notify this client that a rematch has been accepted and a new game has been created.
 
@@ -1093,7 +1085,7 @@ class GameConsumer(JsonWebsocketConsumer):
                 )
 
             # Step 4: Send navigation payload with redundant lobby fields
-            self.send_json(
+            await self.send_json(
                 {
                     "type": "rematch_start",
                     "new_game_id": new_game_id,
@@ -1103,6 +1095,7 @@ class GameConsumer(JsonWebsocketConsumer):
                     "lobby": lobby_id,
                     "sessionKey": session_key,
                     "message": event.get("message") or f"Rematch created: Game {new_game_id}",
+                    "seq": event.get("seq"),
                 }
             )
 
@@ -1120,9 +1113,9 @@ class GameConsumer(JsonWebsocketConsumer):
                 getattr(self.user, "id", None),
                 exc,
             )
-            SharedUtils.send_error(self, "Failed to initiate rematch transition.")
+            await SharedUtils.async_send_error(self, "Failed to initiate rematch transition.")
 
-    def disconnect(self, close_code: int) -> None:
+    async def disconnect(self, close_code: int) -> None:
         """
         Clean up state when a WebSocket disconnects.
 
@@ -1141,7 +1134,8 @@ class GameConsumer(JsonWebsocketConsumer):
         game_id = getattr(self, "game_id", None)
 
         group_name = (
-            getattr(self, "group_name", None)
+            getattr(self, "game_group_name", None)
+            or getattr(self, "group_name", None)
             or getattr(self, "lobby_group_name", None)
         )
 
@@ -1162,7 +1156,7 @@ class GameConsumer(JsonWebsocketConsumer):
             if game_lobby_manager and redis_key:
                 # Step 2: Always remove the channel (channel is truly dead)
                 try:
-                    game_lobby_manager.remove_channel(redis_key, self.channel_name)
+                    await game_lobby_manager.aremove_channel(redis_key, self.channel_name)
                 except Exception as exc:
                     logger.debug("[DISCONNECT] remove_channel failed: %s", exc)
 
@@ -1171,7 +1165,7 @@ class GameConsumer(JsonWebsocketConsumer):
 
                 # Step 4: Broadcast player list after channel removal
                 try:
-                    game_lobby_manager.broadcast_player_list(self.channel_layer, redis_key)
+                    await game_lobby_manager.abroadcast_player_list(self.channel_layer, redis_key)
                 except Exception as exc:
                     logger.debug("[DISCONNECT] broadcast_player_list failed: %s", exc)
             else:
@@ -1190,6 +1184,6 @@ class GameConsumer(JsonWebsocketConsumer):
             # Step 5: Always discard from group
             try:
                 if group_name:
-                    async_to_sync(self.channel_layer.group_discard)(group_name, self.channel_name)
+                    await self.channel_layer.group_discard(group_name, self.channel_name)
             except Exception as exc:
                 logger.debug("[DISCONNECT] group_discard failed: %s", exc)
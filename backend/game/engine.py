@@ -0,0 +1,142 @@
+# Filename: backend/game/engine.py
+
+"""
+Bitboard rules engine for Tic-Tac-Toe.
+
+A board is two 9-bit masks, one per marker, where bit ``i`` is cell ``i`` of
+the ``board_state`` string. Every rule the game needs (legal moves, applying
+a move, win/draw detection, the winning line) is answered from small
+precomputed tables, so the model, the AI and the serializers all share one
+definition of the rules.
+
+The persisted format is still the 9-character ``board_state`` string; use
+``from_board_state`` / ``to_board_state`` at the edges.
+"""
+
+EMPTY = "_"
+MARKERS = ("X", "O")
+BOARD_SIZE = 9
+FULL_MASK = (1 << BOARD_SIZE) - 1
+
+WINNING_COMBINATIONS = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),  # rows
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),  # columns
+    (0, 4, 8), (2, 4, 6),             # diagonals
+)
+
+CELL_MASKS = tuple(1 << i for i in range(BOARD_SIZE))
+WIN_MASKS = tuple(sum(CELL_MASKS[i] for i in combo) for combo in WINNING_COMBINATIONS)
+
+
+def _first_winning_line(mask):
+    for combo, win_mask in zip(WINNING_COMBINATIONS, WIN_MASKS):
+        if mask & win_mask == win_mask:
+            return combo
+    return None
+
+
+# Step 1: Precomputed per-mask answers (512 entries each)
+# WINNING_LINE[mask] is the first completed line for that marker, or None.
+WINNING_LINE = tuple(_first_winning_line(mask) for mask in range(FULL_MASK + 1))
+IS_WIN = tuple(line is not None for line in WINNING_LINE)
+
+# LEGAL_MOVES[occupied] lists the empty cell indexes, in ascending order.
+LEGAL_MOVES = tuple(
+    tuple(i for i in range(BOARD_SIZE) if not occupied & CELL_MASKS[i])
+    for occupied in range(FULL_MASK + 1)
+)
+
+_CHAR_BITS = {"X": (1, 0), "O": (0, 1), EMPTY: (0, 0)}
+
+
+def other_marker(marker):
+    """Return the opposing marker."""
+    return "O" if marker == "X" else "X"
+
+
+def from_board_state(board_state):
+    """
+    Convert a 9-character ``board_state`` string into ``(x_mask, o_mask)``.
+
+    Raises:
+        ValueError: If the string is not 9 cells of 'X', 'O' or '_'.
+    """
+    if len(board_state) != BOARD_SIZE:
+        raise ValueError(f"Board state must be {BOARD_SIZE} characters long.")
+
+    x_mask = o_mask = 0
+    for i, cell in enumerate(board_state):
+        try:
+            is_x, is_o = _CHAR_BITS[cell]
+        except KeyError:
+            raise ValueError(f"Invalid board cell {cell!r} at index {i}.")
+        if is_x:
+            x_mask |= CELL_MASKS[i]
+        elif is_o:
+            o_mask |= CELL_MASKS[i]
+    return x_mask, o_mask
+
+
+def to_board_state(x_mask, o_mask):
+    """Convert ``(x_mask, o_mask)`` back into the persisted string format."""
+    return "".join(
+        "X" if x_mask & bit else "O" if o_mask & bit else EMPTY
+        for bit in CELL_MASKS
+    )
+
+
+def legal_moves_mask(x_mask, o_mask):
+    """Bitmask of empty cells."""
+    return FULL_MASK & ~(x_mask | o_mask)
+
+
+def legal_moves(x_mask, o_mask):
+    """Tuple of empty cell indexes, ascending."""
+    return LEGAL_MOVES[x_mask | o_mask]
+
+
+def winner(x_mask, o_mask):
+    """
+    Return 'X' or 'O' for a completed line, 'D' for a full board, else None.
+    """
+    if IS_WIN[x_mask]:
+        return "X"
+    if IS_WIN[o_mask]:
+        return "O"
+    if x_mask | o_mask == FULL_MASK:
+        return "D"
+    return None
+
+
+def winning_line(x_mask, o_mask):
+    """Return the completed line as a list of indexes, or [] if none."""
+    line = WINNING_LINE[x_mask] or WINNING_LINE[o_mask]
+    return list(line) if line else []
+
+
+def validate_move(x_mask, o_mask, position, player, current_turn):
+    """
+    Check a move against the rules without applying it.
+
+    Returns:
+        str | None: A human-readable error, or None if the move is legal.
+    """
+    if winner(x_mask, o_mask) is not None:
+        return "Invalid move: The game is already over."
+    if not isinstance(position, int) or isinstance(position, bool) or not (0 <= position < BOARD_SIZE):
+        return "Invalid move: Position must be an integer between 0 and 8."
+    if (x_mask | o_mask) & CELL_MASKS[position]:
+        return "Invalid move: The position is already occupied."
+    if current_turn != player:
+        return "Invalid move: It's not your turn."
+    return None
+
+
+def apply_move(x_mask, o_mask, position, marker):
+    """
+    Place ``marker`` at ``position`` (assumed legal) and return the new masks.
+    """
+    bit = CELL_MASKS[position]
+    if marker == "X":
+        return x_mask | bit, o_mask
+    return x_mask, o_mask | bit
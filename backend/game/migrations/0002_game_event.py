@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-17 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game_type', models.CharField(max_length=32)),
+                ('game_id', models.PositiveBigIntegerField()),
+                ('seq', models.PositiveIntegerField()),
+                ('event_type', models.CharField(max_length=64)),
+                ('payload', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('game_type', 'game_id', 'seq'),
+                'constraints': [models.UniqueConstraint(fields=('game_type', 'game_id', 'seq'), name='game_event_unique_seq')],
+            },
+        ),
+    ]
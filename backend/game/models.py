@@ -1,7 +1,10 @@
 from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from game import engine
 from game.ai_logic.ai_logic import get_best_move
+from stats.hooks import CompletionHookMixin
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,7 +12,7 @@ logger = logging.getLogger(__name__)
 # In models.py
 DEFAULT_BOARD_STATE = "_________"
 
-class TicTacToeGame(models.Model):
+class TicTacToeGame(CompletionHookMixin, models.Model):
     """
     Represents a Tic-Tac-Toe game between two players.
     
@@ -25,6 +28,8 @@ class TicTacToeGame(models.Model):
         updated_at (DateTimeField): Timestamp when the game was last updated.
     """
 
+    stats_game_type = "tic_tac_toe"
+
     player_x = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
         related_name="player_x_games",
@@ -77,6 +82,10 @@ class TicTacToeGame(models.Model):
         """
         Executes a move by updating the board state and switching the turn.
 
+        Rules come from the bitboard engine (`game.engine`); the game row is
+        saved once per move and the update is published by
+        `game.services.game_update_bus` after commit.
+
         Args:
             position (int): The index (0-8) where the player wants to place their marker.
             player (str): The player making the move ('X' or 'O').
@@ -87,38 +96,38 @@ class TicTacToeGame(models.Model):
         if self.winner:
             raise ValidationError("Invalid move: The game is already over.")
 
-        if not isinstance(position, int) or not (0 <= position < 9):
-            raise ValidationError("Invalid move: Position must be an integer between 0 and 8.")
-
-        if self.board_state[position] != "_":
-            raise ValidationError("Invalid move: The position is already occupied.")
-
-        if self.current_turn != player:
-            raise ValidationError("Invalid move: It's not your turn.")
+        x_mask, o_mask = engine.from_board_state(self.board_state)
+        error = engine.validate_move(x_mask, o_mask, position, player, self.current_turn)
+        if error:
+            raise ValidationError(error)
 
         # Update the board state with the player's marker
-        board = list(self.board_state)
-        board[position] = player
-        self.board_state = "".join(board)
+        x_mask, o_mask = engine.apply_move(x_mask, o_mask, position, player)
+        self.board_state = engine.to_board_state(x_mask, o_mask)
         logger.debug(f"Updated board state: {self.board_state}")
 
         # Check for a winner or draw
-        self.check_winner()
+        self.check_winner(x_mask, o_mask)
 
         if not self.winner:  # If the game is not over, switch turns
-            self.current_turn = "O" if player == "X" else "X"
+            self.current_turn = engine.other_marker(player)
             logger.debug(f"Turn switched to: {self.current_turn}")
 
-        # Save the updated game state
-        self.save()
-        logger.debug(f"Game state saved: Board State={self.board_state}, Current Turn={self.current_turn}, Winner={self.winner}")
+        # Imported here: the bus logs events to GameEvent, defined below.
+        from game.services.game_update_bus import record_move
 
+        # Save the updated game state; the game group hears about this move
+        # (and the AI's reply) in one event, once the transaction commits.
+        with transaction.atomic():
+            self.save()
+            record_move(self, position, player)
+            logger.debug(f"Game state saved: Board State={self.board_state}, Current Turn={self.current_turn}, Winner={self.winner}")
 
-        # Trigger AI move if applicable
-        if self.is_ai_game and self.current_turn == "O":
-            self.handle_ai_move()
+            # Trigger AI move if applicable
+            if self.is_ai_game and self.current_turn == "O":
+                self.handle_ai_move()
 
-    def check_winner(self):
+    def check_winner(self, x_mask=None, o_mask=None):
         """
         Determines if there is a winner or if the game has ended in a draw.
 
@@ -126,34 +135,27 @@ class TicTacToeGame(models.Model):
             - Three markers of the same type ('X' or 'O') appear in a row, column, or diagonal.
             - If no winning condition is met and all cells are filled, the game is declared a draw.
 
-        Logs:
-            - The board state being checked.
-            - The winner, if found, or a draw condition.
+        Args:
+            x_mask (int, optional): Precomputed X bitboard (parsed from board_state if omitted).
+            o_mask (int, optional): Precomputed O bitboard.
 
         Updates:
-            - Sets `self.winner` to 'X', 'O', or 'D' based on the result.
+            - Sets `self.winner` to 'X', 'O', or 'D' and `self.is_completed`.
+              Does not save; `make_move` persists the result.
         """
-        logger.debug(f"Checking winner for board state: {self.board_state}")
-        
-        winning_combinations = [
-            (0, 1, 2), (3, 4, 5), (6, 7, 8),  # rows
-            (0, 3, 6), (1, 4, 7), (2, 5, 8),  # columns
-            (0, 4, 8), (2, 4, 6)              # diagonals
-        ]
-        
-        for combo in winning_combinations:
-            if self.board_state[combo[0]] == self.board_state[combo[1]] == self.board_state[combo[2]] != '_':
-                logger.debug(f"Winner found: {self.board_state[combo[0]]} for combination {combo}")
-                self.winner = self.board_state[combo[0]]
-                self.is_completed = True
-                self.save()
-                return
-        
-        if "_" not in self.board_state:
-            logger.debug("All spaces are filled. Declaring a draw.")
-            self.winner = "D"
+        if x_mask is None or o_mask is None:
+            x_mask, o_mask = engine.from_board_state(self.board_state)
+
+        result = engine.winner(x_mask, o_mask)
+        if result is not None:
+            logger.debug(f"Game over for board state {self.board_state}: {result}")
+            self.winner = result
             self.is_completed = True
-            self.save()
+
+    @property
+    def winning_combination(self):
+        """Indexes of the completed line (empty list if none)."""
+        return engine.winning_line(*engine.from_board_state(self.board_state))
 
     def handle_ai_move(self):
         """
@@ -186,8 +188,9 @@ class TicTacToeGame(models.Model):
             logger.debug("Game already has a winner or is completed. Skipping AI move.")
             return
         
-        # Use the AI logic to calculate the best move
-        ai_move = get_best_move(self, "X", "O")
+        # Use the AI logic (precomputed move table lookup) to pick the move
+        player_marker = "O" if ai_marker == "X" else "X"
+        ai_move = get_best_move(self, player_marker, ai_marker)
         if ai_move is not None:
             logger.debug(f"AI chooses position {ai_move}")
             self.make_move(ai_move, ai_marker) # Execute the move using the determined marker
@@ -210,3 +213,36 @@ class TicTacToeGame(models.Model):
             self.player_o.first_name if self.player_o and self.player_o.first_name else self.player_o.email if self.player_o else "Unassigned"
         )
         return f"Game between {player_x_name} and {player_o_name}"
+
+
+class GameEvent(models.Model):
+    """
+    Durable copy of a game's event log (see `utils.game.event_log`).
+
+    One row per broadcast gameplay event, for any game type, numbered per game
+    by `seq`. Redis keeps only a recent window; this table keeps them all.
+
+    Attributes:
+        game_type (CharField): Registry key, e.g. 'tic_tac_toe', 'connect_four'.
+        game_id (PositiveBigIntegerField): The game's primary key.
+        seq (PositiveIntegerField): Position in the game's log, starting at 1.
+        event_type (CharField): The group event type (e.g. 'game_update').
+        payload (JSONField): The group event as broadcast.
+        created_at (DateTimeField): When the row was mirrored.
+    """
+
+    game_type = models.CharField(max_length=32)
+    game_id = models.PositiveBigIntegerField()
+    seq = models.PositiveIntegerField()
+    event_type = models.CharField(max_length=64)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("game_type", "game_id", "seq")
+        constraints = [
+            models.UniqueConstraint(fields=("game_type", "game_id", "seq"), name="game_event_unique_seq"),
+        ]
+
+    def __str__(self):
+        return f"{self.game_type}:{self.game_id} #{self.seq} {self.event_type}"
@@ -0,0 +1,92 @@
+# Filename: game/tests/test_engine.py
+
+# Step 1: Imports
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+
+from game import engine
+from game.models import TicTacToeGame
+
+User = get_user_model()
+
+
+# Step 2: Pure engine tests
+def test_board_state_round_trip():
+    board = "XO_X_O__X"
+    assert engine.to_board_state(*engine.from_board_state(board)) == board
+
+
+def test_from_board_state_rejects_bad_input():
+    with pytest.raises(ValueError):
+        engine.from_board_state("XO")
+    with pytest.raises(ValueError):
+        engine.from_board_state("XO_X_O__Z")
+
+
+@pytest.mark.parametrize(
+    "board, expected, line",
+    [
+        ("XXX_OO___", "X", [0, 1, 2]),
+        ("XX_OOOX__", "O", [3, 4, 5]),
+        ("O_X_OX__O", "O", [0, 4, 8]),
+        ("XOXXOOOXX", "D", []),
+        ("XO_______", None, []),
+    ],
+)
+def test_winner_and_winning_line(board, expected, line):
+    masks = engine.from_board_state(board)
+    assert engine.winner(*masks) == expected
+    assert engine.winning_line(*masks) == line
+
+
+def test_legal_moves_are_empty_cells():
+    masks = engine.from_board_state("X_O_X_O__")
+    assert engine.legal_moves(*masks) == (1, 3, 5, 7, 8)
+    assert engine.legal_moves_mask(*masks) == sum(1 << i for i in (1, 3, 5, 7, 8))
+
+
+def test_validate_move_messages():
+    masks = engine.from_board_state("X________")
+    assert engine.validate_move(*masks, 0, "O", "O") == "Invalid move: The position is already occupied."
+    assert engine.validate_move(*masks, 9, "O", "O").startswith("Invalid move: Position")
+    assert engine.validate_move(*masks, 4, "X", "O") == "Invalid move: It's not your turn."
+    assert engine.validate_move(*masks, 4, "O", "O") is None
+
+
+# Step 3: Model integration
+@pytest.fixture
+def pvp_game(db):
+    x = User.objects.create_user(email="x@test.com", password="pass1234")
+    o = User.objects.create_user(email="o@test.com", password="pass1234")
+    return TicTacToeGame.objects.create(player_x=x, player_o=o, current_turn="X")
+
+
+@pytest.mark.django_db
+def test_make_move_saves_once_per_move(pvp_game, monkeypatch):
+    saves = []
+    original_save = TicTacToeGame.save
+
+    def counting_save(self, *args, **kwargs):
+        saves.append(self.board_state)
+        return original_save(self, *args, **kwargs)
+
+    monkeypatch.setattr(TicTacToeGame, "save", counting_save)
+
+    # X wins on the top row; the winning move must still be a single save.
+    for position, player in [(0, "X"), (3, "O"), (1, "X"), (4, "O"), (2, "X")]:
+        pvp_game.make_move(position, player)
+
+    assert len(saves) == 5
+    assert pvp_game.winner == "X"
+    assert pvp_game.is_completed is True
+    assert pvp_game.winning_combination == [0, 1, 2]
+
+
+@pytest.mark.django_db
+def test_make_move_rejects_illegal_moves(pvp_game):
+    pvp_game.make_move(4, "X")
+    with pytest.raises(ValidationError):
+        pvp_game.make_move(4, "O")
+    with pytest.raises(ValidationError):
+        pvp_game.make_move(0, "X")
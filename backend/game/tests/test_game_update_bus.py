@@ -0,0 +1,176 @@
+# Filename: backend/game/tests/test_game_update_bus.py
+
+# Step 1: Imports
+import json
+from unittest.mock import MagicMock, patch
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from game.models import TicTacToeGame
+from game.services import game_update_bus
+from game.services.game_update_bus import apublish, delta_event
+from utils.game import event_log, hot_game_state
+from utils.game.hot_game_state import aapply_move, aget_game_state
+
+User = get_user_model()
+
+
+# Step 2: Fixtures
+class CountingLayer(InMemoryChannelLayer):
+    """Records every group message and its JSON size."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sent = []
+
+    async def group_send(self, group, message):
+        self.sent.append((group, message, len(json.dumps(message))))
+        await super().group_send(group, message)
+
+
+@pytest.fixture
+def layer(db):
+    """A counting channel layer plus in-memory Redis for the event log and hot state."""
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    counting = CountingLayer()
+
+    def async_client():
+        return fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+
+    with patch.object(game_update_bus, "get_channel_layer", return_value=counting), \
+            patch.object(event_log, "get_redis_client", return_value=client), \
+            patch.object(event_log, "get_async_redis_client", side_effect=async_client), \
+            patch.object(hot_game_state, "get_redis_client", return_value=client), \
+            patch.object(hot_game_state, "get_async_redis_client", side_effect=async_client), \
+            patch.object(hot_game_state, "get_timer_scheduler", return_value=MagicMock()):
+        yield counting
+
+
+@pytest.fixture
+def game(db):
+    x = User.objects.create_user(email="bus-x@test.com", password="pass", first_name="Xena")
+    o = User.objects.create_user(email="bus-o@test.com", password="pass", first_name="Otto")
+    return TicTacToeGame.objects.create(player_x=x, player_o=o)
+
+
+def _legacy_payload(game):
+    """The full event the removed post_save receiver sent on every save."""
+    return {
+        "type": "game_update",
+        "game_id": str(game.id),
+        "board_state": game.board_state,
+        "current_turn": game.current_turn,
+        "winner": game.winner,
+        "is_completed": game.is_completed,
+        "player_x": {"id": game.player_x.id, "first_name": game.player_x.first_name},
+        "player_o": {"id": game.player_o.id, "first_name": game.player_o.first_name},
+    }
+
+
+# Step 3: Row writes
+def test_row_move_sends_one_event_after_commit(layer, game, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            game.make_move(0, "X")
+            game.make_move(4, "O")
+            assert layer.sent == []          # nothing before commit
+
+    assert len(layer.sent) == 1
+    group, message, _ = layer.sent[0]
+    assert group == f"game_{game.id}"
+    assert message["moves"] == [[0, "X"], [4, "O"]]
+    assert (message["current_turn"], message["version"], message["seq"]) == ("X", None, 1)
+
+
+def test_rolled_back_move_sends_nothing(layer, game, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                game.make_move(0, "X")
+                raise RuntimeError("abort")
+        with transaction.atomic():
+            game.refresh_from_db()
+            game.make_move(8, "X")
+
+    assert [message["moves"] for _, message, _ in layer.sent] == [[[8, "X"]]]
+
+
+def test_rolled_back_savepoint_drops_only_its_moves(layer, game, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            game.make_move(0, "X")
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    game.make_move(4, "O")
+                    raise RuntimeError("abort")
+
+    assert len(layer.sent) == 1
+    _, message, _ = layer.sent[0]
+    assert message["moves"] == [[0, "X"]]
+    assert message["current_turn"] == "O"
+
+
+def test_commit_hook_storage_is_what_the_flush_relies_on(db):
+    """Fails if Django changes how pending commit hooks are kept (``_queue_flush_last`` reorders them)."""
+    def outer():
+        pass
+
+    def inner():
+        pass
+
+    with transaction.atomic():
+        connection = transaction.get_connection()
+        transaction.on_commit(outer, robust=True)
+        with transaction.atomic():
+            transaction.on_commit(inner)
+            assert connection.run_on_commit[-2:] == [
+                (set(connection.savepoint_ids[:-1]), outer, True),
+                (set(connection.savepoint_ids), inner, False),
+            ]
+        assert game_update_bus._hooks_are_reorderable(connection)
+
+
+def test_unrecognised_hooks_still_send_committed_moves(layer, game, django_capture_on_commit_callbacks):
+    with patch.object(game_update_bus, "_hooks_are_reorderable", return_value=False), \
+            django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            game.make_move(0, "X")
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    game.make_move(4, "O")
+                    raise RuntimeError("abort")
+
+    assert [message["moves"] for _, message, _ in layer.sent] == [[[0, "X"]]]
+
+
+# Step 4: Hot-state moves
+def test_hot_move_is_one_small_message(layer, game):
+    state = async_to_sync(aapply_move)(game.id, 4, "X")
+    async_to_sync(apublish)(delta_event(
+        game.id, state.last_moves, state.current_turn, state.winner, state.is_completed, version=state.version,
+    ), mirror=False)
+
+    assert len(layer.sent) == 1
+    _, message, size = layer.sent[0]
+    assert message["moves"] == [[4, "X"]] and message["version"] == state.version
+    game.refresh_from_db()
+    assert size < len(json.dumps(_legacy_payload(game)))
+
+
+def test_apply_delta_follows_versions(layer, game):
+    watcher = async_to_sync(aget_game_state)(game.id)
+    state = async_to_sync(aapply_move)(game.id, 0, "X")
+    event = delta_event(game.id, state.last_moves, state.current_turn, state.winner, False, version=state.version)
+
+    assert watcher.apply_delta(event) is True
+    assert (watcher.board_state, watcher.current_turn) == ("X________", "O")
+    assert watcher.apply_delta(event) is True                     # duplicate is a no-op
+    assert watcher.apply_delta({**event, "version": watcher.version + 2}) is False
+    assert watcher.apply_delta({**event, "version": None}) is False
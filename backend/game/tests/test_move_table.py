@@ -0,0 +1,71 @@
+# Filename: game/tests/test_move_table.py
+
+# Step 1: Imports
+from types import SimpleNamespace
+
+from game.ai_logic import ai_logic, ai_logic_hard_mode
+from game.ai_logic.move_table import HARD_TABLE, MEDIUM_TABLE, lookup_ranked_moves
+from game.engine import from_board_state, winner
+
+
+def _game(board_state):
+    return SimpleNamespace(board_state=board_state)
+
+
+def _place(board_state, index, marker):
+    return board_state[:index] + marker + board_state[index + 1:]
+
+
+# Step 2: Table coverage
+def test_tables_cover_both_openers():
+    # 4520 non-terminal positions per opener (X or O may start)
+    assert len(HARD_TABLE) == len(MEDIUM_TABLE) == 9040
+    assert ("_________", "X") in HARD_TABLE
+    assert ("_________", "O") in HARD_TABLE
+
+
+def test_hard_mode_takes_immediate_win_over_block():
+    # O can win at 2 while X threatens 3-4-5; winning beats blocking.
+    board = "OO_XX____"
+    assert ai_logic_hard_mode.get_best_move(_game(board), "X", "O") == 2
+
+
+def test_hard_mode_blocks_forced_loss():
+    # X threatens 0-1-2; O must block at 2.
+    board = "XX__O____"
+    assert ai_logic_hard_mode.get_best_move(_game(board), "X", "O") == 2
+
+
+def test_medium_mode_without_randomness_plays_table_best():
+    board = "XX__O____"
+    expected = MEDIUM_TABLE[(board, "O")][0][0]
+    assert ai_logic.get_best_move(_game(board), "X", "O", randomness=0) == expected
+
+
+def test_lookup_returns_empty_for_finished_board():
+    assert lookup_ranked_moves("XXXOO____", "O") == ()
+    assert ai_logic_hard_mode.get_best_move(_game("XOXXOOOXX"), "X", "O") is None
+
+
+# Step 3: Perfect play property
+def _hard_ai_never_loses(board, to_move, ai_marker):
+    outcome = winner(*from_board_state(board))
+    if outcome is not None:
+        return outcome in (ai_marker, "D")
+
+    human = "O" if ai_marker == "X" else "X"
+    if to_move == ai_marker:
+        move = ai_logic_hard_mode.get_best_move(_game(board), human, ai_marker)
+        return _hard_ai_never_loses(_place(board, move, ai_marker), human, ai_marker)
+
+    return all(
+        _hard_ai_never_loses(_place(board, i, human), ai_marker, ai_marker)
+        for i, cell in enumerate(board)
+        if cell == "_"
+    )
+
+
+def test_hard_mode_never_loses_any_line_of_play():
+    for ai_marker in ("X", "O"):
+        for opener in ("X", "O"):
+            assert _hard_ai_never_loses("_________", opener, ai_marker)
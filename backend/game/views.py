@@ -1,6 +1,6 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated, AllowAny
 from rest_framework.decorators import action
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
@@ -12,6 +12,7 @@ from .models import TicTacToeGame
 from .serializers import TicTacToeGameSerializer
 from .ai_logic.ai_logic import get_best_move
 from .services.game_factory import create_tictactoe_game
+from utils.game.hot_game_state import persist_game_state
 from utils.redis.redis_game_lobby_manager import RedisGameLobbyManager
 from utils.websockets.ws_groups import scoped_lobby_id
 
@@ -27,6 +28,23 @@ class TicTacToeGameViewSet(viewsets.ModelViewSet):
     serializer_class = TicTacToeGameSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_object(self):
+        """
+        The permission-checked game, after any hot Redis state has been
+        written back to its row.
+
+        Only writes (unsafe methods) drop the hot state, since they save the
+        row directly; reads leave a live game in Redis.
+        """
+        game = super().get_object()
+        try:
+            persist_game_state(game.pk, evict=self.request.method not in SAFE_METHODS)
+        except Exception as exc:
+            logger.warning(f"Could not write back hot state for game {game.pk}: {exc}")
+        else:
+            game.refresh_from_db()
+        return game
+
     def create(self, request, *args, **kwargs):
         # Step 1: Validate request data shape
         if not isinstance(request.data, dict):
@@ -16,7 +16,7 @@ from .models import GameInvite, GameInviteStatus
 from .serializers import GameInviteSerializer
 
 # Step 5: Shared notification helper (your project util)
-from utils.notifications.notify import notify_user
+from utils.notifications.notify import notify_user, notify_users
 
 # Step 6: Canonical WS payload builders (contract-locked)
 from invites.ws_payload import (
@@ -85,14 +85,8 @@ def expire_invite_if_needed(*, invite: GameInvite) -> GameInvite:
 
         # Step 3: Notify both users AFTER commit succeeds (canonical payload)
         transaction.on_commit(
-            lambda: notify_user(
-                user_id=invite.to_user_id,
-                payload=build_invite_status_event(invite),
-            )
-        )
-        transaction.on_commit(
-            lambda: notify_user(
-                user_id=invite.from_user_id,
+            lambda: notify_users(
+                user_ids=[invite.to_user_id, invite.from_user_id],
                 payload=build_invite_status_event(invite),
             )
         )
@@ -185,14 +179,8 @@ def accept_invite(*, invite: GameInvite, acting_user) -> GameInvite:
 
         # Step 4e: Notify after commit
         transaction.on_commit(
-            lambda: notify_user(
-                user_id=invite.to_user_id,
-                payload=build_invite_status_event(invite),
-            )
-        )
-        transaction.on_commit(
-            lambda: notify_user(
-                user_id=invite.from_user_id,
+            lambda: notify_users(
+                user_ids=[invite.to_user_id, invite.from_user_id],
                 payload=build_invite_status_event(invite),
             )
         )
@@ -235,14 +223,8 @@ def decline_invite(*, invite: GameInvite, acting_user) -> GameInvite:
         invite.save(update_fields=["status", "responded_at"])
 
         transaction.on_commit(
-            lambda: notify_user(
-                user_id=invite.to_user_id,
-                payload=build_invite_status_event(invite),
-            )
-        )
-        transaction.on_commit(
-            lambda: notify_user(
-                user_id=invite.from_user_id,
+            lambda: notify_users(
+                user_ids=[invite.to_user_id, invite.from_user_id],
                 payload=build_invite_status_event(invite),
             )
         )
@@ -3,12 +3,13 @@ import logging
 import random
 from urllib.parse import parse_qs
 
-from asgiref.sync import async_to_sync
-from channels.generic.websocket import JsonWebsocketConsumer
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.db import transaction
 
 from utils.redis.redis_game_lobby_manager import RedisGameLobbyManager
 from utils.shared.shared_utils_game_chat import SharedUtils
+from utils.websockets.codec import WireCodecMixin
 from utils.websockets.ws_groups import lobby_group, scoped_lobby_id
 from utils.game_registry import get_game_type_config, get_model_for
 
@@ -26,7 +27,7 @@ LOBBY_ALLOWED_TYPES = {
 }
 
 
-class LobbyConsumer(JsonWebsocketConsumer):
+class LobbyConsumer(WireCodecMixin, AsyncJsonWebsocketConsumer):
     """
     Lobby WebSocket (pre-game control plane)
 
@@ -50,17 +51,20 @@ class LobbyConsumer(JsonWebsocketConsumer):
       - self.redis_scope_id: "<game_type>-<lobby_id>", used for every
         Redis key and the Channels group name, so two different game
         types never collide on the same numeric lobby_id.
+
+    Runs on the event loop: Redis goes through the manager's async twins
+    and database work through ``database_sync_to_async`` sections.
     """
 
-    def connect(self):
+    async def connect(self):
         # Step 1: Basic scope setup
         self.user = self.scope.get("user")
         self.game_type = str(self.scope["url_route"]["kwargs"]["game_type"])
         self.lobby_id = str(self.scope["url_route"]["kwargs"]["lobby_id"])
 
         if not get_game_type_config(self.game_type):
-            self.accept()
-            self.close(code=4400)  # unknown game_type
+            await self.accept()
+            await self.close(code=4400)  # unknown game_type
             return
 
         self.redis_scope_id = scoped_lobby_id(self.game_type, self.lobby_id)
@@ -73,8 +77,8 @@ class LobbyConsumer(JsonWebsocketConsumer):
 
         if not self.user or getattr(self.user, "is_anonymous", True):
             # Anonymous users cannot use lobby WS
-            self.accept()
-            self.close(code=4401)
+            await self.accept()
+            await self.close(code=4401)
             return
 
         # Step 2: Parse query params
@@ -88,7 +92,7 @@ class LobbyConsumer(JsonWebsocketConsumer):
         if invite:
             # Step 3a: Validate invite BEFORE minting/allow-listing (match GameConsumer)
             try:
-                validate_invite_for_lobby_join(
+                await database_sync_to_async(validate_invite_for_lobby_join)(
                     user=self.user,
                     lobby_id=str(self.lobby_id),
                     invite_id=str(invite),
@@ -103,76 +107,61 @@ class LobbyConsumer(JsonWebsocketConsumer):
                     getattr(self.user, "id", None),
                     exc,
                 )
-                self.accept()
-                self.close(code=4404)  # invite invalid / not allowed
+                await self.accept()
+                await self.close(code=4404)  # invite invalid / not allowed
                 return
 
             # Step 3b: Invite path: mint/reuse sessionKey and allow-list this user
             try:
-                minted_or_valid_session_key = self.game_lobby_manager.ensure_session_key(self.redis_scope_id)
-                self.game_lobby_manager.add_user_to_session(self.redis_scope_id, int(self.user.id))
+                minted_or_valid_session_key = await self.game_lobby_manager.aensure_session_key(self.redis_scope_id)
+                await self.game_lobby_manager.aadd_user_to_session(self.redis_scope_id, int(self.user.id))
             except Exception as exc:
                 logger.error("[LOBBY] invite session init failed lobby_id=%s err=%s", self.redis_scope_id, exc)
-                self.accept()
-                self.close(code=4500)
+                await self.accept()
+                await self.close(code=4500)
                 return
 
         elif session_key:
             # SessionKey path: validate and refresh allow-list (best effort)
+            # (poker tables admit anyone holding the table's sessionKey)
             try:
-                is_valid = self.game_lobby_manager.validate_session_key(
+                is_valid = await self.game_lobby_manager.avalidate_session_key(
                     lobby_id=self.redis_scope_id,
                     session_key=str(session_key),
                     user_id=int(self.user.id),
+                    admit=self.game_type == "poker",
                 )
             except Exception as exc:
                 logger.error("[LOBBY] session validation error lobby_id=%s err=%s", self.redis_scope_id, exc)
-                self.accept()
-                self.close(code=4500)
+                await self.accept()
+                await self.close(code=4500)
                 return
 
             if not is_valid:
-                if self.game_type == "poker":
-                    stored = self.game_lobby_manager.redis.get(
-                        self.game_lobby_manager._session_key_key(self.redis_scope_id)
-                    )
-                    is_valid = bool(stored and str(stored) == str(session_key))
-                    if is_valid:
-                        self.game_lobby_manager.add_user_to_session(self.redis_scope_id, int(self.user.id))
-
-                if not is_valid:
-                    self.accept()
-                    self.close(code=4408)  # invalid/expired session
-                    return
+                await self.accept()
+                await self.close(code=4408)  # invalid/expired session
+                return
 
             minted_or_valid_session_key = str(session_key)
-            try:
-                self.game_lobby_manager.add_user_to_session(self.redis_scope_id, int(self.user.id))
-            except Exception:
-                pass
 
         else:
             # No invite and no sessionKey => reject
-            self.accept()
-            self.close(code=4404)
+            await self.accept()
+            await self.close(code=4404)
             return
 
         # Step 4: Join lobby group + accept socket
-        async_to_sync(self.channel_layer.group_add)(self.lobby_group_name, self.channel_name)
-        self.accept()
+        await self.channel_layer.group_add(self.lobby_group_name, self.channel_name)
+        await self.accept()
 
         try:
-            # Presence + channel tracking
-            self.game_lobby_manager.add_player(self.redis_scope_id, self.user)
-            self.game_lobby_manager.add_channel(self.redis_scope_id, self.channel_name)
-
-            # Assign role via Redis manager (X/O/Spectator) — these are internal
-            # lobby SEAT labels shared by every game type, not gameplay markers.
-            role = self.game_lobby_manager.assign_player_role(self.redis_scope_id, self.user)
-            self.game_lobby_manager.set_player_role(self.redis_scope_id, int(self.user.id), role)
+            # Presence + channel tracking + role (X/O/Spectator), one atomic
+            # script — these are internal lobby SEAT labels shared by every
+            # game type, not gameplay markers.
+            await self.game_lobby_manager.ajoin_lobby(self.redis_scope_id, self.user, self.channel_name)
 
             # Tell client the stable session key
-            self.send_json(
+            await self.send_json(
                 {
                     "type": "session_established",
                     "gameType": self.game_type,
@@ -182,38 +171,37 @@ class LobbyConsumer(JsonWebsocketConsumer):
             )
 
             # Broadcast roster (must broadcast to lobby_<scope> group internally)
-            self.game_lobby_manager.broadcast_player_list(self.channel_layer, self.redis_scope_id)
+            await self.game_lobby_manager.abroadcast_player_list(self.channel_layer, self.redis_scope_id)
 
         except Exception as exc:
             logger.error("[LOBBY] post-connect init failed lobby_id=%s err=%s", self.redis_scope_id, exc)
-            self.send_json({"type": "error", "message": "Failed to initialize lobby."})
-            self.close(code=4500)
+            await self.send_json({"type": "error", "message": "Failed to initialize lobby."})
+            await self.close(code=4500)
 
-    def disconnect(self, code):
+    async def disconnect(self, code):
         # Step 1: Guard for early disconnects
         if not hasattr(self, "redis_scope_id"):
             return
 
         # Step 2: Remove from Redis
         try:
-            self.game_lobby_manager.remove_player(self.redis_scope_id, self.user)
-            self.game_lobby_manager.remove_channel(self.redis_scope_id, self.channel_name)
+            await self.game_lobby_manager.aleave_lobby(self.redis_scope_id, self.user, self.channel_name)
         except Exception as exc:
             logger.warning("[LOBBY] disconnect cleanup failed lobby_id=%s err=%s", self.redis_scope_id, exc)
 
         # Step 3: Leave Channels group
         try:
-            async_to_sync(self.channel_layer.group_discard)(self.lobby_group_name, self.channel_name)
+            await self.channel_layer.group_discard(self.lobby_group_name, self.channel_name)
         except Exception:
             pass
 
         # Step 4: Broadcast roster update
         try:
-            self.game_lobby_manager.broadcast_player_list(self.channel_layer, self.redis_scope_id)
+            await self.game_lobby_manager.abroadcast_player_list(self.channel_layer, self.redis_scope_id)
         except Exception:
             pass
 
-    def receive_json(self, content, **kwargs):
+    async def receive_json(self, content, **kwargs):
         """
         Step 1: Validate client payload using per-socket allowed types.
         Step 2: Route lobby-only message types.
@@ -221,7 +209,7 @@ class LobbyConsumer(JsonWebsocketConsumer):
         """
         # Step 1: Validate
         if not SharedUtils.validate_message(content, allowed_types=LOBBY_ALLOWED_TYPES):
-            self.send_json({"type": "error", "message": "Invalid message payload/type."})
+            await self.send_json({"type": "error", "message": "Invalid message payload/type."})
             return
 
         # Step 2: Normalize
@@ -230,46 +218,46 @@ class LobbyConsumer(JsonWebsocketConsumer):
         # Step 3: Route
         try:
             if message_type == "join_lobby":
-                self.handle_join_lobby()
+                await self.handle_join_lobby()
 
             elif message_type == "leave_lobby":
-                self.handle_leave_lobby()
+                await self.handle_leave_lobby()
 
             elif message_type == "start_game":
-                self.handle_start_game()
+                await self.handle_start_game()
 
             else:
                 # Should be unreachable because allowed_types is enforced
-                self.send_json({"type": "error", "message": f"Unsupported message type: {message_type}"})
+                await self.send_json({"type": "error", "message": f"Unsupported message type: {message_type}"})
                 return
 
         except Exception as exc:
             logger.error("[LOBBY] unexpected error type=%s err=%s", message_type, exc)
-            self.send_json({"type": "error", "message": "Server error handling lobby message."})
+            await self.send_json({"type": "error", "message": "Server error handling lobby message."})
             return
 
-    def handle_join_lobby(self):
+    async def handle_join_lobby(self):
         # Step 1: Idempotent resync (connect already joined)
-        self.game_lobby_manager.add_player(self.redis_scope_id, self.user)
-        self.game_lobby_manager.add_channel(self.redis_scope_id, self.channel_name)
-        self.game_lobby_manager.broadcast_player_list(self.channel_layer, self.redis_scope_id)
+        await self.game_lobby_manager.ajoin_lobby(
+            self.redis_scope_id, self.user, self.channel_name, assign_role=False
+        )
+        await self.game_lobby_manager.abroadcast_player_list(self.channel_layer, self.redis_scope_id)
 
-    def handle_leave_lobby(self):
+    async def handle_leave_lobby(self):
         # Step 1: Client-initiated leave
         try:
-            self.game_lobby_manager.remove_player(self.redis_scope_id, self.user)
-            self.game_lobby_manager.remove_channel(self.redis_scope_id, self.channel_name)
+            await self.game_lobby_manager.aleave_lobby(self.redis_scope_id, self.user, self.channel_name)
         except Exception:
             pass
 
         try:
-            self.game_lobby_manager.broadcast_player_list(self.channel_layer, self.redis_scope_id)
+            await self.game_lobby_manager.abroadcast_player_list(self.channel_layer, self.redis_scope_id)
         except Exception:
             pass
 
-        self.close(code=1000)
+        await self.close(code=1000)
 
-    def handle_start_game(self):
+    async def handle_start_game(self):
         """
         Start game orchestration (lobby socket responsibility):
         - requires X and O present in Redis
@@ -279,11 +267,9 @@ class LobbyConsumer(JsonWebsocketConsumer):
         - ensure sessionKey exists for this lobby
         - broadcast game_start_acknowledgment with game_id + gameType + sessionKey
         """
-        cfg = get_game_type_config(self.game_type)
-
-        players = self.game_lobby_manager.get_players_with_roles(self.redis_scope_id) or []
+        players = await self.game_lobby_manager.aget_players_with_roles(self.redis_scope_id) or []
         if self.game_type == "poker":
-            self._handle_start_poker(players)
+            await self._handle_start_poker(players)
             return
 
         # Step 1: Require X and O (roles are Redis-authoritative)
@@ -291,7 +277,7 @@ class LobbyConsumer(JsonWebsocketConsumer):
         player_o = next((p for p in players if p.get("role") == "O"), None)
 
         if not player_x or not player_o:
-            self.send_json(
+            await self.send_json(
                 {
                     "type": "error",
                     "message": "Waiting for 2 players (X and O) to join the lobby.",
@@ -302,69 +288,42 @@ class LobbyConsumer(JsonWebsocketConsumer):
         # Step 2: Only X can start (prevents double-start races)
         me = next((p for p in players if str(p.get("id")) == str(getattr(self.user, "id", ""))), None)
         if not me or me.get("role") != "X":
-            self.send_json({"type": "error", "message": "Only Player X can start the game."})
+            await self.send_json({"type": "error", "message": "Only Player X can start the game."})
             return
 
         # Step 3: Ensure there is a stable lobby sessionKey for BOTH clients
         # (used by FE to navigate into the game route with ?sessionKey=...)
         session_key = None
         try:
-            session_key = self.game_lobby_manager.ensure_session_key(self.redis_scope_id)
+            session_key = await self.game_lobby_manager.aensure_session_key(self.redis_scope_id)
         except Exception as exc:
             logger.error("[LOBBY] ensure_session_key failed lobby_id=%s err=%s", self.redis_scope_id, exc)
 
         # Step 4: Persist into DB safely (transaction + row lock)
-        seat_x_field = cfg["seat_fk_names"]["X"]
-        seat_o_field = cfg["seat_fk_names"]["O"]
-        starting_turn = None
-
+        GameModel = get_model_for(self.game_type)
         try:
-            GameModel = get_model_for(self.game_type)
-
-            with transaction.atomic():
-                game = GameModel.objects.select_for_update().get(id=self.lobby_id)
-
-                # Step 4.1: Idempotency: if already started, do NOT re-randomize
-                already_started = bool(
-                    getattr(game, f"{seat_x_field}_id", None) and getattr(game, f"{seat_o_field}_id", None)
-                )
-
-                if not already_started:
-                    starting_seat = random.choice(["X", "O"])
-                    starting_turn = cfg["turn_values"][starting_seat]
-
-                    setattr(game, f"{seat_x_field}_id", int(player_x["id"]))
-                    setattr(game, f"{seat_o_field}_id", int(player_o["id"]))
-                    game.current_turn = starting_turn
-
-                    if hasattr(game, "ensure_dealt"):
-                        game.ensure_dealt()
-
-                    game.save(update_fields=[seat_x_field, seat_o_field, "current_turn"])
-                else:
-                    # If already started, use the canonical DB turn
-                    starting_turn = game.current_turn
+            starting_turn = await self._persist_seats(player_x, player_o)
 
             # Step 4.2: If session_key couldn't be ensured earlier, try a second time
             # (non-fatal, but improves navigation reliability)
             if not session_key:
                 try:
-                    session_key = self.game_lobby_manager.ensure_session_key(self.redis_scope_id)
+                    session_key = await self.game_lobby_manager.aensure_session_key(self.redis_scope_id)
                 except Exception:
                     session_key = None
 
         except GameModel.DoesNotExist:
-            self.send_json({"type": "error", "message": "Lobby game not found."})
+            await self.send_json({"type": "error", "message": "Lobby game not found."})
             return
         except Exception as exc:
             logger.error("[LOBBY] start_game persist failed lobby_id=%s err=%s", self.redis_scope_id, exc)
-            self.send_json(
+            await self.send_json(
                 {"type": "error", "message": "Failed to start the game due to a server error."}
             )
             return
 
         # Step 5: Broadcast ack (include gameType + sessionKey + canonical state)
-        async_to_sync(self.channel_layer.group_send)(
+        await self.channel_layer.group_send(
             self.lobby_group_name,
             {
                 "type": "game_start_acknowledgment",
@@ -378,13 +337,50 @@ class LobbyConsumer(JsonWebsocketConsumer):
             },
         )
 
+    @database_sync_to_async
+    def _persist_seats(self, player_x, player_o):
+        """
+        Seat X and O on the lobby's game row under a row lock.
+
+        Returns:
+            The starting turn (the stored one if the game had already started).
+        """
+        cfg = get_game_type_config(self.game_type)
+        seat_x_field = cfg["seat_fk_names"]["X"]
+        seat_o_field = cfg["seat_fk_names"]["O"]
+        GameModel = get_model_for(self.game_type)
+
+        with transaction.atomic():
+            game = GameModel.objects.select_for_update().get(id=self.lobby_id)
+
+            # Idempotency: if already started, do NOT re-randomize
+            already_started = bool(
+                getattr(game, f"{seat_x_field}_id", None) and getattr(game, f"{seat_o_field}_id", None)
+            )
+            if already_started:
+                # If already started, use the canonical DB turn
+                return game.current_turn
+
+            starting_seat = random.choice(["X", "O"])
+            starting_turn = cfg["turn_values"][starting_seat]
+
+            setattr(game, f"{seat_x_field}_id", int(player_x["id"]))
+            setattr(game, f"{seat_o_field}_id", int(player_o["id"]))
+            game.current_turn = starting_turn
+
+            if hasattr(game, "ensure_dealt"):
+                game.ensure_dealt()
+
+            game.save(update_fields=[seat_x_field, seat_o_field, "current_turn"])
+            return starting_turn
+
     # Group event passthrough
-    def update_player_list(self, event: dict) -> None:
+    async def update_player_list(self, event: dict) -> None:
         players = event.get("players", [])
-        self.send_json({"type": "update_player_list", "players": players})
+        await self.send_json({"type": "update_player_list", "players": players})
 
-    def game_start_acknowledgment(self, event: dict) -> None:
-        self.send_json(
+    async def game_start_acknowledgment(self, event: dict) -> None:
+        await self.send_json(
             {
                 "type": "game_start_acknowledgment",
                 "message": event.get("message"),
@@ -395,55 +391,35 @@ class LobbyConsumer(JsonWebsocketConsumer):
             }
         )
 
-    def _handle_start_poker(self, players):
+    async def _handle_start_poker(self, players):
         if len(players) < 2:
-            self.send_json({"type": "error", "message": "Poker needs at least 2 players."})
+            await self.send_json({"type": "error", "message": "Poker needs at least 2 players."})
             return
         if len(players) > 9:
-            self.send_json({"type": "error", "message": "Poker supports up to 9 players."})
+            await self.send_json({"type": "error", "message": "Poker supports up to 9 players."})
             return
 
         session_key = None
         try:
-            session_key = self.game_lobby_manager.ensure_session_key(self.redis_scope_id)
+            session_key = await self.game_lobby_manager.aensure_session_key(self.redis_scope_id)
         except Exception as exc:
             logger.error("[LOBBY] ensure_session_key failed lobby_id=%s err=%s", self.redis_scope_id, exc)
 
+        GameModel = get_model_for(self.game_type)
         try:
-            GameModel = get_model_for(self.game_type)
-            UserModel = GameModel._meta.get_field("player_one").remote_field.model
-            with transaction.atomic():
-                game = GameModel.objects.select_for_update().get(id=self.lobby_id)
-                if int(getattr(self.user, "id", 0)) != int(game.player_one_id):
-                    self.send_json({"type": "error", "message": "Only the table host can start the game."})
-                    return
-                if len(players) > int(getattr(game, "max_players", 6)):
-                    self.send_json({"type": "error", "message": f"Poker table is capped at {game.max_players} players."})
-                    return
-
-                player_ids = [int(player["id"]) for player in players]
-                if int(game.player_one_id) in player_ids:
-                    player_ids = [int(game.player_one_id)] + [
-                        player_id for player_id in player_ids if player_id != int(game.player_one_id)
-                    ]
-
-                users_by_id = {
-                    user.id: user
-                    for user in UserModel.objects.filter(id__in=player_ids)
-                }
-                ordered_users = [users_by_id[user_id] for user_id in player_ids if user_id in users_by_id]
-                game.initialize_table(ordered_users)
-                game.ensure_dealt()
-                starting_turn = game.current_turn
+            error, starting_turn = await self._persist_poker_table(players)
         except GameModel.DoesNotExist:
-            self.send_json({"type": "error", "message": "Lobby game not found."})
+            await self.send_json({"type": "error", "message": "Lobby game not found."})
             return
         except Exception as exc:
             logger.error("[LOBBY] poker start_game persist failed lobby_id=%s err=%s", self.redis_scope_id, exc)
-            self.send_json({"type": "error", "message": "Failed to start poker table."})
+            await self.send_json({"type": "error", "message": "Failed to start poker table."})
+            return
+        if error:
+            await self.send_json({"type": "error", "message": error})
             return
 
-        async_to_sync(self.channel_layer.group_send)(
+        await self.channel_layer.group_send(
             self.lobby_group_name,
             {
                 "type": "game_start_acknowledgment",
@@ -454,3 +430,35 @@ class LobbyConsumer(JsonWebsocketConsumer):
                 "current_turn": starting_turn,
             },
         )
+
+    @database_sync_to_async
+    def _persist_poker_table(self, players):
+        """
+        Seat the lobby's players (host first) and deal, under a row lock.
+
+        Returns:
+            (error message or None, starting turn)
+        """
+        GameModel = get_model_for(self.game_type)
+        UserModel = GameModel._meta.get_field("player_one").remote_field.model
+        with transaction.atomic():
+            game = GameModel.objects.select_for_update().get(id=self.lobby_id)
+            if int(getattr(self.user, "id", 0)) != int(game.player_one_id):
+                return "Only the table host can start the game.", None
+            if len(players) > int(getattr(game, "max_players", 6)):
+                return f"Poker table is capped at {game.max_players} players.", None
+
+            player_ids = [int(player["id"]) for player in players]
+            if int(game.player_one_id) in player_ids:
+                player_ids = [int(game.player_one_id)] + [
+                    player_id for player_id in player_ids if player_id != int(game.player_one_id)
+                ]
+
+            users_by_id = {
+                user.id: user
+                for user in UserModel.objects.filter(id__in=player_ids)
+            }
+            ordered_users = [users_by_id[user_id] for user_id in player_ids if user_id in users_by_id]
+            game.initialize_table(ordered_users)
+            game.ensure_dealt()
+            return None, game.current_turn
@@ -4,9 +4,22 @@ from types import SimpleNamespace
 
 from channels.routing import URLRouter
 from channels.testing import WebsocketCommunicator
+from django.test import override_settings
 
 from lobby.routing import websocket_urlpatterns
 
+IN_MEMORY_LAYER = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+# connect() hops through database_sync_to_async, which checks the thread's
+# DB connection even when the invite guard is stubbed.
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def in_memory_channel_layer():
+    with override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER):
+        yield
+
 
 def make_user(user_id=1, is_anonymous=False):
     # Step 1: Minimal shape the consumer expects
@@ -17,6 +30,13 @@ def make_user(user_id=1, is_anonymous=False):
     )
 
 
+async def _assert_closed_with(communicator, code):
+    # Step 1: The next frame after the accept must be the close frame
+    output = await communicator.receive_output()
+    assert output == {"type": "websocket.close", "code": code}
+    assert await communicator.receive_nothing()
+
+
 @pytest.mark.asyncio
 async def test_lobby_ws_rejects_unknown_game_type(monkeypatch):
     """
@@ -26,14 +46,13 @@ async def test_lobby_ws_rejects_unknown_game_type(monkeypatch):
     """
     application = URLRouter(websocket_urlpatterns)
 
-    communicator = WebsocketCommunicator(application, "/ws/lobby/checkers/664/?sessionKey=abc")
+    communicator = WebsocketCommunicator(application, "/ws/lobby/chess/664/?sessionKey=abc")
     communicator.scope["user"] = make_user(is_anonymous=False)
 
     connected, _ = await communicator.connect()
     assert connected is True
 
-    await communicator.wait_closed()
-    assert communicator.close_code == 4400
+    await _assert_closed_with(communicator, 4400)
 
 
 @pytest.mark.asyncio
@@ -50,8 +69,7 @@ async def test_lobby_ws_rejects_anonymous_user(monkeypatch):
     connected, _ = await communicator.connect()
     assert connected is True
 
-    await communicator.wait_closed()
-    assert communicator.close_code == 4401
+    await _assert_closed_with(communicator, 4401)
 
 
 @pytest.mark.asyncio
@@ -68,8 +86,7 @@ async def test_lobby_ws_rejects_without_invite_or_sessionkey(monkeypatch):
     connected, _ = await communicator.connect()
     assert connected is True
 
-    await communicator.wait_closed()
-    assert communicator.close_code == 4404
+    await _assert_closed_with(communicator, 4404)
 
 
 @pytest.mark.asyncio
@@ -94,8 +111,7 @@ async def test_lobby_ws_rejects_when_invite_guard_fails(monkeypatch):
     connected, _ = await communicator.connect()
     assert connected is True
 
-    await communicator.wait_closed()
-    assert communicator.close_code == 4404
+    await _assert_closed_with(communicator, 4404)
 
 
 @pytest.mark.asyncio
@@ -108,7 +124,7 @@ async def test_lobby_ws_rejects_invalid_sessionkey(monkeypatch):
 
     # Step 1: Stub manager with deterministic behavior
     class FakeManager:
-        def validate_session_key(self, lobby_id, session_key, user_id):
+        async def avalidate_session_key(self, lobby_id, session_key, user_id, admit=False):
             return False
 
     # Step 2: Patch constructor used by consumer
@@ -122,8 +138,7 @@ async def test_lobby_ws_rejects_invalid_sessionkey(monkeypatch):
     connected, _ = await communicator.connect()
     assert connected is True
 
-    await communicator.wait_closed()
-    assert communicator.close_code == 4408
+    await _assert_closed_with(communicator, 4408)
 
 
 @pytest.mark.asyncio
@@ -141,25 +156,16 @@ async def test_lobby_ws_invite_happy_path_sends_session_established(monkeypatch)
 
     # Step 2: Fake Redis manager used in connect() (no real Redis needed)
     class FakeManager:
-        def ensure_session_key(self, lobby_id):
+        async def aensure_session_key(self, lobby_id):
             return "session-xyz"
 
-        def add_user_to_session(self, lobby_id, user_id):
+        async def aadd_user_to_session(self, lobby_id, user_id):
             return None
 
-        def add_player(self, lobby_id, user):
-            return None
-
-        def add_channel(self, lobby_id, channel_name):
-            return None
-
-        def assign_player_role(self, lobby_id, user):
+        async def ajoin_lobby(self, lobby_id, user, channel_name=None, assign_role=True):
             return "X"
 
-        def set_player_role(self, lobby_id, user_id, role):
-            return None
-
-        def broadcast_player_list(self, channel_layer, lobby_id):
+        async def abroadcast_player_list(self, channel_layer, lobby_id):
             return None
 
     monkeypatch.setattr(lobby_consumer_module, "RedisGameLobbyManager", lambda: FakeManager())
@@ -194,32 +200,20 @@ async def test_lobby_receive_json_invalid_type_returns_error_not_close(monkeypat
     monkeypatch.setattr(lobby_consumer_module, "validate_invite_for_lobby_join", lambda **kwargs: None)
 
     class FakeManager:
-        def ensure_session_key(self, lobby_id):
+        async def aensure_session_key(self, lobby_id):
             return "session-xyz"
 
-        def add_user_to_session(self, lobby_id, user_id):
-            return None
-
-        def add_player(self, lobby_id, user):
-            return None
-
-        def add_channel(self, lobby_id, channel_name):
+        async def aadd_user_to_session(self, lobby_id, user_id):
             return None
 
-        def assign_player_role(self, lobby_id, user):
+        async def ajoin_lobby(self, lobby_id, user, channel_name=None, assign_role=True):
             return "X"
 
-        def set_player_role(self, lobby_id, user_id, role):
+        async def abroadcast_player_list(self, channel_layer, lobby_id):
             return None
 
-        def broadcast_player_list(self, channel_layer, lobby_id):
-            return None
-
-        def remove_player(self, lobby_id, user):
-            return None
-
-        def remove_channel(self, lobby_id, channel_name):
-            return None
+        async def aleave_lobby(self, lobby_id, user, channel_name=None):
+            return 0
 
     monkeypatch.setattr(lobby_consumer_module, "RedisGameLobbyManager", lambda: FakeManager())
 
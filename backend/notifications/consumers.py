@@ -5,10 +5,12 @@ import json
 import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from utils.websockets.codec import WireCodecMixin, loads
+
 logger = logging.getLogger("notifications.consumer")
 
 
-class NotificationConsumer(AsyncWebsocketConsumer):
+class NotificationConsumer(WireCodecMixin, AsyncWebsocketConsumer):
     """
     WebSocket consumer for handling real-time user-level notifications.
 
@@ -62,7 +64,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             return
 
         try:
-            data = json.loads(text_data)
+            data = loads(text_data)
             logger.info(f"[Notify] Received client message: {data}")
         except json.JSONDecodeError:
             logger.warning("[Notify] Invalid JSON received. Ignoring.")
@@ -71,7 +73,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         """Send notification payload to websocket client."""
         payload = event.get("payload", {})
         logger.info(f"[Notify] Sending event to {self.user}: {payload}")
-        await self.send(text_data=json.dumps(payload))
+        await self.send_json(payload)
 
     # Step 1: Safe fallback handlers (ignore unexpected event types)
     async def chat_message(self, event: dict) -> None:
@@ -0,0 +1,219 @@
+"""
+Poker AI: hand strength and pot odds to an action, inside a time budget.
+
+- Hand strength is the share of the pot the hand wins at showdown against
+  the live opponents' unknown cards. Preflop it is a dict lookup in the
+  precomputed ``poker.preflop`` table; later streets run ``poker.equity``
+  rollouts in small batches until the decision's deadline, and results are
+  cached per (hole, board, opponents).
+- If too little budget is left for a rollout, the made hand's category gives
+  a rough heads-up strength, raised to the power of the opponent count.
+- Pot odds (call / pot after calling) decide calls; strength relative to a
+  fair share of the pot decides bets, raises and shoves.
+- Profiles (``PROFILES``) set the thresholds and bet sizes.
+
+Like ``poker.equity`` this module has no Django imports; callers describe the
+decision with a ``Spot``.
+"""
+
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from poker.equity import compute_equity
+from poker.evaluator import hand_score
+from poker.preflop import preflop_equity
+
+# Betting profiles:
+# - call_margin: equity needed above the pot odds to call;
+# - raise_at: strength relative to a fair share (1.0) needed to bet/raise;
+# - shove_at: equity at which a short stack (<= 2x the pot) goes all-in;
+# - bluff_frequency: chance of betting a weak hand when checked to;
+# - bet_sizes: bet/raise sizes as fractions of the pot, stronger hands
+#   using the larger ones.
+PROFILES = {
+    "tight": {
+        "call_margin": 0.05,
+        "raise_at": 1.5,
+        "shove_at": 0.85,
+        "bluff_frequency": 0.02,
+        "bet_sizes": (0.5, 0.75),
+    },
+    "balanced": {
+        "call_margin": 0.0,
+        "raise_at": 1.3,
+        "shove_at": 0.8,
+        "bluff_frequency": 0.06,
+        "bet_sizes": (0.5, 0.75, 1.0),
+    },
+    "aggressive": {
+        "call_margin": -0.04,
+        "raise_at": 1.15,
+        "shove_at": 0.72,
+        "bluff_frequency": 0.15,
+        "bet_sizes": (0.75, 1.0, 1.5),
+    },
+}
+DEFAULT_PROFILE = "balanced"
+DEFAULT_TIME_BUDGET_MS = 50
+
+# Relative strength above ``raise_at`` per step up in ``bet_sizes``.
+SIZE_STEP = 0.4
+# Rollout settings: small batches so the deadline is checked often, and
+# enumeration only where it is a few ms (river heads-up, not the turn).
+ROLLOUT_BATCH_SIZE = 512
+ROLLOUT_MAX_TRIALS = 4096
+ROLLOUT_EXHAUSTIVE_LIMIT = 5000
+# The batch running at the deadline finishes anyway; keep this much of the
+# budget back for it.
+ROLLOUT_RESERVE_MS = 10.0
+# Below this much rollout time, use the made-hand fallback instead.
+MIN_ROLLOUT_MS = 5.0
+# Rough heads-up strength per made-hand category (high card .. straight flush).
+CATEGORY_STRENGTH = (0.3, 0.55, 0.72, 0.8, 0.85, 0.88, 0.94, 0.98, 0.995)
+_CATEGORY_SHIFT = 20
+
+CACHE_MAX_ENTRIES = 4096
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+@dataclass
+class Spot:
+    """What the player to act knows. Chip amounts are all for the current street."""
+    hole: list
+    board: list
+    opponents: int
+    pot: int
+    current_bet: int
+    bet: int
+    chips: int
+    min_raise: int
+    big_blind: int
+
+    @property
+    def to_call(self):
+        return max(0, self.current_bet - self.bet)
+
+
+@dataclass
+class Decision:
+    action: str
+    amount: int
+    strength: float
+    pot_odds: float
+    elapsed_ms: float
+
+
+def made_hand_strength(hole, board, opponents):
+    """Category-based strength for when there is no time for a rollout."""
+    category = hand_score(list(hole) + list(board)) >> _CATEGORY_SHIFT
+    return CATEGORY_STRENGTH[category] ** max(1, int(opponents))
+
+
+def hand_strength(hole, board, opponents, deadline_ms=DEFAULT_TIME_BUDGET_MS):
+    """
+    Share of the pot ``hole`` wins against ``opponents`` random hands.
+
+    Args:
+        hole (list[str]): Two hole cards.
+        board (list[str]): 0, 3, 4 or 5 community cards.
+        opponents (int): Live opponents.
+        deadline_ms (float): Time allowed for a rollout on a cache miss.
+
+    Returns:
+        float: Equity in [0, 1].
+    """
+    opponents = max(1, int(opponents))
+    if not board:
+        return preflop_equity(hole, opponents)
+
+    key = (tuple(sorted(hole)), tuple(sorted(board)), opponents)
+    with _cache_lock:
+        strength = _cache.get(key)
+        if strength is not None:
+            _cache.move_to_end(key)
+            return strength
+    if deadline_ms < MIN_ROLLOUT_MS:
+        return made_hand_strength(hole, board, opponents)
+
+    result = compute_equity(
+        list(hole), list(board), opponents,
+        deadline_ms=deadline_ms,
+        max_trials=ROLLOUT_MAX_TRIALS,
+        seed=0,
+        exhaustive_limit=ROLLOUT_EXHAUSTIVE_LIMIT,
+        batch_size=ROLLOUT_BATCH_SIZE,
+    )
+    strength = result["equity"]
+    with _cache_lock:
+        _cache[key] = strength
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return strength
+
+
+def _raise_to(spot, params, relative):
+    sizes = params["bet_sizes"]
+    step = int(max(0.0, relative - params["raise_at"]) / SIZE_STEP)
+    fraction = sizes[min(step, len(sizes) - 1)]
+    big_blind = max(1, spot.big_blind)
+    raise_by = round(fraction * (spot.pot + spot.to_call) / big_blind) * big_blind
+    return spot.current_bet + max(spot.min_raise, raise_by)
+
+
+def decide(spot, profile=DEFAULT_PROFILE, time_budget_ms=DEFAULT_TIME_BUDGET_MS, rng=None):
+    """
+    Choose an action for ``spot``.
+
+    Args:
+        spot (Spot): The decision to make.
+        profile (str): Key of ``PROFILES``; unknown names use the default.
+        time_budget_ms (float): Wall-clock budget for the whole decision.
+        rng (random.Random): Source for bluffs, for reproducible play.
+
+    Returns:
+        Decision: ``action`` is one of fold/check/call/raise/all_in and is
+        always legal for the spot; ``amount`` is the raise-to total for
+        ``raise`` and None otherwise.
+    """
+    started = time.perf_counter()
+    params = PROFILES.get(profile) or PROFILES[DEFAULT_PROFILE]
+    rng = rng or random
+
+    strength = hand_strength(
+        spot.hole, spot.board, spot.opponents, deadline_ms=time_budget_ms - ROLLOUT_RESERVE_MS,
+    )
+    to_call = spot.to_call
+    pot_odds = to_call / (spot.pot + to_call) if to_call else 0.0
+    relative = strength * (max(1, spot.opponents) + 1)
+
+    def decision(action, amount=None):
+        return Decision(action, amount, strength, pot_odds, (time.perf_counter() - started) * 1000)
+
+    if spot.chips <= 0:
+        return decision("call" if to_call else "check")
+    # Calling a bet bigger than the stack puts it all in either way.
+    if to_call >= spot.chips:
+        return decision("call" if strength >= pot_odds + params["call_margin"] else "fold")
+
+    committed = spot.chips <= 2 * (spot.pot + to_call)
+    if strength >= params["shove_at"] and committed:
+        return decision("all_in")
+
+    bluff = not to_call and rng.random() < params["bluff_frequency"]
+    if relative >= params["raise_at"] or bluff:
+        if spot.chips >= to_call + spot.min_raise:
+            raise_to = _raise_to(spot, params, relative)
+            if raise_to >= spot.bet + spot.chips:
+                return decision("all_in")
+            return decision("raise", raise_to)
+        return decision("call" if to_call else "check")
+
+    if not to_call:
+        return decision("check")
+    if strength >= pot_odds + params["call_margin"]:
+        return decision("call")
+    return decision("fold")
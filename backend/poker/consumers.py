@@ -1,88 +1,73 @@
-import threading
+from datetime import timedelta
 
 from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
 from channels.layers import get_channel_layer
-from channels.generic.websocket import JsonWebsocketConsumer
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.core.exceptions import ValidationError
 from django.db import transaction
 
+from utils.scheduler.timer_scheduler import get_timer_scheduler
 from utils.shared.shared_utils_game_chat import SharedUtils
+from utils.websockets.codec import MSGPACK_SUBPROTOCOL, WireCodecMixin
 
 from .models import PokerGame
-from .serializers import poker_payload
+from .serializers import merge_payload, poker_payload, private_views, public_snapshot, spectator_view
+from .services.ai_player import play_ai_turns
 
 POKER_GROUP = "poker_{game_id}"
-_TURN_TIMERS = {}
-_TURN_TIMERS_LOCK = threading.Lock()
-_NEXT_HAND_TIMERS = {}
-_NEXT_HAND_TIMERS_LOCK = threading.Lock()
+TURN_TIMER = "poker.turn"
+NEXT_HAND_TIMER = "poker.next_hand"
 AUTO_NEXT_HAND_DELAY_SECONDS = 5.0
 
 
 def _resolve_ai_turn(game):
-    guard = 0
-    while game.is_ai_game and game._current_turn_is_ai() and not game.is_completed and guard < 32:
-        game.apply_ai_action()
-        guard += 1
+    """Play pending AI turns; call after the transaction holding the row lock."""
+    return play_ai_turns(game)
 
 
 def _prepare_game_for_realtime(game):
-    game.enforce_turn_timeout()
+    with transaction.atomic():
+        game.refresh_from_db(from_queryset=PokerGame.objects.select_for_update())
+        game.enforce_turn_timeout()
     _resolve_ai_turn(game)
     if not game.current_turn_started_at and game._current_turn_can_act():
-        game.refresh_turn_timer()
-        game.save(update_fields=["current_turn_started_at", "updated_at"])
+        with transaction.atomic():
+            game.refresh_from_db(from_queryset=PokerGame.objects.select_for_update())
+            if not game.current_turn_started_at and game._current_turn_can_act():
+                game.refresh_turn_timer()
+                game.save(update_fields=["current_turn_started_at", "updated_at"])
     return game
 
 
+def _turn_token(game):
+    return game.current_turn_started_at.isoformat() if game.current_turn_started_at else ""
+
+
 def _cancel_turn_timer(game_id):
-    with _TURN_TIMERS_LOCK:
-        timer = _TURN_TIMERS.pop(str(game_id), None)
-    if timer:
-        timer.cancel()
+    get_timer_scheduler().cancel(TURN_TIMER, str(game_id))
 
 
 def _cancel_next_hand_timer(game_id):
-    with _NEXT_HAND_TIMERS_LOCK:
-        entry = _NEXT_HAND_TIMERS.pop(str(game_id), None)
-    if entry:
-        entry[1].cancel()
+    get_timer_scheduler().cancel(NEXT_HAND_TIMER, str(game_id))
 
 
 def _schedule_turn_timer(game):
     deadline = game.current_turn_deadline_at()
-    game_id = str(game.id)
-    _cancel_turn_timer(game_id)
     if not deadline:
+        _cancel_turn_timer(game.id)
         return
-
-    delay = max(0.1, (deadline - timezone_now()).total_seconds())
-    started_at = game.current_turn_started_at.isoformat() if game.current_turn_started_at else None
-    timer = threading.Timer(delay, _fire_turn_timeout, args=(game_id, started_at))
-    timer.daemon = True
-    with _TURN_TIMERS_LOCK:
-        _TURN_TIMERS[game_id] = timer
-    timer.start()
+    # Keyed on the turn start, so every socket re-scheduling the same turn
+    # is a no-op and a new turn replaces the old deadline.
+    get_timer_scheduler().schedule(TURN_TIMER, str(game.id), _turn_token(game), deadline)
 
 
 def _schedule_next_hand_timer(game):
-    game_id = str(game.id)
     if not game.is_completed or game.is_ai_game:
-        _cancel_next_hand_timer(game_id)
+        _cancel_next_hand_timer(game.id)
         return
-
-    hand_number = int(game.hand_number or 1)
-    with _NEXT_HAND_TIMERS_LOCK:
-        existing = _NEXT_HAND_TIMERS.get(game_id)
-        if existing and existing[0] == hand_number:
-            return
-        if existing:
-            existing[1].cancel()
-
-        timer = threading.Timer(AUTO_NEXT_HAND_DELAY_SECONDS, _fire_auto_next_hand, args=(game_id, hand_number))
-        timer.daemon = True
-        _NEXT_HAND_TIMERS[game_id] = (hand_number, timer)
-        timer.start()
+    fire_at = timezone_now() + timedelta(seconds=AUTO_NEXT_HAND_DELAY_SECONDS)
+    get_timer_scheduler().schedule(NEXT_HAND_TIMER, str(game.id), int(game.hand_number or 1), fire_at)
 
 
 def _schedule_game_timers(game):
@@ -97,164 +82,255 @@ def timezone_now():
 
 
 def _fire_turn_timeout(game_id, started_at):
-    changed = False
     try:
         with transaction.atomic():
             game = PokerGame.objects.select_for_update().get(pk=game_id)
-            current_started_at = game.current_turn_started_at.isoformat() if game.current_turn_started_at else None
-            if current_started_at != started_at:
-                return
+            if _turn_token(game) != started_at:
+                return None
             changed = game.enforce_turn_timeout()
-            _resolve_ai_turn(game)
-            if not changed:
-                _schedule_turn_timer(game)
-                return
     except PokerGame.DoesNotExist:
-        _cancel_turn_timer(game_id)
-        return
-    if changed:
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            POKER_GROUP.format(game_id=game_id),
-            {"type": "poker_update", "game_id": game_id},
-        )
+        return None
+    _resolve_ai_turn(game)
+    if not changed:
+        if _turn_token(game) == started_at:
+            # Fired before the deadline: try again when it is due.
+            return game.current_turn_deadline_at()
+        _schedule_turn_timer(game)
+        return None
+    broadcast_game_update(game_id)
+    return None
 
 
 def _fire_auto_next_hand(game_id, hand_number):
-    with _NEXT_HAND_TIMERS_LOCK:
-        existing = _NEXT_HAND_TIMERS.get(str(game_id))
-        if not existing or existing[0] != int(hand_number):
-            return
-        _NEXT_HAND_TIMERS.pop(str(game_id), None)
-
     try:
         with transaction.atomic():
             game = PokerGame.objects.select_for_update().get(pk=game_id)
             if not game.is_completed or int(game.hand_number or 1) != int(hand_number):
                 return
             game.start_next_hand(game.player_one)
-            _resolve_ai_turn(game)
     except (PokerGame.DoesNotExist, ValidationError):
         return
+    _resolve_ai_turn(game)
+    broadcast_game_update(game_id)
+
+
+def _group_equity_callback(channel_layer, group, game):
+    """``on_equity_ready`` factory for broadcasts: results go to the group, tagged with the user."""
+    hand_number = game.hand_number
+    community_count = len(game.community_cards or [])
 
+    def _for_user(user_id):
+        def _on_ready(result):
+            async_to_sync(channel_layer.group_send)(group, {
+                "type": "poker_equity",
+                "user_id": str(user_id),
+                "hand_number": hand_number,
+                "community_count": community_count,
+                "equity": round(result["equity"], 4),
+            })
+
+        return _on_ready
+
+    return _for_user
+
+
+def _game_update_event(game_id, channel_layer):
+    """The ``poker_update`` group event for the prepared game (None if it is gone)."""
+    try:
+        game = _prepare_game_for_realtime(PokerGame.objects.get(pk=game_id))
+    except PokerGame.DoesNotExist:
+        return None
+    _schedule_game_timers(game)
+    group = POKER_GROUP.format(game_id=game_id)
+    return {
+        "type": "poker_update",
+        "game_id": str(game_id),
+        "game": public_snapshot(game),
+        "private": private_views(game, on_equity_ready=_group_equity_callback(channel_layer, group, game)),
+    }
+
+
+def broadcast_game_update(game_id):
+    """
+    Prepare the game once and send the table one ``poker_update`` carrying
+    the shared public snapshot and every seat's private view.
+
+    Subscribers only merge their own view into the snapshot, so the database
+    work per action does not grow with the number of sockets. The private
+    views (hole cards included) stay inside the channel layer; each consumer
+    forwards only its own.
+    """
     channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        POKER_GROUP.format(game_id=game_id),
-        {"type": "poker_update", "game_id": game_id},
-    )
+    event = _game_update_event(game_id, channel_layer)
+    if event is not None:
+        async_to_sync(channel_layer.group_send)(POKER_GROUP.format(game_id=game_id), event)
+
+
+async def abroadcast_game_update(game_id):
+    """``broadcast_game_update`` for async callers: the database work runs in one thread hop."""
+    channel_layer = get_channel_layer()
+    event = await database_sync_to_async(_game_update_event)(game_id, channel_layer)
+    if event is not None:
+        await channel_layer.group_send(POKER_GROUP.format(game_id=game_id), event)
+
 
+get_timer_scheduler().register(TURN_TIMER, _fire_turn_timeout)
+get_timer_scheduler().register(NEXT_HAND_TIMER, _fire_auto_next_hand)
+
+
+class PokerConsumer(WireCodecMixin, AsyncJsonWebsocketConsumer):
+    # Binary msgpack frames for clients that offer the subprotocol.
+    wire_subprotocols = (MSGPACK_SUBPROTOCOL,)
 
-class PokerConsumer(JsonWebsocketConsumer):
     def _group(self):
         return POKER_GROUP.format(game_id=self.game_id)
 
-    def _accept_and_close(self, code):
-        self.accept()
-        self.close(code=code)
+    async def _accept_and_close(self, code):
+        await self.accept()
+        await self.close(code=code)
 
-    def connect(self):
+    @database_sync_to_async
+    def _load_for_connect(self):
+        """The prepared game, or None when the user has no seat at it."""
+        game = PokerGame.objects.get(pk=self.game_id)
+        if game.piece_for_user(self.user) is None:
+            return None
+        return _prepare_game_for_realtime(game)
+
+    async def connect(self):
         raw_id = self.scope.get("url_route", {}).get("kwargs", {}).get("game_id")
         if not raw_id:
-            self._accept_and_close(4002)
+            await self._accept_and_close(4002)
             return
         self.game_id = str(raw_id)
         self.user = SharedUtils.authenticate_user(self.scope)
         if not self.user:
-            self._accept_and_close(4001)
+            await self._accept_and_close(4001)
             return
         try:
-            with transaction.atomic():
-                game = PokerGame.objects.select_for_update().get(pk=self.game_id)
-                _prepare_game_for_realtime(game)
+            game = await self._load_for_connect()
         except PokerGame.DoesNotExist:
-            self._accept_and_close(4004)
+            await self._accept_and_close(4004)
             return
-        if game.piece_for_user(self.user) is None:
-            self._accept_and_close(4003)
+        if game is None:
+            await self._accept_and_close(4003)
             return
 
-        async_to_sync(self.channel_layer.group_add)(self._group(), self.channel_name)
-        self.accept()
-        self._send_state(game)
+        await self.channel_layer.group_add(self._group(), self.channel_name)
+        await self.accept()
+        await self._send_state(game)
 
-    def receive_json(self, content, **kwargs):
+    async def receive_json(self, content, **kwargs):
         msg_type = content.get("type", "")
         if msg_type == "action":
-            self._handle_action(content)
+            await self._handle_action(content)
         elif msg_type == "next_hand":
-            self._handle_next_hand(content)
+            await self._handle_next_hand(content)
         elif msg_type == "sync":
-            self._handle_sync()
+            await self._handle_sync()
         else:
-            self.send_json({"type": "error", "message": "Unknown message type."})
+            await self.send_json({"type": "error", "message": "Unknown message type."})
 
-    def _handle_sync(self):
+    @database_sync_to_async
+    def _load_prepared(self):
+        return _prepare_game_for_realtime(PokerGame.objects.get(pk=self.game_id))
+
+    async def _handle_sync(self):
         try:
-            with transaction.atomic():
-                game = PokerGame.objects.select_for_update().get(pk=self.game_id)
-                _prepare_game_for_realtime(game)
-            self._send_state(game)
+            await self._send_state(await self._load_prepared())
         except PokerGame.DoesNotExist:
-            self.send_json({"type": "error", "message": "Game not found."})
+            await self.send_json({"type": "error", "message": "Game not found."})
 
-    def _send_state(self, game):
+    @database_sync_to_async
+    def _state_payload(self, game):
         _schedule_game_timers(game)
-        self.send_json({"type": "game_state", "game": poker_payload(game, self.user)})
+        return poker_payload(game, self.user, on_equity_ready=self._equity_callback(game))
+
+    async def _send_state(self, game):
+        await self.send_json({
+            "type": "game_state",
+            "game": await self._state_payload(game),
+        })
+
+    def _equity_callback(self, game):
+        """
+        Called from the equity pool when a rollout finishes; hands the result
+        back to this socket through the channel layer (never blocks here).
+        """
+        channel_layer = self.channel_layer
+        channel_name = self.channel_name
+        hand_number = game.hand_number
+        community_count = len(game.community_cards or [])
+
+        def _on_ready(result):
+            async_to_sync(channel_layer.send)(channel_name, {
+                "type": "poker_equity",
+                "hand_number": hand_number,
+                "community_count": community_count,
+                "equity": round(result["equity"], 4),
+            })
+
+        return _on_ready
+
+    async def poker_equity(self, event):
+        if "user_id" in event and event["user_id"] != str(self.user.id):
+            return
+        await self.send_json({
+            "type": "equity_update",
+            "hand_number": event["hand_number"],
+            "community_count": event["community_count"],
+            "my_equity": event["equity"],
+        })
+
+    @database_sync_to_async
+    def _apply_action(self, action, amount):
+        with transaction.atomic():
+            game = PokerGame.objects.select_for_update().get(pk=self.game_id)
+            game.apply_action(action, self.user, amount)
+        _resolve_ai_turn(game)
 
-    def _handle_action(self, content):
+    async def _handle_action(self, content):
         try:
-            with transaction.atomic():
-                game = PokerGame.objects.select_for_update().get(pk=self.game_id)
-                game.apply_action(content.get("action"), self.user, content.get("amount"))
-                _resolve_ai_turn(game)
+            await self._apply_action(content.get("action"), content.get("amount"))
         except PokerGame.DoesNotExist:
-            self.send_json({"type": "error", "message": "Game not found."})
+            await self.send_json({"type": "error", "message": "Game not found."})
             return
         except ValidationError as exc:
-            self.send_json({"type": "error", "message": str(exc)})
+            await self.send_json({"type": "error", "message": str(exc)})
             return
+        await abroadcast_game_update(self.game_id)
 
-        async_to_sync(self.channel_layer.group_send)(
-            self._group(),
-            {"type": "poker_update", "game_id": self.game_id},
-        )
-
-    def _handle_next_hand(self, content=None):
+    @database_sync_to_async
+    def _start_next_hand(self):
+        with transaction.atomic():
+            game = PokerGame.objects.select_for_update().get(pk=self.game_id)
+            game.start_next_hand(self.user)
+            # Scheduler I/O stays out of the row lock and is skipped on rollback.
+            game_id = self.game_id
+            transaction.on_commit(lambda: _cancel_next_hand_timer(game_id))
+        _resolve_ai_turn(game)
+
+    async def _handle_next_hand(self, content=None):
         content = content or {}
         try:
-            with transaction.atomic():
-                game = PokerGame.objects.select_for_update().get(pk=self.game_id)
-                game.start_next_hand(self.user)
-                _resolve_ai_turn(game)
-                _cancel_next_hand_timer(self.game_id)
+            await self._start_next_hand()
         except PokerGame.DoesNotExist:
-            self.send_json({"type": "error", "message": "Game not found."})
+            await self.send_json({"type": "error", "message": "Game not found."})
             return
         except ValidationError as exc:
             if content.get("auto"):
-                self._handle_sync()
+                await self._handle_sync()
                 return
-            self.send_json({"type": "error", "message": str(exc)})
+            await self.send_json({"type": "error", "message": str(exc)})
             return
+        await abroadcast_game_update(self.game_id)
 
-        async_to_sync(self.channel_layer.group_send)(
-            self._group(),
-            {"type": "poker_update", "game_id": self.game_id},
-        )
-
-    def poker_update(self, event):
-        try:
-            with transaction.atomic():
-                game = PokerGame.objects.select_for_update().get(pk=event["game_id"])
-                _prepare_game_for_realtime(game)
-        except PokerGame.DoesNotExist:
-            self.send_json({"type": "error", "message": "Game not found."})
-            return
-        _schedule_game_timers(game)
-        self.send_json({"type": "game_update", "game": poker_payload(game, self.user)})
+    async def poker_update(self, event):
+        private = event["private"].get(str(self.user.id)) or spectator_view()
+        await self.send_json({"type": "game_update", "game": merge_payload(event["game"], private)})
 
-    def disconnect(self, close_code):
+    async def disconnect(self, close_code):
         try:
-            async_to_sync(self.channel_layer.group_discard)(self._group(), self.channel_name)
+            await self.channel_layer.group_discard(self._group(), self.channel_name)
         except Exception:
             pass
@@ -0,0 +1,235 @@
+"""
+Hand-equity calculator: batched NumPy rollouts over the table evaluator.
+
+Cards are encoded as ints ``rank * 4 + suit`` (0..51) so a whole batch of
+rollouts is one ``(trials, 7)`` array. Each batch is scored at once with the
+same tables ``poker.evaluator`` uses:
+
+- non-flush hands: prime product of the ranks, looked up with
+  ``np.searchsorted`` in the sorted ``RANK_TABLE`` keys;
+- flush hands: the flush suit's 13-bit rank mask indexes ``FLUSH_TABLE``.
+
+``compute_equity`` enumerates every outcome when that is cheap (late
+streets, heads-up) and otherwise runs Monte Carlo batches until a deadline
+or a trial cap. Opponents' hole cards are treated as unknown unless passed
+in, so the number shown to a player never leaks what the server knows.
+
+Like ``poker.evaluator`` this module has no Django imports and is safe to
+run in a worker process (see ``poker.services.equity``).
+"""
+
+import itertools
+import time
+
+import numpy as np
+
+from poker.evaluator import FLUSH_TABLE, PRIMES, RANK_TABLE, RANKS, SUITS
+
+BATCH_SIZE = 2048
+DEFAULT_MAX_TRIALS = 20_000
+DEFAULT_DEADLINE_MS = 150
+# Enumerate instead of sampling when there are at most this many outcomes.
+EXHAUSTIVE_LIMIT = 50_000
+
+# Step 1: Encoded-card lookup arrays
+CARD_CODES = {f"{rank}{suit}": r * 4 + s for r, rank in enumerate(RANKS) for s, suit in enumerate(SUITS)}
+_PRIME_BY_CODE = np.array([PRIMES[code >> 2] for code in range(52)], dtype=np.int64)
+_BIT_BY_CODE = np.array([1 << (code >> 2) for code in range(52)], dtype=np.int64)
+_SUIT_BY_CODE = np.array([code & 3 for code in range(52)], dtype=np.int64)
+
+_RANK_KEYS = np.array(sorted(RANK_TABLE), dtype=np.int64)
+_RANK_VALUES = np.array([RANK_TABLE[key] for key in _RANK_KEYS.tolist()], dtype=np.int64)
+_FLUSH_VALUES = np.array(FLUSH_TABLE, dtype=np.int64)
+
+
+def encode(cards):
+    """
+    Encode card strings ("Ah") as ints.
+
+    Raises:
+        ValueError: For an unknown or repeated card.
+    """
+    try:
+        codes = [CARD_CODES[card] for card in cards]
+    except (KeyError, TypeError):
+        raise ValueError(f"Invalid card in {cards!r}.")
+    if len(set(codes)) != len(codes):
+        raise ValueError(f"Duplicate card in {cards!r}.")
+    return codes
+
+
+def batch_scores(hands):
+    """
+    Score many hands at once.
+
+    Args:
+        hands (np.ndarray): ``(n, k)`` int array of encoded cards, 5 <= k <= 7.
+
+    Returns:
+        np.ndarray: ``(n,)`` int64 scores, comparable like ``hand_score``.
+    """
+    products = _PRIME_BY_CODE[hands].prod(axis=1)
+    scores = _RANK_VALUES[np.searchsorted(_RANK_KEYS, products)]
+
+    bits = _BIT_BY_CODE[hands]
+    suits = _SUIT_BY_CODE[hands]
+    for suit in range(4):
+        in_suit = suits == suit
+        flush = in_suit.sum(axis=1) >= 5
+        if flush.any():
+            masks = np.where(in_suit[flush], bits[flush], 0).sum(axis=1)
+            scores[flush] = _FLUSH_VALUES[masks]
+    return scores
+
+
+def _showdown(hero_scores, villain_scores):
+    """Per-trial hero share of the pot: 1 win, 1/k for a k-way tie, else 0."""
+    best_villain = villain_scores.max(axis=1)
+    ahead = hero_scores > best_villain
+    tied = hero_scores == best_villain
+    tie_ways = (villain_scores == best_villain[:, None]).sum(axis=1) + 1
+    share = ahead.astype(np.float64)
+    share[tied] = 1.0 / tie_ways[tied]
+    return ahead, tied, share
+
+
+def _score_deals(hero, board, villains, deals, need_board, unknown_villains):
+    """
+    Score ``deals`` (``(n, need_board + 2 * unknown_villains)`` codes).
+
+    The first ``need_board`` columns complete the board; each following pair
+    is one unknown opponent's hole cards.
+    """
+    trials = deals.shape[0]
+    full_board = np.concatenate(
+        [np.broadcast_to(np.array(board, dtype=np.int64), (trials, len(board))), deals[:, :need_board]],
+        axis=1,
+    )
+    hero_hands = np.concatenate([np.broadcast_to(np.array(hero, dtype=np.int64), (trials, 2)), full_board], axis=1)
+    hero_scores = batch_scores(hero_hands)
+
+    villain_scores = []
+    for known in villains:
+        hole = np.broadcast_to(np.array(known, dtype=np.int64), (trials, 2))
+        villain_scores.append(batch_scores(np.concatenate([hole, full_board], axis=1)))
+    for index in range(unknown_villains):
+        start = need_board + 2 * index
+        villain_scores.append(batch_scores(np.concatenate([deals[:, start:start + 2], full_board], axis=1)))
+    return _showdown(hero_scores, np.stack(villain_scores, axis=1))
+
+
+def _outcome_count(remaining, need_board, unknown_villains):
+    if unknown_villains > 1:
+        return None  # multiway enumeration is never cheap enough
+    count = 1
+    left = remaining
+    for take in (need_board, 2 * unknown_villains):
+        count *= _comb(left, take)
+        left -= take
+    return count
+
+
+def _comb(n, k):
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return result
+
+
+def _exhaustive_deals(remaining, need_board, unknown_villains):
+    rows = []
+    for board_cards in itertools.combinations(remaining, need_board):
+        rest = [card for card in remaining if card not in board_cards] if unknown_villains else ()
+        if unknown_villains:
+            for hole in itertools.combinations(rest, 2):
+                rows.append(board_cards + hole)
+        else:
+            rows.append(board_cards)
+    return np.array(rows, dtype=np.int64).reshape(len(rows), need_board + 2 * unknown_villains)
+
+
+def compute_equity(hole_cards, board_cards=(), opponents=1, known_opponents=(),
+                   deadline_ms=DEFAULT_DEADLINE_MS, max_trials=DEFAULT_MAX_TRIALS, seed=None,
+                   exhaustive_limit=EXHAUSTIVE_LIMIT, batch_size=BATCH_SIZE):
+    """
+    Estimate the share of the pot ``hole_cards`` wins at showdown.
+
+    Args:
+        hole_cards (list[str]): The player's two cards.
+        board_cards (list[str]): 0, 3, 4 or 5 community cards.
+        opponents (int): Live opponents whose cards are unknown.
+        known_opponents (list[list[str]]): Opponents whose cards are known
+            (e.g. all-in hands already shown).
+        deadline_ms (float): Stop sampling after this long.
+        max_trials (int): Sampling cap.
+        seed (int): RNG seed, for reproducible results.
+        exhaustive_limit (int): Enumerate instead of sampling up to this many
+            outcomes. Enumeration ignores the deadline, so callers with a
+            tight budget pass a smaller limit.
+        batch_size (int): Rollouts per NumPy batch; the deadline is checked
+            between batches.
+
+    Returns:
+        dict: ``{"equity", "win", "tie", "trials", "exhaustive", "elapsed_ms"}``
+        with probabilities in [0, 1].
+
+    Raises:
+        ValueError: For malformed, duplicate or too many cards.
+    """
+    started = time.perf_counter()
+    hero = encode(hole_cards)
+    board = encode(board_cards)
+    villains = [encode(cards) for cards in known_opponents]
+    if len(hero) != 2 or len(board) > 5 or any(len(cards) != 2 for cards in villains):
+        raise ValueError("Expected two hole cards per player and at most five board cards.")
+    dead = hero + board + [card for cards in villains for card in cards]
+    if len(set(dead)) != len(dead):
+        raise ValueError("The same card appears twice.")
+    unknown = max(0, int(opponents))
+    if not unknown and not villains:
+        return {"equity": 1.0, "win": 1.0, "tie": 0.0, "trials": 0, "exhaustive": True, "elapsed_ms": 0.0}
+
+    dead_set = set(dead)
+    remaining = [code for code in range(52) if code not in dead_set]
+    need_board = 5 - len(board)
+    width = need_board + 2 * unknown
+    if width > len(remaining):
+        raise ValueError("Not enough cards left in the deck.")
+
+    # Step 2: Enumerate small outcome spaces exactly
+    outcomes = _outcome_count(len(remaining), need_board, unknown)
+    if outcomes is not None and outcomes <= exhaustive_limit:
+        deals = _exhaustive_deals(remaining, need_board, unknown)
+        ahead, tied, share = _score_deals(hero, board, villains, deals, need_board, unknown)
+        return _result(ahead.sum(), tied.sum(), share.sum(), len(deals), True, started)
+
+    # Step 3: Monte Carlo batches until the deadline or trial cap
+    rng = np.random.default_rng(seed)
+    pool = np.array(remaining, dtype=np.int64)
+    deadline = started + deadline_ms / 1000.0
+    wins = ties = total_share = trials = 0
+    while trials < max_trials:
+        size = min(batch_size, max_trials - trials)
+        # Independent shuffle per row; the first ``width`` columns are a
+        # uniform ordered sample without replacement.
+        order = np.argsort(rng.random((size, len(pool))), axis=1)[:, :width]
+        ahead, tied, share = _score_deals(hero, board, villains, pool[order], need_board, unknown)
+        wins += int(ahead.sum())
+        ties += int(tied.sum())
+        total_share += float(share.sum())
+        trials += size
+        if time.perf_counter() >= deadline:
+            break
+    return _result(wins, ties, total_share, trials, False, started)
+
+
+def _result(wins, ties, share, trials, exhaustive, started):
+    trials = max(1, int(trials))
+    return {
+        "equity": float(share) / trials,
+        "win": int(wins) / trials,
+        "tie": int(ties) / trials,
+        "trials": trials,
+        "exhaustive": exhaustive,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+    }
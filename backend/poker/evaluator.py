@@ -0,0 +1,214 @@
+"""
+Table-driven poker hand evaluator for 5, 6 and 7 cards.
+
+Every hand value is a single integer ``score``: the category in the top bits
+and up to five kicker values (2..14) packed four bits each below it, so
+
+    score_a > score_b  <=>  (rank_a, kickers_a) > (rank_b, kickers_b)
+
+exactly as the old combination-by-combination evaluator compared hands.
+
+Two tables are built once at import (a few hundred ms):
+
+- ``FLUSH_TABLE[suit_mask]``: score of the best flush / straight flush for
+  a 13-bit rank mask of one suit. With at most seven cards a flush always
+  beats any pair-based hand the same cards could make, so a flush suit
+  settles the hand on its own.
+- ``RANK_TABLE[prime_product]``: score of the best non-flush hand for every
+  multiset of 5-7 ranks. Each rank maps to a prime, so the product of the
+  cards' primes identifies the multiset regardless of order.
+
+Evaluating a hand is then a per-card dict lookup, a multiply, and one table
+lookup.
+"""
+
+RANKS = "23456789TJQKA"
+SUITS = "cdhs"
+
+HIGH_CARD, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, STRAIGHT_FLUSH = range(9)
+LABELS = (
+    "High card",
+    "Pair",
+    "Two pair",
+    "Three of a kind",
+    "Straight",
+    "Flush",
+    "Full house",
+    "Four of a kind",
+    "Straight flush",
+)
+# How many kicker values each category carries in its ``kickers`` list.
+KICKER_COUNTS = (5, 4, 3, 3, 1, 5, 2, 2, 1)
+
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+_RANK_BITS = 13
+_KICKER_SLOTS = 5
+_CATEGORY_SHIFT = 4 * _KICKER_SLOTS
+
+
+_SLOT_SHIFTS = tuple(4 * (_KICKER_SLOTS - 1 - slot) for slot in range(_KICKER_SLOTS))
+
+
+def _pack(category, kickers):
+    score = category << _CATEGORY_SHIFT
+    for shift, value in zip(_SLOT_SHIFTS, kickers):
+        score |= value << shift
+    return score
+
+
+def _straight_high(mask):
+    """Top card value of the best straight in a 13-bit rank mask, or 0."""
+    for high in range(12, 3, -1):
+        run = 0b11111 << (high - 4)
+        if mask & run == run:
+            return high + 2
+    if mask & 0b1000000001111 == 0b1000000001111:  # A-2-3-4-5
+        return 5
+    return 0
+
+
+def _top_values(mask, count):
+    values = []
+    for index in range(_RANK_BITS - 1, -1, -1):
+        if mask >> index & 1:
+            values.append(index + 2)
+            if len(values) == count:
+                break
+    return values
+
+
+# Step 1: Straight and flush tables (indexed by 13-bit rank masks)
+STRAIGHT_HIGH = tuple(_straight_high(mask) for mask in range(1 << _RANK_BITS))
+
+
+def _flush_score(mask):
+    if mask.bit_count() < 5:
+        return 0
+    high = STRAIGHT_HIGH[mask]
+    if high:
+        return _pack(STRAIGHT_FLUSH, [high])
+    return _pack(FLUSH, _top_values(mask, 5))
+
+
+FLUSH_TABLE = tuple(_flush_score(mask) for mask in range(1 << _RANK_BITS))
+
+
+# Step 2: Non-flush table keyed by prime product of the ranks
+def _rank_score(present, counts, mask):
+    """
+    Best non-flush score for a rank multiset.
+
+    ``present`` lists the distinct values (2..14) high to low and ``counts``
+    their multiplicities; ``mask`` is the 13-bit rank mask.
+    """
+    quads = trips = None
+    pairs = []
+    for value, count in zip(present, counts):
+        if count == 4:
+            quads = value
+        elif count == 3:
+            if trips is None:
+                trips = value
+            else:
+                pairs.append(value)  # a second set plays as the pair
+        elif count == 2:
+            pairs.append(value)
+
+    if quads is not None:
+        return _pack(QUADS, [quads] + [v for v in present if v != quads][:1])
+    if trips is not None and pairs:
+        return _pack(FULL_HOUSE, [trips, max(pairs)])
+    straight = STRAIGHT_HIGH[mask]
+    if straight:
+        return _pack(STRAIGHT, [straight])
+    if trips is not None:
+        return _pack(TRIPS, [trips] + [v for v in present if v != trips][:2])
+    if len(pairs) >= 2:
+        high, low = pairs[0], pairs[1]
+        return _pack(TWO_PAIR, [high, low] + [v for v in present if v != high and v != low][:1])
+    if pairs:
+        pair = pairs[0]
+        return _pack(PAIR, [pair] + [v for v in present if v != pair][:3])
+    return _pack(HIGH_CARD, present[:5])
+
+
+def _build_rank_table():
+    table = {}
+
+    # Walk ranks from the ace down, choosing 0-4 copies of each, so every
+    # multiset of 5-7 ranks is visited once with its values already sorted.
+    def walk(index, cards, product, present, counts, mask):
+        if cards >= 5:
+            table[product] = _rank_score(present, counts, mask)
+        if index < 0 or cards == 7:
+            return
+        walk(index - 1, cards, product, present, counts, mask)
+        prime = PRIMES[index]
+        for copies in range(1, min(4, 7 - cards) + 1):
+            walk(
+                index - 1,
+                cards + copies,
+                product * prime ** copies,
+                present + [index + 2],
+                counts + [copies],
+                mask | 1 << index,
+            )
+
+    walk(_RANK_BITS - 1, 0, 1, [], [], 0)
+    return table
+
+
+RANK_TABLE = _build_rank_table()
+
+# Step 3: Per-card lookup: "Ah" -> (prime, suit index, rank bit)
+CARDS = {
+    f"{rank}{suit}": (PRIMES[r], s, 1 << r)
+    for r, rank in enumerate(RANKS)
+    for s, suit in enumerate(SUITS)
+}
+
+
+def hand_score(cards):
+    """
+    Integer score of the best five-card hand within 5-7 ``cards``.
+
+    Raises:
+        ValueError: For an unknown card, a repeated card or a hand size
+            outside 5-7.
+    """
+    if not 5 <= len(cards) <= 7:
+        raise ValueError("A hand must have between 5 and 7 cards.")
+
+    product = 1
+    suit_masks = [0, 0, 0, 0]
+    for card in cards:
+        try:
+            prime, suit, bit = CARDS[card]
+        except (KeyError, TypeError):
+            raise ValueError(f"Invalid card {card!r}.")
+        if suit_masks[suit] & bit:
+            raise ValueError(f"Duplicate card {card!r}.")
+        suit_masks[suit] |= bit
+        product *= prime
+
+    for mask in suit_masks:
+        if mask.bit_count() >= 5:
+            return FLUSH_TABLE[mask]
+    return RANK_TABLE[product]
+
+
+def hand_label(score):
+    """Category label ("Flush", "Two pair", ...) of a score."""
+    return LABELS[score >> _CATEGORY_SHIFT]
+
+
+def describe(score):
+    """Split a score back into the ``{"rank", "kickers", "label"}`` dict."""
+    category = score >> _CATEGORY_SHIFT
+    kickers = [(score >> shift) & 0xF for shift in _SLOT_SHIFTS[:KICKER_COUNTS[category]]]
+    return {"rank": category, "kickers": kickers, "label": LABELS[category]}
+
+
+def evaluate_hand(cards):
+    """Best hand within 5-7 cards as ``{"rank", "kickers", "label"}``."""
+    return describe(hand_score(cards))
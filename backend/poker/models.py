@@ -1,6 +1,4 @@
-import itertools
 import random
-from collections import Counter
 from datetime import timedelta
 
 from django.conf import settings
@@ -8,9 +6,12 @@ from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
 
+from stats.hooks import CompletionHookMixin
+
+from .ai import Spot, decide
+from .evaluator import RANKS, SUITS, evaluate_hand, hand_label, hand_score  # noqa: F401
+
 
-RANKS = "23456789TJQKA"
-SUITS = "cdhs"
 PHASES = ("preflop", "flop", "turn", "river", "showdown", "completed")
 STARTING_CHIPS = 1000
 SMALL_BLIND = 10
@@ -29,66 +30,10 @@ def new_deck():
     return deck
 
 
-def _rank_value(card):
-    return RANKS.index(card[0]) + 2
-
-
-def _straight_high(values):
-    unique = sorted(set(values), reverse=True)
-    if 14 in unique:
-        unique.append(1)
-    for i in range(len(unique) - 4):
-        run = unique[i:i + 5]
-        if run[0] - run[4] == 4 and len(set(run)) == 5:
-            return 5 if run[0] == 5 else run[0]
-    return None
-
-
-def _evaluate_five(cards):
-    values = sorted((_rank_value(card) for card in cards), reverse=True)
-    suits = [card[1] for card in cards]
-    counts = Counter(values)
-    groups = sorted(counts.items(), key=lambda item: (item[1], item[0]), reverse=True)
-    flush = len(set(suits)) == 1
-    straight = _straight_high(values)
-
-    if straight and flush:
-        return (8, [straight], "Straight flush")
-    if groups[0][1] == 4:
-        quad = groups[0][0]
-        kicker = max(v for v in values if v != quad)
-        return (7, [quad, kicker], "Four of a kind")
-    if groups[0][1] == 3 and groups[1][1] == 2:
-        return (6, [groups[0][0], groups[1][0]], "Full house")
-    if flush:
-        return (5, values, "Flush")
-    if straight:
-        return (4, [straight], "Straight")
-    if groups[0][1] == 3:
-        trips = groups[0][0]
-        kickers = sorted([v for v in values if v != trips], reverse=True)
-        return (3, [trips] + kickers, "Three of a kind")
-    if groups[0][1] == 2 and groups[1][1] == 2:
-        pairs = sorted([g[0] for g in groups if g[1] == 2], reverse=True)
-        kicker = max(v for v in values if v not in pairs)
-        return (2, pairs + [kicker], "Two pair")
-    if groups[0][1] == 2:
-        pair = groups[0][0]
-        kickers = sorted([v for v in values if v != pair], reverse=True)
-        return (1, [pair] + kickers, "Pair")
-    return (0, values, "High card")
-
-
-def evaluate_hand(cards):
-    best = None
-    for combo in itertools.combinations(cards, 5):
-        score = _evaluate_five(combo)
-        if best is None or (score[0], score[1]) > (best[0], best[1]):
-            best = score
-    return {"rank": best[0], "kickers": best[1], "label": best[2]}
-
-
-class PokerGame(models.Model):
+class PokerGame(CompletionHookMixin, models.Model):
+    stats_game_type = "poker"
+    stats_round_field = "hand_number"
+
     player_one = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -492,9 +437,12 @@ class PokerGame(models.Model):
         self.last_action = "Blinds posted"
 
     def legal_actions_for(self, user):
+        return self.legal_actions_for_seat(self.piece_for_user(user))
+
+    def legal_actions_for_seat(self, seat_no):
         if self.table_seats:
-            return self._table_legal_actions_for(user)
-        player = self.piece_for_user(user)
+            return self._table_legal_actions_for_seat(seat_no)
+        player = seat_no
         if self.is_completed or player != self.current_turn or not self.player_two:
             return []
         if self._chips(player) <= 0:
@@ -506,8 +454,8 @@ class PokerGame(models.Model):
             actions.append("raise")
         return actions
 
-    def _table_legal_actions_for(self, user):
-        seat = self._seat_for_user(user)
+    def _table_legal_actions_for_seat(self, seat_no):
+        seat = self._seat_by_number(seat_no) if seat_no is not None else None
         if not seat or self.is_completed or int(seat["seat"]) != int(self.current_turn):
             return []
         if seat.get("folded") or seat.get("all_in") or int(seat.get("chips", 0)) <= 0:
@@ -875,12 +823,12 @@ class PokerGame(models.Model):
         if self.table_seats:
             self._table_showdown()
             return
-        one = evaluate_hand(self.player_one_cards + self.community_cards)
-        two = evaluate_hand(self.player_two_cards + self.community_cards)
-        if (one["rank"], one["kickers"]) > (two["rank"], two["kickers"]):
-            self._award(1, one["label"])
-        elif (two["rank"], two["kickers"]) > (one["rank"], one["kickers"]):
-            self._award(2, two["label"])
+        one = hand_score(self.player_one_cards + self.community_cards)
+        two = hand_score(self.player_two_cards + self.community_cards)
+        if one > two:
+            self._award(1, hand_label(one))
+        elif two > one:
+            self._award(2, hand_label(two))
         else:
             split = self.pot // 2
             payouts = {1: split, 2: self.pot - split}
@@ -901,9 +849,9 @@ class PokerGame(models.Model):
             return
         scored = []
         for seat in contenders:
-            best = evaluate_hand(list(seat.get("cards", [])) + self.community_cards)
-            seat["best"] = best["label"]
-            scored.append((best["rank"], best["kickers"], seat))
+            score = hand_score(list(seat.get("cards", [])) + self.community_cards)
+            seat["best"] = hand_label(score)
+            scored.append((score, seat))
 
         payouts = self._calculate_side_pot_payouts(scored)
         for seat_no, amount in payouts.items():
@@ -912,16 +860,16 @@ class PokerGame(models.Model):
         self.pot = 0
         winning_seats = [seat_no for seat_no, amount in payouts.items() if amount > 0]
         self.winner = winning_seats[0] if len(winning_seats) == 1 else 0
-        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
-        self.winning_label = scored[0][2].get("best") if len(winning_seats) == 1 else "Split pot"
+        scored.sort(key=lambda item: item[0], reverse=True)
+        self.winning_label = scored[0][1].get("best") if len(winning_seats) == 1 else "Split pot"
         self._record_last_hand_result(payouts, self.winning_label, "showdown")
         self.phase = "completed"
         self.is_completed = True
         self.current_turn_started_at = None
 
     def _calculate_side_pot_payouts(self, scored):
-        score_by_seat = {seat["seat"]: (rank, kickers) for rank, kickers, seat in scored}
-        live_seats = {seat["seat"] for _, _, seat in scored}
+        score_by_seat = {seat["seat"]: score for score, seat in scored}
+        live_seats = {seat["seat"] for _, seat in scored}
         contributions = {
             seat["seat"]: int(seat.get("contribution", 0))
             for seat in self.table_seats
@@ -973,33 +921,62 @@ class PokerGame(models.Model):
         self.is_completed = True
         self.current_turn_started_at = None
 
-    def apply_ai_action(self):
-        if not self.is_ai_game or self.is_completed:
-            return
+    def ai_spot(self):
+        """
+        ``poker.ai.Spot`` for the AI seat to act, or None if it is not an AI's turn.
+        """
+        if not self.is_ai_game or self.is_completed or not self._current_turn_is_ai():
+            return None
         if self.table_seats:
             seat = self._seat_by_number(self.current_turn)
-            if not seat or not seat.get("is_ai"):
-                return
-            bet = int(seat.get("bet", 0))
-            chips = int(seat.get("chips", 0))
-            if bet < self.current_bet:
-                action = "call"
-            elif chips <= MIN_RAISE:
-                action = "check"
-            else:
-                action = random.choice(["check", "check", "check", "raise"])
-            self._apply_table_action_for_seat(seat, action)
-            return
-        if self.current_turn != 2:
-            return
-        bet = self.player_two_bet
-        if bet < self.current_bet:
-            action = "call"
-        elif self.player_two_chips <= MIN_RAISE:
-            action = "check"
+            opponents = sum(
+                1 for other in self._remaining_live_seats()
+                if other is not seat and other.get("cards")
+            )
+            hole, bet, chips = seat.get("cards") or [], int(seat.get("bet", 0)), int(seat.get("chips", 0))
+        else:
+            opponents = 1
+            hole, bet, chips = self.player_two_cards, self.player_two_bet, self.player_two_chips
+        if len(hole) != 2:
+            return None
+        return Spot(
+            hole=list(hole),
+            board=list(self.community_cards),
+            opponents=opponents,
+            pot=self.pot,
+            current_bet=self.current_bet,
+            bet=bet,
+            chips=chips,
+            min_raise=MIN_RAISE,
+            big_blind=self.big_blind,
+        )
+
+    def decide_ai_action(self):
+        """
+        Run the AI policy for the seat to act without changing the game.
+
+        Safe to call without the row lock; see ``poker.services.ai_player``.
+        """
+        spot = self.ai_spot()
+        if spot is None:
+            return None
+        return decide(spot, settings.POKER_AI_PROFILE, settings.POKER_AI_TIME_BUDGET_MS)
+
+    def apply_ai_action(self, decision=None):
+        """
+        Play the AI's turn: ``decision`` if one was computed ahead of time,
+        otherwise decide now.
+        """
+        if decision is None:
+            decision = self.decide_ai_action()
+        if decision is None:
+            return None
+        if self.table_seats:
+            seat = self._seat_by_number(self.current_turn)
+            self._apply_table_action_for_seat(seat, decision.action, decision.amount)
         else:
-            action = random.choice(["check", "check", "check", "raise"])
-        self.apply_action(action, self.player_two)
+            self.apply_action(decision.action, self.player_two, decision.amount)
+        return decision
 
     def __str__(self):
         p1 = getattr(self.player_one, "first_name", "?") if self.player_one else "?"
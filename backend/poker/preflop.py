@@ -0,0 +1,253 @@
+"""
+Precomputed preflop equities for the 169 starting-hand classes.
+
+Suits only matter preflop as "same suit or not", so every two-card hand
+falls into one of 169 classes: pairs ("QQ"), suited ("AKs") and offsuit
+("AKo") hands. ``PREFLOP_EQUITY[hand_class][n - 1]`` is the class's share of
+the pot at showdown against ``n`` random hands, for 1 to ``MAX_OPPONENTS``
+opponents. Looking one up costs a dict access instead of a rollout.
+
+The table is generated with ``poker.equity`` and checked in; regenerate it
+(a few minutes) with:
+
+    python -m poker.preflop > table.txt
+"""
+
+from poker.evaluator import RANKS
+
+MAX_OPPONENTS = 8
+
+
+def hand_class(cards):
+    """
+    Starting-hand class of two hole cards, e.g. ``["Kd", "Ah"]`` -> ``"AKo"``.
+
+    Raises:
+        ValueError: Unless given exactly two distinct valid cards.
+    """
+    if len(cards) != 2 or cards[0] == cards[1]:
+        raise ValueError(f"Expected two distinct hole cards, got {cards!r}.")
+    try:
+        (high_rank, high_suit), (low_rank, low_suit) = sorted(
+            ((card[0], card[1]) for card in cards), key=lambda card: RANKS.index(card[0]), reverse=True,
+        )
+    except (IndexError, TypeError, ValueError):
+        raise ValueError(f"Invalid card in {cards!r}.")
+    if high_rank == low_rank:
+        return high_rank + low_rank
+    return high_rank + low_rank + ("s" if high_suit == low_suit else "o")
+
+
+def hand_classes():
+    """All 169 classes, strongest ranks first."""
+    classes = []
+    for high in reversed(RANKS):
+        for low in reversed(RANKS[:RANKS.index(high) + 1]):
+            if high == low:
+                classes.append(high + low)
+            else:
+                classes.extend((high + low + "s", high + low + "o"))
+    return classes
+
+
+def preflop_equity(cards, opponents):
+    """Table equity of ``cards`` against ``opponents`` random hands (clamped to 1..8)."""
+    return PREFLOP_EQUITY[hand_class(cards)][min(max(int(opponents), 1), MAX_OPPONENTS) - 1]
+
+
+def _representative(hand):
+    high, low = hand[0], hand[1]
+    return [high + "s", low + ("s" if hand.endswith("s") else "h")]
+
+
+def build_table(trials=50_000, max_opponents=MAX_OPPONENTS, seed=0):
+    """Monte Carlo every class against 1..``max_opponents`` random hands."""
+    from poker.equity import compute_equity
+
+    return {
+        hand: tuple(
+            round(compute_equity(_representative(hand), [], opponents, deadline_ms=60_000,
+                                 max_trials=trials, seed=seed)["equity"], 3)
+            for opponents in range(1, max_opponents + 1)
+        )
+        for hand in hand_classes()
+    }
+
+
+PREFLOP_EQUITY = {
+    "AA": (0.853, 0.734, 0.642, 0.563, 0.496, 0.438, 0.391, 0.349),
+    "AKs": (0.672, 0.510, 0.418, 0.358, 0.312, 0.280, 0.253, 0.230),
+    "AKo": (0.654, 0.483, 0.388, 0.326, 0.279, 0.246, 0.218, 0.195),
+    "AQs": (0.663, 0.498, 0.402, 0.339, 0.293, 0.261, 0.234, 0.211),
+    "AQo": (0.645, 0.471, 0.372, 0.307, 0.260, 0.226, 0.198, 0.174),
+    "AJs": (0.655, 0.484, 0.388, 0.326, 0.281, 0.248, 0.222, 0.201),
+    "AJo": (0.636, 0.456, 0.356, 0.292, 0.245, 0.211, 0.186, 0.164),
+    "ATs": (0.650, 0.474, 0.377, 0.313, 0.269, 0.236, 0.212, 0.192),
+    "ATo": (0.629, 0.444, 0.341, 0.275, 0.229, 0.196, 0.170, 0.150),
+    "A9s": (0.630, 0.448, 0.346, 0.284, 0.241, 0.210, 0.187, 0.169),
+    "A9o": (0.609, 0.417, 0.311, 0.245, 0.201, 0.169, 0.145, 0.126),
+    "A8s": (0.616, 0.433, 0.335, 0.274, 0.232, 0.202, 0.180, 0.162),
+    "A8o": (0.594, 0.401, 0.298, 0.234, 0.191, 0.160, 0.137, 0.118),
+    "A7s": (0.611, 0.425, 0.324, 0.262, 0.222, 0.193, 0.172, 0.154),
+    "A7o": (0.590, 0.394, 0.288, 0.223, 0.181, 0.152, 0.130, 0.112),
+    "A6s": (0.600, 0.412, 0.311, 0.253, 0.214, 0.187, 0.166, 0.151),
+    "A6o": (0.578, 0.381, 0.276, 0.215, 0.174, 0.146, 0.125, 0.109),
+    "A5s": (0.600, 0.415, 0.316, 0.259, 0.221, 0.194, 0.172, 0.156),
+    "A5o": (0.576, 0.383, 0.279, 0.220, 0.180, 0.152, 0.130, 0.114),
+    "A4s": (0.590, 0.407, 0.309, 0.253, 0.215, 0.189, 0.170, 0.154),
+    "A4o": (0.567, 0.374, 0.271, 0.213, 0.174, 0.148, 0.127, 0.111),
+    "A3s": (0.582, 0.397, 0.301, 0.246, 0.210, 0.185, 0.166, 0.151),
+    "A3o": (0.559, 0.364, 0.263, 0.206, 0.169, 0.143, 0.124, 0.109),
+    "A2s": (0.574, 0.389, 0.296, 0.241, 0.207, 0.182, 0.163, 0.148),
+    "A2o": (0.551, 0.356, 0.257, 0.200, 0.164, 0.139, 0.120, 0.105),
+    "KK": (0.825, 0.686, 0.583, 0.498, 0.430, 0.374, 0.328, 0.290),
+    "KQs": (0.636, 0.473, 0.385, 0.328, 0.287, 0.255, 0.228, 0.206),
+    "KQo": (0.616, 0.445, 0.354, 0.295, 0.253, 0.220, 0.193, 0.170),
+    "KJs": (0.626, 0.460, 0.372, 0.314, 0.272, 0.240, 0.214, 0.193),
+    "KJo": (0.606, 0.433, 0.341, 0.281, 0.238, 0.205, 0.178, 0.157),
+    "KTs": (0.621, 0.450, 0.361, 0.303, 0.262, 0.231, 0.207, 0.187),
+    "KTo": (0.600, 0.420, 0.327, 0.267, 0.225, 0.192, 0.168, 0.148),
+    "K9s": (0.602, 0.426, 0.332, 0.274, 0.235, 0.205, 0.183, 0.165),
+    "K9o": (0.580, 0.394, 0.296, 0.236, 0.195, 0.164, 0.141, 0.123),
+    "K8s": (0.581, 0.402, 0.309, 0.253, 0.215, 0.187, 0.166, 0.149),
+    "K8o": (0.557, 0.368, 0.271, 0.213, 0.175, 0.146, 0.124, 0.107),
+    "K7s": (0.575, 0.394, 0.302, 0.245, 0.207, 0.181, 0.161, 0.145),
+    "K7o": (0.551, 0.361, 0.264, 0.205, 0.166, 0.139, 0.118, 0.103),
+    "K6s": (0.567, 0.385, 0.292, 0.238, 0.203, 0.177, 0.157, 0.141),
+    "K6o": (0.542, 0.351, 0.254, 0.198, 0.161, 0.135, 0.114, 0.099),
+    "K5s": (0.558, 0.375, 0.284, 0.231, 0.197, 0.171, 0.152, 0.137),
+    "K5o": (0.531, 0.341, 0.246, 0.191, 0.156, 0.130, 0.110, 0.095),
+    "K4s": (0.547, 0.366, 0.276, 0.224, 0.190, 0.166, 0.148, 0.134),
+    "K4o": (0.520, 0.330, 0.236, 0.182, 0.148, 0.124, 0.105, 0.091),
+    "K3s": (0.539, 0.357, 0.271, 0.220, 0.187, 0.164, 0.146, 0.132),
+    "K3o": (0.511, 0.321, 0.230, 0.178, 0.144, 0.121, 0.103, 0.089),
+    "K2s": (0.532, 0.351, 0.266, 0.216, 0.185, 0.163, 0.146, 0.133),
+    "K2o": (0.504, 0.313, 0.224, 0.173, 0.141, 0.119, 0.102, 0.089),
+    "QQ": (0.798, 0.647, 0.537, 0.447, 0.379, 0.325, 0.283, 0.249),
+    "QJs": (0.603, 0.442, 0.358, 0.303, 0.263, 0.232, 0.208, 0.188),
+    "QJo": (0.580, 0.413, 0.325, 0.268, 0.228, 0.197, 0.172, 0.152),
+    "QTs": (0.597, 0.432, 0.346, 0.292, 0.253, 0.224, 0.201, 0.182),
+    "QTo": (0.573, 0.401, 0.312, 0.256, 0.216, 0.186, 0.163, 0.144),
+    "Q9s": (0.578, 0.408, 0.319, 0.264, 0.227, 0.198, 0.176, 0.159),
+    "Q9o": (0.554, 0.375, 0.283, 0.226, 0.188, 0.159, 0.136, 0.119),
+    "Q8s": (0.557, 0.384, 0.295, 0.242, 0.206, 0.180, 0.160, 0.145),
+    "Q8o": (0.533, 0.350, 0.258, 0.203, 0.167, 0.141, 0.120, 0.104),
+    "Q7s": (0.543, 0.364, 0.275, 0.223, 0.188, 0.164, 0.146, 0.132),
+    "Q7o": (0.518, 0.331, 0.238, 0.184, 0.148, 0.124, 0.104, 0.090),
+    "Q6s": (0.536, 0.358, 0.269, 0.218, 0.184, 0.161, 0.142, 0.128),
+    "Q6o": (0.511, 0.324, 0.232, 0.179, 0.144, 0.120, 0.101, 0.087),
+    "Q5s": (0.526, 0.348, 0.261, 0.212, 0.180, 0.157, 0.138, 0.125),
+    "Q5o": (0.499, 0.313, 0.222, 0.172, 0.138, 0.115, 0.096, 0.083),
+    "Q4s": (0.515, 0.340, 0.254, 0.207, 0.175, 0.153, 0.136, 0.124),
+    "Q4o": (0.487, 0.304, 0.215, 0.166, 0.133, 0.111, 0.094, 0.082),
+    "Q3s": (0.508, 0.333, 0.249, 0.203, 0.172, 0.150, 0.133, 0.121),
+    "Q3o": (0.480, 0.296, 0.208, 0.161, 0.130, 0.107, 0.091, 0.079),
+    "Q2s": (0.501, 0.325, 0.242, 0.196, 0.167, 0.147, 0.131, 0.120),
+    "Q2o": (0.472, 0.288, 0.201, 0.154, 0.124, 0.104, 0.088, 0.077),
+    "JJ": (0.775, 0.611, 0.491, 0.402, 0.336, 0.285, 0.245, 0.215),
+    "JTs": (0.575, 0.419, 0.338, 0.285, 0.247, 0.218, 0.196, 0.177),
+    "JTo": (0.551, 0.388, 0.304, 0.251, 0.211, 0.182, 0.159, 0.141),
+    "J9s": (0.557, 0.395, 0.313, 0.261, 0.225, 0.198, 0.176, 0.160),
+    "J9o": (0.531, 0.363, 0.278, 0.225, 0.188, 0.160, 0.138, 0.122),
+    "J8s": (0.538, 0.373, 0.290, 0.240, 0.205, 0.179, 0.159, 0.144),
+    "J8o": (0.513, 0.340, 0.255, 0.203, 0.167, 0.141, 0.121, 0.106),
+    "J7s": (0.522, 0.353, 0.270, 0.220, 0.187, 0.163, 0.145, 0.132),
+    "J7o": (0.495, 0.320, 0.234, 0.182, 0.148, 0.124, 0.106, 0.093),
+    "J6s": (0.503, 0.333, 0.253, 0.204, 0.173, 0.151, 0.133, 0.120),
+    "J6o": (0.477, 0.298, 0.215, 0.166, 0.133, 0.110, 0.093, 0.080),
+    "J5s": (0.496, 0.325, 0.245, 0.198, 0.167, 0.146, 0.129, 0.116),
+    "J5o": (0.467, 0.290, 0.207, 0.159, 0.127, 0.105, 0.088, 0.076),
+    "J4s": (0.487, 0.319, 0.240, 0.194, 0.164, 0.144, 0.128, 0.116),
+    "J4o": (0.458, 0.282, 0.200, 0.153, 0.123, 0.102, 0.086, 0.074),
+    "J3s": (0.477, 0.308, 0.231, 0.187, 0.158, 0.138, 0.123, 0.111),
+    "J3o": (0.448, 0.271, 0.192, 0.147, 0.118, 0.097, 0.082, 0.071),
+    "J2s": (0.472, 0.303, 0.227, 0.184, 0.156, 0.137, 0.123, 0.111),
+    "J2o": (0.442, 0.265, 0.186, 0.142, 0.114, 0.095, 0.081, 0.070),
+    "TT": (0.752, 0.577, 0.455, 0.367, 0.304, 0.256, 0.220, 0.194),
+    "T9s": (0.541, 0.389, 0.310, 0.261, 0.227, 0.201, 0.180, 0.163),
+    "T9o": (0.514, 0.356, 0.275, 0.224, 0.190, 0.163, 0.142, 0.126),
+    "T8s": (0.522, 0.365, 0.286, 0.239, 0.206, 0.181, 0.162, 0.147),
+    "T8o": (0.495, 0.331, 0.250, 0.201, 0.169, 0.143, 0.124, 0.109),
+    "T7s": (0.504, 0.345, 0.267, 0.220, 0.188, 0.165, 0.147, 0.133),
+    "T7o": (0.477, 0.313, 0.232, 0.183, 0.151, 0.127, 0.109, 0.096),
+    "T6s": (0.488, 0.327, 0.249, 0.204, 0.174, 0.152, 0.136, 0.123),
+    "T6o": (0.460, 0.293, 0.212, 0.166, 0.135, 0.113, 0.097, 0.085),
+    "T5s": (0.469, 0.306, 0.230, 0.188, 0.159, 0.139, 0.124, 0.111),
+    "T5o": (0.439, 0.269, 0.191, 0.147, 0.118, 0.098, 0.083, 0.071),
+    "T4s": (0.462, 0.302, 0.227, 0.184, 0.156, 0.136, 0.121, 0.109),
+    "T4o": (0.433, 0.265, 0.188, 0.144, 0.115, 0.095, 0.081, 0.070),
+    "T3s": (0.454, 0.291, 0.218, 0.177, 0.150, 0.130, 0.116, 0.105),
+    "T3o": (0.424, 0.255, 0.178, 0.136, 0.109, 0.090, 0.076, 0.066),
+    "T2s": (0.448, 0.288, 0.215, 0.175, 0.149, 0.131, 0.117, 0.106),
+    "T2o": (0.417, 0.249, 0.173, 0.133, 0.107, 0.089, 0.076, 0.067),
+    "99": (0.720, 0.536, 0.415, 0.331, 0.272, 0.228, 0.196, 0.175),
+    "98s": (0.509, 0.362, 0.287, 0.239, 0.206, 0.180, 0.161, 0.147),
+    "98o": (0.481, 0.328, 0.250, 0.201, 0.167, 0.141, 0.123, 0.109),
+    "97s": (0.493, 0.344, 0.268, 0.222, 0.189, 0.165, 0.148, 0.135),
+    "97o": (0.464, 0.310, 0.232, 0.185, 0.152, 0.128, 0.110, 0.098),
+    "96s": (0.477, 0.325, 0.252, 0.206, 0.176, 0.154, 0.137, 0.125),
+    "96o": (0.447, 0.290, 0.214, 0.167, 0.137, 0.115, 0.098, 0.087),
+    "95s": (0.458, 0.302, 0.232, 0.189, 0.161, 0.140, 0.125, 0.114),
+    "95o": (0.427, 0.265, 0.192, 0.148, 0.121, 0.100, 0.085, 0.075),
+    "94s": (0.440, 0.287, 0.217, 0.176, 0.149, 0.129, 0.115, 0.104),
+    "94o": (0.408, 0.249, 0.177, 0.134, 0.107, 0.088, 0.075, 0.065),
+    "93s": (0.432, 0.279, 0.210, 0.170, 0.143, 0.124, 0.110, 0.101),
+    "93o": (0.400, 0.241, 0.169, 0.129, 0.102, 0.084, 0.071, 0.061),
+    "92s": (0.425, 0.275, 0.207, 0.168, 0.143, 0.126, 0.112, 0.102),
+    "92o": (0.393, 0.235, 0.165, 0.124, 0.100, 0.083, 0.070, 0.061),
+    "88": (0.691, 0.499, 0.377, 0.296, 0.242, 0.204, 0.176, 0.158),
+    "87s": (0.478, 0.337, 0.266, 0.222, 0.191, 0.168, 0.151, 0.138),
+    "87o": (0.448, 0.302, 0.230, 0.184, 0.152, 0.130, 0.113, 0.101),
+    "86s": (0.463, 0.318, 0.251, 0.207, 0.178, 0.157, 0.140, 0.129),
+    "86o": (0.432, 0.282, 0.213, 0.168, 0.138, 0.118, 0.102, 0.091),
+    "85s": (0.443, 0.300, 0.235, 0.193, 0.166, 0.146, 0.130, 0.119),
+    "85o": (0.411, 0.263, 0.196, 0.153, 0.125, 0.106, 0.090, 0.080),
+    "84s": (0.426, 0.283, 0.216, 0.177, 0.149, 0.131, 0.117, 0.107),
+    "84o": (0.394, 0.245, 0.176, 0.136, 0.109, 0.091, 0.078, 0.068),
+    "83s": (0.404, 0.260, 0.197, 0.161, 0.135, 0.118, 0.106, 0.097),
+    "83o": (0.371, 0.221, 0.156, 0.120, 0.094, 0.078, 0.066, 0.057),
+    "82s": (0.403, 0.259, 0.196, 0.161, 0.136, 0.120, 0.108, 0.099),
+    "82o": (0.369, 0.219, 0.153, 0.117, 0.093, 0.077, 0.066, 0.057),
+    "77": (0.662, 0.463, 0.345, 0.269, 0.221, 0.188, 0.165, 0.150),
+    "76s": (0.452, 0.319, 0.251, 0.209, 0.181, 0.161, 0.145, 0.133),
+    "76o": (0.421, 0.283, 0.214, 0.171, 0.143, 0.123, 0.108, 0.097),
+    "75s": (0.434, 0.301, 0.236, 0.196, 0.169, 0.150, 0.136, 0.126),
+    "75o": (0.401, 0.263, 0.197, 0.157, 0.130, 0.112, 0.098, 0.089),
+    "74s": (0.416, 0.284, 0.219, 0.182, 0.155, 0.138, 0.124, 0.114),
+    "74o": (0.383, 0.245, 0.179, 0.141, 0.115, 0.098, 0.086, 0.076),
+    "73s": (0.396, 0.264, 0.200, 0.165, 0.140, 0.124, 0.112, 0.103),
+    "73o": (0.361, 0.223, 0.158, 0.122, 0.098, 0.083, 0.071, 0.063),
+    "72s": (0.383, 0.248, 0.187, 0.154, 0.131, 0.116, 0.105, 0.095),
+    "72o": (0.347, 0.206, 0.143, 0.110, 0.087, 0.073, 0.063, 0.054),
+    "66": (0.631, 0.430, 0.315, 0.245, 0.202, 0.174, 0.155, 0.141),
+    "65s": (0.428, 0.300, 0.236, 0.195, 0.171, 0.153, 0.139, 0.128),
+    "65o": (0.397, 0.265, 0.199, 0.158, 0.133, 0.116, 0.103, 0.093),
+    "64s": (0.410, 0.284, 0.221, 0.183, 0.159, 0.142, 0.129, 0.118),
+    "64o": (0.378, 0.248, 0.183, 0.144, 0.120, 0.104, 0.092, 0.082),
+    "63s": (0.393, 0.266, 0.203, 0.166, 0.143, 0.128, 0.115, 0.107),
+    "63o": (0.358, 0.227, 0.162, 0.125, 0.103, 0.088, 0.077, 0.069),
+    "62s": (0.379, 0.251, 0.192, 0.157, 0.134, 0.119, 0.108, 0.098),
+    "62o": (0.342, 0.210, 0.148, 0.113, 0.091, 0.077, 0.067, 0.059),
+    "55": (0.603, 0.401, 0.289, 0.225, 0.186, 0.161, 0.144, 0.132),
+    "54s": (0.411, 0.288, 0.227, 0.190, 0.165, 0.148, 0.133, 0.123),
+    "54o": (0.379, 0.252, 0.188, 0.151, 0.126, 0.109, 0.096, 0.087),
+    "53s": (0.394, 0.271, 0.210, 0.175, 0.152, 0.137, 0.124, 0.114),
+    "53o": (0.359, 0.233, 0.170, 0.135, 0.112, 0.098, 0.086, 0.078),
+    "52s": (0.377, 0.256, 0.198, 0.164, 0.143, 0.128, 0.116, 0.107),
+    "52o": (0.341, 0.216, 0.156, 0.122, 0.101, 0.087, 0.076, 0.068),
+    "44": (0.568, 0.366, 0.262, 0.205, 0.172, 0.150, 0.137, 0.127),
+    "43s": (0.384, 0.264, 0.204, 0.170, 0.148, 0.133, 0.121, 0.111),
+    "43o": (0.350, 0.225, 0.164, 0.130, 0.109, 0.095, 0.084, 0.076),
+    "42s": (0.367, 0.246, 0.189, 0.157, 0.137, 0.123, 0.113, 0.104),
+    "42o": (0.331, 0.206, 0.147, 0.115, 0.095, 0.083, 0.073, 0.066),
+    "33": (0.533, 0.334, 0.239, 0.189, 0.161, 0.145, 0.134, 0.126),
+    "32s": (0.360, 0.238, 0.181, 0.150, 0.131, 0.117, 0.107, 0.099),
+    "32o": (0.324, 0.197, 0.139, 0.108, 0.089, 0.077, 0.069, 0.062),
+    "22": (0.501, 0.305, 0.219, 0.176, 0.153, 0.140, 0.131, 0.124),
+}
+
+
+if __name__ == "__main__":
+    for hand, row in build_table().items():
+        values = ", ".join(f"{value:.3f}" for value in row)
+        print(f'    "{hand}": ({values}),')
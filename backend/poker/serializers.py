@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from django.utils import timezone
 
-from .models import MIN_RAISE, PokerGame, PokerTournament, PokerTournamentRegistration, evaluate_hand
+from .evaluator import hand_label, hand_score
+from .models import MIN_RAISE, PokerGame, PokerTournament, PokerTournamentRegistration
+from .services.equity import equity_for_seat
 
 
 class PokerGameSerializer(serializers.ModelSerializer):
@@ -58,75 +60,143 @@ class PokerGameSerializer(serializers.ModelSerializer):
         return obj.player_two.first_name or obj.player_two.email if obj.player_two else None
 
 
-def poker_payload(game, user):
-    data = PokerGameSerializer(game).data
+def poker_payload(game, user, on_equity_ready=None):
+    return merge_payload(public_snapshot(game), private_view(game, user, on_equity_ready=on_equity_ready))
+
+
+def public_snapshot(game):
+    """
+    The part of the payload every viewer sees, with hole cards masked unless
+    they were shown or revealed at showdown.
+
+    Built once per update and shared by every socket at the table; each one
+    adds its own ``private_view`` with ``merge_payload``.
+    """
+    data = dict(PokerGameSerializer(game).data)
     deadline = game.current_turn_deadline_at()
     data["turn_deadline_at"] = deadline.isoformat() if deadline else None
     data["server_now"] = timezone.now().isoformat()
-    my_seat = game.piece_for_user(user)
     shown_cards = {int(seat) for seat in game.shown_cards or []}
     reveal_all = game.completed_by_showdown()
-    data["my_current_best_hand"] = None
     if game.table_seats:
         safe_seats = []
         for seat in game.table_seats:
-            is_me = str(seat.get("user_id")) == str(getattr(user, "id", None))
-            seat_no = int(seat.get("seat"))
             safe = dict(seat)
             safe["current_best_hand"] = None
-            if is_me:
-                safe["current_best_hand"] = _current_best_hand_label(
-                    seat.get("cards", []),
-                    game.community_cards,
-                )
-                data["my_current_best_hand"] = safe["current_best_hand"]
-            if not is_me and not reveal_all and seat_no not in shown_cards:
+            if not reveal_all and int(seat.get("seat")) not in shown_cards:
                 safe["cards"] = ["??", "??"] if safe.get("cards") else []
             safe_seats.append(safe)
         data["table_seats"] = safe_seats
         data["players"] = safe_seats
-        data["my_seat"] = my_seat
-        data["legal_actions"] = game.legal_actions_for(user)
-        data["call_amount"] = 0
-        data["min_raise_to"] = None
-        data["max_raise_to"] = None
-        data["min_raise"] = MIN_RAISE
-        data["can_update_settings"] = int(getattr(user, "id", 0)) == int(game.player_one_id) and not game.table_seats
-        current = next((s for s in game.table_seats if int(s.get("seat")) == int(my_seat or 0)), None)
-        if current:
-            my_bet = int(current.get("bet", 0))
-            my_chips = int(current.get("chips", 0))
-            data["call_amount"] = max(0, game.current_bet - my_bet)
-            data["min_raise_to"] = game.current_bet + MIN_RAISE if my_chips >= data["call_amount"] + MIN_RAISE else None
-            data["max_raise_to"] = my_bet + my_chips
         return data
 
-    if my_seat != 1 and not reveal_all and 1 not in shown_cards:
+    if not reveal_all and 1 not in shown_cards:
         data["player_one_cards"] = ["??", "??"] if game.player_one_cards else []
-    if my_seat != 2 and not reveal_all and 2 not in shown_cards:
+    if not reveal_all and 2 not in shown_cards:
         data["player_two_cards"] = ["??", "??"] if game.player_two_cards else []
-    data["my_seat"] = my_seat
-    data["legal_actions"] = game.legal_actions_for(user)
-    data["call_amount"] = 0
-    data["min_raise_to"] = None
-    data["max_raise_to"] = None
-    data["min_raise"] = MIN_RAISE
-    data["can_update_settings"] = int(getattr(user, "id", 0)) == int(game.player_one_id) and not game.player_one_cards
     data["player_one_best"] = None
     data["player_two_best"] = None
-    if my_seat == 1:
-        data["my_current_best_hand"] = _current_best_hand_label(game.player_one_cards, game.community_cards)
-    elif my_seat == 2:
-        data["my_current_best_hand"] = _current_best_hand_label(game.player_two_cards, game.community_cards)
-    if my_seat in (1, 2):
-        my_bet = game.player_one_bet if my_seat == 1 else game.player_two_bet
-        my_chips = game.player_one_chips if my_seat == 1 else game.player_two_chips
-        data["call_amount"] = max(0, game.current_bet - my_bet)
-        data["min_raise_to"] = game.current_bet + MIN_RAISE if my_chips >= data["call_amount"] + MIN_RAISE else None
-        data["max_raise_to"] = my_bet + my_chips
     if game.is_completed and len(game.community_cards) >= 5:
-        data["player_one_best"] = evaluate_hand(game.player_one_cards + game.community_cards)["label"]
-        data["player_two_best"] = evaluate_hand(game.player_two_cards + game.community_cards)["label"]
+        data["player_one_best"] = hand_label(hand_score(game.player_one_cards + game.community_cards))
+        data["player_two_best"] = hand_label(hand_score(game.player_two_cards + game.community_cards))
+    return data
+
+
+def private_view(game, user, on_equity_ready=None):
+    """The viewer-specific part of the payload: own cards, equity and legal actions."""
+    return _seat_view(game, game.piece_for_user(user), getattr(user, "id", None), on_equity_ready)
+
+
+def private_views(game, on_equity_ready=None):
+    """
+    ``{str(user_id): private_view}`` for every human seat, without loading users.
+
+    AI seats never have a socket to read a view, so they get none (and no
+    equity rollout). ``on_equity_ready(user_id)`` returns the rollout
+    callback for that user.
+    """
+    if game.table_seats:
+        seats = [
+            (int(seat["seat"]), seat.get("user_id"))
+            for seat in game.table_seats
+            if seat.get("user_id") and not seat.get("is_ai")
+        ]
+    else:
+        seats = [(1, game.player_one_id)] + ([] if game.is_ai_game else [(2, game.player_two_id)])
+    return {
+        str(user_id): _seat_view(game, seat_no, user_id, on_equity_ready(user_id) if on_equity_ready else None)
+        for seat_no, user_id in seats
+        if user_id
+    }
+
+
+def spectator_view():
+    """``private_view`` of someone without a seat."""
+    return {
+        "my_seat": None,
+        "my_cards": None,
+        "my_current_best_hand": None,
+        "my_equity": None,
+        "legal_actions": [],
+        "call_amount": 0,
+        "min_raise_to": None,
+        "max_raise_to": None,
+        "min_raise": MIN_RAISE,
+        "can_update_settings": False,
+    }
+
+
+def _seat_view(game, seat_no, user_id, on_equity_ready=None):
+    view = spectator_view()
+    view["my_seat"] = seat_no
+    view["legal_actions"] = game.legal_actions_for_seat(seat_no)
+    is_host = int(user_id or 0) == int(game.player_one_id or 0)
+    if game.table_seats:
+        view["can_update_settings"] = False
+        current = game._seat_by_number(seat_no) if seat_no is not None else None
+        if current:
+            view["my_cards"] = list(current.get("cards") or [])
+            my_bet = int(current.get("bet", 0))
+            my_chips = int(current.get("chips", 0))
+    else:
+        view["can_update_settings"] = is_host and not game.player_one_cards
+        current = seat_no in (1, 2)
+        if current:
+            view["my_cards"] = list((game.player_one_cards if seat_no == 1 else game.player_two_cards) or [])
+            my_bet = game.player_one_bet if seat_no == 1 else game.player_two_bet
+            my_chips = game.player_one_chips if seat_no == 1 else game.player_two_chips
+    if not current:
+        return view
+
+    view["my_current_best_hand"] = _current_best_hand_label(view["my_cards"], game.community_cards)
+    view["my_equity"] = equity_for_seat(game, seat_no, on_ready=on_equity_ready)
+    view["call_amount"] = max(0, game.current_bet - my_bet)
+    view["min_raise_to"] = game.current_bet + MIN_RAISE if my_chips >= view["call_amount"] + MIN_RAISE else None
+    view["max_raise_to"] = my_bet + my_chips
+    return view
+
+
+def merge_payload(snapshot, private):
+    """Full payload for one viewer: ``public_snapshot`` plus their ``private_view``."""
+    data = dict(snapshot)
+    private = dict(private)
+    cards = private.pop("my_cards", None)
+    data.update(private)
+    my_seat = private.get("my_seat")
+    if cards is None or my_seat is None:
+        return data
+    if snapshot.get("players") is not None:
+        seats = [
+            dict(seat, cards=cards, current_best_hand=private["my_current_best_hand"])
+            if int(seat.get("seat")) == int(my_seat) else seat
+            for seat in snapshot["players"]
+        ]
+        data["table_seats"] = seats
+        data["players"] = seats
+    elif my_seat == 1:
+        data["player_one_cards"] = cards
+    elif my_seat == 2:
+        data["player_two_cards"] = cards
     return data
 
 
@@ -136,7 +206,7 @@ def _current_best_hand_label(hole_cards, community_cards):
     cards = list(hole_cards or []) + list(community_cards or [])
     if len(cards) < 5:
         return None
-    return evaluate_hand(cards)["label"]
+    return hand_label(hand_score(cards))
 
 
 class PokerTournamentRegistrationSerializer(serializers.ModelSerializer):
@@ -0,0 +1,57 @@
+import logging
+
+from django.db import transaction
+
+from poker.models import PokerGame
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on AI turns played back to back (a full table of AIs can take
+# several streets before a human is to act again).
+MAX_AI_TURNS = 32
+
+
+def _turn_token(game):
+    """Fields that change with every action; equal tokens mean the same decision point."""
+    return (
+        game.hand_number,
+        game.phase,
+        game.current_turn,
+        game.current_bet,
+        game.pot,
+        game.actions_since_raise,
+        game.is_completed,
+        game.updated_at,
+    )
+
+
+def play_ai_turns(game, max_turns=MAX_AI_TURNS):
+    """
+    Play AI turns until a human is to act or the hand is over.
+
+    Each decision is computed with no lock held; only applying it takes the
+    row lock, after checking the game has not moved on in the meantime (a
+    stale decision is dropped and recomputed from the fresh row). Call this
+    outside any transaction that already holds the game row, so a table of
+    AIs never keeps the row locked for the whole cascade.
+
+    ``game`` is updated in place and also returned.
+    """
+    for _ in range(max_turns):
+        if not game.is_ai_game or game.is_completed or not game._current_turn_is_ai():
+            break
+        token = _turn_token(game)
+        decision = game.decide_ai_action()
+        if decision is None:
+            break
+        with transaction.atomic():
+            game.refresh_from_db(from_queryset=PokerGame.objects.select_for_update())
+            if _turn_token(game) != token:
+                logger.info("[POKER][AI] stale decision dropped game_id=%s", game.pk)
+                continue
+            game.apply_ai_action(decision)
+        logger.debug(
+            "[POKER][AI] game_id=%s action=%s amount=%s strength=%.3f ms=%.1f",
+            game.pk, decision.action, decision.amount, decision.strength, decision.elapsed_ms,
+        )
+    return game
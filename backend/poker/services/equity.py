@@ -0,0 +1,174 @@
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+
+from poker.equity import compute_equity
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAX_ENTRIES = 4096
+
+_equity_pool = None
+_pool_lock = threading.Lock()
+
+# (hole, board, opponents) -> result dict, most recently used last.
+_cache = OrderedDict()
+# Keys being computed -> callbacks waiting for them.
+_pending = {}
+_cache_lock = threading.Lock()
+
+
+def _get_equity_pool():
+    """
+    Lazily create the per-process rollout pool.
+
+    Rollouts run in spawned worker processes so NumPy batches never hold the
+    GIL of the process serving WebSockets.
+    """
+    global _equity_pool
+    if _equity_pool is None:
+        with _pool_lock:
+            if _equity_pool is None:
+                _equity_pool = ProcessPoolExecutor(
+                    max_workers=settings.POKER_EQUITY_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _equity_pool
+
+
+def equity_key(hole_cards, board_cards, opponents):
+    """Cache key: card order never changes the answer."""
+    return tuple(sorted(hole_cards)), tuple(sorted(board_cards)), int(opponents)
+
+
+def cached_equity(hole_cards, board_cards, opponents):
+    key = equity_key(hole_cards, board_cards, opponents)
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+        return result
+
+
+def _store_result(key, future):
+    try:
+        result = future.result()
+    except Exception:
+        logger.exception("[POKER][EQUITY] rollout failed key=%s", key)
+        result = None
+
+    with _cache_lock:
+        callbacks = _pending.pop(key, [])
+        if result is not None:
+            _cache[key] = result
+            while len(_cache) > CACHE_MAX_ENTRIES:
+                _cache.popitem(last=False)
+
+    if result is None:
+        return
+    for callback in callbacks:
+        try:
+            callback(result)
+        except Exception:
+            logger.exception("[POKER][EQUITY] on_ready callback failed key=%s", key)
+
+
+def request_equity(hole_cards, board_cards, opponents, on_ready=None):
+    """
+    Non-blocking equity lookup.
+
+    Returns the cached result if there is one. Otherwise the rollout is
+    queued on the worker pool (once per key, however many callers ask) and
+    ``on_ready(result)`` is called from a pool thread when it finishes.
+
+    Returns:
+        dict | None: ``poker.equity.compute_equity`` result, or None while pending.
+    """
+    key = equity_key(hole_cards, board_cards, opponents)
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+            return result
+        callbacks = _pending.get(key)
+        if callbacks is not None:
+            if on_ready is not None:
+                callbacks.append(on_ready)
+            return None
+        _pending[key] = [on_ready] if on_ready is not None else []
+
+    try:
+        future = _get_equity_pool().submit(
+            compute_equity,
+            list(hole_cards),
+            list(board_cards),
+            int(opponents),
+            deadline_ms=settings.POKER_EQUITY_DEADLINE_MS,
+        )
+    except Exception:
+        with _cache_lock:
+            _pending.pop(key, None)
+        logger.exception("[POKER][EQUITY] could not queue rollout key=%s", key)
+        return None
+    future.add_done_callback(partial(_store_result, key))
+    return None
+
+
+def equity_inputs_for_user(game, user):
+    """
+    ``(hole_cards, board_cards, opponents)`` for the user's live hand, or
+    None if they have no hand in play.
+    """
+    return equity_inputs_for_seat(game, game.piece_for_user(user))
+
+
+def equity_inputs_for_seat(game, seat_no):
+    """Same as ``equity_inputs_for_user``, for a seat number."""
+    if game.is_completed or seat_no is None:
+        return None
+
+    if game.table_seats:
+        seat = game._seat_by_number(seat_no)
+        if not seat or seat.get("folded") or len(seat.get("cards") or []) != 2:
+            return None
+        opponents = sum(
+            1 for other in game._remaining_live_seats()
+            if other is not seat and len(other.get("cards") or []) == 2
+        )
+        return list(seat["cards"]), list(game.community_cards), opponents
+
+    if seat_no not in (1, 2):
+        return None
+    hole = game.player_one_cards if seat_no == 1 else game.player_two_cards
+    other = game.player_two_cards if seat_no == 1 else game.player_one_cards
+    if len(hole or []) != 2:
+        return None
+    return list(hole), list(game.community_cards), 1 if other else 0
+
+
+def equity_for_user(game, user, on_ready=None):
+    """
+    Equity (0..1) of the user's hand if already known, else None.
+
+    A miss queues the rollout; ``on_ready(result)`` then fires when it is done.
+    Setting ``POKER_EQUITY_WORKERS`` to 0 turns the feature off.
+    """
+    if settings.POKER_EQUITY_WORKERS <= 0:
+        return None
+    return equity_for_seat(game, game.piece_for_user(user), on_ready=on_ready)
+
+
+def equity_for_seat(game, seat_no, on_ready=None):
+    """Same as ``equity_for_user``, for a seat number."""
+    if settings.POKER_EQUITY_WORKERS <= 0:
+        return None
+    inputs = equity_inputs_for_seat(game, seat_no)
+    if inputs is None:
+        return None
+    result = request_equity(*inputs, on_ready=on_ready)
+    return None if result is None else round(result["equity"], 4)
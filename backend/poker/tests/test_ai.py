@@ -0,0 +1,175 @@
+# Filename: poker/tests/test_ai.py
+
+# Step 1: Imports
+import random
+import time
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from poker import ai, equity, preflop
+from poker.models import MIN_RAISE, PokerGame
+from poker.services.ai_player import play_ai_turns
+
+User = get_user_model()
+
+
+def _spot(hole, board=(), opponents=1, pot=30, current_bet=20, bet=20, chips=980, min_raise=MIN_RAISE):
+    return ai.Spot(
+        hole=list(hole), board=list(board), opponents=opponents, pot=pot, current_bet=current_bet,
+        bet=bet, chips=chips, min_raise=min_raise, big_blind=20,
+    )
+
+
+class _NoBluff:
+    def random(self):
+        return 1.0
+
+
+# Step 2: Preflop table
+def test_hand_class_ignores_order_and_exact_suits():
+    assert preflop.hand_class(["Kd", "Ah"]) == "AKo"
+    assert preflop.hand_class(["9h", "7h"]) == "97s"
+    assert preflop.hand_class(["2c", "2d"]) == "22"
+    with pytest.raises(ValueError):
+        preflop.hand_class(["Ah", "Ah"])
+
+
+def test_preflop_table_covers_every_class():
+    assert len(preflop.PREFLOP_EQUITY) == 169
+    assert set(preflop.PREFLOP_EQUITY) == set(preflop.hand_classes())
+    assert all(len(row) == preflop.MAX_OPPONENTS for row in preflop.PREFLOP_EQUITY.values())
+
+
+def test_preflop_table_orders_hands_sensibly():
+    table = preflop.PREFLOP_EQUITY
+    assert table["AA"][0] > table["KK"][0] > table["AKs"][0] > table["AKo"][0] > table["72o"][0]
+    assert list(table["AA"]) == sorted(table["AA"], reverse=True)
+    assert preflop.preflop_equity(["As", "Ad"], 20) == table["AA"][-1]
+
+
+def test_preflop_table_matches_rollouts():
+    for hand, cards in (("AKs", ["Ah", "Kh"]), ("T9o", ["Td", "9c"])):
+        result = equity.compute_equity(cards, [], 1, deadline_ms=5000, max_trials=20_000, seed=11)
+        assert abs(preflop.PREFLOP_EQUITY[hand][0] - result["equity"]) < 0.02
+
+
+# Step 3: Policy
+def test_weak_hand_folds_to_a_big_bet_and_checks_when_free():
+    facing = ai.decide(_spot(["7c", "2d"], ["Ah", "Kd", "Qs"], pot=400, current_bet=200, bet=0), rng=_NoBluff())
+    assert facing.action == "fold"
+    assert facing.pot_odds == pytest.approx(200 / 600)
+
+    free = ai.decide(_spot(["7c", "2d"], ["Ah", "Kd", "Qs"], current_bet=0, bet=0), rng=_NoBluff())
+    assert free.action == "check"
+
+
+def test_strong_hand_raises_a_legal_amount():
+    spot = _spot(["Ah", "Ad"], pot=30, current_bet=20, bet=10, chips=990)
+    decision = ai.decide(spot, rng=_NoBluff())
+    assert decision.action == "raise"
+    assert spot.current_bet + MIN_RAISE <= decision.amount < spot.bet + spot.chips
+    assert decision.amount % 20 == 0
+
+
+def test_short_stack_shoves_the_nuts():
+    spot = _spot(["Ah", "Kh"], ["Qh", "Jh", "Th"], pot=300, current_bet=0, bet=0, chips=400)
+    assert ai.decide(spot, rng=_NoBluff()).action == "all_in"
+
+
+def test_profiles_change_sizing():
+    spot = _spot(["Kh", "Kd"], ["Kc", "7s", "2d"], pot=200, current_bet=0, bet=0, chips=5000)
+    tight = ai.decide(spot, profile="tight", rng=_NoBluff())
+    aggressive = ai.decide(spot, profile="aggressive", rng=_NoBluff())
+    assert tight.action == aggressive.action == "raise"
+    assert aggressive.amount > tight.amount
+    assert ai.decide(spot, profile="unknown", rng=_NoBluff()).amount == ai.decide(spot, rng=_NoBluff()).amount
+
+
+def test_no_budget_falls_back_to_made_hand():
+    spot = _spot(["9h", "9d"], ["2c", "5s", "Jd", "Kh"], opponents=4, current_bet=0, bet=0)
+    with patch("poker.ai.compute_equity") as rollout:
+        decision = ai.decide(spot, time_budget_ms=0, rng=_NoBluff())
+    rollout.assert_not_called()
+    assert decision.strength == pytest.approx(ai.CATEGORY_STRENGTH[1] ** 4)
+
+
+def test_random_spots_are_legal_and_within_budget():
+    rng = random.Random(8)
+    deck = list(equity.CARD_CODES)
+    slowest = 0.0
+    for _ in range(300):
+        cards = rng.sample(deck, 7)
+        current_bet = rng.choice([0, 20, 60, 300])
+        bet = rng.choice([0, current_bet])
+        spot = _spot(
+            cards[:2], cards[2:2 + rng.choice([0, 3, 4, 5])], opponents=rng.randint(1, 8),
+            pot=current_bet * 2 + 40, current_bet=current_bet, bet=bet, chips=rng.choice([15, 100, 1000]),
+        )
+        started = time.perf_counter()
+        decision = ai.decide(spot, time_budget_ms=40, rng=rng)
+        slowest = max(slowest, (time.perf_counter() - started) * 1000)
+
+        if spot.to_call:
+            assert decision.action in ("fold", "call", "raise", "all_in")
+        else:
+            assert decision.action in ("check", "raise", "all_in")
+        if decision.action == "raise":
+            assert spot.current_bet + MIN_RAISE <= decision.amount < spot.bet + spot.chips
+    assert slowest < 40 + 30  # one rollout batch of slack on a loaded machine
+
+
+# Step 4: Games
+@pytest.mark.django_db
+def test_ai_cascade_decides_outside_the_row_lock():
+    human = User.objects.create_user(email="ai-cascade@test.com", password="pass1234")
+    game = PokerGame.objects.create(player_one=human, is_ai_game=True, dealer=1)
+    game.initialize_ai_table(human, 5)
+    # Seat 1 deals, so the blinds and the first action all fall to AI seats.
+    game.dealer = 1
+    game.ensure_dealt()
+    assert game._current_turn_is_ai()
+
+    baseline = len(connection.atomic_blocks)
+    depths = []
+    decide = PokerGame.decide_ai_action
+
+    def recording_decide(self):
+        depths.append(len(connection.atomic_blocks))
+        return decide(self)
+
+    with patch.object(PokerGame, "decide_ai_action", recording_decide):
+        play_ai_turns(game)
+
+    assert depths and set(depths) == {baseline}
+    assert game.is_completed or not game._current_turn_is_ai()
+
+
+@pytest.mark.django_db
+def test_stale_decision_is_recomputed():
+    human = User.objects.create_user(email="ai-stale@test.com", password="pass1234")
+    game = PokerGame.objects.create(player_one=human, is_ai_game=True, dealer=1)
+    game.initialize_ai_table(human, 1)
+    game.dealer = 1
+    game.ensure_dealt()
+    # Heads-up: the dealer posts the small blind and acts first, so the AI
+    # (seat 2) is not to act yet; hand it the turn in memory only.
+    other = PokerGame.objects.get(pk=game.pk)
+    game.current_turn = 2
+    calls = []
+    decide = PokerGame.decide_ai_action
+
+    def counting_decide(self):
+        calls.append(self.current_turn)
+        return decide(self)
+
+    with patch.object(PokerGame, "decide_ai_action", counting_decide):
+        play_ai_turns(game, max_turns=1)
+
+    # The row still says seat 1 is to act: the decision is dropped unplayed.
+    game.refresh_from_db()
+    assert calls == [2]
+    assert game.current_turn == other.current_turn == 1
+    assert game.last_action == other.last_action
@@ -0,0 +1,113 @@
+# Filename: poker/tests/test_broadcast.py
+
+# Step 1: Imports
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from poker import consumers
+from poker.models import PokerGame
+from poker.serializers import merge_payload, poker_payload, private_views, public_snapshot
+
+User = get_user_model()
+
+
+def _table(size):
+    users = [
+        User.objects.create_user(email=f"bc-{size}-{idx}@test.com", password="pass", first_name=f"P{idx}")
+        for idx in range(size)
+    ]
+    game = PokerGame.objects.create(player_one=users[0], max_players=9)
+    game.initialize_table(users)
+    game.ensure_dealt()
+    return game, users
+
+
+def _without_clock(payload):
+    return {key: value for key, value in payload.items() if key != "server_now"}
+
+
+def _broadcast(game):
+    layer = MagicMock(group_send=AsyncMock())
+    with patch("poker.consumers.get_channel_layer", return_value=layer), \
+            patch("poker.consumers.get_timer_scheduler", return_value=MagicMock()), \
+            CaptureQueriesContext(connection) as queries:
+        consumers.broadcast_game_update(str(game.id))
+    (_, event), _ = layer.group_send.await_args
+    return event, len(queries)
+
+
+# Step 2: Public snapshot and private views
+@pytest.mark.django_db
+def test_snapshot_hides_every_hand_and_views_carry_only_their_own():
+    game, users = _table(3)
+    snapshot = public_snapshot(game)
+    assert all(seat["cards"] == ["??", "??"] for seat in snapshot["players"])
+
+    views = private_views(game)
+    assert set(views) == {str(user.id) for user in users}
+    for seat in game.table_seats:
+        assert views[str(seat["user_id"])]["my_cards"] == seat["cards"]
+
+
+@pytest.mark.django_db
+def test_ai_seats_get_no_private_view_or_equity():
+    human = User.objects.create_user(email="bc-ai-human@test.com", password="pass")
+    bot = User.objects.create_user(email="bc-ai-bot@test.com", password="pass")
+    game = PokerGame.objects.create(player_one=human, player_two=bot, is_ai_game=True)
+    game.ensure_dealt()
+
+    with patch("poker.serializers.equity_for_seat", return_value=None) as equity:
+        views = private_views(game)
+
+    assert set(views) == {str(human.id)}
+    assert [call.args[1] for call in equity.call_args_list] == [1]
+
+
+@pytest.mark.django_db
+def test_merged_payload_matches_poker_payload_for_tables_and_heads_up():
+    game, users = _table(4)
+    heads_up = PokerGame.objects.create(player_one=users[0], player_two=users[1])
+    heads_up.ensure_dealt()
+
+    for current in (game, heads_up):
+        snapshot = public_snapshot(current)
+        views = private_views(current)
+        for user in users[:2]:
+            merged = merge_payload(snapshot, views[str(user.id)])
+            assert _without_clock(merged) == _without_clock(poker_payload(current, user))
+
+
+# Step 3: Fan-out cost
+@pytest.mark.django_db
+def test_broadcast_queries_do_not_grow_with_table_size():
+    small, _ = _table(2)
+    large, _ = _table(9)
+    small_event, small_queries = _broadcast(small)
+    large_event, large_queries = _broadcast(large)
+
+    assert len(large_event["private"]) == 9
+    assert large_queries == small_queries
+
+
+@pytest.mark.django_db
+def test_subscribers_merge_the_event_without_touching_the_database():
+    game, users = _table(9)
+    event, _ = _broadcast(game)
+
+    sent = []
+    consumer = consumers.PokerConsumer()
+    consumer.user = users[4]
+    consumer.send_json = AsyncMock(side_effect=sent.append)
+    with CaptureQueriesContext(connection) as queries:
+        async_to_sync(consumer.poker_update)(event)
+
+    assert len(queries) == 0
+    me = next(seat for seat in sent[0]["game"]["players"] if seat["user_id"] == users[4].id)
+    others = [seat for seat in sent[0]["game"]["players"] if seat["user_id"] != users[4].id]
+    assert me["cards"] != ["??", "??"]
+    assert all(seat["cards"] == ["??", "??"] for seat in others)
@@ -0,0 +1,98 @@
+# Filename: poker/tests/test_equity.py
+
+# Step 1: Imports
+import random
+import threading
+import time
+
+import numpy as np
+import pytest
+from django.contrib.auth import get_user_model
+
+from poker import equity, evaluator
+from poker.models import PokerGame
+from poker.serializers import poker_payload
+from poker.services import equity as equity_service
+
+User = get_user_model()
+
+
+# Step 2: Batched evaluation and rollouts
+def test_batch_scores_match_hand_score():
+    rng = random.Random(4)
+    deck = list(evaluator.CARDS)
+    hands = [rng.sample(deck, 7) for _ in range(3000)]
+    scores = equity.batch_scores(np.array([equity.encode(cards) for cards in hands]))
+    assert [int(score) for score in scores] == [evaluator.hand_score(cards) for cards in hands]
+
+
+def test_river_against_known_hand_is_exact():
+    result = equity.compute_equity(
+        ["Ah", "As"], ["Kd", "Qd", "2c", "3c", "9h"], opponents=0, known_opponents=[["Kh", "Kc"]]
+    )
+    assert result["exhaustive"] is True
+    assert result["equity"] == 0.0
+
+
+def test_turn_heads_up_is_enumerated():
+    result = equity.compute_equity(["Ah", "Kh"], ["Qh", "Jh", "2c", "3d"], opponents=1)
+    assert result["exhaustive"] is True
+    assert result["trials"] == 46 * 990  # river card x opponent holdings
+    assert 0.55 < result["equity"] < 0.7
+
+
+def test_preflop_monte_carlo_is_close_to_known_value():
+    result = equity.compute_equity(
+        ["Ah", "As"], [], opponents=0, known_opponents=[["Kh", "Kd"]],
+        deadline_ms=2000, max_trials=20_000, seed=7,
+    )
+    assert result["exhaustive"] is False
+    assert abs(result["equity"] - 0.82) < 0.02
+
+
+def test_monte_carlo_stops_at_deadline():
+    started = time.perf_counter()
+    result = equity.compute_equity(["7c", "2d"], [], opponents=6, deadline_ms=20, max_trials=10_000_000)
+    assert (time.perf_counter() - started) * 1000 < 500
+    assert 0 < result["trials"] < 10_000_000
+
+
+def test_compute_equity_rejects_bad_cards():
+    with pytest.raises(ValueError):
+        equity.compute_equity(["Ah", "Ah"], [])
+    with pytest.raises(ValueError):
+        equity.compute_equity(["Ah", "Kd"], ["Ah", "2c", "3c"])
+
+
+# Step 3: Pool, cache and payload
+def test_request_equity_runs_once_and_caches():
+    hole, board = ["9s", "9d"], ["2c", "7h", "Kd", "4s", "Jc"]
+    ready = threading.Event()
+    results = []
+
+    def on_ready(result):
+        results.append(result)
+        ready.set()
+
+    assert equity_service.request_equity(hole, board, 1, on_ready=on_ready) is None
+    assert ready.wait(30)
+    cached = equity_service.request_equity(list(reversed(hole)), list(reversed(board)), 1)
+    assert cached is results[0]
+    assert cached["exhaustive"] is True
+
+
+@pytest.mark.django_db
+def test_equity_inputs_only_use_the_users_cards():
+    human = User.objects.create_user(email="equity@test.com", password="pass1234")
+    game = PokerGame.objects.create(player_one=human, is_ai_game=True)
+    game.initialize_ai_table(human, 3)
+    game.ensure_dealt()
+
+    hole, board, opponents = equity_service.equity_inputs_for_user(game, human)
+    seat = game._seat_for_user(human)
+    assert hole == seat["cards"]
+    assert board == game.community_cards
+    assert opponents == 3
+
+    data = poker_payload(game, human)
+    assert "my_equity" in data
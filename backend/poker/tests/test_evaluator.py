@@ -0,0 +1,88 @@
+# Filename: poker/tests/test_evaluator.py
+
+# Step 1: Imports
+import itertools
+import random
+from collections import Counter
+
+import pytest
+
+from poker import evaluator
+
+
+def _reference_five(cards):
+    """Straightforward five-card ranking used as the oracle."""
+    values = sorted((evaluator.RANKS.index(card[0]) + 2 for card in cards), reverse=True)
+    counts = Counter(values)
+    groups = sorted(counts.items(), key=lambda item: (item[1], item[0]), reverse=True)
+    flush = len({card[1] for card in cards}) == 1
+    unique = sorted(set(values), reverse=True) + ([1] if 14 in values else [])
+    straight = next(
+        (5 if unique[i] == 5 else unique[i] for i in range(len(unique) - 4) if unique[i] - unique[i + 4] == 4),
+        None,
+    )
+    if straight and flush:
+        return (8, [straight])
+    if groups[0][1] == 4:
+        return (7, [groups[0][0], groups[1][0]])
+    if groups[0][1] == 3 and groups[1][1] == 2:
+        return (6, [groups[0][0], groups[1][0]])
+    if flush:
+        return (5, values)
+    if straight:
+        return (4, [straight])
+    kickers = [value for value, _ in groups]
+    if groups[0][1] == 3:
+        return (3, kickers)
+    if groups[0][1] == 2:
+        return (2 if groups[1][1] == 2 else 1, kickers)
+    return (0, kickers)
+
+
+def _reference(cards):
+    return max(_reference_five(combo) for combo in itertools.combinations(cards, 5))
+
+
+# Step 2: Categories and contract
+@pytest.mark.parametrize(
+    "cards, label, kickers",
+    [
+        (["Ah", "Kh", "Qh", "Jh", "Th", "9h", "2c"], "Straight flush", [14]),
+        (["5d", "4d", "3d", "2d", "Ad", "Kd", "Ks"], "Straight flush", [5]),
+        (["As", "Ah", "Ad", "Ac", "Kd", "Ks", "Kc"], "Four of a kind", [14, 13]),
+        (["Ah", "Ad", "Ac", "Kh", "Kd", "Ks", "2c"], "Full house", [14, 13]),
+        (["Ah", "Th", "8h", "4h", "2h", "Ks", "Kd"], "Flush", [14, 10, 8, 4, 2]),
+        (["Ah", "2d", "3c", "4s", "5h", "Kd", "Kc"], "Straight", [5]),
+        (["7h", "7d", "7c", "Ah", "Kd", "2s", "3c"], "Three of a kind", [7, 14, 13]),
+        (["2c", "2d", "3c", "3d", "4c", "4d", "Ah"], "Two pair", [4, 3, 14]),
+        (["9c", "9d", "2h", "5s", "Jc", "Kd", "3h"], "Pair", [9, 13, 11, 5]),
+        (["9c", "7d", "2h", "5s", "Jc", "Kd", "3h"], "High card", [13, 11, 9, 7, 5]),
+    ],
+)
+def test_evaluate_hand_categories(cards, label, kickers):
+    hand = evaluator.evaluate_hand(cards)
+    assert hand == {"rank": evaluator.LABELS.index(label), "kickers": kickers, "label": label}
+
+
+def test_scores_order_like_rank_and_kickers():
+    rng = random.Random(11)
+    deck = list(evaluator.CARDS)
+    for _ in range(2000):
+        cards = rng.sample(deck, rng.choice((5, 6, 7)))
+        hand = evaluator.evaluate_hand(cards)
+        rank, kickers = _reference(cards)
+        assert (hand["rank"], hand["kickers"]) == (rank, kickers)
+
+    a = evaluator.hand_score(["Ah", "Ad", "Kc", "Qs", "9h"])
+    b = evaluator.hand_score(["As", "Ac", "Kd", "Qh", "8h"])
+    assert a > b
+    assert evaluator.hand_label(a) == "Pair"
+
+
+def test_hand_score_rejects_bad_input():
+    with pytest.raises(ValueError):
+        evaluator.hand_score(["Ah", "Kd", "Qc", "Js"])
+    with pytest.raises(ValueError):
+        evaluator.hand_score(["Ah", "Ah", "Qc", "Js", "2d"])
+    with pytest.raises(ValueError):
+        evaluator.hand_score(["??", "Kd", "Qc", "Js", "2d"])
@@ -9,9 +9,9 @@ from rest_framework.test import APITestCase
 
 from friends.models import Friendship
 
-from .consumers import _prepare_game_for_realtime
-from .models import PokerGame, PokerTournament, PokerTournamentRegistration, evaluate_hand
-from .serializers import poker_payload
+from poker.consumers import _prepare_game_for_realtime
+from poker.models import PokerGame, PokerTournament, PokerTournamentRegistration, evaluate_hand
+from poker.serializers import poker_payload
 
 User = get_user_model()
 
@@ -494,7 +494,7 @@ class PokerApiTests(APITestCase):
         game = PokerGame.objects.create(player_one=self.p1, is_ai_game=True)
         game.initialize_ai_table(self.p1, 3)
         game.ensure_dealt()
-        from .views import _resolve_ai_turn
+        from poker.views import _resolve_ai_turn
 
         _resolve_ai_turn(game)
         action = "call" if "call" in game.legal_actions_for(self.p1) else "check"
@@ -0,0 +1,99 @@
+# Filename: poker/tests/test_turn_timers.py
+
+# Step 1: Imports
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from poker import consumers
+from poker.models import PokerGame
+
+User = get_user_model()
+
+
+@pytest.fixture
+def game():
+    p1 = User.objects.create_user(email="timer-one@test.com", password="pass1234")
+    p2 = User.objects.create_user(email="timer-two@test.com", password="pass1234")
+    game = PokerGame.objects.create(player_one=p1, player_two=p2, dealer=1)
+    game.ensure_dealt()
+    return game
+
+
+# Step 2: Scheduling goes through the shared scheduler
+@pytest.mark.django_db
+def test_turn_timer_is_keyed_on_the_turn_start(game):
+    scheduler = MagicMock()
+    with patch("poker.consumers.get_timer_scheduler", return_value=scheduler):
+        consumers._schedule_game_timers(game)
+
+    scheduler.schedule.assert_called_once_with(
+        consumers.TURN_TIMER, str(game.id), game.current_turn_started_at.isoformat(),
+        game.current_turn_deadline_at(),
+    )
+    scheduler.cancel.assert_called_once_with(consumers.NEXT_HAND_TIMER, str(game.id))
+
+
+@pytest.mark.django_db
+def test_manual_next_hand_cancels_the_auto_timer_after_commit(game, django_capture_on_commit_callbacks):
+    game.is_completed = True
+    game.save()
+    consumer = consumers.PokerConsumer()
+    consumer.user, consumer.game_id = game.player_one, game.id
+    scheduler = MagicMock()
+
+    with patch("poker.consumers.get_timer_scheduler", return_value=scheduler), \
+            django_capture_on_commit_callbacks() as callbacks:
+        async_to_sync(consumer._start_next_hand)()
+        scheduler.cancel.assert_not_called()
+    assert len(callbacks) == 1
+
+    with patch("poker.consumers.get_timer_scheduler", return_value=scheduler):
+        callbacks[0]()
+    scheduler.cancel.assert_called_once_with(consumers.NEXT_HAND_TIMER, str(game.id))
+
+
+# Step 3: Firing is idempotent per (game_id, current_turn_started_at)
+@pytest.mark.django_db
+def test_stale_turn_timer_does_nothing(game):
+    game.current_turn_started_at = timezone.now() - timedelta(seconds=game.turn_timer_seconds + 5)
+    game.save(update_fields=["current_turn_started_at"])
+
+    with patch("poker.consumers.get_channel_layer") as layer:
+        assert consumers._fire_turn_timeout(str(game.id), "2000-01-01T00:00:00+00:00") is None
+    layer.assert_not_called()
+    game.refresh_from_db()
+    assert not game.is_completed
+
+
+@pytest.mark.django_db
+def test_expired_turn_timer_applies_the_timeout_once(game):
+    game.current_turn_started_at = timezone.now() - timedelta(seconds=game.turn_timer_seconds + 5)
+    game.save(update_fields=["current_turn_started_at"])
+    token = consumers._turn_token(game)
+
+    layer = MagicMock(group_send=AsyncMock())
+    with patch("poker.consumers.get_channel_layer", return_value=layer), \
+            patch("poker.consumers.get_timer_scheduler", return_value=MagicMock()):
+        consumers._fire_turn_timeout(str(game.id), token)
+        game.refresh_from_db()
+        after_first = (game.last_action, game.current_turn, consumers._turn_token(game))
+        consumers._fire_turn_timeout(str(game.id), token)
+
+    assert "timeout" in after_first[0]
+    assert layer.group_send.await_count == 1
+    game.refresh_from_db()
+    assert (game.last_action, game.current_turn, consumers._turn_token(game)) == after_first
+
+
+@pytest.mark.django_db
+def test_early_turn_timer_asks_to_run_again_at_the_deadline(game):
+    token = consumers._turn_token(game)
+    with patch("poker.consumers.get_channel_layer") as layer:
+        retry_at = consumers._fire_turn_timeout(str(game.id), token)
+    layer.assert_not_called()
+    assert retry_at == game.current_turn_deadline_at()
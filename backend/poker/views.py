@@ -1,4 +1,3 @@
-from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
@@ -13,11 +12,12 @@ from friends.models import Friendship
 from utils.redis.redis_game_lobby_manager import RedisGameLobbyManager
 from utils.websockets.ws_groups import scoped_lobby_id
 
+from .consumers import broadcast_game_update
 from .models import PokerGame, PokerTournament, PokerTournamentRegistration
 from .serializers import PokerTournamentSerializer, poker_payload
+from .services.ai_player import play_ai_turns
 
 User = get_user_model()
-POKER_GROUP = "poker_{game_id}"
 
 
 def _ai_user():
@@ -29,21 +29,15 @@ def _ai_user():
 
 
 def _resolve_ai_turn(game):
-    guard = 0
-    while game.is_ai_game and game._current_turn_is_ai() and not game.is_completed and guard < 32:
-        game.apply_ai_action()
-        guard += 1
+    """Play pending AI turns; call after the transaction holding the row lock."""
+    return play_ai_turns(game)
 
 
 def _broadcast_poker_update(game_id):
     try:
-        channel_layer = get_channel_layer()
-        if not channel_layer:
+        if not get_channel_layer():
             return
-        async_to_sync(channel_layer.group_send)(
-            POKER_GROUP.format(game_id=game_id),
-            {"type": "poker_update", "game_id": str(game_id)},
-        )
+        broadcast_game_update(game_id)
     except Exception:
         return
 
@@ -82,9 +76,9 @@ def game_detail(request, game_id):
         with transaction.atomic():
             game = PokerGame.objects.select_for_update().get(pk=game_id)
             game.enforce_turn_timeout()
-            _resolve_ai_turn(game)
     except PokerGame.DoesNotExist:
         return Response({"error": "Game not found."}, status=404)
+    _resolve_ai_turn(game)
     return Response(poker_payload(game, request.user))
 
 
@@ -133,11 +127,11 @@ def action(request, game_id):
             game = PokerGame.objects.select_for_update().get(pk=game_id)
             game.enforce_turn_timeout()
             game.apply_action(request.data.get("action"), request.user, request.data.get("amount"))
-            _resolve_ai_turn(game)
     except PokerGame.DoesNotExist:
         return Response({"error": "Game not found."}, status=404)
     except ValidationError as exc:
         return Response({"error": str(exc)}, status=400)
+    _resolve_ai_turn(game)
     if not game.is_ai_game:
         _broadcast_poker_update(game.id)
     return Response(poker_payload(game, request.user))
@@ -150,11 +144,11 @@ def next_hand(request, game_id):
         with transaction.atomic():
             game = PokerGame.objects.select_for_update().get(pk=game_id)
             game.start_next_hand(request.user)
-            _resolve_ai_turn(game)
     except PokerGame.DoesNotExist:
         return Response({"error": "Game not found."}, status=404)
     except ValidationError as exc:
         return Response({"error": str(exc)}, status=400)
+    _resolve_ai_turn(game)
     return Response(poker_payload(game, request.user))
 
 
@@ -0,0 +1,60 @@
+# Filename: stats/hooks.py
+
+"""
+Completion hook for game models.
+
+Game models set their completion flag in several places (moves, AI
+replies, showdowns, forfeits) and all of them end in ``save()``. The mixin
+notices the save that completes a game and records the result in the same
+transaction, whichever code path got there.
+
+A completed save is counted when the stored row was not completed yet. The
+row is checked (and locked) only on saves of completed instances that were
+not completed when loaded, so ordinary moves cost nothing extra and two
+processes finishing the same game count it once.
+"""
+
+from django.db import transaction
+
+
+class CompletionHookMixin:
+    """
+    Record stats when a save completes the instance.
+
+    Attributes:
+        stats_game_type: Registry game type, or ``"sudoku"``.
+        completion_field: Boolean field that marks the instance finished.
+        stats_round_field: Counter field for games that complete more than
+            once on one row (poker hands); ``None`` means one round per row.
+    """
+
+    stats_game_type = None
+    completion_field = "is_completed"
+    stats_round_field = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._completed_on_save = bool(instance.__dict__.get(cls.completion_field))
+        return instance
+
+    def save(self, *args, **kwargs):
+        completed = bool(getattr(self, self.completion_field))
+        if not completed or getattr(self, "_completed_on_save", False):
+            super().save(*args, **kwargs)
+            self._completed_on_save = completed
+            return
+
+        # Imported here: the recorder pulls in every game app via the registry.
+        from stats.recorder import record_completion
+
+        with transaction.atomic():
+            newly = self.pk is None or (
+                type(self)._base_manager.select_for_update()
+                .filter(pk=self.pk, **{self.completion_field: False})
+                .exists()
+            )
+            super().save(*args, **kwargs)
+            if newly:
+                record_completion(self)
+        self._completed_on_save = True
@@ -0,0 +1,68 @@
+# Filename: stats/management/commands/backfill_stats.py
+
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from stats import recorder
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the leaderboard tables (PvP stats, Sudoku best times) from the game rows.
+
+    Usage:
+        python manage.py backfill_stats
+        python manage.py backfill_stats --user 12 --user 57
+        python manage.py backfill_stats --batch-size 5000
+
+    Notes:
+    - One pass over the completed human-vs-human games of each registered
+      game type adds the rounds missing from the ``GameResult`` ledger; the
+      ledger is then folded (oldest first, for the streaks) and one grouped
+      ``MIN`` runs over completed Sudoku sessions. The rows are replaced in
+      one transaction.
+    - Run it after deploying the tables, or whenever results were written
+      outside the model ``save()`` / hot-state paths. After live play it is
+      a no-op: the hooks write the same ledger it folds.
+    - A game row only shows its current round, so earlier poker hands that
+      never reached the ledger cannot be recovered from it.
+    """
+
+    help = "Rebuild PvP stats and Sudoku best times from completed games."
+
+    def add_arguments(self, parser) -> None:
+        # Step 1: Optional user scope
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only rebuild this user's rows (repeatable).",
+        )
+
+        # Step 2: Insert batch size
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows per bulk insert.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        # Step 1: Read args
+        user_ids = options.get("user_ids")
+        batch_size: int = max(1, int(options.get("batch_size") or 1000))
+
+        # Step 2: Rebuild
+        pvp_rows, sudoku_rows = recorder.rebuild(user_ids=user_ids, batch_size=batch_size)
+
+        # Step 3: Final output
+        scope = f"{len(user_ids)} user(s)" if user_ids else "all users"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Backfilled stats for {scope}: {pvp_rows} PvP row(s), {sudoku_rows} Sudoku best time(s)."
+            )
+        )
@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-17 09:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game_type', models.CharField(max_length=32)),
+                ('game_id', models.PositiveBigIntegerField()),
+                ('round', models.PositiveIntegerField(default=1)),
+                ('result', models.CharField(choices=[('win', 'Win'), ('loss', 'Loss'), ('draw', 'Draw')], max_length=4)),
+                ('completed_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='game_results', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['game_type', 'user', 'completed_at'], name='game_result_fold_idx')],
+                'constraints': [models.UniqueConstraint(fields=('game_type', 'game_id', 'round', 'user'), name='unique_game_result')],
+            },
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Filename: stats/models.py
+
+from django.conf import settings
+from django.db import models
+
+
+class PlayerGameStats(models.Model):
+    """
+    Running PvP record of one user in one game type (human vs human only).
+
+    Maintained by ``stats.recorder`` when a game completes, so the friends
+    leaderboard reads rows instead of replaying every game.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="game_stats",
+        on_delete=models.CASCADE,
+    )
+    game_type = models.CharField(max_length=32)
+    wins = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    draws = models.PositiveIntegerField(default=0)
+    games = models.PositiveIntegerField(default=0)
+    # Consecutive wins up to the latest game (a loss or draw resets it)
+    current_streak = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "game_type"], name="unique_player_game_stats"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.game_type}: {self.wins}-{self.losses}-{self.draws}"
+
+
+class GameResult(models.Model):
+    """
+    One player's result in one round of a PvP game.
+
+    A round is a whole game, or one hand of poker (``hand_number``), which
+    replays the same row. The live hooks and ``backfill_stats`` both fold
+    this ledger into ``PlayerGameStats``, so they count the same rounds.
+    """
+
+    WIN = "win"
+    LOSS = "loss"
+    DRAW = "draw"
+    RESULT_CHOICES = [(WIN, "Win"), (LOSS, "Loss"), (DRAW, "Draw")]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="game_results",
+        on_delete=models.CASCADE,
+    )
+    game_type = models.CharField(max_length=32)
+    game_id = models.PositiveBigIntegerField()
+    round = models.PositiveIntegerField(default=1)
+    result = models.CharField(max_length=4, choices=RESULT_CHOICES)
+    # The game row's updated_at when the round finished (fold order, for streaks)
+    completed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["game_type", "game_id", "round", "user"], name="unique_game_result",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["game_type", "user", "completed_at"], name="game_result_fold_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.game_type} {self.game_id}#{self.round} {self.user_id}: {self.result}"
+
+
+class SudokuBestTime(models.Model):
+    """Fastest completed Sudoku session of one user at one difficulty."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="sudoku_best_times",
+        on_delete=models.CASCADE,
+    )
+    difficulty = models.CharField(max_length=10)
+    best_seconds = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "difficulty"], name="unique_sudoku_best_time"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.difficulty}: {self.best_seconds}s"
@@ -0,0 +1,233 @@
+# Filename: stats/recorder.py
+
+"""
+Write side of the friends leaderboards.
+
+Why:
+- ``get_pvp_leaderboard`` replayed every completed game of every friend in
+  Python, and the Sudoku boards ran one ``MIN`` per user or difficulty, on
+  every request.
+
+How:
+- ``PlayerGameStats`` (per user and game type) and ``SudokuBestTime`` (per
+  user and difficulty) hold the results, updated when a game completes
+  (``stats.hooks.CompletionHookMixin`` on the game models, and the hot Tic
+  Tac Toe write-behind).
+- Every PvP round (a game, or a poker hand) first goes into the
+  ``GameResult`` ledger, keyed on ``(game_type, game_id, round, user)``;
+  the stats counters move only when that round was not in it yet.
+- Updates are insert-if-missing, then ``F()`` arithmetic or a guarded
+  ``UPDATE ... WHERE best_seconds > %s``, inside the transaction that saves
+  the completion, so concurrent games never lose a result.
+- ``manage.py backfill_stats`` adds the rounds the ledger is missing (from
+  the game rows) and refolds ``PlayerGameStats`` from it, so after live
+  play it changes nothing.
+"""
+
+# Step 1: Imports
+import logging
+
+from django.db import transaction
+from django.db.models import F, Min, Q
+from django.utils import timezone
+
+from stats.models import GameResult, PlayerGameStats, SudokuBestTime
+from sudoku.models import SudokuSession
+from utils.game_registry import GAME_TYPE_REGISTRY, get_game_type_config, get_model_for
+
+logger = logging.getLogger("stats.recorder")
+
+SUDOKU = "sudoku"
+
+WIN = GameResult.WIN
+LOSS = GameResult.LOSS
+DRAW = GameResult.DRAW
+
+_COUNTERS = {
+    WIN: {"wins": F("wins") + 1, "current_streak": F("current_streak") + 1},
+    LOSS: {"losses": F("losses") + 1, "current_streak": 0},
+    DRAW: {"draws": F("draws") + 1, "current_streak": 0},
+}
+
+
+# Step 2: Outcomes
+def game_outcomes(cfg, game) -> list:
+    """
+    ``[(user_id, WIN | LOSS | DRAW)]`` for the human seats of a completed game.
+
+    AI games and games without a winner yield nothing. A winner value that
+    is neither seat (draw, split pot) is a draw for both.
+    """
+    if game.is_ai_game or game.winner is None:
+        return []
+
+    outcomes = []
+    for seat in ("X", "O"):
+        user_id = getattr(game, f"{cfg['seat_fk_names'][seat]}_id")
+        if user_id is None:
+            continue
+        if game.winner == cfg["turn_values"][seat]:
+            outcomes.append((user_id, WIN))
+        elif game.winner in cfg["turn_values"].values():
+            outcomes.append((user_id, LOSS))
+        else:
+            outcomes.append((user_id, DRAW))
+    return outcomes
+
+
+def game_round(game) -> int:
+    """The round a completed game row holds: its ``stats_round_field``, else 1."""
+    field = getattr(game, "stats_round_field", None)
+    return int(getattr(game, field) or 1) if field else 1
+
+
+def _ledger_rows(game_type, game, outcomes) -> list:
+    completed_at = getattr(game, "updated_at", None) or timezone.now()
+    return [
+        GameResult(
+            user_id=user_id, game_type=game_type, game_id=game.pk, round=game_round(game),
+            result=result, completed_at=completed_at,
+        )
+        for user_id, result in outcomes
+    ]
+
+
+# Step 3: Writes
+def record_game_result(game_type, game) -> None:
+    """
+    Add one completed PvP round to both players' stats.
+
+    Call it where the completion is saved, with the game row locked. A
+    round already in the ledger (seeded by a backfill) is not counted again.
+    """
+    cfg = get_game_type_config(game_type)
+    outcomes = game_outcomes(cfg, game) if cfg else []
+    if not outcomes:
+        return
+
+    with transaction.atomic():
+        if GameResult.objects.filter(game_type=game_type, game_id=game.pk, round=game_round(game)).exists():
+            return
+        GameResult.objects.bulk_create(_ledger_rows(game_type, game, outcomes))
+        PlayerGameStats.objects.bulk_create(
+            [PlayerGameStats(user_id=user_id, game_type=game_type) for user_id, _ in outcomes],
+            ignore_conflicts=True,
+        )
+        for result in (WIN, LOSS, DRAW):
+            user_ids = [user_id for user_id, outcome in outcomes if outcome == result]
+            if user_ids:
+                PlayerGameStats.objects.filter(game_type=game_type, user_id__in=user_ids).update(
+                    games=F("games") + 1, **_COUNTERS[result],
+                )
+    logger.debug("[STATS] %s game=%s round=%s outcomes=%s", game_type, game.pk, game_round(game), outcomes)
+
+
+def record_sudoku_time(user_id, difficulty, seconds) -> None:
+    """Keep ``seconds`` if it beats the user's best at ``difficulty``."""
+    with transaction.atomic():
+        SudokuBestTime.objects.bulk_create(
+            [SudokuBestTime(user_id=user_id, difficulty=difficulty, best_seconds=seconds)],
+            ignore_conflicts=True,
+        )
+        SudokuBestTime.objects.filter(
+            user_id=user_id, difficulty=difficulty, best_seconds__gt=seconds,
+        ).update(best_seconds=seconds)
+    logger.debug("[STATS] sudoku user=%s difficulty=%s seconds=%s", user_id, difficulty, seconds)
+
+
+def record_completion(instance) -> None:
+    """Completion hook entry point: route a just-completed model instance to its table."""
+    if instance.stats_game_type == SUDOKU:
+        record_sudoku_time(instance.user_id, instance.puzzle.difficulty, instance.elapsed_seconds)
+    else:
+        record_game_result(instance.stats_game_type, instance)
+
+
+# Step 4: Backfill
+def _seed_ledger(game_type, user_ids, batch_size) -> None:
+    """
+    Ledger rows for the rounds the live hooks never recorded.
+
+    A game row only shows its current round, so that is the one added for
+    each completed game; a round already in the ledger is left alone.
+    """
+    cfg = get_game_type_config(game_type)
+    Model = get_model_for(game_type)
+    seat_fields = [f"{cfg['seat_fk_names'][seat]}_id" for seat in ("X", "O")]
+    round_fields = [Model.stats_round_field] if getattr(Model, "stats_round_field", None) else []
+
+    games = Model.objects.filter(is_completed=True, is_ai_game=False, winner__isnull=False)
+    if user_ids is not None:
+        games = games.filter(Q(**{f"{seat_fields[0]}__in": user_ids}) | Q(**{f"{seat_fields[1]}__in": user_ids}))
+    rows = [
+        row
+        for game in games.only("id", "winner", "is_ai_game", "updated_at", *seat_fields, *round_fields).iterator()
+        for row in _ledger_rows(game_type, game, game_outcomes(cfg, game))
+    ]
+    # A conflict is a round already in the ledger, which is exactly what to skip.
+    GameResult.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+
+
+def _pvp_stats(game_type, user_ids):
+    """Fold the ledger of ``game_type``, oldest round first, into stats rows."""
+    results = GameResult.objects.filter(game_type=game_type)
+    if user_ids is not None:
+        results = results.filter(user_id__in=user_ids)
+    rows = {}
+    for user_id, result in results.order_by("completed_at", "id").values_list("user_id", "result").iterator():
+        stats = rows.get(user_id)
+        if stats is None:
+            stats = rows[user_id] = PlayerGameStats(user_id=user_id, game_type=game_type)
+        stats.games += 1
+        if result == WIN:
+            stats.wins += 1
+            stats.current_streak += 1
+        else:
+            stats.current_streak = 0
+            if result == LOSS:
+                stats.losses += 1
+            else:
+                stats.draws += 1
+    return rows.values()
+
+
+def _sudoku_bests(user_ids):
+    """One ``MIN(elapsed_seconds)`` grouped by user and difficulty."""
+    sessions = SudokuSession.objects.filter(completed=True)
+    if user_ids is not None:
+        sessions = sessions.filter(user_id__in=user_ids)
+    rows = sessions.values("user_id", "puzzle__difficulty").annotate(best=Min("elapsed_seconds"))
+    return [
+        SudokuBestTime(user_id=row["user_id"], difficulty=row["puzzle__difficulty"], best_seconds=row["best"])
+        for row in rows
+    ]
+
+
+def rebuild(user_ids=None, batch_size=1000) -> tuple:
+    """
+    Recompute both tables and replace them.
+
+    PvP rows are refolded from the ``GameResult`` ledger after adding the
+    rounds it is missing, so they match what the live hooks counted.
+
+    Args:
+        user_ids: Only these users; ``None`` rebuilds everyone.
+
+    Returns:
+        tuple: (PvP stats rows, Sudoku best-time rows) written.
+    """
+    user_ids = None if user_ids is None else {int(user_id) for user_id in user_ids}
+    with transaction.atomic():
+        for game_type in GAME_TYPE_REGISTRY:
+            _seed_ledger(game_type, user_ids, batch_size)
+        pvp = [stats for game_type in GAME_TYPE_REGISTRY for stats in _pvp_stats(game_type, user_ids)]
+        bests = _sudoku_bests(user_ids)
+
+        for Model in (PlayerGameStats, SudokuBestTime):
+            existing = Model.objects.all()
+            if user_ids is not None:
+                existing = existing.filter(user_id__in=user_ids)
+            existing.delete()
+        PlayerGameStats.objects.bulk_create(pvp, batch_size=batch_size)
+        SudokuBestTime.objects.bulk_create(bests, batch_size=batch_size)
+    return len(pvp), len(bests)
@@ -0,0 +1,163 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from connect_four.models import ConnectFourGame
+from game.models import TicTacToeGame
+from poker.models import PokerGame
+from stats.models import GameResult, PlayerGameStats, SudokuBestTime
+from stats.services import get_my_sudoku_bests, get_pvp_leaderboard, get_sudoku_leaderboard
+from sudoku.models import SudokuPuzzle, SudokuSession
+
+User = get_user_model()
+
+
+class StatsTablesTests(TestCase):
+    def setUp(self):
+        self.ann, self.bob, self.cat = (
+            User.objects.create_user(email=f"{name}@stats.test", password="pass", first_name=name)
+            for name in ("Ann", "Bob", "Cat")
+        )
+        self.user_ids = {self.ann.id, self.bob.id, self.cat.id}
+
+    def _ttt(self, x, o, winner, is_ai_game=False):
+        game = TicTacToeGame.objects.create(player_x=x, player_o=o, is_ai_game=is_ai_game)
+        game.winner, game.is_completed = winner, True
+        game.save()
+        return game
+
+    def _sudoku(self, user, difficulty, seconds):
+        puzzle = SudokuPuzzle.objects.create(difficulty=difficulty, puzzle="0" * 81, solution="1" * 81)
+        session = SudokuSession.objects.create(user=user, puzzle=puzzle, elapsed_seconds=seconds)
+        session.completed = True
+        session.save()
+        return session
+
+    def _poker_hands(self, count):
+        """Heads-up poker on one row: ``count`` hands, each ended by a fold."""
+        game = PokerGame.objects.create(player_one=self.ann, player_two=self.bob)
+        for hand in range(count):
+            if hand:
+                game.start_next_hand(self.ann)
+            game.ensure_dealt()
+            game.apply_action("fold", game.player_one if game.current_turn == 1 else game.player_two)
+        return game
+
+    def _stats(self, user, game_type="tic_tac_toe"):
+        row = PlayerGameStats.objects.get(user=user, game_type=game_type)
+        return row.wins, row.losses, row.draws, row.games, row.current_streak
+
+    def test_completion_updates_both_players(self):
+        self._ttt(self.ann, self.bob, "X")
+        self._ttt(self.bob, self.ann, "O")
+        self._ttt(self.ann, self.bob, "D")
+        self._ttt(self.ann, self.bob, "X")
+
+        self.assertEqual(self._stats(self.ann), (3, 0, 1, 4, 1))
+        self.assertEqual(self._stats(self.bob), (0, 3, 1, 4, 0))
+
+    def test_saving_a_completed_game_again_counts_once(self):
+        game = self._ttt(self.ann, self.bob, "X")
+        game.save()
+        TicTacToeGame.objects.get(pk=game.pk).save()
+
+        self.assertEqual(self._stats(self.ann), (1, 0, 0, 1, 1))
+
+    def test_ai_and_unfinished_games_are_not_counted(self):
+        self._ttt(self.ann, self.bob, "X", is_ai_game=True)
+        TicTacToeGame.objects.create(player_x=self.ann, player_o=self.bob)
+
+        self.assertFalse(PlayerGameStats.objects.exists())
+
+    def test_connect_four_drop_records_the_result(self):
+        game = ConnectFourGame.objects.create(player_one=self.ann, player_two=self.bob)
+        for col in (0, 1, 0, 1, 0, 1, 0):
+            game.drop_piece(col, self.ann if game.current_turn == 1 else self.bob)
+
+        self.assertEqual(game.winner, 1)
+        self.assertEqual(self._stats(self.ann, "connect_four"), (1, 0, 0, 1, 1))
+        self.assertEqual(self._stats(self.bob, "connect_four"), (0, 1, 0, 1, 0))
+
+    def test_each_poker_hand_on_one_row_counts(self):
+        game = self._poker_hands(3)
+
+        self.assertEqual(game.hand_number, 3)
+        self.assertEqual(
+            sorted(GameResult.objects.filter(user=self.ann).values_list("round", flat=True)), [1, 2, 3],
+        )
+        ann, bob = self._stats(self.ann, "poker"), self._stats(self.bob, "poker")
+        self.assertEqual((ann[3], bob[3]), (3, 3))
+        self.assertEqual(ann[0] + bob[0], 3)
+
+    def test_backfill_after_live_play_is_a_no_op(self):
+        self._ttt(self.ann, self.bob, "X")
+        self._ttt(self.bob, self.ann, "D")
+        self._ttt(self.cat, self.ann, "O")
+        self._poker_hands(4)
+        game = ConnectFourGame.objects.create(player_one=self.ann, player_two=self.bob)
+        for col in (0, 1, 0, 1, 0, 1, 0):
+            game.drop_piece(col, self.ann if game.current_turn == 1 else self.bob)
+
+        def snapshot():
+            return (
+                sorted(PlayerGameStats.objects.values_list(
+                    "user_id", "game_type", "wins", "losses", "draws", "games", "current_streak",
+                )),
+                sorted(GameResult.objects.values_list("game_type", "game_id", "round", "user_id", "result")),
+            )
+
+        live = snapshot()
+        call_command("backfill_stats", stdout=StringIO())
+
+        self.assertEqual(snapshot(), live)
+
+    def test_pvp_leaderboard_is_one_query(self):
+        self._ttt(self.ann, self.bob, "X")
+        self._ttt(self.ann, self.bob, "X")
+        self._ttt(self.cat, self.bob, "X")
+
+        with self.assertNumQueries(1):
+            rows = get_pvp_leaderboard("tic_tac_toe", self.user_ids)
+
+        self.assertEqual([row["name"] for row in rows], ["Ann", "Cat", "Bob"])
+        self.assertEqual(rows[0], {
+            "userId": self.ann.id, "name": "Ann", "wins": 2, "losses": 0, "draws": 0,
+            "gamesPlayed": 2, "currentStreak": 2,
+        })
+
+    def test_sudoku_keeps_the_best_time(self):
+        self._sudoku(self.ann, "easy", 300)
+        self._sudoku(self.ann, "easy", 200)
+        self._sudoku(self.ann, "easy", 250)
+        self._sudoku(self.bob, "easy", 180)
+        self._sudoku(self.ann, "hard", 900)
+
+        with self.assertNumQueries(1):
+            rows = get_sudoku_leaderboard("easy", self.user_ids)
+        self.assertEqual([(row["name"], row["bestTimeSeconds"]) for row in rows], [("Bob", 180), ("Ann", 200)])
+
+        with self.assertNumQueries(1):
+            bests = get_my_sudoku_bests(self.ann)
+        self.assertEqual(bests, {"easy": 200, "medium": None, "hard": 900, "expert": None})
+
+    def test_backfill_rebuilds_the_tables(self):
+        self._ttt(self.ann, self.bob, "X")
+        self._ttt(self.bob, self.ann, "X")
+        self._ttt(self.ann, self.cat, "X")
+        self._sudoku(self.cat, "medium", 400)
+        expected = sorted(PlayerGameStats.objects.values_list(
+            "user_id", "game_type", "wins", "losses", "draws", "games", "current_streak",
+        ))
+        PlayerGameStats.objects.update(wins=99, current_streak=99)
+        SudokuBestTime.objects.all().delete()
+
+        out = StringIO()
+        call_command("backfill_stats", stdout=out)
+
+        self.assertIn("3 PvP row(s), 1 Sudoku best time(s)", out.getvalue())
+        self.assertEqual(sorted(PlayerGameStats.objects.values_list(
+            "user_id", "game_type", "wins", "losses", "draws", "games", "current_streak",
+        )), expected)
+        self.assertEqual(SudokuBestTime.objects.get(user=self.cat).best_seconds, 400)
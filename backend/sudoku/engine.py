@@ -0,0 +1,208 @@
+"""
+Bitmask engine for Sudoku: solving, solution counting and random fills.
+
+Layout: the grid is a flat list of 81 ints (row-major, ``0`` empty,
+``1``-``9`` digits). Every row, column and box ("unit", 27 in all) keeps a
+9-bit mask of the digits it already holds, bit ``d - 1`` for digit ``d``:
+
+     units 0-8    rows         (cell // 9)
+     units 9-17   columns      (9 + cell % 9)
+     units 18-26  boxes        (18 + box), boxes numbered left to right, top to bottom
+
+The candidates of an empty cell are ``ALL_DIGITS & ~(row | col | box)``,
+three ORs instead of scanning 27 cells per digit.
+
+Search: before every branch the position is propagated to a fixpoint with
+naked singles (a cell with one candidate) and hidden singles (a digit with
+one possible cell in a unit); a cell or unit with no way out ends the
+branch. The branch is then taken on the empty cell with the fewest
+candidates (minimum remaining values). Counting stops at ``limit``
+solutions, so a uniqueness check never looks past the second one.
+
+The persisted format stays the 81-character digit string; convert at the
+edges with ``from_string`` / ``to_string``.
+"""
+
+SIZE = 9
+CELLS = SIZE * SIZE
+ALL_DIGITS = (1 << SIZE) - 1
+
+UNITS_OF = tuple(
+    (cell // 9, 9 + cell % 9, 18 + (cell // 27) * 3 + (cell % 9) // 3) for cell in range(CELLS)
+)
+UNIT_CELLS = tuple(
+    tuple(cell for cell in range(CELLS) if unit in UNITS_OF[cell]) for unit in range(27)
+)
+
+_POPCOUNT = tuple(bin(mask).count("1") for mask in range(ALL_DIGITS + 1))
+_DIGITS = tuple(
+    tuple(digit + 1 for digit in range(SIZE) if mask >> digit & 1) for mask in range(ALL_DIGITS + 1)
+)
+_DIGIT_OF_BIT = {1 << digit: digit + 1 for digit in range(SIZE)}
+
+
+def from_string(grid):
+    """81-character digit string (``0`` or ``.`` empty) -> list of 81 ints."""
+    return [0 if char == "." else int(char) for char in grid]
+
+
+def to_string(cells):
+    return "".join(str(value) for value in cells)
+
+
+def unit_masks(cells):
+    """
+    Digit masks of the 27 units, or None if a digit repeats within a unit.
+    """
+    used = [0] * 27
+    for cell, value in enumerate(cells):
+        if value:
+            bit = 1 << (value - 1)
+            for unit in UNITS_OF[cell]:
+                if used[unit] & bit:
+                    return None
+                used[unit] |= bit
+    return used
+
+
+def _propagate(cells, used, banned):
+    """
+    Fill naked and hidden singles in place until neither applies.
+
+    Returns:
+        int: The empty cell to branch on (fewest candidates), ``-1`` when the
+        grid is full, or ``-2`` on a contradiction.
+    """
+    while True:
+        # Naked singles, and the MRV cell for the branch
+        changed = False
+        best, best_count = -1, SIZE + 1
+        for cell in range(CELLS):
+            if cells[cell]:
+                continue
+            row, col, box = UNITS_OF[cell]
+            mask = ALL_DIGITS & ~(used[row] | used[col] | used[box] | banned[cell])
+            count = _POPCOUNT[mask]
+            if count == 1:
+                cells[cell] = _DIGIT_OF_BIT[mask]
+                used[row] |= mask
+                used[col] |= mask
+                used[box] |= mask
+                changed = True
+            elif count == 0:
+                return -2
+            elif count < best_count:
+                best, best_count = cell, count
+        if changed:
+            continue
+        if best < 0:
+            return -1
+
+        # Hidden singles (a digit with one place left in a unit)
+        for unit in range(27):
+            once = twice = 0
+            for cell in UNIT_CELLS[unit]:
+                if not cells[cell]:
+                    row, col, box = UNITS_OF[cell]
+                    mask = ALL_DIGITS & ~(used[row] | used[col] | used[box] | banned[cell])
+                    twice |= once & mask
+                    once |= mask
+            if (once | used[unit]) != ALL_DIGITS:
+                return -2
+            hidden = once & ~twice
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for cell in UNIT_CELLS[unit]:
+                    if not cells[cell]:
+                        row, col, box = UNITS_OF[cell]
+                        if bit & ~(used[row] | used[col] | used[box] | banned[cell]):
+                            cells[cell] = _DIGIT_OF_BIT[bit]
+                            used[row] |= bit
+                            used[col] |= bit
+                            used[box] |= bit
+                            changed = True
+                            break
+                else:
+                    return -2   # an earlier single in this pass took its last cell
+        if not changed:
+            return best
+
+
+def solve(cells, limit=2, rng=None, ban=None):
+    """
+    Count the solutions of ``cells`` up to ``limit``.
+
+    Args:
+        cells: 81 ints, ``0`` for empty (not modified).
+        limit: Stop after this many solutions.
+        rng: A ``random.Random`` to try the digits of each branch in random
+            order (random fills); None keeps ascending order.
+        ban: Optional ``(cell, digit)`` the solutions must not use.
+
+    Returns:
+        tuple: (count, first solution as 81 ints, or None).
+    """
+    used = unit_masks(cells)
+    if used is None:
+        return 0, None
+    banned = [0] * CELLS
+    if ban is not None:
+        banned[ban[0]] = 1 << (ban[1] - 1)
+
+    found = []
+
+    def search(cells, used):
+        # Propagate; a full grid is a solution
+        cell = _propagate(cells, used, banned)
+        if cell == -1:
+            found.append(cells)
+            return
+        if cell == -2:
+            return
+
+        # Branch on the MRV cell, on copies (the grid is small)
+        row, col, box = UNITS_OF[cell]
+        digits = _DIGITS[ALL_DIGITS & ~(used[row] | used[col] | used[box] | banned[cell])]
+        if rng is not None:
+            digits = list(digits)
+            rng.shuffle(digits)
+        for digit in digits:
+            bit = 1 << (digit - 1)
+            next_cells, next_used = list(cells), list(used)
+            next_cells[cell] = digit
+            next_used[row] |= bit
+            next_used[col] |= bit
+            next_used[box] |= bit
+            search(next_cells, next_used)
+            if len(found) >= limit:
+                return
+
+    search(list(cells), used)
+    return len(found), (found[0] if found else None)
+
+
+def count_solutions(cells, limit=2):
+    """Number of solutions, counted no further than ``limit``."""
+    return solve(cells, limit)[0]
+
+
+def has_unique_solution(cells):
+    return count_solutions(cells, limit=2) == 1
+
+
+def has_other_solution(cells, cell, digit):
+    """
+    True if the grid can be solved with ``cell`` holding anything but ``digit``.
+
+    The generator's uniqueness test when it empties a cell: the known
+    solution is excluded up front, so this stops at the first other one.
+    """
+    emptied = list(cells)
+    emptied[cell] = 0
+    return solve(emptied, limit=1, ban=(cell, digit))[0] > 0
+
+
+def random_solution(rng):
+    """A random complete grid, as 81 ints."""
+    return solve([0] * CELLS, limit=1, rng=rng)[1]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
 
+from stats.hooks import CompletionHookMixin
+
 
 class SudokuPuzzle(models.Model):
     DIFFICULTY_CHOICES = [
@@ -20,7 +22,10 @@ class SudokuPuzzle(models.Model):
         return f"SudokuPuzzle({self.difficulty}, id={self.pk})"
 
 
-class SudokuSession(models.Model):
+class SudokuSession(CompletionHookMixin, models.Model):
+    stats_game_type = "sudoku"
+    completion_field = "completed"
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -0,0 +1,75 @@
+# Filename: sudoku/tests/test_engine.py
+
+# Step 1: Imports
+import random
+
+import pytest
+
+from sudoku import engine
+from sudoku.puzzle_generator import CLUE_COUNTS, generate_puzzle
+
+# A 17-clue puzzle (minimum clues for a unique solution) and its solution
+MINIMAL = "000000010400000000020000000000050407008000300001090000300400200050100000000806000"
+MINIMAL_SOLUTION = "693784512487512936125963874932651487568247391741398625319475268856129743274836159"
+
+
+def _is_complete(cells):
+    return all(
+        sorted(cells[cell] for cell in engine.UNIT_CELLS[unit]) == list(range(1, 10))
+        for unit in range(27)
+    )
+
+
+# Step 2: Solving and counting
+def test_solves_a_minimal_puzzle():
+    count, solution = engine.solve(engine.from_string(MINIMAL))
+
+    assert count == 1
+    assert engine.to_string(solution) == MINIMAL_SOLUTION
+
+
+def test_counting_stops_at_the_limit():
+    empty = [0] * engine.CELLS
+
+    assert engine.count_solutions(empty) == 2
+    assert engine.count_solutions(empty, limit=5) == 5
+    assert not engine.has_unique_solution(empty)
+
+
+def test_conflicting_clues_have_no_solution():
+    cells = engine.from_string(MINIMAL)
+    cells[0] = cells[7]   # same digit twice in row 0
+
+    assert engine.solve(cells) == (0, None)
+
+
+def test_has_other_solution_agrees_with_counting():
+    rng = random.Random(5)
+    solution = engine.random_solution(rng)
+    cells = list(solution)
+
+    for cell in rng.sample(range(engine.CELLS), 60):
+        emptied = list(cells)
+        emptied[cell] = 0
+        other = engine.has_other_solution(cells, cell, solution[cell])
+        assert other is (engine.count_solutions(emptied) == 2)
+        if not other:
+            cells = emptied
+    assert engine.solve(cells) == (1, solution)
+
+
+def test_random_solution_is_a_valid_grid():
+    cells = engine.random_solution(random.Random(1))
+
+    assert _is_complete(cells)
+
+
+# Step 3: Generator
+@pytest.mark.parametrize("difficulty", sorted(CLUE_COUNTS))
+def test_generated_puzzles_are_unique_and_match_their_solution(difficulty):
+    puzzle, solution = generate_puzzle(difficulty, rng=random.Random(difficulty))
+
+    assert _is_complete(engine.from_string(solution))
+    assert all(clue in ("0", answer) for clue, answer in zip(puzzle, solution))
+    assert engine.solve(engine.from_string(puzzle)) == (1, engine.from_string(solution))
+    assert 81 - puzzle.count("0") >= CLUE_COUNTS[difficulty]
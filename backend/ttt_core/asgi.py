@@ -29,6 +29,16 @@ import lobby.routing
 import connect_four.routing
 import checkers.routing
 import poker.routing
+from chat.services.message_pipeline import schedule_drain
+from utils.scheduler.timer_scheduler import get_timer_scheduler
+
+# Start polling persisted timers now, so deadlines left by a worker that
+# restarted fire even before this worker schedules anything itself.
+get_timer_scheduler().start()
+
+# Periodically write the chat messages a crashed worker (or a failing flush)
+# broadcast but never flushed.
+schedule_drain()
 
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
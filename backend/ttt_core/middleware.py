@@ -1,8 +1,7 @@
 import logging
 from urllib.parse import parse_qs
-from channels.db import database_sync_to_async
-from rest_framework_simplejwt.tokens import AccessToken
-from django.core.cache import cache
+
+from utils.auth.ws_auth_cache import aget_user_principal, verify_access_token
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -32,7 +31,7 @@ class JWTWebSocketMiddleware:
         Steps:
         1. Extract the JWT token from the WebSocket connection's headers or query string.
         2. Decode and validate the token using SimpleJWT.
-        3. Retrieve the user from the database or cache using the user ID from the token payload.
+        3. Resolve the user principal from the auth caches (see utils.auth.ws_auth_cache).
         4. Attach the authenticated user to the WebSocket connection's scope.
         5. Assign an AnonymousUser if the token is missing, invalid, or expired.
 
@@ -49,7 +48,6 @@ class JWTWebSocketMiddleware:
 
         # Lazy-load Django imports to avoid accessing models/settings prematurely
         from django.contrib.auth.models import AnonymousUser
-        from django.contrib.auth import get_user_model
 
         # Step 1: Extract token from headers or query string
         token = self._get_token_from_scope(scope)
@@ -57,27 +55,11 @@ class JWTWebSocketMiddleware:
 
         if token:
             try:
-                # Step 2: Decode and validate the JWT token
-                User = get_user_model()  # Fetch the custom user model dynamically
-                access_token = AccessToken(token)  # Decode the JWT token
-                user_id = access_token["user_id"]  # Extract the user ID from the token payload
-
-                # Step 3: Retrieve the user from cache or database
-                cache_key = f"user_{user_id}"
-                user = None
-
-                try:
-                    user = cache.get(cache_key)
-                except TypeError as redis_error:
-                    logger.warning(f"Redis cache.get() failed: {redis_error} — falling back to DB")
-
-                if not user:
-                    user = await self.get_user(user_id, User)  # Fetch user from database
+                # Step 2: Verify the JWT (the signature check is cached until the token expires)
+                user_id = verify_access_token(token)
 
-                    try:
-                        cache.set(cache_key, user, timeout=60)  # Cache user for 60 seconds
-                    except TypeError as redis_error:
-                        logger.warning(f"Redis cache.set() failed: {redis_error} — skipping cache store")
+                # Step 3: Resolve the user (this worker's LRU, then Redis, then DB; never blocks)
+                user = await aget_user_principal(user_id)
 
                 # Step 4: Attach the authenticated user to the WebSocket scope
                 if user:
@@ -99,29 +81,6 @@ class JWTWebSocketMiddleware:
         # Pass the request to the next middleware or application in the stack
         return await self.app(scope, receive, send)
 
-    @database_sync_to_async
-    def get_user(self, user_id, User):
-        """
-        Retrieve a user from the database asynchronously using the user ID from the token.
-
-        Steps:
-        1. Query the database to fetch the user with the given primary key (ID).
-        2. Return an AnonymousUser if the user does not exist.
-
-        Args:
-            user_id (int): The ID of the user.
-            User: The user model (custom or default).
-
-        Returns:
-            User or AnonymousUser: The user object if found; otherwise, AnonymousUser.
-        """
-        from django.contrib.auth.models import AnonymousUser  # Import inside the method
-        try:
-            return User.objects.get(pk=user_id)
-        except User.DoesNotExist:
-            logger.warning(f"User with ID {user_id} does not exist.")
-            return AnonymousUser()
-
     def _get_token_from_scope(self, scope):
         """
         Extract the JWT token from the WebSocket connection's headers or query string.
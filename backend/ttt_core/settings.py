@@ -236,3 +236,75 @@ CACHES = {
 # Step 22: Staticfiles
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+
+# Step 23: Game AI worker pool
+# Searching AIs (Connect Four, Checkers) run in this many worker processes so
+# a deep search never blocks the ASGI event loop or a request thread's row lock.
+# CONNECT_FOUR_AI_WORKERS is the older name of the same knob.
+GAME_AI_WORKERS = config(
+    "GAME_AI_WORKERS", default=config("CONNECT_FOUR_AI_WORKERS", default=2, cast=int), cast=int,
+)
+
+# Step 24: Checkers AI search limits
+# Budget per AI turn; a player waiting on the REST reply waits this long.
+CHECKERS_AI_MAX_DEPTH = config("CHECKERS_AI_MAX_DEPTH", default=12, cast=int)
+CHECKERS_AI_TIME_BUDGET_MS = config("CHECKERS_AI_TIME_BUDGET_MS", default=300, cast=int)
+
+# Step 25: Poker equity rollouts
+# Live win probability is computed in this many worker processes (0 disables
+# it); each rollout stops sampling at the deadline.
+POKER_EQUITY_WORKERS = config("POKER_EQUITY_WORKERS", default=1, cast=int)
+POKER_EQUITY_DEADLINE_MS = config("POKER_EQUITY_DEADLINE_MS", default=150, cast=int)
+
+# Step 26: Poker AI policy
+# Betting profile from poker.ai.PROFILES and the per-decision time budget.
+# Decisions are computed outside the game's row lock.
+POKER_AI_PROFILE = config("POKER_AI_PROFILE", default="balanced")
+POKER_AI_TIME_BUDGET_MS = config("POKER_AI_TIME_BUDGET_MS", default=50, cast=int)
+
+# Step 27: Shared Redis connection pool (utils.redis.redis_client)
+# Callers wait up to REDIS_POOL_TIMEOUT seconds for a free connection;
+# idle connections are PINGed when next used after this many seconds.
+REDIS_MAX_CONNECTIONS = config("REDIS_MAX_CONNECTIONS", default=50, cast=int)
+REDIS_POOL_TIMEOUT = config("REDIS_POOL_TIMEOUT", default=5, cast=float)
+REDIS_HEALTH_CHECK_INTERVAL = config("REDIS_HEALTH_CHECK_INTERVAL", default=30, cast=int)
+
+# Step 28: Hot Tic-Tac-Toe state (utils.game.hot_game_state)
+# Live games are checkpointed to the DB every TTT_CHECKPOINT_INTERVAL seconds
+# and evicted from Redis once idle; TTT_STATE_TTL is only a safety net.
+TTT_CHECKPOINT_INTERVAL = config("TTT_CHECKPOINT_INTERVAL", default=15, cast=float)
+TTT_IDLE_EVICT_SECONDS = config("TTT_IDLE_EVICT_SECONDS", default=300, cast=float)
+TTT_STATE_TTL = config("TTT_STATE_TTL", default=24 * 60 * 60, cast=int)
+
+# Step 29: Game event log (utils.game.event_log)
+# Events kept per game stream for reconnect replay, and how long it lives.
+GAME_EVENT_LOG_MAXLEN = config("GAME_EVENT_LOG_MAXLEN", default=200, cast=int)
+GAME_EVENT_LOG_TTL = config("GAME_EVENT_LOG_TTL", default=24 * 60 * 60, cast=int)
+
+# Step 30: Presence (utils.presence.presence_service)
+# Clients heartbeat every interval; a socket silent for the TTL is dropped and
+# a user is announced offline only after the grace period.
+PRESENCE_HEARTBEAT_INTERVAL = config("PRESENCE_HEARTBEAT_INTERVAL", default=30, cast=float)
+PRESENCE_HEARTBEAT_TTL = config("PRESENCE_HEARTBEAT_TTL", default=90, cast=float)
+PRESENCE_OFFLINE_GRACE = config("PRESENCE_OFFLINE_GRACE", default=10, cast=float)
+PRESENCE_FRIENDS_TTL = config("PRESENCE_FRIENDS_TTL", default=60 * 60, cast=int)
+
+# Step 31: Unread counters cache (chat.services.unread_counters)
+UNREAD_COUNTERS_TTL = config("UNREAD_COUNTERS_TTL", default=60 * 60, cast=int)
+
+# Step 32: Chat write pipeline (chat.services.message_pipeline)
+# Messages are flushed to the DB every CHAT_FLUSH_INTERVAL_MS or once
+# CHAT_FLUSH_BATCH are waiting. CHAT_WORKER_ID pins this process's message-id
+# worker field (0-63): only that id is leased, and startup fails if another
+# process holds it. Unset, the first free id is leased from Redis. Messages
+# no writer flushed are drained every CHAT_DRAIN_INTERVAL_SECONDS.
+CHAT_FLUSH_INTERVAL_MS = config("CHAT_FLUSH_INTERVAL_MS", default=100, cast=float)
+CHAT_FLUSH_BATCH = config("CHAT_FLUSH_BATCH", default=200, cast=int)
+CHAT_WORKER_ID = config("CHAT_WORKER_ID", default=None, cast=lambda value: None if value in (None, "") else int(value))
+CHAT_DRAIN_INTERVAL_SECONDS = config("CHAT_DRAIN_INTERVAL_SECONDS", default=60, cast=float)
+
+# Step 33: WebSocket auth cache (utils.auth.ws_auth_cache)
+# Per-process LRU of verified tokens in front of a shared Redis cache.
+AUTH_CACHE_LOCAL_SIZE = config("AUTH_CACHE_LOCAL_SIZE", default=10_000, cast=int)
+AUTH_CACHE_LOCAL_TTL = config("AUTH_CACHE_LOCAL_TTL", default=30, cast=int)
+AUTH_CACHE_REDIS_TTL = config("AUTH_CACHE_REDIS_TTL", default=300, cast=int)
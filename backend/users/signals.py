@@ -1,5 +1,6 @@
-from django.db.models.signals import pre_save, post_delete
+from django.db.models.signals import pre_save, post_delete, post_save
 from django.dispatch import receiver
+from utils.auth.ws_auth_cache import PRINCIPAL_FIELDS, invalidate_user
 from .models import CustomUser
 
 @receiver(pre_save, sender=CustomUser)
@@ -11,6 +12,11 @@ def delete_old_avatar_on_update(sender, instance, **kwargs):
     if not instance.pk:
         # If the instance has no primary key yet, it is being created so do nothing
         return
+
+    # Partial saves that leave the avatar alone (status, last_login, ...) skip the lookup
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and "avatar" not in update_fields:
+        return
     
     try:
         old_avatar = CustomUser.objects.get(pk=instance.pk).avatar
@@ -27,4 +33,24 @@ def delete_avatar_on_user_delete(sender, instance, **kwargs):
     Deletes the avatar file from the filesystem when the CustomUser object is deleted
     """
     if instance.avatar and instance.avatar.name:
-        instance.avatar.delete(save=False)
\ No newline at end of file
+        instance.avatar.delete(save=False)
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_auth_cache_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Drops the cached WebSocket principal when one of its fields may have changed.
+    """
+    if created:
+        return
+    if update_fields is not None and not set(update_fields) & set(PRINCIPAL_FIELDS):
+        return
+    invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=CustomUser)
+def invalidate_auth_cache_on_delete(sender, instance, **kwargs):
+    """
+    Drops the cached WebSocket principal of a deleted user.
+    """
+    invalidate_user(instance.pk)
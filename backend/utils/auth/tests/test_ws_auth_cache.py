@@ -0,0 +1,142 @@
+# Filename: backend/utils/auth/tests/test_ws_auth_cache.py
+
+# Step 1: Imports
+import time
+from unittest.mock import MagicMock, patch
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ttt_core.middleware import JWTWebSocketMiddleware
+from utils.auth import ws_auth_cache
+
+User = get_user_model()
+
+
+# Step 2: Fixtures
+@pytest.fixture
+def redis_server():
+    """Both tiers' Redis clients backed by one in-memory server."""
+    server = fakeredis.FakeServer()
+    ws_auth_cache.reset_auth_caches()
+    with patch.object(
+        ws_auth_cache, "get_async_redis_client",
+        side_effect=lambda: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True),
+    ), patch.object(
+        ws_auth_cache, "get_redis_client",
+        return_value=fakeredis.FakeRedis(server=server, decode_responses=True),
+    ):
+        yield server
+    ws_auth_cache.reset_auth_caches()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email="ws-auth@test.com", password="pass1234", first_name="Ada")
+
+
+def _principal(user_id):
+    return async_to_sync(ws_auth_cache.aget_user_principal)(user_id)
+
+
+# Step 3: Token tier
+def test_token_signature_is_verified_once_until_exp(redis_server, user):
+    token = str(AccessToken.for_user(user))
+
+    assert ws_auth_cache.verify_access_token(token) == user.id
+    with patch.object(ws_auth_cache, "AccessToken", side_effect=AssertionError("re-verified")):
+        assert ws_auth_cache.verify_access_token(token) == user.id
+
+    # Past the token's exp the cached entry is gone and verification runs (and fails) again.
+    expired = MagicMock(side_effect=TokenError("Token is expired"))
+    with patch("utils.auth.ws_auth_cache.time.time", return_value=time.time() + 3600), \
+            patch.object(ws_auth_cache, "AccessToken", expired):
+        with pytest.raises(TokenError):
+            ws_auth_cache.verify_access_token(token)
+    expired.assert_called_once_with(token)
+    assert ws_auth_cache.auth_cache_stats()["token_verifications"] == 1
+
+
+def test_invalid_token_is_not_cached(redis_server):
+    for _ in range(2):
+        with pytest.raises(TokenError):
+            ws_auth_cache.verify_access_token("not-a-jwt")
+    assert ws_auth_cache.auth_cache_stats()["tokens_cached"] == 0
+
+
+# Step 4: User tiers
+def test_recent_user_is_served_without_redis_or_db(redis_server, user):
+    first = _principal(user.id)
+    assert first == user and first.first_name == "Ada" and first.email == user.email
+
+    broken = MagicMock(side_effect=AssertionError("Redis touched"))
+    with patch.object(ws_auth_cache, "get_async_redis_client", broken), \
+            CaptureQueriesContext(connection) as queries:
+        again = _principal(user.id)
+
+    assert again == user and again is not first
+    assert len(queries) == 0
+    assert ws_auth_cache.auth_cache_stats()["local_hits"] == 1
+
+
+def test_redis_tier_serves_other_workers(redis_server, user):
+    _principal(user.id)
+    ws_auth_cache._principals.clear()   # a worker that has not seen the user
+
+    with CaptureQueriesContext(connection) as queries:
+        assert _principal(user.id).first_name == "Ada"
+    assert len(queries) == 0
+    assert ws_auth_cache.auth_cache_stats()["redis_hits"] == 1
+
+
+def test_unknown_user_is_none(redis_server, db):
+    assert _principal(987654) is None
+
+
+def test_saving_a_principal_field_invalidates_both_tiers(redis_server, user):
+    _principal(user.id)
+
+    user.status = "online"
+    user.save(update_fields=["status"])
+    assert _principal(user.id).first_name == "Ada"
+    assert ws_auth_cache.auth_cache_stats()["db_loads"] == 1
+
+    user.first_name = "Grace"
+    user.save()
+    assert _principal(user.id).first_name == "Grace"
+    assert ws_auth_cache.auth_cache_stats()["db_loads"] == 2
+
+
+def test_principal_can_save_partial_updates(redis_server, user):
+    principal = _principal(user.id)
+    principal.status = "offline"
+    principal.save(update_fields=["status"])
+
+    user.refresh_from_db()
+    assert user.status == "offline" and user.first_name == "Ada"
+
+
+# Step 5: Middleware
+def test_handshake_attaches_principal(redis_server, user):
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(scope["user"])
+
+    middleware = JWTWebSocketMiddleware(app)
+    token = str(AccessToken.for_user(user))
+    for _ in range(2):
+        async_to_sync(middleware)({"type": "websocket", "query_string": f"token={token}".encode()}, None, None)
+    async_to_sync(middleware)({"type": "websocket", "query_string": b"token=bad"}, None, None)
+
+    assert seen[0] == user and seen[1] == user
+    assert seen[2].is_anonymous
+    stats = ws_auth_cache.auth_cache_stats()
+    assert (stats["token_verifications"], stats["token_hits"], stats["local_hits"]) == (1, 1, 1)
@@ -0,0 +1,192 @@
+# Filename: utils/auth/ws_auth_cache.py
+
+"""
+Caches for WebSocket handshake authentication.
+
+Why:
+- ``JWTWebSocketMiddleware`` re-verified the JWT signature on every
+  handshake, then called the sync ``cache.get``/``cache.set`` from the event
+  loop (a blocking Redis round trip) to store a pickled ``CustomUser``.
+
+How:
+- Token tier: an in-process LRU from sha256(token) to its user id. An entry
+  expires at the token's own ``exp``, so a cached token is never accepted
+  after it would have failed verification.
+- User tier 1: an in-process LRU from user id to a lightweight principal
+  (``PRINCIPAL_FIELDS``), kept ``AUTH_CACHE_LOCAL_TTL`` seconds. A user seen
+  recently by this worker authenticates without touching Redis or the DB.
+- User tier 2: Redis (``auth:user:{id}``, JSON, ``AUTH_CACHE_REDIS_TTL``
+  seconds) on the async client, shared by every worker.
+- Misses read only the principal columns with the async ORM.
+- Saving or deleting a user drops both tiers (``invalidate_user``, wired in
+  ``users.signals``). Other workers' local tier catches up within
+  ``AUTH_CACHE_LOCAL_TTL``.
+
+The principal is a ``CustomUser`` loaded with only ``PRINCIPAL_FIELDS``
+(the rest are deferred), so consumers can compare it with model instances,
+use it in queries and save it with ``update_fields``.
+"""
+
+# Step 1: Imports
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.tokens import AccessToken
+
+from utils.redis.redis_client import get_async_redis_client, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_FIELDS = ("id", "email", "first_name", "is_active", "is_staff", "is_superuser")
+
+
+class _ExpiringLRU:
+    """Thread-safe LRU whose entries carry their own expiry (epoch seconds)."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at: float) -> None:
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_tokens = _ExpiringLRU(settings.AUTH_CACHE_LOCAL_SIZE)       # sha256(token) -> user_id
+_principals = _ExpiringLRU(settings.AUTH_CACHE_LOCAL_SIZE)   # user_id -> principal fields
+_stats = {"token_hits": 0, "token_verifications": 0, "local_hits": 0, "redis_hits": 0, "db_loads": 0}
+
+
+def _user_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+# Step 2: Token tier
+def verify_access_token(token: str):
+    """
+    The token's user id, verifying its signature only the first time it is seen.
+
+    Raises:
+        rest_framework_simplejwt.exceptions.TokenError: invalid or expired token.
+    """
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    user_id = _tokens.get(token_hash)
+    if user_id is not None:
+        _stats["token_hits"] += 1
+        return user_id
+
+    # Step 2.1: Full verification (signature, exp, token type)
+    access_token = AccessToken(token)
+    _stats["token_verifications"] += 1
+    user_id = access_token["user_id"]
+    _tokens.set(token_hash, user_id, expires_at=float(access_token["exp"]))
+    return user_id
+
+
+# Step 3: User tiers
+def _principal(fields: dict):
+    """A ``CustomUser`` with only the principal columns loaded."""
+    User = get_user_model()
+    names = [f.attname for f in User._meta.concrete_fields if f.attname in PRINCIPAL_FIELDS]
+    return User.from_db(DEFAULT_DB_ALIAS, names, [fields[name] for name in names])
+
+
+async def aget_user_principal(user_id):
+    """
+    The user's principal for ``scope["user"]``: local LRU, then Redis, then DB.
+
+    Returns:
+        The principal, or None if the user does not exist.
+    """
+    local_ttl = settings.AUTH_CACHE_LOCAL_TTL
+
+    # Step 3.1: This worker saw the user recently
+    fields = _principals.get(str(user_id))
+    if fields is not None:
+        _stats["local_hits"] += 1
+        return _principal(fields)
+
+    # Step 3.2: Another worker (or this one, earlier) cached it in Redis
+    try:
+        raw = await get_async_redis_client().get(_user_key(user_id))
+    except Exception as exc:
+        logger.warning("[AUTH] redis read failed user_id=%s err=%s", user_id, exc)
+        raw = None
+
+    if raw:
+        fields = json.loads(raw)
+        _stats["redis_hits"] += 1
+    else:
+        # Step 3.3: Database (principal columns only)
+        fields = await get_user_model().objects.filter(pk=user_id).values(*PRINCIPAL_FIELDS).afirst()
+        _stats["db_loads"] += 1
+        if fields is None:
+            return None
+        try:
+            await get_async_redis_client().set(
+                _user_key(user_id),
+                json.dumps(fields),
+                ex=settings.AUTH_CACHE_REDIS_TTL,
+            )
+        except Exception as exc:
+            logger.warning("[AUTH] redis write failed user_id=%s err=%s", user_id, exc)
+
+    _principals.set(str(user_id), fields, expires_at=time.time() + local_ttl)
+    return _principal(fields)
+
+
+def invalidate_user(user_id) -> None:
+    """Drop the user from this worker's LRU and from Redis (sync; signal handlers)."""
+    _principals.pop(str(user_id))
+    try:
+        get_redis_client().delete(_user_key(user_id))
+    except Exception as exc:
+        logger.warning("[AUTH] redis invalidation failed user_id=%s err=%s", user_id, exc)
+
+
+# Step 4: Introspection
+def auth_cache_stats() -> dict:
+    """Hit/miss counters since start (or the last reset) plus local tier sizes."""
+    return {**_stats, "tokens_cached": len(_tokens), "principals_cached": len(_principals)}
+
+
+def reset_auth_caches() -> None:
+    """Empty the local tiers and counters (tests)."""
+    _tokens.clear()
+    _principals.clear()
+    for name in _stats:
+        _stats[name] = 0
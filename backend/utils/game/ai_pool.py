@@ -0,0 +1,53 @@
+# Filename: utils/game/ai_pool.py
+
+"""
+Worker pools shared by the searching game AIs (Connect Four, Checkers).
+
+- Searches run in separate processes (spawned, not forked, so no Django or
+  event-loop state is inherited) to keep the GIL free for sockets.
+- Dispatch threads wait on those searches and write results back to the DB,
+  so consumers can fire and forget an AI turn.
+
+Both pools are created lazily, once per process, and sized by
+``settings.GAME_AI_WORKERS``.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+
+_search_pool = None
+_dispatch_pool = None
+_pool_lock = threading.Lock()
+
+
+def _workers() -> int:
+    return max(1, settings.GAME_AI_WORKERS)
+
+
+def get_search_pool():
+    """Process pool for the AI searches themselves."""
+    global _search_pool
+    if _search_pool is None:
+        with _pool_lock:
+            if _search_pool is None:
+                _search_pool = ProcessPoolExecutor(
+                    max_workers=_workers(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _search_pool
+
+
+def get_dispatch_pool():
+    """Threads that wait on searches and write the result back to the DB."""
+    global _dispatch_pool
+    if _dispatch_pool is None:
+        with _pool_lock:
+            if _dispatch_pool is None:
+                _dispatch_pool = ThreadPoolExecutor(
+                    max_workers=_workers() * 2,
+                    thread_name_prefix="game-ai",
+                )
+    return _dispatch_pool
@@ -0,0 +1,249 @@
+# Filename: utils/game/event_log.py
+
+"""
+Append-only per-game event log with sequence numbers, for reconnect resume.
+
+Why:
+- A reconnecting client could only ask for a full snapshot (the consumer
+  reloads the model), even when it missed one move.
+
+How:
+- Every gameplay group event (moves, completion, rematch offers/answers) is
+  appended before it is broadcast. A Lua script INCRs the game's counter and
+  XADDs the event with the stream ID ``<seq>-0``, so sequence numbers are
+  gap-free and ordered. The stream keeps the last ``GAME_EVENT_LOG_MAXLEN``
+  events. The broadcast carries ``seq`` and clients remember the last one.
+- A client reconnects with ``?since=<seq>`` (or sends ``sync`` with
+  ``since``). If the stream still holds every event after ``since``, those
+  events are replayed through the consumer's own group handlers (so each
+  socket gets exactly what it would have received). Otherwise the consumer
+  falls back to its full snapshot.
+- Events are mirrored to ``game.GameEvent`` for history. Consumers whose move
+  path already touches the DB mirror right away. Tic-Tac-Toe mirrors from
+  its write-behind (``utils.game.hot_game_state``).
+- When the counter is missing (new game, expired, or Redis flushed), it is
+  seeded from the mirror's highest ``seq``, so numbers never go backwards.
+
+Redis Key Structure:
+    - events:{game_type}:{game_id}            (Stream) id "<seq>-0": type, event
+    - events:{game_type}:{game_id}:seq        (String) last seq
+    - events:{game_type}:{game_id}:mirrored   (String) last seq copied to the DB
+"""
+
+# Step 1: Imports
+import json
+import logging
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db.models import Max
+
+from game.models import GameEvent
+from utils.redis.redis_client import get_async_redis_client, get_redis_client
+from utils.redis.script_registry import ScriptRegistry
+
+logger = logging.getLogger(__name__)
+
+# Event fields that are replayed to sockets but never written to the DB.
+UNMIRRORED_FIELDS = ("sessionKey",)
+
+
+def _keys(game_type, game_id) -> tuple:
+    stream = f"events:{game_type}:{game_id}"
+    return stream, f"{stream}:seq", f"{stream}:mirrored"
+
+
+# Step 2: Lua
+# KEYS: stream, seq   ARGV: maxlen, ttl, event type, event json
+# Returns the event's seq, or -1 when the counter must be seeded first.
+APPEND = """
+if redis.call('EXISTS', KEYS[2]) == 0 then return -1 end
+local seq = redis.call('INCR', KEYS[2])
+redis.call('XADD', KEYS[1], 'MAXLEN', ARGV[1], seq .. '-0', 'type', ARGV[3], 'event', ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return seq
+"""
+
+_script = ScriptRegistry({"append": APPEND})
+
+
+def _entry_seq(entry_id) -> int:
+    return int(entry_id.split("-", 1)[0])
+
+
+def _decode(entry_id, fields) -> dict:
+    return {**json.loads(fields["event"]), "seq": _entry_seq(entry_id)}
+
+
+def _append_args(event) -> list:
+    body = {name: value for name, value in event.items() if name != "seq"}
+    return [settings.GAME_EVENT_LOG_MAXLEN, settings.GAME_EVENT_LOG_TTL, event.get("type", ""), json.dumps(body)]
+
+
+# Step 3: Appending
+def seed_sequence(game_type, game_id) -> None:
+    """Start the counter at the mirror's highest seq, unless it already exists (sync)."""
+    _, seq_key, mirrored_key = _keys(game_type, game_id)
+    floor = GameEvent.objects.filter(game_type=game_type, game_id=int(game_id)).aggregate(top=Max("seq"))["top"] or 0
+    redis = get_redis_client()
+    redis.set(seq_key, floor, nx=True, ex=settings.GAME_EVENT_LOG_TTL)
+    redis.set(mirrored_key, floor, nx=True, ex=settings.GAME_EVENT_LOG_TTL)
+
+
+def append_event(game_type, game_id, event: dict, mirror: bool = True) -> dict:
+    """
+    Log a group event and stamp it with its ``seq`` (sync callers).
+
+    Args:
+        event: The ``group_send`` message; gets a ``seq`` key.
+        mirror: Copy new events to the DB now.
+
+    Returns:
+        The same event, for chaining into ``group_send``.
+    """
+    stream, seq_key, _ = _keys(game_type, game_id)
+    script = _script(get_redis_client(), "append")
+    seq = script(keys=[stream, seq_key], args=_append_args(event))
+    if seq == -1:
+        seed_sequence(game_type, game_id)
+        seq = script(keys=[stream, seq_key], args=_append_args(event))
+    event["seq"] = seq
+    if mirror:
+        mirror_events(game_type, game_id)
+    return event
+
+
+async def aappend_event(game_type, game_id, event: dict, mirror: bool = True) -> dict:
+    """Async ``append_event``: one script call; the DB is only touched to seed or mirror."""
+    stream, seq_key, _ = _keys(game_type, game_id)
+    script = _script(get_async_redis_client(), "append")
+    seq = await script(keys=[stream, seq_key], args=_append_args(event))
+    if seq == -1:
+        await database_sync_to_async(seed_sequence)(game_type, game_id)
+        seq = await script(keys=[stream, seq_key], args=_append_args(event))
+    event["seq"] = seq
+    if mirror:
+        await database_sync_to_async(mirror_events)(game_type, game_id)
+    return event
+
+
+# Step 4: Reading
+def _deltas(since, latest, entries):
+    if latest is None:
+        return None                     # log expired or never written
+    latest = int(latest)
+    if since > latest:
+        return None                     # client is ahead of this log
+    if since == latest:
+        return []
+    if not entries or _entry_seq(entries[0][0]) != since + 1:
+        return None                     # trimmed past the client's position
+    return [_decode(entry_id, fields) for entry_id, fields in entries]
+
+
+def events_since(game_type, game_id, since: int):
+    """
+    Events after ``since`` in order, or None if the log no longer covers them.
+    """
+    stream, seq_key, _ = _keys(game_type, game_id)
+    pipe = get_redis_client().pipeline(transaction=False)
+    pipe.get(seq_key)
+    pipe.xrange(stream, f"{since + 1}-0", "+")
+    latest, entries = pipe.execute()
+    return _deltas(since, latest, entries)
+
+
+async def aevents_since(game_type, game_id, since: int):
+    """Async ``events_since`` (one pipelined round trip)."""
+    stream, seq_key, _ = _keys(game_type, game_id)
+    pipe = get_async_redis_client().pipeline(transaction=False)
+    pipe.get(seq_key)
+    pipe.xrange(stream, f"{since + 1}-0", "+")
+    latest, entries = await pipe.execute()
+    return _deltas(since, latest, entries)
+
+
+def latest_seq(game_type, game_id) -> int:
+    """The last seq handed out (0 if none)."""
+    _, seq_key, _ = _keys(game_type, game_id)
+    return int(get_redis_client().get(seq_key) or 0)
+
+
+async def alatest_seq(game_type, game_id) -> int:
+    """The last seq handed out (0 if none), to stamp snapshots with."""
+    _, seq_key, _ = _keys(game_type, game_id)
+    return int(await get_async_redis_client().get(seq_key) or 0)
+
+
+# Step 5: Resume helpers for consumers
+def parse_since(value):
+    """A non-negative int from a query/message value, else None."""
+    try:
+        since = int(value)
+    except (TypeError, ValueError):
+        return None
+    return since if since >= 0 else None
+
+
+def since_from_scope(scope):
+    """``?since=<seq>`` from the WebSocket query string, if present and valid."""
+    qs = parse_qs((scope.get("query_string") or b"").decode("utf-8"))
+    return parse_since((qs.get("since") or [None])[0])
+
+
+async def areplay_since(consumer, game_type, game_id, since) -> bool:
+    """
+    Re-deliver the events after ``since`` through the consumer's handlers.
+
+    Returns:
+        bool: False when the gap is not covered (send a snapshot instead).
+    """
+    if since is None:
+        return False
+    events = await aevents_since(game_type, game_id, since)
+    if events is None:
+        logger.info("[EVENTS] gap not covered game=%s:%s since=%s", game_type, game_id, since)
+        return False
+    for event in events:
+        await consumer.dispatch(event)
+    logger.info("[EVENTS] replayed game=%s:%s since=%s count=%s", game_type, game_id, since, len(events))
+    return True
+
+
+# Step 6: DB mirror
+def mirror_events(game_type, game_id) -> int:
+    """
+    Copy logged events the DB has not seen yet to ``GameEvent`` (sync).
+
+    Returns:
+        int: Events written.
+    """
+    redis = get_redis_client()
+    stream, _, mirrored_key = _keys(game_type, game_id)
+    mirrored = redis.get(mirrored_key)
+    if mirrored is None:
+        mirrored = GameEvent.objects.filter(
+            game_type=game_type, game_id=int(game_id),
+        ).aggregate(top=Max("seq"))["top"] or 0
+
+    entries = redis.xrange(stream, f"{int(mirrored) + 1}-0", "+")
+    if not entries:
+        return 0
+
+    rows = []
+    for entry_id, fields in entries:
+        payload = json.loads(fields["event"])
+        for name in UNMIRRORED_FIELDS:
+            payload.pop(name, None)
+        rows.append(GameEvent(
+            game_type=game_type,
+            game_id=int(game_id),
+            seq=_entry_seq(entry_id),
+            event_type=fields.get("type", ""),
+            payload=payload,
+        ))
+    GameEvent.objects.bulk_create(rows, ignore_conflicts=True)
+    redis.set(mirrored_key, rows[-1].seq, ex=settings.GAME_EVENT_LOG_TTL)
+    return len(rows)
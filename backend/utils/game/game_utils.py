@@ -1,6 +1,7 @@
 import random
 from asgiref.sync import async_to_sync, sync_to_async
 from channels.layers import BaseChannelLayer
+from game import engine
 from game.models import TicTacToeGame, DEFAULT_BOARD_STATE
 from users.models import CustomUser
 import logging
@@ -30,6 +31,17 @@ class GameUtils:
         except TicTacToeGame.DoesNotExist:
             raise ValueError(f"Game with ID {game_id} does not exist")
 
+    @staticmethod
+    async def aget_game_instance(game_id: int):
+        """
+        Async ORM version of get_game_instance, with both players joined in
+        so role checks on the result never query from the event loop.
+        """
+        try:
+            return await TicTacToeGame.objects.select_related("player_x", "player_o").aget(id=game_id)
+        except TicTacToeGame.DoesNotExist:
+            raise ValueError(f"Game with ID {game_id} does not exist")
+
     @staticmethod
     def randomize_turn(players: list) -> tuple:
         """
@@ -127,23 +139,24 @@ class GameUtils:
         Step 1: Return a stable, client-safe snapshot of game state.
         Step 2: Keep keys consistent across versions.
         Step 3: Do NOT include secrets or server-only fields.
+
+        Board-derived fields (winner fallback, winning line) come from the
+        shared bitboard engine so they always agree with the move rules.
         """
-        # Adjust field names below to match your Game model.
-        # These getattr calls make it resilient if you refactor model fields later.
-        board = getattr(game, "board", None)
+        board_state = getattr(game, "board_state", None) or DEFAULT_BOARD_STATE
+        x_mask, o_mask = engine.from_board_state(board_state)
+
         current_turn = getattr(game, "current_turn", None)
-        winner = getattr(game, "winner", None)
+        winner = getattr(game, "winner", None) or engine.winner(x_mask, o_mask)
         status = getattr(game, "status", None)
-
-        # Optional extras if they exist in your model
         is_completed = getattr(game, "is_completed", None)
-        winning_line = getattr(game, "winning_line", None)
 
         return {
-            "board": board,
+            "board": board_state,
             "currentTurn": current_turn,
             "winner": winner,
             "status": status,
             "isCompleted": is_completed,
-            "winningLine": winning_line,
-        }
\ No newline at end of file
+            "winningLine": engine.winning_line(x_mask, o_mask),
+            "legalMoves": list(engine.legal_moves(x_mask, o_mask)) if winner is None else [],
+        }
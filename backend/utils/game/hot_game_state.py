@@ -0,0 +1,405 @@
+# Filename: utils/game/hot_game_state.py
+
+"""
+Redis-resident state for active Tic-Tac-Toe games, written behind to the DB.
+
+Why:
+- Every WebSocket move re-read the ``TicTacToeGame`` row, saved it (firing
+  the ``game_update_signal`` broadcast) and reloaded it: four or more SQL
+  round trips per click.
+
+How:
+- An active game lives in the hash ``ttt:game:{id}`` (board, turn, winner,
+  version, players). The first reader hydrates it from the row; a game that
+  is already hot is never overwritten.
+- A move reads the hash, checks it with the bitboard ``engine`` (so the rules
+  stay in one place) and writes the result with a compare-and-set on
+  ``version``. A lost race re-reads and retries. In AI games the AI's reply
+  is written in the same step. The move path runs no SQL.
+- Write-behind: ``persist_game_state`` copies the hash to the row with
+  ``QuerySet.update`` (no ``post_save``, so no second broadcast). It runs
+  when a game completes, from a per-game checkpoint timer every
+  ``TTT_CHECKPOINT_INTERVAL`` seconds, and before idle eviction
+  (``TTT_IDLE_EVICT_SECONDS`` without a move).
+- Recovery: if Redis loses the hash, the next reader hydrates it again from
+  the row, which is at most one checkpoint behind.
+- The game's event log (``utils.game.event_log``) is seeded on hydration and
+  mirrored to the DB with each write-behind, so moves stay SQL-free.
+
+Redis Key Structure:
+    - ttt:game:{game_id}   (Hash)  board, turn, winner, completed, version,
+                                   persisted, touched_at, player_x_id,
+                                   player_x_name, player_o_id, player_o_name,
+                                   is_ai_game, ai_marker
+"""
+
+# Step 1: Imports
+import logging
+import time
+from dataclasses import dataclass, field, replace
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from game import engine
+from game.ai_logic.ai_logic import get_best_move
+from game.models import TicTacToeGame
+from stats.recorder import record_game_result
+from utils.game.event_log import latest_seq, mirror_events, seed_sequence
+from utils.redis.redis_client import get_async_redis_client, get_redis_client
+from utils.redis.script_registry import ScriptRegistry
+from utils.scheduler.timer_scheduler import get_timer_scheduler
+
+logger = logging.getLogger(__name__)
+
+GAME_TYPE = "tic_tac_toe"
+AI_EMAIL = "ai@tictactoe.com"
+CHECKPOINT_TIMER = "ttt.checkpoint"
+MOVE_RETRIES = 5
+
+
+def game_state_key(game_id) -> str:
+    return f"ttt:game:{game_id}"
+
+
+# Step 2: Lua scripts
+# KEYS: game   ARGV: ttl, field, value, ...
+HYDRATE = """
+local unpack = table.unpack or unpack
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# KEYS: game   ARGV: expected version, board, turn, winner, completed, touched_at, ttl
+# Returns the new version, 0 on a version conflict, -1 if the game is not hot.
+APPLY_MOVE = """
+local version = redis.call('HGET', KEYS[1], 'version')
+if not version then return -1 end
+if version ~= ARGV[1] then return 0 end
+local next_version = tonumber(version) + 1
+redis.call('HSET', KEYS[1], 'board', ARGV[2], 'turn', ARGV[3], 'winner', ARGV[4],
+           'completed', ARGV[5], 'touched_at', ARGV[6], 'version', next_version)
+redis.call('EXPIRE', KEYS[1], ARGV[7])
+return next_version
+"""
+
+# KEYS: game   ARGV: persisted version, evict ('1'/'0')
+# Returns 2 if evicted, 1 if still hot, 0 if the game is not hot.
+MARK_PERSISTED = """
+local version = redis.call('HGET', KEYS[1], 'version')
+if not version then return 0 end
+if tonumber(ARGV[1]) > tonumber(redis.call('HGET', KEYS[1], 'persisted') or '-1') then
+    redis.call('HSET', KEYS[1], 'persisted', ARGV[1])
+end
+if ARGV[2] == '1' and version == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 2
+end
+return 1
+"""
+
+_script = ScriptRegistry({"hydrate": HYDRATE, "apply_move": APPLY_MOVE, "mark_persisted": MARK_PERSISTED})
+
+
+# Step 3: State
+@dataclass
+class GameState:
+    """
+    One hot game. Attribute names follow ``TicTacToeGame`` where they overlap,
+    so ``GameUtils.serialize_game_state`` and the AI accept it as a game.
+    """
+    game_id: str
+    board_state: str
+    current_turn: str
+    winner: str | None
+    is_completed: bool
+    version: int
+    persisted: int
+    touched_at: float
+    player_x_id: int | None
+    player_x_name: str | None
+    player_o_id: int | None
+    player_o_name: str | None
+    is_ai_game: bool
+    ai_marker: str | None
+    last_moves: list = field(default_factory=list)   # (cell, marker) written by aapply_move
+
+    def marker_for(self, user_id):
+        """'X', 'O', or None for a spectator."""
+        if user_id is not None and user_id == self.player_x_id:
+            return "X"
+        if user_id is not None and user_id == self.player_o_id:
+            return "O"
+        return None
+
+    def apply_delta(self, event) -> bool:
+        """
+        Bring this copy up to a ``game_update_bus`` event.
+
+        Returns:
+            bool: False when it cannot (a gap, or a direct row write with no
+            version): reload the state instead.
+        """
+        version = event.get("version")
+        if version is None or version > self.version + 1:
+            return False
+        if version == self.version + 1:
+            cells = list(self.board_state)
+            for cell, marker in event.get("moves", []):
+                cells[cell] = marker
+            self.board_state = "".join(cells)
+            self.current_turn, self.winner = event["current_turn"], event["winner"]
+            self.is_completed, self.version = event["is_completed"], version
+        return True
+
+    def players(self) -> dict:
+        """``{"player_x": {...} | None, "player_o": {...} | None}`` for broadcasts."""
+        def player(user_id, name, marker):
+            if user_id is None:
+                return None
+            return {"id": user_id, "first_name": "AI" if marker == self.ai_marker else name}
+
+        return {
+            "player_x": player(self.player_x_id, self.player_x_name, "X"),
+            "player_o": player(self.player_o_id, self.player_o_name, "O"),
+        }
+
+
+def _optional_int(value):
+    return int(value) if value not in (None, "") else None
+
+
+def _decode(game_id, fields: dict) -> GameState:
+    return GameState(
+        game_id=str(game_id),
+        board_state=fields["board"],
+        current_turn=fields["turn"],
+        winner=fields.get("winner") or None,
+        is_completed=fields.get("completed") == "1",
+        version=int(fields["version"]),
+        persisted=int(fields.get("persisted", 0)),
+        touched_at=float(fields.get("touched_at", 0)),
+        player_x_id=_optional_int(fields.get("player_x_id")),
+        player_x_name=fields.get("player_x_name") or None,
+        player_o_id=_optional_int(fields.get("player_o_id")),
+        player_o_name=fields.get("player_o_name") or None,
+        is_ai_game=fields.get("is_ai_game") == "1",
+        ai_marker=fields.get("ai_marker") or None,
+    )
+
+
+def _encode(game: TicTacToeGame, version: int) -> dict:
+    """Hash fields for a row (players must be loaded or cheap to load)."""
+    player_x, player_o = game.player_x, game.player_o
+    ai_marker = ""
+    if game.is_ai_game:
+        ai_marker = "X" if player_x and player_x.email == AI_EMAIL else "O"
+    return {
+        "board": game.board_state,
+        "turn": game.current_turn,
+        "winner": game.winner or "",
+        "completed": "1" if game.is_completed else "0",
+        "version": version,
+        "persisted": version,
+        "touched_at": time.time(),
+        "player_x_id": player_x.id if player_x else "",
+        "player_x_name": (player_x.first_name or player_x.email) if player_x else "",
+        "player_o_id": player_o.id if player_o else "",
+        "player_o_name": (player_o.first_name or player_o.email) if player_o else "",
+        "is_ai_game": "1" if game.is_ai_game else "0",
+        "ai_marker": ai_marker,
+    }
+
+
+def _pairs(flat) -> dict:
+    return dict(zip(flat[::2], flat[1::2]))
+
+
+# Step 4: Loading (hydration is the only SQL, and only on a cold game)
+def hydrate_game_state(game: TicTacToeGame, redis=None) -> GameState:
+    """
+    Make ``game`` hot unless it already is, and arm its checkpoint timer.
+
+    Returns:
+        The hot state (the existing one if another worker won the race).
+    """
+    redis = redis or get_redis_client()
+    # Versions start at the event log's seq, which survives eviction, so a
+    # socket's copy from before an eviction never looks newer than the game.
+    seed_sequence(GAME_TYPE, game.id)
+    args = [settings.TTT_STATE_TTL]
+    for name, value in _encode(game, latest_seq(GAME_TYPE, game.id)).items():
+        args.extend((name, value))
+    state = _decode(game.id, _pairs(_script(redis, "hydrate")(keys=[game_state_key(game.id)], args=args)))
+
+    if not state.is_completed:
+        get_timer_scheduler().schedule(
+            CHECKPOINT_TIMER, str(game.id), int(time.time()),
+            time.time() + settings.TTT_CHECKPOINT_INTERVAL,
+        )
+    logger.debug("[TTT_STATE] hydrated game_id=%s version=%s", game.id, state.version)
+    return state
+
+
+def load_game_state(game_id) -> GameState:
+    """
+    The game's hot state, hydrating it from the row on a miss (sync).
+
+    Raises:
+        ValueError: If the game does not exist (same contract as ``GameUtils``).
+    """
+    redis = get_redis_client()
+    fields = redis.hgetall(game_state_key(game_id))
+    if fields:
+        return _decode(game_id, fields)
+    try:
+        game = TicTacToeGame.objects.select_related("player_x", "player_o").get(id=game_id)
+    except TicTacToeGame.DoesNotExist:
+        raise ValueError(f"Game with ID {game_id} does not exist")
+    return hydrate_game_state(game, redis=redis)
+
+
+async def aget_game_state(game_id) -> GameState:
+    """Async ``load_game_state``: one HGETALL, or a DB hydration when cold."""
+    fields = await get_async_redis_client().hgetall(game_state_key(game_id))
+    if fields:
+        return _decode(game_id, fields)
+    return await database_sync_to_async(load_game_state)(game_id)
+
+
+# Step 5: Moves
+def next_board(state: GameState, position: int, marker: str) -> tuple:
+    """
+    The position after ``marker`` plays ``position`` (and the AI replies, in
+    AI games), without touching Redis.
+
+    Returns:
+        tuple: (board_state, current_turn, winner, moves), ``moves`` being
+        the ``(cell, marker)`` pairs played, in order.
+
+    Raises:
+        ValidationError: Same messages as ``TicTacToeGame.make_move``.
+    """
+    if state.winner:
+        raise ValidationError("Invalid move: The game is already over.")
+
+    x_mask, o_mask = engine.from_board_state(state.board_state)
+    error = engine.validate_move(x_mask, o_mask, position, marker, state.current_turn)
+    if error:
+        raise ValidationError(error)
+
+    turn, moves = marker, []
+    while True:
+        x_mask, o_mask = engine.apply_move(x_mask, o_mask, position, turn)
+        moves.append((position, turn))
+        board = engine.to_board_state(x_mask, o_mask)
+        winner = engine.winner(x_mask, o_mask)
+        if winner:
+            return board, turn, winner, moves
+        turn = engine.other_marker(turn)
+        if not state.is_ai_game or turn != state.ai_marker:
+            return board, turn, None, moves
+
+        # Step 5.1: AI reply (table lookup), applied in the same write
+        position = get_best_move(
+            replace(state, board_state=board, current_turn=turn), engine.other_marker(turn), turn,
+        )
+        if position is None:
+            return board, turn, None, moves
+
+
+async def aapply_move(game_id, position: int, marker: str) -> GameState:
+    """
+    Apply a move to the hot game: read, validate, compare-and-set on version.
+
+    Raises:
+        ValidationError: Illegal move, or the game kept changing underneath.
+        ValueError: The game does not exist.
+    """
+    redis = get_async_redis_client()
+    ttl = settings.TTT_STATE_TTL
+    for _ in range(MOVE_RETRIES):
+        state = await aget_game_state(game_id)
+        board, turn, winner, moves = next_board(state, position, marker)
+        now = time.time()
+        version = await _script(redis, "apply_move")(
+            keys=[game_state_key(game_id)],
+            args=[state.version, board, turn, winner or "", "1" if winner else "0", now, ttl],
+        )
+        if version > 0:
+            state.board_state, state.current_turn, state.winner = board, turn, winner
+            state.is_completed, state.version, state.touched_at = bool(winner), version, now
+            state.last_moves = moves
+            return state
+        logger.debug("[TTT_STATE] move retry game_id=%s result=%s", game_id, version)
+    raise ValidationError("Game state changed, please retry the move.")
+
+
+# Step 6: Write-behind
+def persist_game_state(game_id, evict: bool = False) -> bool:
+    """
+    Copy the hot state to the ``TicTacToeGame`` row if it is ahead (sync).
+
+    Args:
+        evict: Also drop the hash, unless a move landed after this write.
+
+    Returns:
+        bool: Whether the game is still hot afterwards.
+    """
+    redis = get_redis_client()
+    fields = redis.hgetall(game_state_key(game_id))
+    if not fields:
+        return False
+    state = _decode(game_id, fields)
+
+    if state.version > state.persisted:
+        fields = dict(
+            board_state=state.board_state,
+            current_turn=state.current_turn,
+            winner=state.winner,
+            is_completed=state.is_completed,
+            updated_at=timezone.now(),
+        )
+        rows = TicTacToeGame.objects.filter(pk=game_id)
+        with transaction.atomic():
+            # The write that completes the row also records the result (once).
+            if state.is_completed and rows.filter(is_completed=False).update(**fields):
+                record_game_result(GAME_TYPE, rows.get())
+            else:
+                rows.update(**fields)
+        logger.debug("[TTT_STATE] persisted game_id=%s version=%s", game_id, state.version)
+    mirror_events(GAME_TYPE, game_id)
+
+    result = _script(redis, "mark_persisted")(
+        keys=[game_state_key(game_id)], args=[state.version, "1" if evict else "0"],
+    )
+    return result == 1
+
+
+def discard_game_state(game_id) -> None:
+    """Forget the hot state (the row was written directly and is now newer)."""
+    try:
+        get_redis_client().delete(game_state_key(game_id))
+    except Exception as exc:
+        logger.warning("[TTT_STATE] could not discard game_id=%s err=%s", game_id, exc)
+
+
+def _fire_checkpoint(key, token):
+    """Timer handler: checkpoint the game, evict it once idle or finished."""
+    fields = get_redis_client().hgetall(game_state_key(key))
+    if not fields:
+        return None
+    state = _decode(key, fields)
+    idle = time.time() - state.touched_at >= settings.TTT_IDLE_EVICT_SECONDS
+    if not persist_game_state(key, evict=idle or state.is_completed):
+        return None
+    return time.time() + settings.TTT_CHECKPOINT_INTERVAL
+
+
+get_timer_scheduler().register(CHECKPOINT_TIMER, _fire_checkpoint)
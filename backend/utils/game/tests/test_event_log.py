@@ -0,0 +1,95 @@
+# Filename: backend/utils/game/tests/test_event_log.py
+
+# Step 1: Imports
+from unittest.mock import patch
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+
+from game.models import GameEvent
+from utils.game import event_log
+from utils.game.event_log import (
+    aappend_event,
+    aevents_since,
+    append_event,
+    events_since,
+    mirror_events,
+    parse_since,
+)
+
+GAME = ("connect_four", 41)
+
+
+# Step 2: Fixtures
+@pytest.fixture
+def redis(db):
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    with patch.object(event_log, "get_redis_client", return_value=client), \
+            patch.object(
+                event_log, "get_async_redis_client",
+                side_effect=lambda: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True),
+            ):
+        yield client
+
+
+def _move(n):
+    return {"type": "c4_game_update", "board": str(n)}
+
+
+# Step 3: Appending
+def test_events_get_consecutive_seqs_and_are_mirrored(redis):
+    seqs = [append_event(*GAME, _move(n))["seq"] for n in range(3)]
+
+    assert seqs == [1, 2, 3]
+    rows = list(GameEvent.objects.filter(game_type="connect_four", game_id=41).values_list("seq", "payload"))
+    assert rows == [(1, {"type": "c4_game_update", "board": "0"}), (2, {"type": "c4_game_update", "board": "1"}),
+                    (3, {"type": "c4_game_update", "board": "2"})]
+
+
+def test_counter_resumes_from_the_mirror_after_a_flush(redis):
+    for n in range(2):
+        append_event(*GAME, _move(n))
+    redis.flushall()
+
+    assert append_event(*GAME, _move(9))["seq"] == 3
+    assert events_since(*GAME, 2) == [{"type": "c4_game_update", "board": "9", "seq": 3}]
+
+
+def test_mirror_is_idempotent_and_keeps_secrets_out(redis):
+    append_event(*GAME, {"type": "c4_rematch_start", "new_game_id": "7", "sessionKey": "s3cret"}, mirror=False)
+
+    assert mirror_events(*GAME) == 1
+    assert mirror_events(*GAME) == 0
+    assert GameEvent.objects.get(game_id=41).payload == {"type": "c4_rematch_start", "new_game_id": "7"}
+    assert events_since(*GAME, 0)[0]["sessionKey"] == "s3cret"
+
+
+# Step 4: Reading
+@override_settings(GAME_EVENT_LOG_MAXLEN=3)
+def test_events_since_only_when_the_window_covers_the_gap(redis):
+    for n in range(5):
+        append_event(*GAME, _move(n), mirror=False)
+
+    assert [event["seq"] for event in events_since(*GAME, 2)] == [3, 4, 5]
+    assert events_since(*GAME, 5) == []
+    assert events_since(*GAME, 1) is None     # seq 2 was trimmed
+    assert events_since(*GAME, 6) is None     # ahead of the log
+    assert events_since("connect_four", 42, 0) is None
+
+
+def test_async_twins_share_the_log(redis):
+    append_event(*GAME, _move(0), mirror=False)
+    event = async_to_sync(aappend_event)(*GAME, _move(1))
+
+    assert event["seq"] == 2
+    assert async_to_sync(aevents_since)(*GAME, 0) == events_since(*GAME, 0)
+    assert GameEvent.objects.filter(game_id=41).count() == 2
+
+
+@pytest.mark.parametrize("value, expected", [("3", 3), (0, 0), ("-1", None), ("x", None), (None, None)])
+def test_parse_since(value, expected):
+    assert parse_since(value) == expected
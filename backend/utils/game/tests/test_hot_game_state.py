@@ -0,0 +1,244 @@
+# Filename: backend/utils/game/tests/test_hot_game_state.py
+
+# Step 1: Imports
+import time
+from unittest.mock import MagicMock, patch
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.test import APIClient
+
+from game import views
+from game.models import GameEvent, TicTacToeGame
+from stats.models import PlayerGameStats
+from utils.game import event_log, hot_game_state
+from utils.game.event_log import aappend_event
+from utils.game.hot_game_state import (
+    aapply_move,
+    aget_game_state,
+    game_state_key,
+    load_game_state,
+    persist_game_state,
+)
+
+User = get_user_model()
+
+
+# Step 2: Fixtures
+@pytest.fixture
+def redis(db):
+    """Sync and async clients (state and event log) on one in-memory server; the timer scheduler is mocked."""
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    scheduler = MagicMock()
+
+    def async_client():
+        return fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+
+    with patch.object(hot_game_state, "get_redis_client", return_value=client), \
+            patch.object(hot_game_state, "get_async_redis_client", side_effect=async_client), \
+            patch.object(event_log, "get_redis_client", return_value=client), \
+            patch.object(event_log, "get_async_redis_client", side_effect=async_client), \
+            patch.object(hot_game_state, "get_timer_scheduler", return_value=scheduler):
+        client.scheduler = scheduler
+        yield client
+
+
+@pytest.fixture
+def game(db):
+    x = User.objects.create_user(email="hot-x@test.com", password="pass", first_name="Xena")
+    o = User.objects.create_user(email="hot-o@test.com", password="pass", first_name="Otto")
+    return TicTacToeGame.objects.create(player_x=x, player_o=o)
+
+
+def _move(game_id, position, marker):
+    return async_to_sync(aapply_move)(game_id, position, marker)
+
+
+# Step 3: Hydration
+def test_first_read_hydrates_and_arms_the_checkpoint(redis, game):
+    state = async_to_sync(aget_game_state)(game.id)
+
+    assert (state.board_state, state.current_turn, state.version) == ("_________", "X", 0)
+    assert state.marker_for(game.player_x_id) == "X" and state.marker_for(12345) is None
+    assert state.players()["player_o"] == {"id": game.player_o_id, "first_name": "Otto"}
+    redis.scheduler.schedule.assert_called_once()
+    assert redis.scheduler.schedule.call_args.args[:2] == (hot_game_state.CHECKPOINT_TIMER, str(game.id))
+
+
+def test_hydration_never_overwrites_a_hot_game(redis, game):
+    load_game_state(game.id)
+    _move(game.id, 4, "X")
+
+    again = hot_game_state.hydrate_game_state(game)
+    assert again.version == 1 and again.board_state[4] == "X"
+
+
+def test_missing_game_raises_value_error(redis):
+    with pytest.raises(ValueError):
+        load_game_state(999999)
+
+
+# Step 4: Moves
+def test_moves_on_a_hot_game_run_no_sql(redis, game):
+    load_game_state(game.id)
+
+    with CaptureQueriesContext(connection) as queries:
+        _move(game.id, 0, "X")
+        state = _move(game.id, 4, "O")
+
+    assert len(queries) == 0
+    assert (state.board_state, state.current_turn, state.version) == ("X___O____", "X", 2)
+    game.refresh_from_db()
+    assert game.board_state == "_________"   # written behind, not through
+
+
+def test_illegal_moves_are_rejected(redis, game):
+    _move(game.id, 0, "X")
+    for position, marker in ((1, "X"), (0, "O")):
+        with pytest.raises(ValidationError):
+            _move(game.id, position, marker)
+    assert load_game_state(game.id).version == 1
+
+
+def test_lost_race_is_retried_against_the_new_version(redis, game):
+    load_game_state(game.id)
+    real_get = hot_game_state.aget_game_state
+    calls = []
+
+    async def stale_then_fresh(game_id):
+        state = await real_get(game_id)
+        if not calls:
+            calls.append(state.version)
+            # Another writer bumps the version between our read and our write.
+            redis.hset(game_state_key(game_id), "version", 1)
+        return state
+
+    with patch.object(hot_game_state, "aget_game_state", stale_then_fresh):
+        state = _move(game.id, 0, "X")
+
+    assert calls == [0]
+    assert state.board_state == "X________" and state.version == 2
+
+
+def test_ai_reply_lands_in_the_same_write(redis, db):
+    human = User.objects.create_user(email="hot-h@test.com", password="pass", first_name="Hu")
+    ai = User.objects.filter(email=hot_game_state.AI_EMAIL).first() or User.objects.create_user(
+        email=hot_game_state.AI_EMAIL, password="pass", first_name="AI",
+    )
+    game = TicTacToeGame.objects.create(player_x=human, player_o=ai, is_ai_game=True)
+
+    state = _move(game.id, 4, "X")
+
+    assert state.board_state.count("O") == 1 and state.current_turn == "X"
+    assert state.version == 1
+    assert state.players()["player_o"]["first_name"] == "AI"
+
+
+# Step 5: Write-behind and recovery
+def test_finished_game_is_written_back_without_post_save(redis, game):
+    saves = MagicMock()
+    post_save.connect(saves, sender=TicTacToeGame)
+    try:
+        for position, marker in ((0, "X"), (3, "O"), (1, "X"), (4, "O"), (2, "X")):
+            state = _move(game.id, position, marker)
+        assert state.winner == "X" and state.is_completed
+        assert persist_game_state(game.id, evict=True) is False
+    finally:
+        post_save.disconnect(saves, sender=TicTacToeGame)
+
+    game.refresh_from_db()
+    assert (game.board_state, game.winner, game.is_completed) == ("XXXOO____", "X", True)
+    assert not redis.exists(game_state_key(game.id))
+    saves.assert_not_called()
+
+
+def test_write_behind_records_the_result_once(redis, game):
+    for position, marker in ((0, "X"), (3, "O"), (1, "X"), (4, "O"), (2, "X")):
+        _move(game.id, position, marker)
+    persist_game_state(game.id)
+    game.refresh_from_db()
+    game.save()   # completed row saved again: not a new result
+
+    rows = PlayerGameStats.objects.filter(game_type="tic_tac_toe").order_by("-wins")
+    assert [(row.user_id, row.wins, row.losses, row.games) for row in rows] == [
+        (game.player_x_id, 1, 0, 1), (game.player_o_id, 0, 1, 1),
+    ]
+
+
+def test_checkpoint_writes_back_then_evicts_idle_games(redis, game):
+    _move(game.id, 0, "X")
+
+    assert hot_game_state._fire_checkpoint(str(game.id), 0) > time.time()
+    game.refresh_from_db()
+    assert game.board_state == "X________"
+    assert load_game_state(game.id).persisted == 1
+
+    redis.hset(game_state_key(game.id), "touched_at", time.time() - 3600)
+    assert hot_game_state._fire_checkpoint(str(game.id), 0) is None
+    assert not redis.exists(game_state_key(game.id))
+
+
+def test_flushed_redis_recovers_from_the_last_checkpoint(redis, game):
+    _move(game.id, 0, "X")
+    persist_game_state(game.id)
+    _move(game.id, 4, "O")   # not checkpointed yet
+    redis.flushall()
+
+    state = async_to_sync(aget_game_state)(game.id)
+    assert (state.board_state, state.current_turn, state.version) == ("X________", "O", 0)
+
+
+def test_direct_row_save_discards_the_hot_copy(redis, game):
+    _move(game.id, 0, "X")
+    assert redis.exists(game_state_key(game.id))
+
+    game.refresh_from_db()
+    game.save()
+    assert not redis.exists(game_state_key(game.id))
+
+
+def test_write_behind_mirrors_the_event_log(redis, game):
+    load_game_state(game.id)   # seeds the log's counter; moves stay SQL-free
+    with CaptureQueriesContext(connection) as queries:
+        _move(game.id, 0, "X")
+        event = async_to_sync(aappend_event)("tic_tac_toe", game.id, {"type": "game_update"}, mirror=False)
+    assert len(queries) == 0 and event["seq"] == 1
+
+    persist_game_state(game.id)
+    assert list(GameEvent.objects.filter(game_id=game.id).values_list("game_type", "seq")) == [("tic_tac_toe", 1)]
+
+
+# Step 6: REST views write back before reading
+def test_rest_reads_keep_the_game_hot_and_writes_evict_it(redis, game):
+    _move(game.id, 0, "X")
+    client = APIClient()
+    client.force_authenticate(game.player_o)
+
+    response = client.get(f"/api/games/{game.id}/")
+    assert response.data["board_state"] == "X________"
+    assert redis.exists(game_state_key(game.id))
+
+    response = client.post(f"/api/games/{game.id}/move/", {"position": 4}, format="json")
+    assert response.data["board_state"] == "X___O____"
+    assert not redis.exists(game_state_key(game.id))
+
+
+def test_rest_outsiders_are_rejected_before_any_write_back(redis, game):
+    _move(game.id, 0, "X")
+    outsider = User.objects.create_user(email="hot-z@test.com", password="pass")
+    client = APIClient()
+    client.force_authenticate(outsider)
+
+    with patch("game.views.persist_game_state") as persist, \
+            patch.object(views.TicTacToeGameViewSet, "check_object_permissions", side_effect=PermissionDenied):
+        assert client.get(f"/api/games/{game.id}/").status_code == 403
+    persist.assert_not_called()
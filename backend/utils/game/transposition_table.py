@@ -0,0 +1,44 @@
+# Filename: utils/game/transposition_table.py
+
+"""
+Bounded transposition table shared by the searching game AIs
+(Connect Four, Checkers).
+"""
+
+TT_MAX_ENTRIES = 250_000
+
+# Bound types stored with each score.
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class TranspositionTable:
+    """
+    Bounded cache of search results keyed by a position hash.
+
+    Entries are ``(depth, flag, score, best_move)``. When full, the oldest
+    insertion is evicted (dicts keep insertion order, so this is O(1)).
+    """
+
+    def __init__(self, max_entries=TT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def store(self, key, depth, flag, score, best_move):
+        entries = self._entries
+        existing = entries.get(key)
+        if existing is not None:
+            # Keep the deeper result for the same position.
+            if existing[0] > depth:
+                return
+        elif len(entries) >= self.max_entries:
+            del entries[next(iter(entries))]
+        entries[key] = (depth, flag, score, best_move)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,104 @@
+# Filename: backend/utils/notifications/tests/test_notify.py
+
+# Step 1: Imports
+import uuid
+from unittest.mock import patch
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from channels.layers import InMemoryChannelLayer
+from channels_redis.core import RedisChannelLayer
+from redis.asyncio.connection import Connection
+
+from utils.notifications import notify
+from utils.notifications.notify import agroup_send_many, anotify_users
+
+MEMBERS = 500
+
+
+# Step 2: Fixtures
+class FakeRedisLayer(RedisChannelLayer):
+    """``RedisChannelLayer`` whose hosts are in-memory Redis servers."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.servers = [fakeredis.FakeServer() for _ in self.hosts]
+
+    def connection(self, index):
+        return fakeredis.aioredis.FakeRedis(server=self.servers[index])
+
+
+@pytest.fixture
+def layer():
+    return FakeRedisLayer(hosts=["redis://a", "redis://b"], prefix=f"test-{uuid.uuid4().hex}")
+
+
+class RoundTrips:
+    """Counts requests written to Redis (a pipeline counts once)."""
+
+    def __init__(self):
+        self.count = 0
+        self._send = Connection.send_packed_command
+
+    def __enter__(self):
+        counter = self
+
+        async def send_packed_command(connection, command, check_health=True):
+            counter.count += 1
+            return await counter._send(connection, command, check_health)
+
+        self._patch = patch.object(Connection, "send_packed_command", send_packed_command)
+        self._patch.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._patch.stop()
+
+
+# Step 3: Redis layer
+async def test_room_fan_out_costs_two_round_trips_per_host(layer):
+    channels = [await layer.new_channel() for _ in range(MEMBERS)]
+    for user_id, channel in enumerate(channels):
+        await layer.group_add(f"user_{user_id}", channel)
+
+    with patch.object(notify, "get_channel_layer", return_value=layer), RoundTrips() as trips:
+        await anotify_users(user_ids=range(MEMBERS), payload={"type": "group_chat", "room_id": 7})
+
+    assert trips.count <= 2 * len(layer.hosts)
+    for channel in (channels[0], channels[-1]):
+        assert await layer.receive(channel) == {"type": "notify", "payload": {"type": "group_chat", "room_id": 7}}
+
+
+async def test_channel_in_several_groups_gets_one_copy(layer):
+    channel, other = await layer.new_channel(), await layer.new_channel()
+    await layer.group_add("user_1", channel)
+    await layer.group_add("user_2", channel)
+    await layer.group_add("user_3", other)
+
+    await agroup_send_many(["user_1", "user_2", "user_3", "user_1", "nobody"], {"type": "ping"}, layer)
+
+    assert await layer.receive(channel) == {"type": "ping"}
+    assert await layer.receive(other) == {"type": "ping"}
+    channel_key = layer.prefix + layer.non_local_name(channel)
+    index = layer.consistent_hash(channel)
+    assert await layer.connection(index).zcard(channel_key) == 0
+
+
+# Step 4: Other layers and the payload contract
+async def test_in_memory_layer_sends_concurrently():
+    memory = InMemoryChannelLayer()
+    channels = [await memory.new_channel() for _ in range(3)]
+    for user_id, channel in enumerate(channels):
+        await memory.group_add(f"user_{user_id}", channel)
+
+    with patch.object(notify, "get_channel_layer", return_value=memory):
+        await anotify_users(user_ids=[0, 1, 2], payload={"type": "invite_created"})
+
+    for channel in channels:
+        assert (await memory.receive(channel))["payload"] == {"type": "invite_created"}
+
+
+async def test_double_envelope_is_rejected():
+    with pytest.raises(ValueError):
+        await anotify_users(user_ids=[1], payload={"type": "notify", "payload": {"type": "x"}})
@@ -0,0 +1,259 @@
+# Filename: utils/presence/presence_service.py
+
+"""
+Redis-backed online/offline presence for friends.
+
+Why:
+- ``FriendStatusConsumer`` saved ``CustomUser.status`` and re-queried the
+  user's friendships on every connect and disconnect, then sent one
+  ``group_send`` per friend. With two tabs open, closing either one marked
+  the user offline, and every page reload sent an offline/online pair to all
+  friends.
+
+How:
+- Each socket is a member of ``presence:conns:{user_id}``, scored with its
+  heartbeat expiry. The consumer refreshes it every
+  ``PRESENCE_HEARTBEAT_INTERVAL`` seconds. A worker that dies without a
+  disconnect leaves entries that lapse after ``PRESENCE_HEARTBEAT_TTL``.
+- ``presence:online`` holds the users whose friends were last told
+  "online". A Lua script changes it only on a real transition. The first
+  live socket makes the user online. The last one leaving schedules a
+  check ``PRESENCE_OFFLINE_GRACE`` seconds later on the timer scheduler, and
+  the user goes offline only if no socket came back by then. A reload never
+  reaches the friends.
+- Friend ids are cached in ``presence:friends:{user_id}``. The cache is
+  filled on a miss and dropped when a ``Friendship`` changes. The same
+  script that records a transition returns only the friends who are online,
+  and the transition goes out as one pre-encoded frame to their presence
+  groups in one batched send (``agroup_send_many``).
+- A warm connect runs no SQL. ``CustomUser.status`` is written lazily, from
+  the timer thread, by the presence check.
+
+Redis Key Structure:
+    - presence:conns:{user_id}    (ZSet)  channel name -> heartbeat expiry
+    - presence:online             (Set)   user ids currently shown online
+    - presence:friends:{user_id}  (Set)   accepted friend ids + "-" marker
+"""
+
+# Step 1: Imports
+import logging
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+from friends.models import Friendship
+from utils.redis.redis_client import get_async_redis_client, get_redis_client
+from utils.redis.script_registry import ScriptRegistry
+from utils.notifications.notify import agroup_send_many
+from utils.scheduler.timer_scheduler import get_timer_scheduler
+from utils.websockets.codec import frame_event
+
+logger = logging.getLogger(__name__)
+
+ONLINE = "online"
+OFFLINE = "offline"
+ONLINE_KEY = "presence:online"
+PRESENCE_TIMER = "presence.check"
+FRIENDS_MARKER = "-"   # keeps a user without friends cached
+
+
+def heartbeat_interval() -> float:
+    return settings.PRESENCE_HEARTBEAT_INTERVAL
+
+
+def _conns_key(user_id) -> str:
+    return f"presence:conns:{user_id}"
+
+
+def _friends_key(user_id) -> str:
+    return f"presence:friends:{user_id}"
+
+
+def presence_group(user_id) -> str:
+    """Channels group of one user's presence sockets (not ``user_<id>``, which is notifications)."""
+    return f"presence_user_{user_id}"
+
+
+# Step 2: Lua scripts
+# KEYS: conns, online, friends   ARGV: channel, now, expires_at, user id, conns ttl
+# Returns {-1} when the friend cache must be filled first, {0} with no
+# transition, or {1, online friend id, ...} when the user just came online.
+CONNECT = """
+local unpack = table.unpack or unpack
+if redis.call('EXISTS', KEYS[3]) == 0 then return {-1} end
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[2])
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+if redis.call('SADD', KEYS[2], ARGV[4]) == 0 then return {0} end
+return {1, unpack(redis.call('SINTER', KEYS[3], KEYS[2]))}
+"""
+
+# KEYS: conns   ARGV: channel, now
+# Returns the number of live sockets left.
+DISCONNECT = """
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[2])
+return redis.call('ZCARD', KEYS[1])
+"""
+
+# KEYS: conns, online, friends   ARGV: user id, now
+# Returns {0, latest expiry} while a socket is live, {-1} if already offline,
+# or {1, online friend id, ...} when the user just went offline.
+CHECK = """
+local unpack = table.unpack or unpack
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[2])
+local live = redis.call('ZRANGE', KEYS[1], -1, -1, 'WITHSCORES')
+if #live > 0 then return {0, live[2]} end
+if redis.call('SREM', KEYS[2], ARGV[1]) == 0 then return {-1} end
+return {1, unpack(redis.call('SINTER', KEYS[3], KEYS[2]))}
+"""
+
+_script = ScriptRegistry({"connect": CONNECT, "disconnect": DISCONNECT, "check": CHECK})
+
+
+# Step 3: Friend cache
+def load_friend_ids(user_id) -> list:
+    """Accepted friend ids from the DB (one query, no user rows)."""
+    pairs = Friendship.objects.filter(is_accepted=True).filter(
+        Q(from_user_id=user_id) | Q(to_user_id=user_id)
+    ).values_list("from_user_id", "to_user_id")
+    return [to_id if from_id == int(user_id) else from_id for from_id, to_id in pairs]
+
+
+def _fill_args(user_id, friend_ids):
+    return _friends_key(user_id), [FRIENDS_MARKER, *friend_ids], settings.PRESENCE_FRIENDS_TTL
+
+
+def cache_friend_ids(user_id) -> None:
+    """Fill the friend cache from the DB (sync)."""
+    key, members, ttl = _fill_args(user_id, load_friend_ids(user_id))
+    pipe = get_redis_client().pipeline()
+    pipe.delete(key)
+    pipe.sadd(key, *members)
+    pipe.expire(key, ttl)
+    pipe.execute()
+
+
+async def acache_friend_ids(user_id) -> None:
+    """Async ``cache_friend_ids``: the query runs in the DB thread."""
+    key, members, ttl = _fill_args(user_id, await database_sync_to_async(load_friend_ids)(user_id))
+    pipe = get_async_redis_client().pipeline()
+    pipe.delete(key)
+    pipe.sadd(key, *members)
+    pipe.expire(key, ttl)
+    await pipe.execute()
+
+
+def invalidate_friend_ids(*user_ids) -> None:
+    """Drop cached friend ids (a friendship was accepted or removed)."""
+    try:
+        get_redis_client().delete(*(_friends_key(user_id) for user_id in user_ids))
+    except Exception as exc:
+        logger.warning("[PRESENCE] could not invalidate friends of %s err=%s", user_ids, exc)
+
+
+# Step 4: Fan-out
+def _status_event(user_id, status) -> dict:
+    return frame_event({"type": "status_update", "user_id": int(user_id), "status": status})
+
+
+async def afan_out(user_id, status, friend_ids) -> None:
+    """Send one status frame, encoded once, to every listed friend's presence group in one batch."""
+    if not friend_ids:
+        return
+    await agroup_send_many(
+        [presence_group(friend_id) for friend_id in friend_ids], _status_event(user_id, status), get_channel_layer(),
+    )
+    logger.info("[PRESENCE] user_id=%s %s -> %s online friends", user_id, status, len(friend_ids))
+
+
+def _friend_ids(result) -> list:
+    return [int(member) for member in result[1:] if member != FRIENDS_MARKER]
+
+
+def _schedule_check(user_id, fire_at) -> None:
+    get_timer_scheduler().schedule(PRESENCE_TIMER, str(user_id), str(int(fire_at * 1000)), fire_at)
+
+
+# Step 5: Socket lifecycle
+async def aconnect(user_id, channel_name) -> bool:
+    """
+    Record a live socket (also its heartbeat); announce the user if they just came online.
+
+    Returns:
+        bool: True on an offline -> online transition.
+    """
+    now = time.time()
+    script = _script(get_async_redis_client(), "connect")
+    keys = [_conns_key(user_id), ONLINE_KEY, _friends_key(user_id)]
+    args = [channel_name, now, now + settings.PRESENCE_HEARTBEAT_TTL,
+            user_id, int(settings.PRESENCE_HEARTBEAT_TTL) * 2]
+    result = await script(keys=keys, args=args)
+    if result[0] == -1:
+        await acache_friend_ids(user_id)
+        result = await script(keys=keys, args=args)
+    if result[0] != 1:
+        return False
+
+    await afan_out(user_id, ONLINE, _friend_ids(result))
+    # The check syncs the DB column and keeps watching for lapsed heartbeats.
+    await sync_to_async(_schedule_check, thread_sensitive=False)(user_id, now)
+    return True
+
+
+async def adisconnect(user_id, channel_name) -> None:
+    """Drop a socket; the last one leaving starts the offline grace period."""
+    now = time.time()
+    left = await _script(get_async_redis_client(), "disconnect")(keys=[_conns_key(user_id)], args=[channel_name, now])
+    if left == 0:
+        grace = settings.PRESENCE_OFFLINE_GRACE
+        await sync_to_async(_schedule_check, thread_sensitive=False)(user_id, now + grace)
+
+
+# Step 6: Reads
+def online_user_ids(user_ids) -> set:
+    """The subset of ``user_ids`` shown online (one round trip)."""
+    user_ids = [int(user_id) for user_id in user_ids]
+    if not user_ids:
+        return set()
+    flags = get_redis_client().smismember(ONLINE_KEY, user_ids)
+    return {user_id for user_id, flag in zip(user_ids, flags) if flag}
+
+
+def is_online(user_id) -> bool:
+    return bool(get_redis_client().sismember(ONLINE_KEY, int(user_id)))
+
+
+# Step 7: Timer
+def _sync_status_column(user_id, status) -> None:
+    """Lazy copy to ``CustomUser.status`` (``QuerySet.update``: no signals, no-op when equal)."""
+    get_user_model().objects.filter(pk=user_id).exclude(status=status).update(status=status)
+
+
+def _fire_presence_check(key, token):
+    """
+    Timer handler: take the user offline once no socket is live, else check
+    again after the latest heartbeat lapses.
+    """
+    redis = get_redis_client()
+    if not redis.exists(_friends_key(key)):
+        cache_friend_ids(key)
+    result = _script(redis, "check")(
+        keys=[_conns_key(key), ONLINE_KEY, _friends_key(key)], args=[key, time.time()],
+    )
+    if result[0] == 0:
+        _sync_status_column(key, ONLINE)
+        return float(result[1]) + settings.PRESENCE_OFFLINE_GRACE
+
+    _sync_status_column(key, OFFLINE)
+    if result[0] == 1:
+        async_to_sync(afan_out)(key, OFFLINE, _friend_ids(result))
+    return None
+
+
+get_timer_scheduler().register(PRESENCE_TIMER, _fire_presence_check)
@@ -0,0 +1,174 @@
+# Filename: backend/utils/presence/tests/test_presence_service.py
+
+# Step 1: Imports
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from friends.models import Friendship
+from utils.presence import presence_service
+from utils.presence.presence_service import (
+    PRESENCE_TIMER,
+    _fire_presence_check,
+    aconnect,
+    adisconnect,
+    is_online,
+    online_user_ids,
+)
+
+User = get_user_model()
+
+
+# Step 2: Fixtures
+class CountingLayer(InMemoryChannelLayer):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sent = []
+
+    async def group_send(self, group, message):
+        self.sent.append((group, json.loads(message["text"])))
+        await super().group_send(group, message)
+
+
+@pytest.fixture
+def presence(db):
+    """Presence on an in-memory Redis, with a counting channel layer and a mocked timer scheduler."""
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    layer = CountingLayer()
+    scheduler = MagicMock()
+    with patch.object(presence_service, "get_redis_client", return_value=client), \
+            patch.object(
+                presence_service, "get_async_redis_client",
+                side_effect=lambda: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True),
+            ), \
+            patch.object(presence_service, "get_channel_layer", return_value=layer), \
+            patch.object(presence_service, "get_timer_scheduler", return_value=scheduler):
+        layer.scheduler = scheduler
+        yield layer
+
+
+@pytest.fixture
+def people(db):
+    ada, bob, cy = (
+        User.objects.create_user(email=f"{name}@presence.test", password="pass", first_name=name)
+        for name in ("ada", "bob", "cy")
+    )
+    Friendship.objects.create(from_user=ada, to_user=bob, is_accepted=True)
+    Friendship.objects.create(from_user=cy, to_user=ada, is_accepted=True)
+    return ada, bob, cy
+
+
+def _connect(user, channel):
+    return async_to_sync(aconnect)(user.id, channel)
+
+
+def _disconnect(user, channel):
+    async_to_sync(adisconnect)(user.id, channel)
+
+
+def _fire(presence, user):
+    """Run the most recently scheduled presence check."""
+    kind, key, token, _ = presence.scheduler.schedule.call_args.args
+    assert (kind, key) == (PRESENCE_TIMER, str(user.id))
+    return _fire_presence_check(key, token)
+
+
+# Step 3: Transitions
+def test_only_online_friends_are_told_once(presence, people):
+    ada, bob, cy = people
+    _connect(bob, "bob-1")
+    presence.sent.clear()
+
+    assert _connect(ada, "ada-1") is True
+    assert _connect(ada, "ada-2") is False   # second tab
+    assert presence.sent == [
+        ("presence_user_%s" % bob.id, {"type": "status_update", "user_id": ada.id, "status": "online"}),
+    ]
+    assert online_user_ids([ada.id, bob.id, cy.id]) == {ada.id, bob.id}
+
+
+def test_closing_one_of_two_tabs_keeps_the_user_online(presence, people):
+    ada, bob, _ = people
+    _connect(bob, "bob-1")
+    _connect(ada, "ada-1")
+    _connect(ada, "ada-2")
+    presence.scheduler.reset_mock()
+    presence.sent.clear()
+
+    _disconnect(ada, "ada-1")
+    presence.scheduler.schedule.assert_not_called()
+    assert is_online(ada.id) and presence.sent == []
+
+
+def test_reload_within_grace_is_silent(presence, people):
+    ada, bob, _ = people
+    _connect(bob, "bob-1")
+    _connect(ada, "ada-1")
+    presence.sent.clear()
+
+    _disconnect(ada, "ada-1")
+    _connect(ada, "ada-2")
+    assert _fire(presence, ada) > time.time()   # still live: checks again later
+    assert presence.sent == []
+    ada.refresh_from_db()
+    assert ada.status == "online"               # written lazily by the check
+
+
+def test_last_tab_goes_offline_after_grace(presence, people):
+    ada, bob, _ = people
+    _connect(bob, "bob-1")
+    _connect(ada, "ada-1")
+    presence.sent.clear()
+
+    _disconnect(ada, "ada-1")
+    assert _fire(presence, ada) is None
+    assert presence.sent == [
+        ("presence_user_%s" % bob.id, {"type": "status_update", "user_id": ada.id, "status": "offline"}),
+    ]
+    ada.refresh_from_db()
+    assert ada.status == "offline" and not is_online(ada.id)
+
+
+def test_lapsed_heartbeat_takes_the_user_offline(presence, people):
+    ada, _, _ = people
+    _connect(ada, "ada-1")
+    with patch.object(presence_service.time, "time", return_value=time.time() + 3600):
+        assert _fire(presence, ada) is None
+    assert not is_online(ada.id)
+
+
+# Step 4: Friend cache
+def test_warm_connect_runs_no_sql(presence, people):
+    ada, _, _ = people
+    with CaptureQueriesContext(connection) as cold:
+        _connect(ada, "ada-1")
+    assert len(cold) == 1
+
+    with CaptureQueriesContext(connection) as warm:
+        _connect(ada, "ada-2")
+        _disconnect(ada, "ada-2")
+    assert len(warm) == 0
+
+
+def test_friendship_change_refreshes_the_cache(presence, people):
+    ada, _, _ = people
+    dan = User.objects.create_user(email="dan@presence.test", password="pass", first_name="dan")
+    _connect(dan, "dan-1")
+    _connect(ada, "ada-1")
+    _disconnect(ada, "ada-1")
+    _fire(presence, ada)
+
+    Friendship.objects.create(from_user=dan, to_user=ada, is_accepted=True)
+    presence.sent.clear()
+    _connect(ada, "ada-2")
+    assert [group for group, _ in presence.sent] == ["presence_user_%s" % dan.id]
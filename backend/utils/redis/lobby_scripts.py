@@ -0,0 +1,141 @@
+# Filename: utils/redis/lobby_scripts.py
+
+"""
+Server-side Lua scripts for lobby operations.
+
+Why:
+- A lobby join used to be HSET + SADD + a WATCH/MULTI role loop + three
+  EXPIREs per write, i.e. 10+ round trips, and the role loop retried forever
+  on any error.
+
+How:
+- Each operation is one script: its reads, writes and TTL refresh run
+  atomically inside Redis in a single round trip. Scripts are sent by SHA
+  (EVALSHA), through a preloading ``ScriptRegistry``: they are loaded once
+  per sync client, and redis-py reloads one whenever a server reports
+  NOSCRIPT (which is all an async client relies on: the sync client has
+  normally loaded them into the same server already).
+- Key layout is the one documented on ``RedisGameLobbyManager``.
+
+Return values:
+    join_lobby / assign_role  -> "X" | "O" | "Spectator"
+    validate_session          -> 1 valid, 0 not
+    leave_lobby               -> channels left in the lobby
+    rematch_offer             -> existing offer payload, or nil once stored
+"""
+
+# Step 1: Imports
+from utils.redis.script_registry import ScriptRegistry
+
+
+def _lua(*parts: str) -> str:
+    return "".join(parts).strip()
+
+
+# Lua: pick a free seat for ARGV[1] in the roles hash KEYS[3] (sets `role`).
+_PICK_ROLE = """
+local role = redis.call('HGET', KEYS[3], ARGV[1])
+if not role then
+    role = 'Spectator'
+    if assign == '1' then
+        local has_x, has_o = false, false
+        for _, taken in ipairs(redis.call('HVALS', KEYS[3])) do
+            if taken == 'X' then has_x = true elseif taken == 'O' then has_o = true end
+        end
+        if not has_x then role = 'X' elseif not has_o then role = 'O' end
+        if role ~= 'Spectator' then redis.call('HSET', KEYS[3], ARGV[1], role) end
+    end
+end
+"""
+
+_TOUCH_LOBBY = """
+for index = 1, 3 do redis.call('EXPIRE', KEYS[index], ttl) end
+"""
+
+# KEYS: players, channels, roles
+# ARGV: user_id, player_json, channel_name ('' = none), ttl, assign ('1'/'0')
+JOIN_LOBBY = _lua("""
+local ttl, assign = ARGV[4], ARGV[5]
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+if ARGV[3] ~= '' then redis.call('SADD', KEYS[2], ARGV[3]) end
+""", _PICK_ROLE, _TOUCH_LOBBY, """
+return role
+""")
+
+# KEYS: players, channels, roles
+# ARGV: user_id, ttl
+ASSIGN_ROLE = _lua("""
+local ttl, assign = ARGV[2], '1'
+""", _PICK_ROLE, _TOUCH_LOBBY, """
+return role
+""")
+
+# KEYS: session key, session users
+# ARGV: session_key, user_id, ttl, admit ('1' = add user to the allow-list)
+VALIDATE_SESSION = _lua("""
+local stored = redis.call('GET', KEYS[1])
+if not stored or stored ~= ARGV[1] then return 0 end
+if redis.call('SISMEMBER', KEYS[2], ARGV[2]) == 0 then
+    if ARGV[4] ~= '1' then return 0 end
+    redis.call('SADD', KEYS[2], ARGV[2])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return 1
+""")
+
+# KEYS: players, channels, roles
+# ARGV: user_id, channel_name ('' = none)
+LEAVE_LOBBY = _lua("""
+redis.call('HDEL', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+if ARGV[2] ~= '' then redis.call('SREM', KEYS[2], ARGV[2]) end
+return redis.call('SCARD', KEYS[2])
+""")
+
+# KEYS: rematch
+# ARGV: payload, ttl
+REMATCH_OFFER = _lua("""
+local existing = redis.call('GET', KEYS[1])
+if existing then return existing end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return false
+""")
+
+
+_script = ScriptRegistry(
+    {
+        "join_lobby": JOIN_LOBBY,
+        "assign_role": ASSIGN_ROLE,
+        "validate_session": VALIDATE_SESSION,
+        "leave_lobby": LEAVE_LOBBY,
+        "rematch_offer": REMATCH_OFFER,
+    },
+    preload=True,
+)
+
+
+class LobbyScripts:
+    """Lobby scripts registered on one Redis client (call with keys/args)."""
+
+    def __init__(self, redis) -> None:
+        self.join_lobby = _script(redis, "join_lobby")
+        self.assign_role = _script(redis, "assign_role")
+        self.validate_session = _script(redis, "validate_session")
+        self.leave_lobby = _script(redis, "leave_lobby")
+        self.rematch_offer = _script(redis, "rematch_offer")
+        self._redis = redis
+
+    def load(self) -> None:
+        """SCRIPT LOAD every script in one round trip, so calls start on EVALSHA."""
+        _script.load(self._redis)
+
+
+def get_lobby_scripts(redis) -> LobbyScripts:
+    """
+    The client's ``LobbyScripts``, loaded into Redis on first use.
+
+    A failed load is only logged: EVALSHA falls back to loading the script
+    when Redis reports NOSCRIPT (also after a Redis restart).
+    """
+    return LobbyScripts(redis)
@@ -33,15 +33,9 @@ class RedisChatLobbyManager:
 
     def __init__(self):
         """
-        Initialize the Redis connection using the Django Redis configuration.
+        Use the shared per-process Redis client (pooled, lazily health-checked).
         """
         self.redis = get_redis_client()
-        
-        try:
-            self.redis.ping()
-            logger.debug("Redis connection established successfully.")
-        except Exception as e:
-            logger.warning(f"Redis connection test failed: {e}")
 
     def _players_key(self, lobby_id: str) -> str:
         """
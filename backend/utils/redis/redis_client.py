@@ -1,13 +1,44 @@
 # Filename: utils/redis/redis_client.py
 
-from redis import Redis
+"""
+Process-wide Redis clients.
+
+Why:
+- Building a ``Redis(...)`` per lobby manager gave every consumer connect its
+  own connection pool, i.e. a fresh TCP (and TLS on rediss://) handshake,
+  plus a blocking PING.
+
+How:
+- One bounded ``BlockingConnectionPool`` per process, shared by every
+  ``get_redis_client()`` caller. When all connections are busy, callers wait
+  up to ``REDIS_POOL_TIMEOUT`` seconds instead of opening more.
+- ``get_async_redis_client()`` is the ``redis.asyncio`` twin for async
+  consumers, with one pool per event loop (asyncio connections cannot be
+  shared across loops).
+- Health checks are lazy: a connection that sat idle longer than
+  ``REDIS_HEALTH_CHECK_INTERVAL`` seconds is PINGed when next checked out,
+  instead of every caller pinging up front.
+- ``redis_pool_stats()`` reports pool usage for logs and metrics.
+"""
+
+# Step 1: Imports
+import asyncio
+import threading
+import weakref
 from urllib.parse import urlparse
-import os
 
+import redis.asyncio as redis_async
+from django.conf import settings
+from redis import BlockingConnectionPool, Redis, SSLConnection
 
-def get_redis_client() -> Redis:
+_lock = threading.Lock()
+_client = None
+_async_clients = weakref.WeakKeyDictionary()   # event loop -> redis.asyncio.Redis
+
+
+def _connection_kwargs(is_async=False) -> dict:
     """
-    Returns a configured Redis client for both local and production environments.
+    Connection settings from ``REDIS_URL``.
 
     Why:
     - Local: redis:// (no SSL)
@@ -18,7 +49,7 @@ def get_redis_client() -> Redis:
       preventing subtle bugs when comparing user IDs / roles.
     """
     # Step 1: Read REDIS_URL (default to local dev)
-    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+    redis_url = settings.REDIS_URL
     parsed = urlparse(redis_url)
 
     # Step 2: Shared connection args
@@ -28,6 +59,7 @@ def get_redis_client() -> Redis:
         "db": 0,
         "decode_responses": True,
         "encoding": "utf-8",
+        "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL,
     }
 
     # Step 3: Optional password
@@ -37,10 +69,95 @@ def get_redis_client() -> Redis:
     # Step 4: SSL support for rediss://
     if parsed.scheme == "rediss":
         kwargs.update({
-            "ssl": True,
+            "connection_class": redis_async.SSLConnection if is_async else SSLConnection,
             # Common workaround on free tiers (cert chain issues)
             "ssl_cert_reqs": None,
         })
+    return kwargs
+
+
+def _pool_limits() -> dict:
+    return {
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        "timeout": settings.REDIS_POOL_TIMEOUT,
+    }
+
+
+def get_redis_client() -> Redis:
+    """
+    Returns the process-wide Redis client (bounded, shared connection pool).
+
+    Cheap to call; there is no need to cache the result or ping it.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                pool = BlockingConnectionPool(**_pool_limits(), **_connection_kwargs())
+                _client = Redis(connection_pool=pool)
+    return _client
+
+
+def get_async_redis_client() -> redis_async.Redis:
+    """
+    Returns the ``redis.asyncio`` client for the running event loop.
+
+    Must be called from a coroutine; each loop gets its own bounded pool.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        with _lock:
+            client = _async_clients.get(loop)
+            if client is None:
+                pool = redis_async.BlockingConnectionPool(
+                    **_pool_limits(), **_connection_kwargs(is_async=True)
+                )
+                client = redis_async.Redis(connection_pool=pool)
+                _async_clients[loop] = client
+    return client
+
+
+def _pool_stats(pool) -> dict:
+    queue = getattr(pool.pool, "queue", None)
+    if queue is None:
+        queue = pool.pool._queue  # asyncio.LifoQueue
+    created = len(pool._connections)
+    idle = sum(1 for connection in queue if connection is not None)
+    return {
+        "max_connections": pool.max_connections,
+        "created": created,
+        "in_use": created - idle,
+        "idle": idle,
+    }
+
+
+def redis_pool_stats() -> dict:
+    """
+    Connection counts for this process.
+
+    Returns:
+        dict: ``{"sync": {...}, "async": {...}}``, each with
+        ``max_connections``, ``created``, ``in_use``, ``idle`` and ``pools``
+        (async pools are summed over event loops).
+    """
+    sync = {"max_connections": 0, "created": 0, "in_use": 0, "idle": 0, "pools": 0}
+    if _client is not None:
+        sync.update(_pool_stats(_client.connection_pool), pools=1)
+
+    merged = {"max_connections": 0, "created": 0, "in_use": 0, "idle": 0, "pools": 0}
+    for client in list(_async_clients.values()):
+        for name, value in _pool_stats(client.connection_pool).items():
+            merged[name] += value
+        merged["pools"] += 1
+    return {"sync": sync, "async": merged}
+
 
-    # Step 5: Return a reusable client
-    return Redis(**kwargs)
+def reset_redis_clients() -> None:
+    """Drop the shared clients and their connections (tests, settings changes)."""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.connection_pool.disconnect()
+        _client = None
+        _async_clients.clear()
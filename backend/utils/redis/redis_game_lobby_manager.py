@@ -10,7 +10,8 @@ from asgiref.sync import async_to_sync
 from channels.layers import BaseChannelLayer
 
 from users.models import CustomUser
-from utils.redis.redis_client import get_redis_client
+from utils.redis.lobby_scripts import get_lobby_scripts
+from utils.redis.redis_client import get_async_redis_client, get_redis_client
 from utils.websockets.ws_groups import lobby_group
 
 logger = logging.getLogger(__name__)
@@ -28,6 +29,12 @@ class RedisGameLobbyManager:
     - Tracks sessionKey allow-list (invite -> session continuity).
     - Tracks rematch offer status and supports cleanup.
 
+    Hot paths (join/leave, role assignment, session validation, rematch
+    offers) run as Lua scripts: one atomic round trip each.
+
+    Async consumers use the ``a``-prefixed twins (``ajoin_lobby``, ...), which
+    run the same commands on the event loop's ``redis.asyncio`` client.
+
     Redis Key Structure:
         - lobby:game:{game_id}:players     (Hash) user_id -> {"id", "first_name"}
         - lobby:game:{game_id}:channels    (Set)  channel_name
@@ -43,15 +50,19 @@ class RedisGameLobbyManager:
     SESSION_TTL_SECONDS = 1200       # 20 minutes
 
     def __init__(self) -> None:
-        # Step 1: Create Redis client (decode_responses=True is expected)
+        # Shared per-process client (decode_responses=True); pooled
+        # connections are health-checked lazily, so no ping here.
         self.redis = get_redis_client()
+        self.scripts = get_lobby_scripts(self.redis)
 
-        # Step 2: Optional health check
-        try:
-            self.redis.ping()
-            logger.debug("Redis connection established successfully.")
-        except Exception as exc:
-            logger.warning("Redis connection test failed: %s", exc)
+    @property
+    def aredis(self):
+        """The running event loop's ``redis.asyncio`` client (async twins only)."""
+        return get_async_redis_client()
+
+    @property
+    def ascripts(self):
+        return get_lobby_scripts(self.aredis)
 
     # ----------------------------
     # Key builders
@@ -74,12 +85,27 @@ class RedisGameLobbyManager:
     def _session_users_key(self, lobby_id: str) -> str:
         return f"lobby:session:{lobby_id}:users"
 
-    def _touch_lobby_ttl(self, game_id: str) -> None:
-        """Refresh TTL for lobby keys to prevent stale presence."""
-        # Step 1: Expire each lobby-related key
-        self.redis.expire(self._players_key(game_id), self.LOBBY_TTL_SECONDS)
-        self.redis.expire(self._channels_key(game_id), self.LOBBY_TTL_SECONDS)
-        self.redis.expire(self._roles_key(game_id), self.LOBBY_TTL_SECONDS)
+    def _lobby_keys(self, game_id: str) -> list[str]:
+        """KEYS for the lobby scripts: players, channels, roles."""
+        return [self._players_key(game_id), self._channels_key(game_id), self._roles_key(game_id)]
+
+    @staticmethod
+    def _parse_rematch_offer(raw: str | None) -> dict[str, Any] | None:
+        """Stored offer -> dict (legacy "X"/"O" strings are wrapped)."""
+        if not raw:
+            return None
+
+        try:
+            parsed = json.loads(raw)
+            if isinstance(parsed, dict):
+                return parsed
+        except Exception:
+            pass
+
+        if raw in ("X", "O"):
+            return {"rematchRequestedBy": raw}
+
+        return None
 
     # ----------------------------
     # Session Key (Invite -> Session)
@@ -115,46 +141,68 @@ class RedisGameLobbyManager:
         # Step 2: Refresh TTL
         self.redis.expire(self._session_users_key(lobby_id), self.SESSION_TTL_SECONDS)
 
-    def validate_session_key(self, lobby_id: str, session_key: str, user_id: int) -> bool:
+    def validate_session_key(self, lobby_id: str, session_key: str, user_id: int, admit: bool = False) -> bool:
         """
         Validates that:
         - session_key matches stored key for lobby_id
-        - user_id is in allow-list
+        - user_id is in allow-list (or is added to it when ``admit``)
+
+        A valid check also refreshes the session TTL. One atomic round trip.
 
         Returns:
             True if valid, else False.
         """
-        # Step 1: Validate session key
-        stored = self.redis.get(self._session_key_key(lobby_id))
-        if not stored or str(stored) != str(session_key):
-            return False
-
-        # Step 2: Validate allow-list membership
-        is_allowed = self.redis.sismember(self._session_users_key(lobby_id), str(user_id))
-        return bool(is_allowed)
+        valid = self.scripts.validate_session(
+            keys=[self._session_key_key(lobby_id), self._session_users_key(lobby_id)],
+            args=[str(session_key), str(user_id), self.SESSION_TTL_SECONDS, "1" if admit else "0"],
+        )
+        return bool(int(valid))
 
     # ----------------------------
-    # Players
+    # Join / leave (scripted)
     # ----------------------------
-    def add_player(self, game_id: str, user: CustomUser) -> None:
-        """Adds or updates a player in Redis."""
-        # Step 1: Build player object
-        player = {"id": user.id, "first_name": user.first_name}
-
-        # Step 2: Store under players hash
-        self.redis.hset(self._players_key(game_id), str(user.id), json.dumps(player))
+    def join_lobby(
+        self,
+        game_id: str,
+        user: CustomUser,
+        channel_name: str | None = None,
+        assign_role: bool = True,
+    ) -> str:
+        """
+        Adds the player (and socket channel), keeps or assigns their seat
+        role, and refreshes the lobby TTL, atomically in one round trip.
 
-        # Step 3: Refresh TTL for lobby keys
-        self._touch_lobby_ttl(game_id)
+        Returns:
+            "X", "O" or "Spectator" ("Spectator" without a stored role when
+            ``assign_role`` is False).
+        """
+        player = {"id": user.id, "first_name": user.first_name}
+        return self.scripts.join_lobby(
+            keys=self._lobby_keys(game_id),
+            args=[
+                str(user.id),
+                json.dumps(player),
+                channel_name or "",
+                self.LOBBY_TTL_SECONDS,
+                "1" if assign_role else "0",
+            ],
+        )
 
-    def remove_player(self, game_id: str, user: CustomUser) -> None:
-        """Removes a player from Redis (and removes any role assignment)."""
-        # Step 1: Remove from players hash
-        self.redis.hdel(self._players_key(game_id), str(user.id))
+    def leave_lobby(self, game_id: str, user: CustomUser, channel_name: str | None = None) -> int:
+        """
+        Removes the player, their role and the socket channel in one round trip.
 
-        # Step 2: Remove role assignment (if any)
-        self.redis.hdel(self._roles_key(game_id), str(user.id))
+        Returns:
+            Number of socket channels still in the lobby.
+        """
+        return int(self.scripts.leave_lobby(
+            keys=self._lobby_keys(game_id),
+            args=[str(user.id), channel_name or ""],
+        ))
 
+    # ----------------------------
+    # Players
+    # ----------------------------
     def get_players(self, game_id: str) -> list[dict]:
         """Returns list of players stored in Redis for this game."""
         raw_vals = self.redis.hvals(self._players_key(game_id))
@@ -167,14 +215,6 @@ class RedisGameLobbyManager:
     # ----------------------------
     # Channels
     # ----------------------------
-    def add_channel(self, game_id: str, channel_name: str) -> None:
-        """Adds a socket channel to Redis."""
-        # Step 1: Add to channels set
-        self.redis.sadd(self._channels_key(game_id), channel_name)
-
-        # Step 2: Refresh TTL
-        self._touch_lobby_ttl(game_id)
-
     def remove_channel(self, game_id: str, channel_name: str) -> None:
         """Removes a socket channel from Redis."""
         self.redis.srem(self._channels_key(game_id), channel_name)
@@ -191,78 +231,12 @@ class RedisGameLobbyManager:
         Assigns a role ("X" or "O") to the player if available.
         Returns "Spectator" if both roles are taken.
 
-        Uses WATCH to prevent two clients being assigned the same role concurrently.
-        """
-        roles_key = self._roles_key(game_id)
-        user_id = str(user.id)
-
-        # Step 1: Attempt to assign role with optimistic locking
-        pipe = self.redis.pipeline()
-
-        while True:
-            try:
-                pipe.watch(roles_key)
-
-                # Step 2: Read existing roles
-                roles: dict[str, str] = self.redis.hgetall(roles_key) or {}
-
-                # Step 3: If user already has a role, return it
-                if user_id in roles:
-                    pipe.unwatch()
-                    self._touch_lobby_ttl(game_id)
-                    return roles[user_id]
-
-                # Step 4: Determine which roles are taken
-                taken = set(roles.values())
-
-                # Step 5: Choose role
-                assigned = "Spectator"
-                if "X" not in taken:
-                    assigned = "X"
-                elif "O" not in taken:
-                    assigned = "O"
-
-                # Step 6: Write transactionally
-                pipe.multi()
-                if assigned in ("X", "O"):
-                    pipe.hset(roles_key, user_id, assigned)
-                pipe.execute()
-
-                self._touch_lobby_ttl(game_id)
-                return assigned
-
-            except Exception as exc:
-                # Step 7: Retry on conflicts
-                try:
-                    pipe.reset()
-                except Exception:
-                    pass
-
-                logger.debug("Role assignment retry due to Redis conflict/exception: %s", exc)
-                continue
-
-    def set_player_role(self, game_id: str, user_id: int, role: str) -> None:
+        Runs as one Lua script, so two clients can never be given the same role.
         """
-        Explicitly sets a player's lobby role.
-
-        This exists to support your consumer calling:
-            self.game_lobby_manager.set_player_role(...)
-
-        Rules:
-        - Store only X/O in Redis (Spectator is implied if missing).
-        - If role == "Spectator", remove any stored role.
-        """
-        # Step 1: Normalize
-        role = str(role)
-
-        # Step 2: Write role or delete if Spectator
-        if role in ("X", "O"):
-            self.redis.hset(self._roles_key(game_id), str(user_id), role)
-        else:
-            self.redis.hdel(self._roles_key(game_id), str(user_id))
-
-        # Step 3: Refresh TTL
-        self._touch_lobby_ttl(game_id)
+        return self.scripts.assign_role(
+            keys=self._lobby_keys(game_id),
+            args=[str(user.id), self.LOBBY_TTL_SECONDS],
+        )
 
     def get_players_with_roles(self, game_id: str) -> list[dict]:
         """Returns player objects with their roles merged in."""
@@ -296,83 +270,160 @@ class RedisGameLobbyManager:
         self.redis.set(self._rematch_key(game_id), payload, ex=self.REMATCH_TTL_SECONDS)
         logger.info("Stored rematch offer for game_id=%s: %s", game_id, payload)
 
+    def offer_rematch(self, game_id: str, offer: dict[str, Any]) -> dict[str, Any] | None:
+        """
+        Stores ``offer`` unless one is already pending, in one atomic round trip.
+
+        Returns:
+            The pending offer if there was one (nothing stored), else None.
+        """
+        existing = self.scripts.rematch_offer(
+            keys=[self._rematch_key(game_id)],
+            args=[json.dumps(offer), self.REMATCH_TTL_SECONDS],
+        )
+        if existing is None:
+            logger.info("Stored rematch offer for game_id=%s", game_id)
+            return None
+        return self._parse_rematch_offer(existing) or {}
+
     def pop_rematch_offer(self, game_id: str) -> dict[str, Any] | None:
         """
-        Atomically reads and deletes the rematch offer.
+        Atomically reads and deletes the rematch offer (GETDEL).
 
         Returns:
             - dict offer if JSON dict
             - {"rematchRequestedBy": "X"/"O"} if legacy
             - None if missing/invalid
         """
-        key = self._rematch_key(game_id)
-
-        # Step 1: Use GETDEL if available
-        getdel = getattr(self.redis, "getdel", None)
-        if callable(getdel):
-            raw = getdel(key)
-            if not raw:
-                return None
-
-            # Step 2: Parse JSON dict
-            try:
-                parsed = json.loads(raw)
-                if isinstance(parsed, dict):
-                    return parsed
-            except Exception:
-                pass
-
-            # Step 3: Legacy fallback
-            if raw in ("X", "O"):
-                return {"rematchRequestedBy": raw}
+        return self._parse_rematch_offer(self.redis.getdel(self._rematch_key(game_id)))
 
-            return None
+    def get_rematch_offer(self, game_id: str) -> dict[str, Any] | None:
+        """Gets the current rematch offer if present."""
+        return self._parse_rematch_offer(self.redis.get(self._rematch_key(game_id)))
 
-        # Step 4: Fallback pipeline GET + DEL
-        pipe = self.redis.pipeline()
-        try:
-            pipe.get(key)
-            pipe.delete(key)
-            raw, _ = pipe.execute()
-        except Exception:
-            return None
+    def clear_rematch_offer(self, game_id: str) -> None:
+        """Deletes the rematch offer key."""
+        self.redis.delete(self._rematch_key(game_id))
 
-        if not raw:
-            return None
+    # ----------------------------
+    # Async twins (async consumers)
+    # ----------------------------
+    async def aensure_session_key(self, lobby_id: str) -> str:
+        """Async ``ensure_session_key``."""
+        # Step 1: Reuse an existing key (refreshing both TTLs)
+        existing = await self.aredis.get(self._session_key_key(lobby_id))
+        if existing:
+            pipe = self.aredis.pipeline(transaction=False)
+            pipe.expire(self._session_key_key(lobby_id), self.SESSION_TTL_SECONDS)
+            pipe.expire(self._session_users_key(lobby_id), self.SESSION_TTL_SECONDS)
+            await pipe.execute()
+            return str(existing)
 
-        try:
-            parsed = json.loads(raw)
-            if isinstance(parsed, dict):
-                return parsed
-        except Exception:
-            pass
+        # Step 2: Create and store a new one with TTL
+        session_key = secrets.token_urlsafe(24)
+        pipe = self.aredis.pipeline(transaction=False)
+        pipe.set(self._session_key_key(lobby_id), session_key, ex=self.SESSION_TTL_SECONDS)
+        pipe.expire(self._session_users_key(lobby_id), self.SESSION_TTL_SECONDS)
+        await pipe.execute()
 
-        if raw in ("X", "O"):
-            return {"rematchRequestedBy": raw}
+        logger.info("[SESSION] Created sessionKey for lobby_id=%s", lobby_id)
+        return session_key
 
-        return None
+    async def aadd_user_to_session(self, lobby_id: str, user_id: int) -> None:
+        """Async ``add_user_to_session``."""
+        pipe = self.aredis.pipeline(transaction=False)
+        pipe.sadd(self._session_users_key(lobby_id), str(user_id))
+        pipe.expire(self._session_users_key(lobby_id), self.SESSION_TTL_SECONDS)
+        await pipe.execute()
+
+    async def avalidate_session_key(
+        self, lobby_id: str, session_key: str, user_id: int, admit: bool = False
+    ) -> bool:
+        """Async ``validate_session_key``."""
+        valid = await self.ascripts.validate_session(
+            keys=[self._session_key_key(lobby_id), self._session_users_key(lobby_id)],
+            args=[str(session_key), str(user_id), self.SESSION_TTL_SECONDS, "1" if admit else "0"],
+        )
+        return bool(int(valid))
+
+    async def ajoin_lobby(
+        self,
+        game_id: str,
+        user: CustomUser,
+        channel_name: str | None = None,
+        assign_role: bool = True,
+    ) -> str:
+        """Async ``join_lobby``."""
+        player = {"id": user.id, "first_name": user.first_name}
+        return await self.ascripts.join_lobby(
+            keys=self._lobby_keys(game_id),
+            args=[
+                str(user.id),
+                json.dumps(player),
+                channel_name or "",
+                self.LOBBY_TTL_SECONDS,
+                "1" if assign_role else "0",
+            ],
+        )
 
-    def get_rematch_offer(self, game_id: str) -> dict[str, Any] | None:
-        """Gets the current rematch offer if present."""
-        raw = self.redis.get(self._rematch_key(game_id))
-        if not raw:
-            return None
+    async def aleave_lobby(self, game_id: str, user: CustomUser, channel_name: str | None = None) -> int:
+        """Async ``leave_lobby``."""
+        return int(await self.ascripts.leave_lobby(
+            keys=self._lobby_keys(game_id),
+            args=[str(user.id), channel_name or ""],
+        ))
+
+    async def aremove_channel(self, game_id: str, channel_name: str) -> None:
+        """Async ``remove_channel``."""
+        await self.aredis.srem(self._channels_key(game_id), channel_name)
+
+    async def aget_players_with_roles(self, game_id: str) -> list[dict]:
+        """Async ``get_players_with_roles`` (players and roles in one round trip)."""
+        pipe = self.aredis.pipeline(transaction=False)
+        pipe.hvals(self._players_key(game_id))
+        pipe.hgetall(self._roles_key(game_id))
+        raw_players, roles = await pipe.execute()
+
+        players = [json.loads(v) for v in raw_players or []]
+        roles = roles or {}
+        return [{**p, "role": roles.get(str(p["id"]), "Spectator")} for p in players]
 
-        try:
-            parsed = json.loads(raw)
-            if isinstance(parsed, dict):
-                return parsed
-        except Exception:
-            pass
+    async def abroadcast_player_list(self, channel_layer: BaseChannelLayer, game_id: str) -> None:
+        """Async ``broadcast_player_list``."""
+        players_with_roles = await self.aget_players_with_roles(game_id)
+        await channel_layer.group_send(
+            lobby_group(str(game_id)),
+            {"type": "update_player_list", "players": players_with_roles},
+        )
 
-        if raw in ("X", "O"):
-            return {"rematchRequestedBy": raw}
+    async def astore_rematch_offer(self, game_id: str, offer: dict[str, Any] | str) -> None:
+        """Async ``store_rematch_offer``."""
+        payload = json.dumps(offer) if isinstance(offer, dict) else str(offer)
+        await self.aredis.set(self._rematch_key(game_id), payload, ex=self.REMATCH_TTL_SECONDS)
+        logger.info("Stored rematch offer for game_id=%s: %s", game_id, payload)
 
-        return None
+    async def aoffer_rematch(self, game_id: str, offer: dict[str, Any]) -> dict[str, Any] | None:
+        """Async ``offer_rematch``."""
+        existing = await self.ascripts.rematch_offer(
+            keys=[self._rematch_key(game_id)],
+            args=[json.dumps(offer), self.REMATCH_TTL_SECONDS],
+        )
+        if existing is None:
+            logger.info("Stored rematch offer for game_id=%s", game_id)
+            return None
+        return self._parse_rematch_offer(existing) or {}
 
-    def clear_rematch_offer(self, game_id: str) -> None:
-        """Deletes the rematch offer key."""
-        self.redis.delete(self._rematch_key(game_id))
+    async def apop_rematch_offer(self, game_id: str) -> dict[str, Any] | None:
+        """Async ``pop_rematch_offer`` (GETDEL)."""
+        return self._parse_rematch_offer(await self.aredis.getdel(self._rematch_key(game_id)))
+
+    async def aget_rematch_offer(self, game_id: str) -> dict[str, Any] | None:
+        """Async ``get_rematch_offer``."""
+        return self._parse_rematch_offer(await self.aredis.get(self._rematch_key(game_id)))
+
+    async def aclear_rematch_offer(self, game_id: str) -> None:
+        """Async ``clear_rematch_offer``."""
+        await self.aredis.delete(self._rematch_key(game_id))
 
     # ----------------------------
     # Cleanup
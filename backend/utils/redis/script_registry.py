@@ -0,0 +1,65 @@
+# Filename: utils/redis/script_registry.py
+
+"""
+Lua scripts registered once per Redis client.
+
+Why:
+- Several services (hot game state, the event log, presence, unread
+  counters) each kept their own client -> {name: Script} cache and lock.
+
+How:
+- A module declares its scripts once, ``_script = ScriptRegistry({...})``,
+  and calls ``_script(redis, name)``. Each client (sync or ``redis.asyncio``)
+  gets its own registered ``Script`` objects, created on first use and held
+  only as long as the client lives. Scripts run by SHA (EVALSHA); redis-py
+  loads one whenever a server reports NOSCRIPT.
+- ``preload=True`` also SCRIPT LOADs every script in one round trip when a
+  sync client first uses the registry, so its calls start on EVALSHA.
+  ``redis.asyncio`` clients are never preloaded (that would block the event
+  loop); they rely on the NOSCRIPT fallback.
+"""
+
+# Step 1: Imports
+import logging
+import threading
+import weakref
+
+import redis.asyncio as redis_async
+
+logger = logging.getLogger(__name__)
+
+
+class ScriptRegistry:
+    """Named Lua sources, registered lazily on each Redis client they are run on."""
+
+    def __init__(self, sources: dict, preload: bool = False) -> None:
+        self._sources = dict(sources)
+        self._preload = preload
+        self._registered = weakref.WeakKeyDictionary()   # Redis client -> {name: Script}
+        self._lock = threading.Lock()
+
+    def __call__(self, redis, name: str):
+        registered = self._registered.get(redis)
+        if registered is None:
+            with self._lock:
+                registered = self._registered.get(redis)
+                if registered is None:
+                    registered = {
+                        script_name: redis.register_script(source)
+                        for script_name, source in self._sources.items()
+                    }
+                    if self._preload and not isinstance(redis, redis_async.Redis):
+                        try:
+                            self.load(redis)
+                        except Exception as exc:
+                            # EVALSHA still loads each script on NOSCRIPT
+                            logger.warning("[REDIS] could not preload scripts %s: %s", sorted(self._sources), exc)
+                    self._registered[redis] = registered
+        return registered[name]
+
+    def load(self, redis) -> None:
+        """SCRIPT LOAD every script on a sync client in one round trip."""
+        pipe = redis.pipeline(transaction=False)
+        for source in self._sources.values():
+            pipe.script_load(source)
+        pipe.execute()
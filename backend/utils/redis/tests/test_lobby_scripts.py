@@ -0,0 +1,170 @@
+# Filename: backend/utils/redis/tests/test_lobby_scripts.py
+
+# Step 1: Imports
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from utils.redis import lobby_scripts
+from utils.redis.lobby_scripts import get_lobby_scripts
+from utils.redis.redis_game_lobby_manager import RedisGameLobbyManager
+
+
+# Step 2: Test helpers
+def _fake_user(user_id: int, first_name: str):
+    return SimpleNamespace(id=user_id, first_name=first_name)
+
+
+@pytest.fixture
+def manager():
+    server = fakeredis.FakeServer()
+    with patch(
+        "utils.redis.redis_game_lobby_manager.get_redis_client",
+        return_value=fakeredis.FakeRedis(server=server, decode_responses=True),
+    ), patch(
+        "utils.redis.redis_game_lobby_manager.get_async_redis_client",
+        side_effect=lambda: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True),
+    ):
+        yield RedisGameLobbyManager()
+
+
+@pytest.fixture
+def round_trips(manager):
+    """Counts commands sent by the manager's client (each is one round trip)."""
+    calls = []
+    execute = manager.redis.execute_command
+
+    def _counting(*args, **kwargs):
+        calls.append(args[0])
+        return execute(*args, **kwargs)
+
+    manager.redis.execute_command = _counting
+    return calls
+
+
+# Step 3: Join / leave
+def test_join_assigns_x_then_o_then_spectator_and_keeps_roles(manager):
+    roles = [manager.join_lobby("g1", _fake_user(uid, f"U{uid}"), f"chan-{uid}") for uid in (1, 2, 3)]
+    assert roles == ["X", "O", "Spectator"]
+    assert manager.join_lobby("g1", _fake_user(2, "U2"), "chan-2b") == "O"
+
+    players = {p["id"]: p["role"] for p in manager.get_players_with_roles("g1")}
+    assert players == {1: "X", 2: "O", 3: "Spectator"}
+    for key in manager._lobby_keys("g1"):
+        assert 0 < manager.redis.ttl(key) <= manager.LOBBY_TTL_SECONDS
+
+
+def test_join_without_role_assignment_leaves_seats_free(manager):
+    assert manager.join_lobby("g1", _fake_user(1, "A"), "chan-1", assign_role=False) == "Spectator"
+    assert manager.redis.hlen(manager._roles_key("g1")) == 0
+    assert manager.assign_player_role("g1", _fake_user(1, "A")) == "X"
+
+
+def test_leave_frees_the_seat_and_reports_remaining_channels(manager):
+    manager.join_lobby("g1", _fake_user(1, "A"), "chan-1")
+    manager.join_lobby("g1", _fake_user(2, "B"), "chan-2")
+
+    assert manager.leave_lobby("g1", _fake_user(1, "A"), "chan-1") == 1
+    assert [p["id"] for p in manager.get_players("g1")] == [2]
+    assert manager.join_lobby("g1", _fake_user(3, "C"), "chan-3") == "X"
+
+
+def test_concurrent_joins_never_share_a_role(manager):
+    users = [_fake_user(uid, f"U{uid}") for uid in range(1, 21)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        roles = list(pool.map(lambda user: manager.join_lobby("g1", user, f"chan-{user.id}"), users))
+
+    assert sorted(role for role in roles if role != "Spectator") == ["O", "X"]
+
+
+# Step 4: Session validation
+def test_validate_session_key(manager):
+    session_key = manager.ensure_session_key("lobby1")
+    manager.add_user_to_session("lobby1", 7)
+
+    assert manager.validate_session_key("lobby1", session_key, 7) is True
+    assert manager.validate_session_key("lobby1", "wrong", 7) is False
+    assert manager.validate_session_key("lobby1", session_key, 8) is False
+    assert manager.validate_session_key("lobby1", session_key, 8, admit=True) is True
+    assert manager.validate_session_key("lobby1", session_key, 8) is True
+    assert manager.validate_session_key("missing", session_key, 7, admit=True) is False
+
+
+# Step 5: Rematch offers
+def test_offer_rematch_stores_once(manager):
+    first = {"rematchRequestedBy": "X", "requesterUserId": 1}
+    assert manager.offer_rematch("g1", first) is None
+    assert manager.offer_rematch("g1", {"rematchRequestedBy": "O"}) == first
+    assert manager.get_rematch_offer("g1") == first
+    assert 0 < manager.redis.ttl(manager._rematch_key("g1")) <= manager.REMATCH_TTL_SECONDS
+
+
+def test_pop_rematch_offer_parses_and_deletes(manager):
+    manager.offer_rematch("g1", {"rematchRequestedBy": "X"})
+    assert manager.pop_rematch_offer("g1") == {"rematchRequestedBy": "X"}
+    assert manager.pop_rematch_offer("g1") is None
+
+    manager.store_rematch_offer("g1", "O")
+    assert manager.pop_rematch_offer("g1") == {"rematchRequestedBy": "O"}
+
+
+# Step 6: One round trip per operation
+def test_each_scripted_operation_is_one_round_trip(manager, round_trips):
+    user = _fake_user(1, "A")
+    session_key = manager.ensure_session_key("lobby1")
+    round_trips.clear()
+
+    manager.join_lobby("g1", user, "chan-1")
+    manager.assign_player_role("g1", user)
+    manager.validate_session_key("lobby1", session_key, 1, admit=True)
+    manager.leave_lobby("g1", user, "chan-1")
+    manager.offer_rematch("g1", {"rematchRequestedBy": "X"})
+
+    assert round_trips == ["EVALSHA"] * 5
+
+
+def test_scripts_are_registered_and_preloaded_once_per_client():
+    loads = []
+    with patch.object(lobby_scripts._script, "load", side_effect=loads.append):
+        client = fakeredis.FakeRedis(decode_responses=True)
+        first, second = get_lobby_scripts(client), get_lobby_scripts(client)
+        aclient = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        get_lobby_scripts(aclient)
+
+    assert first.join_lobby is second.join_lobby
+    assert loads == [client]     # async clients are never preloaded
+
+
+# Step 7: Async twins share state with the sync methods
+def test_async_twins_match_the_sync_methods(manager):
+    async def _flow():
+        roles = [await manager.ajoin_lobby("g1", _fake_user(uid, f"U{uid}"), f"chan-{uid}") for uid in (1, 2, 3)]
+        session_key = await manager.aensure_session_key("lobby1")
+        await manager.aadd_user_to_session("lobby1", 7)
+        valid = (
+            await manager.avalidate_session_key("lobby1", session_key, 7),
+            await manager.avalidate_session_key("lobby1", session_key, 8),
+        )
+        left = await manager.aleave_lobby("g1", _fake_user(3, "U3"), "chan-3")
+        offers = (
+            await manager.aoffer_rematch("g1", {"rematchRequestedBy": "X"}),
+            await manager.aoffer_rematch("g1", {"rematchRequestedBy": "O"}),
+        )
+        popped = await manager.apop_rematch_offer("g1")
+        return roles, session_key, valid, left, offers, popped, await manager.aget_players_with_roles("g1")
+
+    roles, session_key, valid, left, offers, popped, players = asyncio.run(_flow())
+
+    assert roles == ["X", "O", "Spectator"]
+    assert manager.validate_session_key("lobby1", session_key, 7) is True
+    assert valid == (True, False)
+    assert left == 2
+    assert offers == (None, {"rematchRequestedBy": "X"})
+    assert popped == {"rematchRequestedBy": "X"} and manager.get_rematch_offer("g1") is None
+    assert {p["id"]: p["role"] for p in players} == {1: "X", 2: "O"}
+    assert {p["id"]: p["role"] for p in manager.get_players_with_roles("g1")} == {1: "X", 2: "O"}
@@ -32,8 +32,8 @@ def test_add_and_get_game_players():
         user1 = _fake_user(1, "Alice")
         user2 = _fake_user(2, "Bob")
 
-        manager.add_player(game_id, user1)
-        manager.add_player(game_id, user2)
+        manager.join_lobby(game_id, user1, assign_role=False)
+        manager.join_lobby(game_id, user2, assign_role=False)
 
         players = manager.get_players(game_id)
         assert len(players) == 2
@@ -52,8 +52,8 @@ def test_remove_game_player():
         user1 = _fake_user(1, "Alice")
         user2 = _fake_user(2, "Bob")
 
-        manager.add_player(game_id, user1)
-        manager.add_player(game_id, user2)
+        manager.join_lobby(game_id, user1, assign_role=False)
+        manager.join_lobby(game_id, user2, assign_role=False)
 
         # Assign roles so we can verify role cleanup too
         role1 = manager.assign_player_role(game_id, user1)
@@ -62,7 +62,7 @@ def test_remove_game_player():
         assert role2 in {"X", "O"}
         assert role1 != role2
 
-        manager.remove_player(game_id, user1)
+        manager.leave_lobby(game_id, user1)
 
         players = manager.get_players(game_id)
         assert len(players) == 1
@@ -107,8 +107,8 @@ def test_get_players_with_roles():
         user1 = _fake_user(1, "Alice")
         user2 = _fake_user(2, "Bob")
 
-        manager.add_player(game_id, user1)
-        manager.add_player(game_id, user2)
+        manager.join_lobby(game_id, user1, assign_role=False)
+        manager.join_lobby(game_id, user2, assign_role=False)
 
         role1 = manager.assign_player_role(game_id, user1)
         role2 = manager.assign_player_role(game_id, user2)
@@ -163,9 +163,7 @@ def test_clear_game_lobby_state():
         manager = RedisGameLobbyManager()
 
         user1 = _fake_user(1, "Alice")
-        manager.add_player(game_id, user1)
-        manager.add_channel(game_id, "chan_1")
-        manager.assign_player_role(game_id, user1)
+        manager.join_lobby(game_id, user1, "chan_1")
         manager.store_rematch_offer(game_id, {"rematchRequestedBy": "X"})
 
         manager.clear_game_lobby_state(game_id)
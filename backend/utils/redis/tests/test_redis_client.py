@@ -0,0 +1,86 @@
+# Filename: backend/utils/redis/tests/test_redis_client.py
+
+# Step 1: Imports
+import asyncio
+import threading
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from django.test import override_settings
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from utils.redis import redis_client
+from utils.redis.redis_chat_lobby_manager import RedisChatLobbyManager
+from utils.redis.redis_game_lobby_manager import RedisGameLobbyManager
+
+
+# Step 2: Fixtures
+@pytest.fixture
+def fake_pool(monkeypatch):
+    """Shared clients backed by an in-memory server instead of REDIS_URL."""
+    server = fakeredis.FakeServer()
+
+    def _kwargs(is_async=False):
+        connection_class = fakeredis.aioredis.FakeConnection if is_async else fakeredis.FakeConnection
+        return {"connection_class": connection_class, "server": server, "decode_responses": True}
+
+    monkeypatch.setattr(redis_client, "_connection_kwargs", _kwargs)
+    redis_client.reset_redis_clients()
+    with override_settings(REDIS_MAX_CONNECTIONS=3, REDIS_POOL_TIMEOUT=0.2):
+        yield server
+    redis_client.reset_redis_clients()
+
+
+# Step 3: Sync client
+def test_client_and_pool_are_shared(fake_pool):
+    first = redis_client.get_redis_client()
+    assert redis_client.get_redis_client() is first
+    assert RedisGameLobbyManager().redis is first
+    assert RedisChatLobbyManager().redis is first
+
+
+def test_managers_do_not_open_connections_when_built(fake_pool):
+    for _ in range(100):
+        RedisGameLobbyManager()
+        RedisChatLobbyManager()
+    # Only the one-time lobby script load touched Redis.
+    assert redis_client.redis_pool_stats()["sync"]["created"] == 1
+
+    client = redis_client.get_redis_client()
+    for index in range(100):
+        client.set(f"k{index}", index)
+    stats = redis_client.redis_pool_stats()["sync"]
+    assert stats["created"] == 1
+    assert stats["in_use"] == 0 and stats["idle"] == 1
+
+
+def test_pool_is_bounded(fake_pool):
+    pool = redis_client.get_redis_client().connection_pool
+    held = [pool.get_connection("GET") for _ in range(3)]
+    assert redis_client.redis_pool_stats()["sync"]["in_use"] == 3
+
+    with pytest.raises(RedisConnectionError):
+        pool.get_connection("GET")
+
+    released = threading.Timer(0.05, pool.release, args=(held.pop(),))
+    released.start()
+    held.append(pool.get_connection("GET"))
+    for connection in held:
+        pool.release(connection)
+    assert redis_client.redis_pool_stats()["sync"]["created"] == 3
+
+
+# Step 4: Async twin
+def test_async_client_is_per_event_loop(fake_pool):
+    async def _use():
+        client = redis_client.get_async_redis_client()
+        assert redis_client.get_async_redis_client() is client
+        await client.set("shared", "yes")
+        return client
+
+    first = asyncio.run(_use())
+    second = asyncio.run(_use())
+    assert first is not second
+    assert redis_client.get_redis_client().get("shared") == "yes"
+    assert redis_client.redis_pool_stats()["async"]["pools"] <= 2
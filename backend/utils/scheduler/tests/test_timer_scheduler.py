@@ -0,0 +1,184 @@
+# Filename: backend/utils/scheduler/tests/test_timer_scheduler.py
+
+# Step 1: Imports
+import statistics
+import threading
+import time
+from collections import Counter
+
+import fakeredis
+import pytest
+
+from utils.scheduler.timer_scheduler import CURRENT_KEY, DUE_KEY, TimerScheduler
+
+
+# Step 2: Test helpers
+class _Recorder:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, key, token):
+        with self.lock:
+            self.calls.append((key, token, time.time()))
+
+    def wait_for(self, count, timeout=10.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self.lock:
+                if len(self.calls) >= count:
+                    return True
+            time.sleep(0.01)
+        return False
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def make_scheduler(server):
+    created = []
+
+    def _make(**kwargs):
+        kwargs.setdefault("poll_interval", 0.05)
+        scheduler = TimerScheduler(redis=fakeredis.FakeRedis(server=server, decode_responses=True), **kwargs)
+        created.append(scheduler)
+        return scheduler
+
+    yield _make
+    for scheduler in created:
+        scheduler.stop()
+
+
+# Step 3: Scheduling
+def test_timers_fire_once_at_their_deadline(make_scheduler):
+    scheduler = make_scheduler()
+    recorder = _Recorder()
+    scheduler.register("turn", recorder)
+
+    now = time.time()
+    for index in range(3):
+        scheduler.schedule("turn", f"game-{index}", "t1", now + 0.05 * (index + 1))
+
+    assert recorder.wait_for(3)
+    time.sleep(0.2)
+    assert sorted(key for key, _, _ in recorder.calls) == ["game-0", "game-1", "game-2"]
+    assert all(fired >= now + 0.05 for _, _, fired in recorder.calls)
+    assert scheduler.redis.zcard(DUE_KEY) == 0
+    assert scheduler.redis.hlen(CURRENT_KEY) == 0
+    assert scheduler.pending() == 0
+
+
+def test_same_token_keeps_deadline_and_new_token_replaces(make_scheduler):
+    scheduler = make_scheduler()
+    recorder = _Recorder()
+    scheduler.register("turn", recorder)
+
+    now = time.time()
+    scheduler.schedule("turn", "game", "t1", now + 0.1)
+    scheduler.schedule("turn", "game", "t1", now + 5)
+    assert recorder.wait_for(1)
+
+    scheduler.schedule("turn", "game", "t2", now + 5)
+    scheduler.schedule("turn", "game", "t3", time.time() + 0.1)
+    assert recorder.wait_for(2)
+    time.sleep(0.2)
+    assert [token for _, token, _ in recorder.calls] == ["t1", "t3"]
+
+
+def test_cancel_drops_the_timer(make_scheduler):
+    scheduler = make_scheduler()
+    recorder = _Recorder()
+    scheduler.register("turn", recorder)
+
+    scheduler.schedule("turn", "game", "t1", time.time() + 0.1)
+    scheduler.cancel("turn", "game")
+    time.sleep(0.3)
+    assert recorder.calls == []
+    assert scheduler.redis.zcard(DUE_KEY) == 0
+
+
+def test_handler_can_ask_to_run_again(make_scheduler):
+    scheduler = make_scheduler()
+    runs = []
+
+    def early_handler(key, token):
+        runs.append(token)
+        if len(runs) == 1:
+            return time.time() + 0.1
+        return None
+
+    scheduler.register("turn", early_handler)
+    scheduler.schedule("turn", "game", "t1", time.time())
+    deadline = time.time() + 5
+    while len(runs) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert runs == ["t1", "t1"]
+
+
+# Step 4: Persistence and multiple workers
+def test_another_worker_fires_timers_left_by_a_dead_one(make_scheduler):
+    dead = make_scheduler()
+    dead.register("turn", _Recorder())
+    dead.schedule("turn", "game", "t1", time.time() + 60)
+    dead.stop()
+    # The deadline passes while no worker that scheduled it is alive.
+    dead.redis.zadd(DUE_KEY, {"turn|game|t1": time.time() - 1})
+
+    survivor = make_scheduler()
+    recorder = _Recorder()
+    survivor.register("turn", recorder)
+    survivor.start()
+
+    assert recorder.wait_for(1)
+    assert recorder.calls[0][:2] == ("game", "t1")
+
+
+def test_timer_scheduled_by_two_workers_fires_once(make_scheduler):
+    recorder = _Recorder()
+    workers = [make_scheduler(), make_scheduler()]
+    fire_at = time.time() + 0.1
+    for worker in workers:
+        worker.register("turn", recorder)
+        worker.schedule("turn", "game", "t1", fire_at)
+
+    assert recorder.wait_for(1)
+    time.sleep(0.3)
+    assert len(recorder.calls) == 1
+
+
+# Step 5: Load
+def test_holds_5000_table_timers_on_one_thread(make_scheduler):
+    scheduler = make_scheduler(poll_interval=0.5)
+    recorder = _Recorder()
+    scheduler.register("turn", recorder)
+    threads_before = threading.active_count()
+
+    count = 5000
+    keys = [f"game-{index}" for index in range(count)]
+    for key in keys:
+        scheduler.schedule("turn", key, "t1", time.time() + 3600)
+
+    # One loop thread plus the handler pool, however many tables are waiting.
+    assert threading.active_count() - threads_before <= 1 + 4 + 1
+    assert scheduler.pending() == count
+    assert scheduler.redis.zcard(DUE_KEY) == count
+
+    # Every table moves to a new turn that expires within the next second.
+    start = time.time() + 0.5
+    deadlines = {key: start + (index % 100) * 0.01 for index, key in enumerate(keys)}
+    for key, fire_at in deadlines.items():
+        scheduler.schedule("turn", key, "t2", fire_at)
+
+    assert recorder.wait_for(count, timeout=60)
+    time.sleep(0.2)
+    fired = Counter(key for key, _, _ in recorder.calls)
+    assert len(fired) == count and set(fired.values()) == {1}
+    assert {token for _, token, _ in recorder.calls} == {"t2"}
+    lateness = [fired_at - deadlines[key] for key, _, fired_at in recorder.calls]
+    assert min(lateness) >= 0
+    # Loose: firing speed here is bound by fakeredis running in-process.
+    assert statistics.median(lateness) < 5.0
+    assert scheduler.redis.zcard(DUE_KEY) == 0
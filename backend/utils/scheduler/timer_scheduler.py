@@ -0,0 +1,382 @@
+# Filename: utils/scheduler/timer_scheduler.py
+
+"""
+Process-wide timer scheduler: one heap, one asyncio task, persisted in Redis.
+
+Why:
+- A ``threading.Timer`` per deadline means one sleeping OS thread per table,
+  and the deadline is lost when the worker restarts.
+
+How:
+- Each worker runs a single event loop (in one daemon thread) that sleeps
+  until the earliest deadline in its in-memory heap, or the next Redis poll.
+- Every timer is also stored in the Redis sorted set ``timers:due`` (score =
+  deadline, epoch seconds). Workers poll it, so a timer scheduled by a
+  worker that has since died is still fired by another one.
+- A timer is identified by ``(kind, key, token)``, e.g. ``("poker.turn",
+  game_id, turn_started_at)``. Scheduling the same identity again is a
+  no-op; scheduling a new token for the same ``(kind, key)`` replaces the
+  old timer.
+- Firing is claimed with ``SET NX`` on ``timers:claim:<member>``, so each
+  timer runs once across workers. The claim expires: if a worker dies
+  mid-handler, the timer is still in ``timers:due`` and is retried once the
+  claim lapses, so handlers must be idempotent for their token.
+- Handlers are plain sync callables ``handler(key, token)`` run on a small
+  thread pool (they usually touch the database). A handler that returns a
+  deadline is run again at that time with the same token (e.g. it fired
+  before the state it checks had expired).
+
+Redis Key Structure:
+    - timers:due              (ZSet)   member -> deadline
+    - timers:current          (Hash)   "kind|key" -> member
+    - timers:claim:{member}   (String) worker id, short TTL
+"""
+
+# Step 1: Imports
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from django.db import close_old_connections
+
+from utils.redis.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+DUE_KEY = "timers:due"
+CURRENT_KEY = "timers:current"
+CLAIM_PREFIX = "timers:claim:"
+SEPARATOR = "|"
+
+POLL_INTERVAL_SECONDS = 1.0
+CLAIM_TTL_SECONDS = 30
+POLL_BATCH = 500
+HANDLER_WORKERS = 4
+
+
+def _member(kind, key, token):
+    return SEPARATOR.join((kind, str(key), str(token or "")))
+
+
+def _slot(kind, key):
+    return f"{kind}{SEPARATOR}{key}"
+
+
+def _parse_member(member):
+    kind, key, token = member.split(SEPARATOR, 2)
+    return kind, key, token
+
+
+def _timestamp(fire_at):
+    return fire_at.timestamp() if isinstance(fire_at, datetime) else float(fire_at)
+
+
+class TimerScheduler:
+    """
+    Schedules ``handler(key, token)`` calls at wall-clock deadlines.
+
+    Thread-safe: ``schedule``/``cancel`` may be called from any thread
+    (sync consumers, request threads, handlers themselves).
+    """
+
+    def __init__(self, redis=None, poll_interval=POLL_INTERVAL_SECONDS,
+                 claim_ttl=CLAIM_TTL_SECONDS, handler_workers=HANDLER_WORKERS):
+        self._redis = redis
+        self.poll_interval = poll_interval
+        self.claim_ttl = claim_ttl
+        self.worker_id = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._handlers = {}
+        self._lock = threading.Lock()
+        # Heap of (deadline, seq, member); entries whose member is no longer
+        # in ``_local`` (cancelled/replaced) are skipped when popped.
+        self._heap = []
+        self._seq = itertools.count()
+        self._local = {}      # member -> deadline
+        self._current = {}    # slot -> member
+
+        self._loop = None
+        self._wakeup = None
+        self._thread = None
+        self._started = threading.Event()
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(max_workers=handler_workers, thread_name_prefix="timers")
+
+    # ----------------------------
+    # Redis
+    # ----------------------------
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_client()
+        return self._redis
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def register(self, kind, handler):
+        """Set the callable fired for timers of ``kind``."""
+        self._handlers[kind] = handler
+
+    def schedule(self, kind, key, token, fire_at):
+        """
+        Fire ``handler(key, token)`` at ``fire_at`` (datetime or epoch seconds).
+
+        Replaces any other pending timer for ``(kind, key)``; scheduling the
+        same token again keeps the original deadline.
+        """
+        member = _member(kind, key, token)
+        slot = _slot(kind, key)
+        deadline = _timestamp(fire_at)
+        with self._lock:
+            if self._current.get(slot) == member:
+                return
+
+        # Persist before the local heap can fire it: a claim checks Redis.
+        try:
+            stored = self.redis.hget(CURRENT_KEY, slot)
+            if stored != member:
+                pipe = self.redis.pipeline()
+                if stored:
+                    pipe.zrem(DUE_KEY, stored)
+                pipe.zadd(DUE_KEY, {member: deadline})
+                pipe.hset(CURRENT_KEY, slot, member)
+                pipe.execute()
+        except Exception as exc:
+            logger.warning("[TIMERS] could not persist %s: %s", member, exc)
+
+        with self._lock:
+            previous = self._current.get(slot)
+            self._current[slot] = member
+            if previous and previous != member:
+                self._local.pop(previous, None)
+            self._local[member] = deadline
+            earliest = not self._heap or deadline < self._heap[0][0]
+            heapq.heappush(self._heap, (deadline, next(self._seq), member))
+
+        self.start()
+        if earliest:
+            self._wake()
+
+    def cancel(self, kind, key):
+        """Drop the pending timer for ``(kind, key)``, if any."""
+        slot = _slot(kind, key)
+        with self._lock:
+            member = self._current.pop(slot, None)
+            if member:
+                self._local.pop(member, None)
+        try:
+            stored = self.redis.hget(CURRENT_KEY, slot)
+            if stored:
+                pipe = self.redis.pipeline()
+                pipe.zrem(DUE_KEY, stored)
+                pipe.hdel(CURRENT_KEY, slot)
+                pipe.execute()
+        except Exception as exc:
+            logger.warning("[TIMERS] could not cancel %s: %s", slot, exc)
+
+    def pending(self):
+        """Number of timers this worker is waiting on."""
+        with self._lock:
+            return len(self._local)
+
+    def start(self):
+        """Start the scheduler thread and its event loop (idempotent)."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._thread_main, name="timer-scheduler", daemon=True)
+            self._thread.start()
+        self._started.wait(5)
+
+    def stop(self):
+        """Stop the loop and wait for running handlers (tests, shutdown)."""
+        self._stopping = True
+        self._wake()
+        if self._thread is not None:
+            self._thread.join(5)
+        self._executor.shutdown(wait=True)
+
+    # ----------------------------
+    # Event loop
+    # ----------------------------
+    def _thread_main(self):
+        asyncio.run(self._run())
+
+    def _wake(self):
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._started.set()
+        next_poll = 0.0
+        while not self._stopping:
+            now = time.time()
+            due = [(member, True) for member in self._pop_local_due(now)]
+            if now >= next_poll:
+                next_poll = now + self.poll_interval
+                remote = await self._loop.run_in_executor(None, self._fetch_due, now)
+                due.extend((member, False) for member in remote)
+            if due:
+                for member in await self._loop.run_in_executor(None, self._claim, due):
+                    self._executor.submit(self._fire, member)
+
+            with self._lock:
+                next_deadline = self._heap[0][0] if self._heap else now + self.poll_interval
+            timeout = max(0.0, min(next_deadline, next_poll) - time.time())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _pop_local_due(self, now):
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, _, member = heapq.heappop(self._heap)
+                if self._local.get(member) == deadline:
+                    due.append(member)
+        return due
+
+    def _fetch_due(self, now):
+        """Due members in Redis not already on this worker's heap."""
+        try:
+            members = self.redis.zrangebyscore(DUE_KEY, "-inf", now, start=0, num=POLL_BATCH)
+        except Exception as exc:
+            logger.warning("[TIMERS] poll failed: %s", exc)
+            return []
+        kinds = self._handlers
+        with self._lock:
+            return [
+                member for member in members
+                if member not in self._local and _parse_member(member)[0] in kinds
+            ]
+
+    # ----------------------------
+    # Firing
+    # ----------------------------
+    def _claim(self, due):
+        """
+        Claim ``due`` ``(member, local)`` pairs in one round trip; returns the
+        members this worker should run.
+
+        Without Redis, timers this worker scheduled still fire (single-worker
+        behaviour); timers seen only in Redis never do.
+        """
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for member, _ in due:
+                pipe.set(f"{CLAIM_PREFIX}{member}", self.worker_id, nx=True, ex=self.claim_ttl)
+                pipe.zscore(DUE_KEY, member)
+            results = pipe.execute()
+        except Exception as exc:
+            logger.warning("[TIMERS] claim failed for %d timers: %s", len(due), exc)
+            claimed = [member for member, local in due if local]
+        else:
+            claimed, released = [], []
+            for (member, _), won, score in zip(due, results[0::2], results[1::2]):
+                if won and score is not None:
+                    claimed.append(member)
+                    continue
+                if won:
+                    # Cancelled, replaced or already fired elsewhere.
+                    released.append(f"{CLAIM_PREFIX}{member}")
+                self._forget(member)
+            if released:
+                try:
+                    self.redis.delete(*released)
+                except Exception as exc:
+                    logger.warning("[TIMERS] could not release claims: %s", exc)
+
+        now = time.time()
+        with self._lock:
+            # Keep claimed members tracked (so a re-arm is possible) but off
+            # the poll results while their handlers run.
+            for member in claimed:
+                self._local.setdefault(member, now)
+        return claimed
+
+    def _forget(self, member):
+        kind, key, _ = _parse_member(member)
+        slot = _slot(kind, key)
+        with self._lock:
+            self._local.pop(member, None)
+            if self._current.get(slot) == member:
+                del self._current[slot]
+        return slot
+
+    def _complete(self, member):
+        slot = self._forget(member)
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.zrem(DUE_KEY, member)
+            pipe.hget(CURRENT_KEY, slot)
+            _, current = pipe.execute()
+            if current == member:
+                self.redis.hdel(CURRENT_KEY, slot)
+        except Exception as exc:
+            logger.warning("[TIMERS] could not clear %s: %s", member, exc)
+
+    def _fire(self, member):
+        kind, key, token = _parse_member(member)
+        handler = self._handlers.get(kind)
+        if handler is None:
+            self._forget(member)
+            return
+        retry_at = None
+        try:
+            retry_at = handler(key, token)
+        except Exception:
+            logger.exception("[TIMERS] handler failed for %s", member)
+        finally:
+            if retry_at is None:
+                self._complete(member)
+            else:
+                self._rearm(member, _timestamp(retry_at))
+            close_old_connections()
+
+    def _rearm(self, member, deadline):
+        with self._lock:
+            if member not in self._local:
+                return  # cancelled or replaced while the handler ran
+            self._local[member] = deadline
+            heapq.heappush(self._heap, (deadline, next(self._seq), member))
+        try:
+            pipe = self.redis.pipeline()
+            pipe.zadd(DUE_KEY, {member: deadline}, xx=True)
+            pipe.delete(f"{CLAIM_PREFIX}{member}")
+            pipe.execute()
+        except Exception as exc:
+            logger.warning("[TIMERS] could not re-arm %s: %s", member, exc)
+        self._wake()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_timer_scheduler():
+    """The worker's shared scheduler (created on first use)."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = TimerScheduler()
+    return _scheduler
@@ -0,0 +1,118 @@
+# Filename: utils/websockets/codec.py
+
+"""
+Wire codec shared by the WebSocket consumers.
+
+Why:
+- Every frame went through stdlib ``json``: through
+  ``AsyncJsonWebsocketConsumer.encode_json`` or through direct ``json.dumps``
+  calls. A group event was also re-serialized once per subscriber, even when
+  every subscriber got the same bytes.
+
+How:
+- Text frames are encoded and decoded with ``orjson``. Its output is compact
+  JSON, and ``JSONDecodeError`` is still a ``json.JSONDecodeError``.
+- A consumer that lists ``MSGPACK_SUBPROTOCOL`` in ``wire_subprotocols``
+  accepts that subprotocol when the client offers it
+  (``new WebSocket(url, ["msgpack"])``). That socket then sends and receives
+  binary msgpack frames instead of text. Clients that offer nothing get text
+  as before.
+- ``frame_event`` encodes a group payload once, before ``group_send``. Each
+  subscriber's ``wire_frame`` handler forwards the frame as is. Use it only
+  for payloads that are the same for every socket in the group.
+"""
+
+# Step 1: Imports
+import msgpack
+import orjson
+
+MSGPACK_SUBPROTOCOL = "msgpack"
+
+FRAME_EVENT_TYPE = "wire.frame"
+
+
+# Step 2: Encoding
+def dumps(content) -> str:
+    """``content`` as a JSON text frame."""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+def loads(data):
+    """Decode a JSON text (or bytes) frame; raises ``json.JSONDecodeError``."""
+    return orjson.loads(data)
+
+
+def pack(content) -> bytes:
+    """``content`` as a msgpack binary frame."""
+    return msgpack.packb(content, use_bin_type=True)
+
+
+def unpack(data):
+    """Decode a msgpack binary frame."""
+    return msgpack.unpackb(data, raw=False)
+
+
+def frame_event(content, binary: bool = False) -> dict:
+    """
+    A ``group_send`` event carrying ``content`` already encoded.
+
+    Args:
+        content: The client payload, the same for every subscriber.
+        binary: Also carry the msgpack frame (groups with msgpack sockets).
+    """
+    event = {"type": FRAME_EVENT_TYPE, "text": dumps(content)}
+    if binary:
+        event["bytes"] = pack(content)
+    return event
+
+
+# Step 3: Consumer mixin
+class WireCodecMixin:
+    """
+    Codec for ``AsyncWebsocketConsumer`` and ``AsyncJsonWebsocketConsumer``.
+
+    Put it first in the bases. It provides ``send_json`` (orjson text, or
+    msgpack on a binary socket) and the ``wire_frame`` group handler. JSON
+    consumers also get orjson ``encode_json``/``decode_json``, and binary
+    frames are routed to ``receive_json``.
+    """
+
+    # Subprotocols this consumer may negotiate (opt in per consumer).
+    wire_subprotocols = ()
+    wire_binary = False
+
+    async def accept(self, subprotocol=None):
+        if subprotocol is None and MSGPACK_SUBPROTOCOL in self.wire_subprotocols:
+            if MSGPACK_SUBPROTOCOL in (self.scope.get("subprotocols") or ()):
+                subprotocol = MSGPACK_SUBPROTOCOL
+        self.wire_binary = subprotocol == MSGPACK_SUBPROTOCOL
+        await super().accept(subprotocol)
+
+    @classmethod
+    async def decode_json(cls, text_data):
+        return loads(text_data)
+
+    @classmethod
+    async def encode_json(cls, content):
+        return dumps(content)
+
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        if self.wire_binary and bytes_data is not None:
+            await self.receive_json(unpack(bytes_data), **kwargs)
+            return
+        await super().receive(text_data=text_data, bytes_data=bytes_data, **kwargs)
+
+    async def send_json(self, content, close=False):
+        if self.wire_binary:
+            await self.send(bytes_data=pack(content), close=close)
+        else:
+            await self.send(text_data=dumps(content), close=close)
+
+    async def wire_frame(self, event):
+        """Forward a ``frame_event`` without re-encoding it."""
+        if not self.wire_binary:
+            await self.send(text_data=event["text"])
+        elif "bytes" in event:
+            await self.send(bytes_data=event["bytes"])
+        else:
+            await self.send(bytes_data=pack(loads(event["text"])))
@@ -0,0 +1,90 @@
+# Filename: backend/utils/websockets/tests/test_codec.py
+
+# Step 1: Imports
+import json
+from unittest.mock import patch
+
+import pytest
+from channels.generic.websocket import AsyncJsonWebsocketConsumer, AsyncWebsocketConsumer
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.test import override_settings
+
+from utils.websockets import codec
+from utils.websockets.codec import MSGPACK_SUBPROTOCOL, WireCodecMixin, frame_event, pack, unpack
+
+IN_MEMORY_LAYER = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+GROUP = "codec_test"
+
+
+# Step 2: Consumers under test
+class EchoConsumer(WireCodecMixin, AsyncJsonWebsocketConsumer):
+    wire_subprotocols = (MSGPACK_SUBPROTOCOL,)
+
+    async def connect(self):
+        await self.channel_layer.group_add(GROUP, self.channel_name)
+        await self.accept()
+
+    async def receive_json(self, content, **kwargs):
+        await self.send_json({"echo": content})
+
+
+class TextOnlyConsumer(WireCodecMixin, AsyncWebsocketConsumer):
+    async def connect(self):
+        await self.channel_layer.group_add(GROUP, self.channel_name)
+        await self.accept()
+
+
+# Step 3: Encoding
+def test_text_frames_match_stdlib_json():
+    content = {"type": "game_update", "board_state": "X___O____", "winner": None, 7: [1, 2]}
+    assert json.loads(codec.dumps(content)) == json.loads(json.dumps(content))
+    assert codec.loads(codec.dumps(content).encode()) == json.loads(codec.dumps(content))
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads("{not json")
+
+
+def test_frame_event_carries_binary_only_when_asked():
+    content = {"type": "status_update", "user_id": 3, "status": "online"}
+    assert frame_event(content) == {"type": "wire.frame", "text": codec.dumps(content)}
+    assert unpack(frame_event(content, binary=True)["bytes"]) == content
+
+
+# Step 4: Consumers
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+async def test_subprotocol_is_only_used_when_offered():
+    binary = WebsocketCommunicator(EchoConsumer.as_asgi(), "/", subprotocols=["v1", MSGPACK_SUBPROTOCOL])
+    text = WebsocketCommunicator(EchoConsumer.as_asgi(), "/")
+    assert await binary.connect() == (True, MSGPACK_SUBPROTOCOL)
+    assert await text.connect() == (True, None)
+
+    await binary.send_to(bytes_data=pack({"move": 4}))
+    assert unpack((await binary.receive_output())["bytes"]) == {"echo": {"move": 4}}
+    await text.send_json_to({"move": 4})
+    assert await text.receive_json_from() == {"echo": {"move": 4}}
+
+    await binary.disconnect()
+    await text.disconnect()
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+async def test_group_frame_is_encoded_once_for_every_subscriber():
+    sockets = [
+        WebsocketCommunicator(TextOnlyConsumer.as_asgi(), "/"),
+        WebsocketCommunicator(EchoConsumer.as_asgi(), "/"),
+        WebsocketCommunicator(EchoConsumer.as_asgi(), "/", subprotocols=[MSGPACK_SUBPROTOCOL]),
+    ]
+    for socket in sockets:
+        await socket.connect()
+
+    content = {"type": "group_message", "room_id": 1, "message": "hi"}
+    event = frame_event(content, binary=True)
+    with patch.object(codec, "dumps", side_effect=AssertionError("re-encoded")), \
+            patch.object(codec, "pack", side_effect=AssertionError("re-packed")):
+        await get_channel_layer().group_send(GROUP, event)
+        frames = [await socket.receive_output() for socket in sockets]
+
+    assert frames[0]["text"] == frames[1]["text"] == event["text"]
+    assert frames[2]["bytes"] == event["bytes"]
+    for socket in sockets:
+        await socket.disconnect()
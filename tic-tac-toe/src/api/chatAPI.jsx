@@ -19,11 +19,13 @@ const getConversationWith = async (authAxios, friendId) => {
 };
 
 /**
- * Fetch messages for a conversation.
- * Backend: GET /api/chat/conversations/<conversation_id>/messages/
+ * Fetch a page of messages for a conversation (newest page when no cursor).
+ * Backend: GET /api/chat/conversations/<conversation_id>/messages/?before=&after=&limit=
+ *
+ * Expected response: { results: [...oldest -> newest], older: cursor|null, newer: cursor|null }
  */
-const fetchConversationMessages = async (authAxios, conversationId) => {
-  return await authAxios.get(`/chat/conversations/${conversationId}/messages/`);
+const fetchConversationMessages = async (authAxios, conversationId, params = {}) => {
+  return await authAxios.get(`/chat/conversations/${conversationId}/messages/`, { params });
 };
 
 /**
@@ -57,8 +59,12 @@ const createGroup = async (authAxios, { name, memberIds }) => {
   });
 };
 
-const fetchGroupMessages = async (authAxios, roomId) => {
-  return await authAxios.get(`/chat/groups/${roomId}/messages/`);
+/**
+ * Fetch a page of group messages; same paging contract as fetchConversationMessages.
+ * Backend: GET /api/chat/groups/<room_id>/messages/?before=&after=&limit=
+ */
+const fetchGroupMessages = async (authAxios, roomId, params = {}) => {
+  return await authAxios.get(`/chat/groups/${roomId}/messages/`, { params });
 };
 
 const markGroupRead = async (authAxios, roomId) => {
@@ -1,7 +1,7 @@
 // # Filename: src/components/messaging/DMDrawer/DMDrawer.jsx
 // ✅ New Code
 
-import React, { useCallback, useEffect, useMemo, useRef, useState } from "react";
+import React, { useCallback, useEffect, useLayoutEffect, useMemo, useRef, useState } from "react";
 import { IoIosSend } from "react-icons/io";
 import { IoCloseSharp, IoChevronBack } from "react-icons/io5";
 import { CiTrash, CiChat1 } from "react-icons/ci";
@@ -51,10 +51,15 @@ export default function DMDrawer() {
     addGroupMembers,
     openGroup,
     isLoading,
+    isLoadingOlder,
+    hasOlderMessages,
+    loadOlderMessages,
   } = useDirectMessage();
 
   const [draft, setDraft] = useState("");
   const endRef = useRef(null);
+  const scrollRef = useRef(null);
+  const scrollAnchorRef = useRef(null);
   const prevThreadKeyRef = useRef(null);
   const [isCreatingGroup, setIsCreatingGroup] = useState(false);
   const [isAddingMembers, setIsAddingMembers] = useState(false);
@@ -101,6 +106,10 @@ export default function DMDrawer() {
   // used to tell "switched to a different chat" apart from "new message arrived".
   const threadKey = activeMode === "group" ? `group:${activeGroupId}` : `dm:${friendId}`;
 
+  // The newest message -- prepending older history must not count as "new".
+  const lastMsg = thread[thread.length - 1];
+  const lastMessageKey = lastMsg ? lastMsg.message_id || lastMsg.id || lastMsg.timestamp : null;
+
   useEffect(() => { setIsGroupMenuOpen(false); }, [threadKey]);
 
   useEffect(() => {
@@ -313,7 +322,35 @@ export default function DMDrawer() {
     }, isThreadSwitch ? 0 : 40);
 
     return () => clearTimeout(t);
-  }, [isOpen, thread.length, threadKey]);
+  }, [isOpen, lastMessageKey, threadKey]);
+
+  // Step 7b: Scroll-back. Reaching the top loads the previous page; the
+  // scroll offset is then shifted by the height it added so the message the
+  // user was reading stays put.
+  const handleLoadOlder = useCallback(() => {
+    const el = scrollRef.current;
+    if (!el || !hasOlderMessages || isLoadingOlder) return;
+
+    scrollAnchorRef.current = { height: el.scrollHeight, top: el.scrollTop };
+    loadOlderMessages().then((loaded) => {
+      if (!loaded) scrollAnchorRef.current = null;
+    });
+  }, [hasOlderMessages, isLoadingOlder, loadOlderMessages]);
+
+  const handleThreadScroll = useCallback((e) => {
+    if (e.currentTarget.scrollTop < 48) handleLoadOlder();
+  }, [handleLoadOlder]);
+
+  useLayoutEffect(() => {
+    const el = scrollRef.current;
+    const anchor = scrollAnchorRef.current;
+    if (!el || !anchor) return;
+
+    scrollAnchorRef.current = null;
+    el.scrollTop = el.scrollHeight - anchor.height + anchor.top;
+  }, [thread.length]);
+
+  useEffect(() => { scrollAnchorRef.current = null; }, [threadKey]);
 
   // Step 8: Escape closes
   useEffect(() => {
@@ -555,7 +592,11 @@ export default function DMDrawer() {
         </div>
 
         {/* Messages (scroll region) */}
-        <div className="flex-1 min-h-0 overflow-y-auto px-3 py-3 tron-scrollbar-dark">
+        <div
+          ref={scrollRef}
+          onScroll={isInbox || isAddingMembers ? undefined : handleThreadScroll}
+          className="flex-1 min-h-0 overflow-y-auto px-3 py-3 tron-scrollbar-dark"
+        >
           {isInbox ? (
             <ChatInbox
               groups={groups}
@@ -592,6 +633,18 @@ export default function DMDrawer() {
             </div>
           ) : (
             <>
+              {hasOlderMessages || isLoadingOlder ? (
+                <div className="flex justify-center pb-2">
+                  <button
+                    type="button"
+                    onClick={handleLoadOlder}
+                    disabled={isLoadingOlder}
+                    className="text-xs text-text-secondary hover:text-brand-cyan disabled:opacity-60"
+                  >
+                    {isLoadingOlder ? "Loading earlier messages…" : "Load earlier messages"}
+                  </button>
+                </div>
+              ) : null}
               {thread.map((msg) => (
                 <MessageBubble
                   key={msg.message_id || msg.id || msg.timestamp}
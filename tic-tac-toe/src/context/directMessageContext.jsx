@@ -81,6 +81,7 @@ export const DirectMessageProvider = ({ children }) => {
 
   // Cancels stale async work when user switches threads quickly
   const connectAttemptRef = useRef(0);
+  const loadingOlderRef = useRef(false);
 
   // ---------------------------
   // Step 2: Helpers
@@ -646,6 +647,11 @@ export const DirectMessageProvider = ({ children }) => {
         if (attemptId !== connectAttemptRef.current) return true;
 
         if (conversationId) {
+          dispatch({
+            type: DmActionTypes.SET_CONVERSATION_ID,
+            payload: { friendId, conversationId },
+          });
+
           const res = await chatAPI.fetchConversationMessages(
             authAxios,
             conversationId
@@ -653,13 +659,13 @@ export const DirectMessageProvider = ({ children }) => {
 
           if (attemptId !== connectAttemptRef.current) return true;
 
-          const normalized = Array.isArray(res.data)
-            ? res.data.map(normalizeRestMessage)
+          const normalized = Array.isArray(res.data?.results)
+            ? res.data.results.map(normalizeRestMessage)
             : [];
 
           dispatch({
             type: DmActionTypes.SET_MESSAGES,
-            payload: { friendId, messages: normalized },
+            payload: { friendId, messages: normalized, older: res.data?.older },
           });
 
           await markConversationRead(conversationId);
@@ -711,13 +717,13 @@ export const DirectMessageProvider = ({ children }) => {
         if (!mountedRef.current) return true;
         if (attemptId !== connectAttemptRef.current) return true;
 
-        const normalized = Array.isArray(res.data)
-          ? res.data.map(normalizeGroupMessage)
+        const normalized = Array.isArray(res.data?.results)
+          ? res.data.results.map(normalizeGroupMessage)
           : [];
 
         dispatch({
           type: DmActionTypes.SET_GROUP_MESSAGES,
-          payload: { groupId, messages: normalized },
+          payload: { groupId, messages: normalized, older: res.data?.older },
         });
 
         await chatAPI.markGroupRead(authAxios, groupId);
@@ -738,6 +744,61 @@ export const DirectMessageProvider = ({ children }) => {
     [authAxios, connectGroupWsOnly, normalizeGroupMessage, setDMOpen]
   );
 
+  // Scroll-back: fetch the page before the oldest loaded message of the open
+  // thread and prepend it. The cursor comes from the last page fetched; null
+  // means the start of the thread is already loaded.
+  const loadOlderMessages = useCallback(async () => {
+    if (loadingOlderRef.current) return false;
+
+    const isGroup = state.activeMode === "group";
+    const key = isGroup ? state.activeGroupId : state.activeFriendId;
+    if (!key) return false;
+
+    const before = isGroup ? state.groupOlderCursors[key] : state.olderCursors[key];
+    const conversationId = isGroup ? null : state.conversationIds[key];
+    if (!before || (!isGroup && !conversationId)) return false;
+
+    loadingOlderRef.current = true;
+    dispatch({ type: DmActionTypes.SET_LOADING_OLDER, payload: true });
+
+    try {
+      const res = isGroup
+        ? await chatAPI.fetchGroupMessages(authAxios, key, { before })
+        : await chatAPI.fetchConversationMessages(authAxios, conversationId, { before });
+      if (!mountedRef.current) return false;
+
+      const results = Array.isArray(res.data?.results) ? res.data.results : [];
+      dispatch(
+        isGroup
+          ? {
+              type: DmActionTypes.PREPEND_GROUP_MESSAGES,
+              payload: { groupId: key, messages: results.map(normalizeGroupMessage), older: res.data?.older },
+            }
+          : {
+              type: DmActionTypes.PREPEND_MESSAGES,
+              payload: { friendId: key, messages: results.map(normalizeRestMessage), older: res.data?.older },
+            }
+      );
+      return results.length > 0;
+    } catch (err) {
+      console.error("❌ Loading older messages failed:", err?.response?.status || err);
+      dispatch({ type: DmActionTypes.SET_LOADING_OLDER, payload: false });
+      return false;
+    } finally {
+      loadingOlderRef.current = false;
+    }
+  }, [
+    authAxios,
+    normalizeGroupMessage,
+    normalizeRestMessage,
+    state.activeFriendId,
+    state.activeGroupId,
+    state.activeMode,
+    state.conversationIds,
+    state.groupOlderCursors,
+    state.olderCursors,
+  ]);
+
   const closeChat = useCallback(() => {
     try {
       disconnectDM();
@@ -872,6 +933,12 @@ export const DirectMessageProvider = ({ children }) => {
         ...state,
         openChat,
         openGroup,
+        loadOlderMessages,
+        hasOlderMessages: Boolean(
+          state.activeMode === "group"
+            ? state.groupOlderCursors[state.activeGroupId]
+            : state.olderCursors[state.activeFriendId]
+        ),
         closeChat,
         backToInbox: disconnectDM,
         sendMessage,
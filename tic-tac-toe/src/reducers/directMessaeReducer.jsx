@@ -7,7 +7,8 @@
  * - activeChat (selected friend object)
  * - activeFriendId (other user id)
  * - socket (WebSocket instance)
- * - messages (keyed by friendId)
+ * - messages (keyed by friendId), oldest -> newest
+ * - olderCursors / groupOlderCursors (paging back through history)
  * - unreadCounts (keyed by friendId)
  *
  * NOTE (tech debt):
@@ -30,6 +31,12 @@ export const initialDMState = {
   groupMessages: {},
   groups: [],
 
+  // olderCursors[friendId] / groupOlderCursors[groupId] = `before` cursor for
+  // the next page back, or null once the start of the thread is loaded
+  olderCursors: {},
+  groupOlderCursors: {},
+  isLoadingOlder: false,
+
   // unreadCounts[friendId] = number
   unreadCounts: {},
   groupUnreadCounts: {},
@@ -55,6 +62,9 @@ export const DmActionTypes = {
   UPSERT_GROUP: "UPSERT_GROUP",
   REMOVE_GROUP: "REMOVE_GROUP",
   SET_GROUP_MESSAGES: "SET_GROUP_MESSAGES",
+  PREPEND_MESSAGES: "PREPEND_MESSAGES",
+  PREPEND_GROUP_MESSAGES: "PREPEND_GROUP_MESSAGES",
+  SET_LOADING_OLDER: "SET_LOADING_OLDER",
   RECEIVE_MESSAGE: "RECEIVE_MESSAGE",
   RECEIVE_GROUP_MESSAGE: "RECEIVE_GROUP_MESSAGE",
   CLEAR_THREAD: "CLEAR_THREAD",
@@ -78,6 +88,17 @@ export const DmActionTypes = {
 
 const normalizeFriendKey = (friendId) => String(friendId);
 
+const messageKey = (m) => String(m?.id ?? m?.message_id);
+
+// Older page first, skipping anything the thread already holds
+// (a live message can land in both).
+const prependPage = (existing, older) => {
+  const thread = Array.isArray(existing) ? existing : [];
+  const seen = new Set(thread.map(messageKey));
+  const page = (Array.isArray(older) ? older : []).filter((m) => !seen.has(messageKey(m)));
+  return [...page, ...thread];
+};
+
 const safeNumber = (n) => {
   const v = Number(n);
   return Number.isFinite(v) ? v : 0;
@@ -144,7 +165,7 @@ export function directMessageReducer(state, action) {
     // Step 2: Messages
     // ---------------------------
     case DmActionTypes.SET_MESSAGES: {
-      const { friendId, messages } = action.payload || {};
+      const { friendId, messages, older } = action.payload || {};
       const key = normalizeFriendKey(friendId);
 
       return {
@@ -154,6 +175,28 @@ export function directMessageReducer(state, action) {
           ...state.messages,
           [key]: Array.isArray(messages) ? messages : [],
         },
+        olderCursors: {
+          ...state.olderCursors,
+          [key]: older ?? null,
+        },
+      };
+    }
+
+    case DmActionTypes.PREPEND_MESSAGES: {
+      const { friendId, messages, older } = action.payload || {};
+      const key = normalizeFriendKey(friendId);
+
+      return {
+        ...state,
+        isLoadingOlder: false,
+        messages: {
+          ...state.messages,
+          [key]: prependPage(state.messages[key], messages),
+        },
+        olderCursors: {
+          ...state.olderCursors,
+          [key]: older ?? null,
+        },
       };
     }
 
@@ -207,7 +250,7 @@ export function directMessageReducer(state, action) {
     }
 
     case DmActionTypes.SET_GROUP_MESSAGES: {
-      const { groupId, messages } = action.payload || {};
+      const { groupId, messages, older } = action.payload || {};
       const key = normalizeFriendKey(groupId);
 
       return {
@@ -217,6 +260,35 @@ export function directMessageReducer(state, action) {
           ...state.groupMessages,
           [key]: Array.isArray(messages) ? messages : [],
         },
+        groupOlderCursors: {
+          ...state.groupOlderCursors,
+          [key]: older ?? null,
+        },
+      };
+    }
+
+    case DmActionTypes.PREPEND_GROUP_MESSAGES: {
+      const { groupId, messages, older } = action.payload || {};
+      const key = normalizeFriendKey(groupId);
+
+      return {
+        ...state,
+        isLoadingOlder: false,
+        groupMessages: {
+          ...state.groupMessages,
+          [key]: prependPage(state.groupMessages[key], messages),
+        },
+        groupOlderCursors: {
+          ...state.groupOlderCursors,
+          [key]: older ?? null,
+        },
+      };
+    }
+
+    case DmActionTypes.SET_LOADING_OLDER: {
+      return {
+        ...state,
+        isLoadingOlder: Boolean(action.payload),
       };
     }
 
@@ -322,10 +394,14 @@ export function directMessageReducer(state, action) {
       const nextUnread = { ...state.unreadCounts };
       nextUnread[key] = 0;
 
+      const nextCursors = { ...state.olderCursors };
+      delete nextCursors[key];
+
       return {
         ...state,
         messages: nextMessages,
         unreadCounts: nextUnread,
+        olderCursors: nextCursors,
       };
     }
 
@@ -343,6 +419,10 @@ export function directMessageReducer(state, action) {
           ...state.groupUnreadCounts,
           [key]: 0,
         },
+        groupOlderCursors: {
+          ...state.groupOlderCursors,
+          [key]: null,
+        },
       };
     }
 